@@ -0,0 +1,190 @@
+# website_builder/benchmarks/highlighter_benchmark.py
+"""
+Throughput benchmark: single-pass lexer highlighter vs. the old regex rule loop.
+
+Builds a synthetic HTML document (markup, an embedded <style> and <script>),
+attaches each highlighter to its own QTextDocument and times a full
+rehighlight, reporting blocks per second.
+
+Usage (from the repository root):
+    python benchmarks/highlighter_benchmark.py [--lines 20000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtCore import QRegularExpression
+from PyQt6.QtGui import QColor, QFont, QGuiApplication, QSyntaxHighlighter, QTextCharFormat, QTextDocument
+
+from utils import syntax_lexer
+from views.syntax_highlighters import HtmlHighlighter
+
+
+class LegacyRuleHighlighter(QSyntaxHighlighter):
+    """The previous highlighter: one globalMatch per rule per block, then a comment pass."""
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.highlightingRules = []
+        self.commentStartExpression = QRegularExpression("/\\*")
+        self.commentEndExpression = QRegularExpression("\\*/")
+        self.multiLineCommentFormat = QTextCharFormat()
+        self.multiLineCommentFormat.setForeground(QColor(128, 128, 128))
+        self.multiLineCommentFormat.setFontItalic(True)
+
+        def create_format(color, bold=False, italic=False):
+            fmt = QTextCharFormat()
+            fmt.setForeground(color)
+            if bold:
+                fmt.setFontWeight(QFont.Weight.Bold)
+            if italic:
+                fmt.setFontItalic(True)
+            return fmt
+
+        case_insensitive = QRegularExpression.PatternOption.CaseInsensitiveOption
+        tag_format = create_format(QColor(0, 0, 128), bold=True)
+        for word in [
+            "html", "head", "body", "title", "div", "span", "p", "a", "img", "ul", "ol", "li",
+            "table", "tr", "td", "th", "form", "input", "button", "textarea", "select",
+            "option", "meta", "link", "style", "script", "header", "footer", "nav",
+            "article", "section", "aside", "main", "figure", "figcaption",
+        ]:
+            self.highlightingRules.append((QRegularExpression(f"<\\s*{word}(\\b|(?=\\s|/?>))", case_insensitive), tag_format))
+            self.highlightingRules.append((QRegularExpression(f"</\\s*{word}\\s*>", case_insensitive), tag_format))
+        self.highlightingRules.append((QRegularExpression("\\b[a-zA-Z\\-:]+(?=\\s*=)"), create_format(QColor(128, 0, 0))))
+        self.highlightingRules.append((QRegularExpression("[<>/]"), create_format(QColor(128, 128, 128))))
+        self.highlightingRules.append((QRegularExpression("(^\\s*|}\\s*)([\\w\\.#\\-\\*\\[\\]=:\"]+)(?=\\s*\\{)"), create_format(QColor(128, 0, 128))))
+        self.highlightingRules.append((QRegularExpression("\\b([a-z\\-]+)(?=\\s*:)"), create_format(QColor(0, 128, 0))))
+        self.highlightingRules.append((QRegularExpression(":\\s*([^;\\}]+)(?=[;\\}])"), create_format(QColor(0, 0, 200))))
+        keyword_format = create_format(QColor(170, 120, 100), bold=True)
+        for word in sorted(syntax_lexer.JS_KEYWORDS):
+            self.highlightingRules.append((QRegularExpression(f"\\b{word}\\b"), keyword_format))
+        builtin_format = create_format(QColor(100, 100, 200))
+        for word in sorted(syntax_lexer.JS_BUILTINS):
+            self.highlightingRules.append((QRegularExpression(f"\\b{word}\\b"), builtin_format))
+        self.highlightingRules.append((QRegularExpression("//[^\n]*"), create_format(QColor(128, 128, 128), italic=True)))
+        string_format = create_format(QColor(0, 150, 0))
+        for pattern in ("\".*?\"", "'.*?'", "`.*?`"):
+            self.highlightingRules.append((QRegularExpression(pattern), string_format))
+        self.highlightingRules.append((QRegularExpression("\\b\\d+(?:\\.\\d+)?(?:[eE][+-]?\\d+)?\\b"), create_format(QColor(200, 100, 0))))
+
+    def highlightBlock(self, text):
+        for pattern, format_rule in self.highlightingRules:
+            match_iterator = pattern.globalMatch(text)
+            while match_iterator.hasNext():
+                match = match_iterator.next()
+                if self.currentBlockState() != 1:
+                    self.setFormat(match.capturedStart(), match.capturedLength(), format_rule)
+
+        self.setCurrentBlockState(0)
+        if self.previousBlockState() == 1:
+            start_index = 0
+        else:
+            match = self.commentStartExpression.match(text)
+            start_index = match.capturedStart() if match.hasMatch() else -1
+        while start_index >= 0:
+            end_match = self.commentEndExpression.match(text, start_index + 2)
+            end_index = end_match.capturedStart()
+            if end_index == -1:
+                self.setCurrentBlockState(1)
+                comment_length = len(text) - start_index
+            else:
+                comment_length = end_index - start_index + end_match.capturedLength()
+            self.setFormat(start_index, comment_length, self.multiLineCommentFormat)
+            match = self.commentStartExpression.match(text, start_index + comment_length)
+            start_index = match.capturedStart() if match.hasMatch() else -1
+
+
+SECTION = """<section class="card" id="card-{i}" data-index="{i}">
+    <h2 class="card__title">Item {i}</h2>
+    <p>Some <a href="/items/{i}.html" title='Item {i}'>linked</a> text &amp; more text.</p>
+    <!-- card {i}
+         footer -->
+    <img src="img/{i}.png" alt="Image {i}" width="320" height="200">
+</section>
+"""
+
+STYLE = """<style>
+/* generated rules */
+.card-{i} {{ color: #333; margin: 0 auto; font-family: "SF Pro", sans-serif; }}
+.card-{i}:hover {{ background: url('bg-{i}.png') no-repeat; }}
+</style>
+"""
+
+SCRIPT = """<script type="module">
+// handler {i}
+const el{i} = document.getElementById("card-{i}");
+function onClick{i}(event) {{ return fetch(`/api/items/${{event.id}}`).then(r => r.json()); }}
+/* multi
+   line */ el{i}.addEventListener('click', onClick{i});
+</script>
+"""
+
+
+def build_document(line_count: int) -> str:
+    parts = ["<!DOCTYPE html>\n<html lang=\"en\">\n<head><title>Benchmark</title></head>\n<body>\n"]
+    lines = 4
+    i = 0
+    while lines < line_count:
+        for template in (SECTION, STYLE, SCRIPT):
+            chunk = template.format(i=i)
+            parts.append(chunk)
+            lines += chunk.count("\n")
+        i += 1
+    parts.append("</body>\n</html>\n")
+    return "".join(parts)
+
+
+def time_highlighter(factory, text: str, repeat: int) -> float:
+    """Returns the best wall time (seconds) of a full rehighlight."""
+    document = QTextDocument()
+    document.setPlainText(text)
+    highlighter = factory(document)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        highlighter.rehighlight()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def time_lexer(text: str, repeat: int) -> float:
+    """Returns the best wall time (seconds) of lexing every line without Qt."""
+    lines = text.split("\n")
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        state = syntax_lexer.HTML_TEXT
+        for line in lines:
+            _, state = syntax_lexer.HTML_LEXER.lex_line(line, state)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lines", type=int, default=20000, help="approximate document size in lines")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    text = build_document(args.lines)
+    block_count = text.count("\n") + 1
+    print(f"Document: {block_count} blocks, {len(text) / 1024:.0f} KiB")
+
+    results = [
+        ("legacy rule loop", time_highlighter(LegacyRuleHighlighter, text, args.repeat)),
+        ("single-pass lexer", time_highlighter(HtmlHighlighter, text, args.repeat)),
+        ("lexer only (no Qt)", time_lexer(text, args.repeat)),
+    ]
+    baseline = results[0][1]
+    for name, seconds in results:
+        print(f"{name:>20}: {seconds * 1000:8.1f} ms  {block_count / seconds:10.0f} blocks/s  "
+              f"x{baseline / seconds:.1f}")
+
+
+if __name__ == "__main__":
+    main()
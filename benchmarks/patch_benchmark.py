@@ -0,0 +1,80 @@
+# website_builder/benchmarks/patch_benchmark.py
+"""
+Cost of replacing editor content: minimal-diff patching vs. setPlainText.
+
+For each document size, a highlighted QTextDocument receives a new version of
+its text that differs in a few lines (the common case for a reload after an
+external tool touched the file), once through setPlainText and once through
+patch_document. Reports the best wall time of each.
+
+Usage (from the repository root):
+    python benchmarks/patch_benchmark.py [--sizes 1000,10000,50000] [--changes 3] [--mode edit|insert] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtGui import QGuiApplication, QTextDocument
+
+from views.document_patcher import patch_document
+from views.syntax_highlighters import HtmlHighlighter
+from highlighter_benchmark import build_document
+
+
+def changed_version(text: str, changes: int, mode: str) -> str:
+    """
+    Changes `changes` places spread evenly over the document: re-indents a line
+    ("edit", like a formatter would) or inserts a new one ("insert").
+    """
+    lines = text.split("\n")
+    step = max(1, len(lines) // (changes + 1))
+    for n in range(changes, 0, -1):
+        index = min(n * step, len(lines) - 1)
+        if mode == "insert":
+            lines.insert(index, f"<p>Inserted {n}</p>")
+        else:
+            lines[index] = "  " + lines[index]
+    return "\n".join(lines)
+
+
+def time_replace(replace, old_text: str, new_text: str, repeat: int) -> float:
+    """Returns the best wall time (seconds) of one replacement on a highlighted document."""
+    best = float("inf")
+    for _ in range(repeat):
+        document = QTextDocument()
+        document.setPlainText(old_text)
+        highlighter = HtmlHighlighter(document)
+        start = time.perf_counter()
+        replace(document, new_text)
+        best = min(best, time.perf_counter() - start)
+        if document.toPlainText() != new_text:
+            raise AssertionError("replacement produced the wrong text")
+        del highlighter
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,50000", help="comma-separated document sizes in lines")
+    parser.add_argument("--changes", type=int, default=3, help="changed lines per new version")
+    parser.add_argument("--mode", choices=("edit", "insert"), default="edit", help="how lines are changed")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per variant (best is reported)")
+    args = parser.parse_args()
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    print(f"{'blocks':>8} {'setPlainText':>14} {'patch':>10} {'speedup':>8}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        old_text = build_document(size)
+        new_text = changed_version(old_text, args.changes, args.mode)
+        full = time_replace(lambda doc, text: doc.setPlainText(text), old_text, new_text, args.repeat)
+        patched = time_replace(patch_document, old_text, new_text, args.repeat)
+        print(f"{old_text.count(chr(10)) + 1:>8} {full * 1000:>11.1f} ms {patched * 1000:>7.1f} ms "
+              f"{full / patched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,7 @@ import re
 import shutil
 import logging
 from bs4 import BeautifulSoup
-from PyQt6.QtCore import QObject, pyqtSlot, QUrl
+from PyQt6.QtCore import QObject, QTimer, pyqtSlot, QUrl
 from PyQt6.QtWidgets import (
     QFileDialog,
     QMessageBox,
@@ -20,9 +20,21 @@ from PyQt6.QtWidgets import (
     QPushButton,
 )
 
+from utils import session_store
+from utils.completion_engine import CompletionEngine
+from utils.dev_server import DevServer
+from utils.latency_metrics import LatencyMetrics
+from utils.lint_service import LintService
+from utils.project_replace import ProjectReplacer, replace_in_text
+from utils.project_search import ProjectSearchIndexer, compile_query, replacement_function
+from utils.symbol_extractor import CLASS, FUNCTION, ID, VARIABLE, language_for_path, symbol_at
+from utils.symbol_index import ProjectSymbolIndexer
+
 logger = logging.getLogger(__name__)
 
 class MainController(QObject):
+    BUFFER_INDEX_DELAY_MS = 300 # Typing pause before an edited buffer is reindexed
+
     def __init__(self, main_window, theme_manager, welcome_screen):
         super().__init__()
         self.window = main_window
@@ -32,6 +44,38 @@ class MainController(QObject):
         self.projects_dir = self._get_root_projects_directory()
         self.current_project_mode = "free"
         self._signals_connected = False
+
+        # Background index of ids, classes, CSS rules and JS declarations of the project
+        self.symbol_indexer = ProjectSymbolIndexer(self)
+        self.symbol_indexer.index_updated.connect(self._on_symbol_index_updated)
+        self._dirty_buffers = set()
+        self._buffer_index_timer = QTimer(self)
+        self._buffer_index_timer.setSingleShot(True)
+        self._buffer_index_timer.setInterval(self.BUFFER_INDEX_DELAY_MS)
+        self._buffer_index_timer.timeout.connect(self._index_dirty_buffers)
+        # Trigram index for find in files (saved between sessions)
+        self.search_indexer = ProjectSearchIndexer(self)
+        self.search_indexer.matches_found.connect(self._on_search_matches)
+        self.search_indexer.search_finished.connect(self._on_search_finished)
+        # Replace in files: all-or-nothing writes on a worker pool
+        self.replacer = ProjectReplacer(self)
+        self.replacer.progress.connect(self._on_replace_progress)
+        self.replacer.finished.connect(self._on_replace_finished)
+        # Completion of tags, attributes, CSS and the project's classes, ids and paths
+        self.completion_engine = CompletionEngine(self.symbol_indexer, self)
+        self.window.code_editor_widget.set_completion_engine(self.completion_engine)
+        # The preview patches unsaved edits of its page in, pulling the text from the editor
+        self.window.web_preview.buffer_source = self.window.code_editor_widget.get_content
+        # ... and serves unsaved files to the page from their editor buffers
+        self.window.web_preview.overlay.buffer_source = self.window.code_editor_widget.unsaved_content
+        # Diagnostics of open files, computed in worker processes
+        self.lint_service = LintService(self)
+        self.lint_service.diagnostics_ready.connect(self._on_diagnostics_ready)
+        # Serves the project over HTTP to external browsers ("Run in Browser"); started on first use
+        self.dev_server = DevServer(self)
+        self._editor_replacements = 0 # Made in open editors by the running replace
+        self._editor_edited_files = 0 # Open editors it patched
+
         self._connect_signals()
 
     def _get_root_projects_directory(self) -> str:
@@ -96,6 +140,7 @@ class MainController(QObject):
         try:
             self.window.action_undo.triggered.connect(self.undo)
             self.window.action_redo.triggered.connect(self.redo)
+            self.window.action_find_in_files.triggered.connect(self.show_find_in_files)
             # Add cut/copy/paste connections if implemented
             logger.debug("Connected Edit menu signals.")
         except AttributeError as e:
@@ -107,6 +152,7 @@ class MainController(QObject):
         # --- View Menu Actions ---
         try:
             self.window.action_toggle_theme.triggered.connect(self.toggle_theme)
+            self.window.action_dump_latency_metrics.triggered.connect(self.dump_latency_metrics)
             # Connections for toggle docks are in MainWindow itself
             logger.debug("Connected View menu signals.")
         except AttributeError as e:
@@ -137,6 +183,17 @@ class MainController(QObject):
             # ... (connect CodeEditorTabWidget signals) ...
             self.window.code_editor_widget.content_changed.connect(self.handle_content_change)
             self.window.code_editor_widget.tab_closed_signal.connect(self.handle_tab_closed)
+            self.window.code_editor_widget.current_file_changed.connect(self.refresh_outline)
+            self.window.code_editor_widget.definition_requested.connect(self.go_to_definition)
+            self.window.code_editor_widget.usages_requested.connect(self.find_usages)
+            self.window.symbol_panel.location_activated.connect(self.window.code_editor_widget.go_to_location)
+            self.window.code_editor_widget.save_finished.connect(self.handle_file_saved)
+            self.window.find_panel.search_requested.connect(self.find_in_files)
+            self.window.find_panel.cancel_requested.connect(self.cancel_find_in_files)
+            self.window.find_panel.replace_requested.connect(self.replace_in_files)
+            self.window.find_panel.location_activated.connect(self.window.code_editor_widget.go_to_location)
+            self.window.code_editor_widget.document_loaded.connect(self.lint_file)
+            self.window.problems_panel.location_activated.connect(self.window.code_editor_widget.go_to_location)
 
             logger.debug("Connected Widget signals.")
         except AttributeError as e:
@@ -730,20 +787,34 @@ class MainController(QObject):
         """Updates file explorer, preview, and window title for the given path."""
 
         if folder_path and os.path.isdir(folder_path):
+            if self.current_project_path and os.path.normpath(self.current_project_path) != os.path.normpath(folder_path):
+                self.save_session() # Remember the tabs of the project we are leaving
             self.current_project_path = folder_path
             self.window.file_explorer.set_root_path(folder_path) # This will also trigger filter update in explorer
             self.window.web_preview.set_project_root(folder_path) # This might auto-load index/default file
+            self.dev_server.set_root(folder_path)
+            self._set_index_roots(folder_path)
             project_folder_name = os.path.basename(folder_path)
             self.window.setWindowTitle(f"{project_folder_name} - Flexta")
             print(f"MainController: Project context updated to: {folder_path}")
             # Maybe close tabs from previous project? Optional.
             # self.window.code_editor_widget.close_all_tabs()
+            session = session_store.load_session(folder_path)
+            if session:
+                self.window.code_editor_widget.restore_session(session)
         else:
             print(f"MainController: Error updating project context: Invalid path '{folder_path}'")
             self.current_project_path = None
             # Optionally clear file explorer, preview, title here
             self.window.setWindowTitle("Flexta")
 
+    def save_session(self):
+        """Saves the open tabs of the current project, to be restored when it is opened again."""
+        if not self.current_project_path:
+            return
+        session_store.save_session(self.current_project_path, self.window.code_editor_widget.session_state())
+        self.search_indexer.flush()
+
     @pyqtSlot(str)
     def handle_file_selected(self, file_path):
         """Handles the signal when a file is selected in the file explorer."""
@@ -757,12 +828,236 @@ class MainController(QObject):
         if file_path.lower().endswith((".html", ".htm")):
             self.window.web_preview.load_file(file_path)
 
-    @pyqtSlot(str, str)
-    def handle_content_change(self, file_path, content):
-        """Handles the signal when the content of a file changes in the code editor."""
+    @pyqtSlot(str, int, list)
+    def handle_content_change(self, file_path, version, deltas):
+        """
+        Handles coalesced edits from the code editor: `deltas` is a list of
+        (position, chars_removed, inserted_text). The full text, if needed, can be
+        pulled with code_editor_widget.get_content(file_path).
+        """
+        logger.debug(f"Content changed in {file_path} (version {version}, {len(deltas)} edits)")
+        # TODO: Implement synchronization logic between code editor and visual designer
+        self._dirty_buffers.add(file_path)
+        self._buffer_index_timer.start()
+        self.window.web_preview.buffer_changed(file_path)
+
+    def _index_dirty_buffers(self):
+        """Reindexes and lints edited files from their (unsaved) editor text."""
+        dirty, self._dirty_buffers = self._dirty_buffers, set()
+        for file_path in dirty:
+            content = self.window.code_editor_widget.get_content(file_path)
+            if content is not None:
+                self.symbol_indexer.update_buffer(file_path, content)
+                self.lint_service.lint(file_path, content)
+
+    @pyqtSlot(str)
+    def lint_file(self, file_path):
+        """Lints an open file's current text (answered from the lint cache if it was linted before)."""
+        if self.window.code_editor_widget.is_large_file(file_path):
+            return
+        content = self.window.code_editor_widget.get_content(file_path)
+        if content is not None:
+            self.lint_service.lint(file_path, content)
+
+    def _on_diagnostics_ready(self, file_path, diagnostics):
+        if file_path not in self.window.code_editor_widget.open_files:
+            return # Closed while being linted
+        self.window.code_editor_widget.set_diagnostics(file_path, diagnostics)
+        self.window.problems_panel.set_diagnostics(file_path, diagnostics)
+
+    def _set_index_roots(self, folder_path):
+        """Points the symbol and search indexes (and their panels) and completion at a project."""
+        self._dirty_buffers.clear()
+        self.symbol_indexer.set_project_root(folder_path)
+        self.window.symbol_panel.project_root = folder_path
+        self.window.symbol_panel.show_results("Results", [])
+        self.refresh_outline()
+        self.search_indexer.set_project_root(folder_path)
+        self.window.find_panel.project_root = folder_path
+        self.window.problems_panel.project_root = folder_path
+        self.completion_engine.set_project_root(folder_path)
+
+    @pyqtSlot(str, bool)
+    def handle_file_saved(self, file_path, success):
+        """Saves by the editor are not reported as filesystem events; update the search index, preview and server here."""
+        if success:
+            self.search_indexer.reindex_file(file_path)
+            self.window.web_preview.notify_file_saved(file_path)
+            self.dev_server.notify_file_saved(file_path)
+
+    @pyqtSlot()
+    def show_find_in_files(self):
+        """Shows the find in files panel, seeded with the editor's selection."""
+        selection = ""
+        editor = self.window.code_editor_widget.open_files.get(self.window.code_editor_widget.current_file_path() or "")
+        if editor is not None:
+            selection = editor.textCursor().selectedText()
+            if "\u2029" in selection: # Multi-line selection (paragraph separators): not a useful query
+                selection = ""
+        self.window.find_dock.show()
+        self.window.find_dock.raise_()
+        self.window.find_panel.focus_query(selection)
+
+    @pyqtSlot(str, bool, bool, str)
+    def find_in_files(self, query, regex, case_sensitive, replacement=""):
+        if not self.current_project_path:
+            self.window.find_panel.show_error("Open a project to search its files.")
+            return
+        try:
+            self.search_indexer.search(query, regex, case_sensitive,
+                                       buffers=self.window.code_editor_widget.unsaved_contents(),
+                                       replacement=replacement or None)
+        except re.error as e:
+            self.window.find_panel.show_error(f"Invalid regular expression or replacement: {e}")
+            return
+        self.window.find_panel.begin_search(query)
+
+    @pyqtSlot(str, bool, bool, str, list)
+    def replace_in_files(self, query, regex, case_sensitive, replacement, excluded):
+        """
+        Replaces every match of a query in the project, except in `excluded` files.
+        Open editors are patched in place (one undo step each) and all other files
+        are rewritten together by the ProjectReplacer. Only once that succeeded are
+        the editors that were clean saved; otherwise their edits are undone.
+        """
+        if not self.current_project_path or self.replacer.is_running():
+            return
+        try:
+            pattern = compile_query(query, regex, case_sensitive)
+            replace = replacement_function(pattern, replacement, regex)
+        except re.error as e:
+            self.window.find_panel.show_error(f"Invalid regular expression or replacement: {e}")
+            return
+        reply = QMessageBox.question(
+            self.window, "Replace in Files",
+            f"Replace all matches of '{query}' with '{replacement}' in the project?\n\n"
+            "Files open in the editor can be restored with Undo; other files are written directly."
+        )
+        if reply != QMessageBox.StandardButton.Yes:
+            return
+
+        self.search_indexer.cancel_search()
+        editor = self.window.code_editor_widget
+        excluded = {os.path.normpath(fp) for fp in excluded}
+        candidates = set(self.search_indexer.candidate_files(query, regex)) | set(editor.open_files)
+        disk_files, self._editor_replacements, self._editor_edited_files = [], 0, 0
+        for file_path in sorted(candidates - excluded):
+            count = editor.apply_to_open_file(file_path, lambda text: replace_in_text(text, pattern, replace))
+            if count is None:
+                disk_files.append(file_path)
+            elif count:
+                self._editor_replacements += count
+                self._editor_edited_files += 1
+        self.window.find_panel.begin_replace(len(disk_files))
+        self.replacer.replace(disk_files, pattern, replace, editor.fsync_policy())
+
+    def _on_replace_progress(self, done, total):
+        self.window.find_panel.replace_progress(done, total)
+
+    def _on_replace_finished(self, result):
+        editor = self.window.code_editor_widget
+        if result.committed:
+            saved = editor.commit_open_file_edits()
+            message = (
+                f"Replaced {result.replacements + self._editor_replacements} matches: "
+                f"{len(result.changed) + len(saved)} files written"
+            )
+            if len(saved) < self._editor_edited_files:
+                message += ", open editors updated"
+        else:
+            kept = editor.revert_open_file_edits()
+            written = len(result.changed) # Renamed into place before the commit failed
+            changed = f"{written} files were changed" if written else "no files were changed"
+            message = f"Replace cancelled; {changed}"
+            if result.errors:
+                file_path, error = result.errors[0]
+                message = f"Replace failed at {file_path}: {error}; {changed}"
+            if kept:
+                message += f" (not undone in {len(kept)} open files edited meanwhile)"
+            if result.errors:
+                QMessageBox.warning(self.window, "Replace in Files", message)
+        self.window.find_panel.replace_finished(message)
+        self.window.status_bar.showMessage(message, 5000)
+
+    @pyqtSlot()
+    def cancel_find_in_files(self):
+        if self.replacer.is_running():
+            self.replacer.cancel() # Reported through _on_replace_finished
+            return
+        self.search_indexer.cancel_search()
+        self.window.find_panel.search_cancelled()
+
+    def _on_search_matches(self, search_id, matches):
+        self.window.find_panel.add_matches(matches)
+
+    def _on_search_finished(self, search_id, files_searched, match_count):
+        self.window.find_panel.search_finished(files_searched, match_count)
 
-        print(f"MainController: Content changed in {file_path}")
-        # TODO: Implement synchronization logic between code editor, visual designer, and preview
+    @pyqtSlot(str)
+    def refresh_outline(self, file_path=None):
+        """Shows the outline of the current editor file in the symbol panel."""
+        if file_path is None:
+            file_path = self.window.code_editor_widget.current_file_path()
+        file_path = os.path.normpath(file_path) if file_path else None
+        entries = self.symbol_indexer.index.outline(file_path) if file_path else []
+        self.window.symbol_panel.show_outline(file_path, entries)
+
+    def _on_symbol_index_updated(self, file_paths):
+        outline_path = self.window.symbol_panel.outline_path
+        if outline_path and outline_path in file_paths:
+            self.refresh_outline(outline_path)
+
+    def _symbol_keys_at(self, file_path, line_text, column):
+        """The (kind, name) keys to look up for the symbol under the cursor."""
+        found = symbol_at(line_text, column, language_for_path(file_path))
+        if found is None:
+            return []
+        kind, name = found
+        if kind == FUNCTION: # An identifier: a function or a variable
+            return [(FUNCTION, name), (VARIABLE, name)]
+        return [(kind, name)]
+
+    @pyqtSlot(str, str, int)
+    def go_to_definition(self, file_path, line_text, column):
+        """Jumps to the definition of the symbol under the cursor (lists them if there are several)."""
+        keys = self._symbol_keys_at(file_path, line_text, column)
+        if not keys:
+            self.window.status_bar.showMessage("No symbol under the cursor", 3000)
+            return
+        index = self.symbol_indexer.index
+        definitions = []
+        for kind, name in keys:
+            definitions = index.definitions(kind, name)
+            if definitions:
+                break
+        kind, name = keys[0]
+        label = {ID: f"#{name}", CLASS: f".{name}"}.get(kind, name)
+        if not definitions:
+            self.window.status_bar.showMessage(f"No definition found for {label}", 3000)
+            return
+        if len(definitions) == 1:
+            symbol = definitions[0]
+            self.window.code_editor_widget.go_to_location(symbol.file_path, symbol.line, symbol.column)
+            return
+        self.window.symbol_panel.show_results(f"Definitions of {label}", definitions)
+        self.window.symbols_dock.show()
+        self.window.symbols_dock.raise_()
+
+    @pyqtSlot(str, str, int)
+    def find_usages(self, file_path, line_text, column):
+        """Lists where the symbol under the cursor is used across the project."""
+        keys = self._symbol_keys_at(file_path, line_text, column)
+        if not keys:
+            self.window.status_bar.showMessage("No symbol under the cursor", 3000)
+            return
+        usages = []
+        for kind, name in keys:
+            usages.extend(self.symbol_indexer.index.usages(kind, name))
+        kind, name = keys[0]
+        label = {ID: f"#{name}", CLASS: f".{name}"}.get(kind, name)
+        self.window.symbol_panel.show_results(f"Usages of {label}", usages)
+        self.window.symbols_dock.show()
+        self.window.symbols_dock.raise_()
 
     @pyqtSlot(str)
     def handle_folder_changed(self, folder_path):
@@ -771,6 +1066,8 @@ class MainController(QObject):
         # Update project path when file explorer root changes
         self.current_project_path = folder_path
         self.window.web_preview.set_project_root(folder_path)
+        self.dev_server.set_root(folder_path)
+        self._set_index_roots(folder_path)
         self.window.setWindowTitle(f"{os.path.basename(folder_path)} - PyQt Website Builder")
 
     @pyqtSlot(str)
@@ -779,6 +1076,11 @@ class MainController(QObject):
 
         print(f"MainController: Tab closed for {file_path}")
         # TODO: Implement any necessary cleanup or state updates when a tab is closed
+        # Unsaved edits were indexed from the buffer; go back to what is on disk
+        self._dirty_buffers.discard(file_path)
+        self.symbol_indexer.reindex_file(file_path)
+        self.lint_service.forget(file_path)
+        self.window.problems_panel.set_diagnostics(file_path, [])
 
     @pyqtSlot()
     def save_current_file(self):
@@ -823,6 +1125,22 @@ class MainController(QObject):
         print("MainController: toggle_theme requested.")
         self.theme_manager.toggle_theme()
 
+    @pyqtSlot()
+    def dump_latency_metrics(self):
+        """Writes the recorded latency histograms to a JSON file chosen by the user."""
+        start_dir = self.current_project_path or os.path.expanduser("~")
+        file_path, _ = QFileDialog.getSaveFileName(
+            self.window, "Dump Latency Metrics", os.path.join(start_dir, "latency_metrics.json"), "JSON Files (*.json)"
+        )
+        if not file_path:
+            return
+        try:
+            LatencyMetrics.instance().dump(file_path)
+            self.window.status_bar.showMessage(f"Latency metrics written to {file_path}", 3000)
+        except OSError as e:
+            logger.error(f"Could not write latency metrics to {file_path}: {e}")
+            QMessageBox.warning(self.window, "Dump Failed", f"Could not write latency metrics:\n{e}")
+
     @pyqtSlot()
     def export_project(self):
         """Exports the current project to a deployable folder."""
@@ -860,8 +1178,13 @@ class MainController(QObject):
         if file_to_open and os.path.exists(file_to_open):
             try:
                 import webbrowser
-                # Convert path to file:/// URL
-                url = QUrl.fromLocalFile(file_to_open).toString()
+                # Over HTTP from the development server (fetch, ES modules and live reload work);
+                # file:/// only for a page outside the project, or if the server cannot start
+                url = None
+                if self.dev_server.start():
+                    url = self.dev_server.url_for_path(file_to_open)
+                if url is None:
+                    url = QUrl.fromLocalFile(file_to_open).toString()
                 webbrowser.open(url)
                 print(f"MainController: Opening {url} in default browser.")
             except Exception as e:
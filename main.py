@@ -1,5 +1,6 @@
 # website_builder/main.py
 import hashlib
+import multiprocessing
 import os
 import sys
 
@@ -10,6 +11,7 @@ from PyQt6.QtCore import QCoreApplication, QSettings
 from PyQt6.QtWidgets import QApplication
 
 from main_window import MainWindow
+from utils.overlay_scheme import register_overlay_scheme
 from utils.theme_manager import ThemeManager
 
 # Set application metadata
@@ -40,6 +42,7 @@ def load_font(font_filename):
 def main():
     # ... (optional remote debugging env var) ...
 
+    register_overlay_scheme() # Custom URL schemes must be known before the application exists
     app = QApplication(sys.argv)
 
     # --- Load Custom Fonts ---
@@ -97,6 +100,7 @@ def main():
 
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support() # Lint workers are spawned processes (see utils.lint_service)
     # --- Keep existing plugin path logic ---
     # ... (plugin path logic remains the same) ...
     plugin_paths = [
@@ -22,7 +22,11 @@ from controllers.main_controller import MainController
 from views.code_editor import CodeEditorTabWidget
 from views.components_panel import ComponentsPanel
 from views.file_explorer import FileExplorer
+from views.find_panel import FindInFilesPanel
+from views.latency_panel import LatencyPanel
+from views.problems_panel import ProblemsPanel
 from views.properties_panel import PropertiesPanel
+from views.symbol_panel import SymbolPanel
 from views.visual_designer import VisualDesigner
 from views.web_preview import WebPreview
 from views.welcome_screen import WelcomeScreen
@@ -159,6 +163,11 @@ class MainWindow(QMainWindow):
         self.action_paste.setShortcut(QKeySequence.StandardKey.Paste)
         self.action_paste.setStatusTip("Paste text from the clipboard")
         self.project_dependent_actions.append(self.action_paste)
+
+        self.action_find_in_files = QAction("Find in &Files...", self)
+        self.action_find_in_files.setShortcut(QKeySequence("Ctrl+Shift+F"))
+        self.action_find_in_files.setStatusTip("Search the text of every file in the project")
+        self.project_dependent_actions.append(self.action_find_in_files)
         # TODO: Connect Edit actions (Undo/Redo/Cut/Copy/Paste) to the focused editor.
 
         # --- View Actions ---
@@ -175,6 +184,11 @@ class MainWindow(QMainWindow):
         )
         self.action_toggle_components = QAction("Components", self, checkable=True)
         self.action_toggle_properties = QAction("Properties", self, checkable=True)
+        self.action_toggle_symbols = QAction("Outline", self, checkable=True)
+        self.action_toggle_problems = QAction("Problems", self, checkable=True)
+        self.action_toggle_latency_panel = QAction("Latency Metrics", self, checkable=True)
+        self.action_dump_latency_metrics = QAction("Dump Latency Metrics...", self)
+        self.action_dump_latency_metrics.setStatusTip("Write the recorded editor latency histograms to a JSON file")
 
         # --- Project Actions ---
         self.action_export_project = QAction(
@@ -220,6 +234,8 @@ class MainWindow(QMainWindow):
         edit_menu.addAction(self.action_cut)
         edit_menu.addAction(self.action_copy)
         edit_menu.addAction(self.action_paste)
+        edit_menu.addSeparator()
+        edit_menu.addAction(self.action_find_in_files)
 
         view_menu = menu_bar.addMenu("&View")
         view_menu.addAction(self.action_toggle_theme)
@@ -228,6 +244,11 @@ class MainWindow(QMainWindow):
         view_menu.addAction(self.action_toggle_file_explorer)
         view_menu.addAction(self.action_toggle_components)
         view_menu.addAction(self.action_toggle_properties)
+        view_menu.addAction(self.action_toggle_symbols)
+        view_menu.addAction(self.action_toggle_problems)
+        view_menu.addSeparator()
+        view_menu.addAction(self.action_toggle_latency_panel)
+        view_menu.addAction(self.action_dump_latency_metrics)
 
         project_menu = menu_bar.addMenu("&Project")
         project_menu.addAction(self.action_run_in_browser)
@@ -357,6 +378,48 @@ class MainWindow(QMainWindow):
         self.action_toggle_properties.toggled.connect(self.properties_dock.setVisible)
         self.properties_dock.visibilityChanged.connect(self.action_toggle_properties.setChecked)
 
+        # Outline / Symbols Dock (below Properties): current file outline and lookup results
+        self.symbols_dock = QDockWidget("Outline", self)
+        self.symbols_dock.setObjectName("SymbolsDock")
+        self.symbol_panel = SymbolPanel(self)
+        self.symbols_dock.setWidget(self.symbol_panel)
+        self.addDockWidget(Qt.DockWidgetArea.RightDockWidgetArea, self.symbols_dock)
+        self.splitDockWidget(self.properties_dock, self.symbols_dock, Qt.Orientation.Vertical)
+        self.docks.append(self.symbols_dock)
+        self.action_toggle_symbols.setChecked(True)
+        self.action_toggle_symbols.toggled.connect(self.symbols_dock.setVisible)
+        self.symbols_dock.visibilityChanged.connect(self.action_toggle_symbols.setChecked)
+
+        # Find in Files Dock (bottom; hidden until a search is started, so it is not in self.docks)
+        self.find_dock = QDockWidget("Find in Files", self)
+        self.find_dock.setObjectName("FindInFilesDock")
+        self.find_panel = FindInFilesPanel(self)
+        self.find_dock.setWidget(self.find_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.find_dock)
+        self.find_dock.hide()
+
+        # Problems Dock (bottom, next to Find in Files; hidden until toggled, so it is not in self.docks)
+        self.problems_dock = QDockWidget("Problems", self)
+        self.problems_dock.setObjectName("ProblemsDock")
+        self.problems_panel = ProblemsPanel(self)
+        self.problems_dock.setWidget(self.problems_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.problems_dock)
+        self.tabifyDockWidget(self.find_dock, self.problems_dock)
+        self.problems_dock.hide()
+        self.action_toggle_problems.toggled.connect(self.problems_dock.setVisible)
+        self.problems_dock.visibilityChanged.connect(self.action_toggle_problems.setChecked)
+
+        # Latency Metrics Dock (debugging aid; hidden until toggled from the View menu,
+        # so it is not in self.docks)
+        self.latency_dock = QDockWidget("Latency Metrics", self)
+        self.latency_dock.setObjectName("LatencyMetricsDock")
+        self.latency_panel = LatencyPanel(self)
+        self.latency_dock.setWidget(self.latency_panel)
+        self.addDockWidget(Qt.DockWidgetArea.BottomDockWidgetArea, self.latency_dock)
+        self.latency_dock.hide()
+        self.action_toggle_latency_panel.toggled.connect(self.latency_dock.setVisible)
+        self.latency_dock.visibilityChanged.connect(self.action_toggle_latency_panel.setChecked)
+
     def handle_edit_design_tab_changed(self, index):
         """Checks validity before allowing switch to Design tab (index 1)."""
         design_tab_index = 1  # Assuming "Design" is the second tab (index 1)
@@ -491,6 +554,7 @@ class MainWindow(QMainWindow):
         """Handles window close event, checking for unsaved changes."""
         # Check only if the main UI (splitter) is visible, implying a project is open
         if hasattr(self, 'main_splitter') and self.main_splitter.isVisible():
+            self.controller.save_session() # Open tabs, cursors and scroll positions
             if self.code_editor_widget.has_unsaved_changes():
                 reply = QMessageBox.question(
                     self,
@@ -502,11 +566,12 @@ class MainWindow(QMainWindow):
                     QMessageBox.StandardButton.Save # Default to Save
                 )
                 if reply == QMessageBox.StandardButton.Save:
-                    # Attempt to save all files; if successful, accept the event
-                    # If saving fails (e.g., permission error), save_all_files should show a message,
-                    # and we might want to reconsider closing. For now, assume save works or user sees error.
-                    self.code_editor_widget.save_all_files()
-                    event.accept()
+                    # Save all files and wait for the background writes; only
+                    # close if they all succeeded (save_all_files reports errors)
+                    if self.code_editor_widget.save_all_files(wait=True):
+                        event.accept()
+                    else:
+                        event.ignore()
                 elif reply == QMessageBox.StandardButton.Discard:
                     event.accept()
                 else: # Cancel
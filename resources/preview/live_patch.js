@@ -0,0 +1,182 @@
+// website_builder/resources/preview/live_patch.js
+// Injected into every preview page (see views/web_preview.py). Brings the
+// page's DOM up to date with the editor's unsaved text by morphing it in
+// place: nodes that did not change are kept, so scroll position, form input,
+// focus and the state of running scripts survive. Scripts are never re-run.
+//
+// Patches (planned by utils/html_patch.py):
+//   {mode: "element", index, tag, count, html}: the new inner HTML of the
+//       index-th element in <body> (document order); refused (false) unless
+//       the body still has `count` elements and that one is a <tag>.
+//   {mode: "document", html}: the whole new document.
+(function () {
+    "use strict";
+    if (window.__flextaLivePatch) {
+        return;
+    }
+
+    const ELEMENT_NODE = 1;
+    const STYLESHEET_TOKEN = "flexta-css"; // Cache buster of stylesheets swapped in by the preview
+
+    function sameAttribute(element, name, value) {
+        const current = element.getAttribute(name);
+        if (current === value) {
+            return true;
+        }
+        // A swapped stylesheet's href is the source's plus a cache buster
+        if (name !== "href" || current === null || element.localName !== "link") {
+            return false;
+        }
+        try {
+            const url = new URL(current, document.baseURI);
+            url.searchParams.delete(STYLESHEET_TOKEN);
+            return url.href === new URL(value, document.baseURI).href;
+        } catch (e) {
+            return false;
+        }
+    }
+
+    function morphAttributes(from, to) {
+        for (const attribute of Array.from(from.attributes)) {
+            if (!to.hasAttribute(attribute.name) && attribute.name !== "data-flexta-stale") {
+                from.removeAttribute(attribute.name);
+            }
+        }
+        for (const attribute of to.attributes) {
+            if (!sameAttribute(from, attribute.name, attribute.value)) {
+                // Only the attribute (the default) changes: a value the user typed is kept
+                from.setAttribute(attribute.name, attribute.value);
+            }
+        }
+    }
+
+    function sameKind(from, to) {
+        if (from.nodeType !== to.nodeType || from.nodeName !== to.nodeName) {
+            return false;
+        }
+        return from.nodeType !== ELEMENT_NODE || from.id === to.id;
+    }
+
+    function isStale(node) {
+        return node.nodeType === ELEMENT_NODE && node.hasAttribute("data-flexta-stale");
+    }
+
+    function morphNode(from, to) {
+        if (from.nodeType === ELEMENT_NODE) {
+            morphAttributes(from, to);
+            if (from.localName !== "script") { // Its text already ran
+                morphChildren(from, to);
+            }
+        } else if (from.nodeValue !== to.nodeValue) {
+            from.nodeValue = to.nodeValue;
+        }
+    }
+
+    function morphChildren(parent, source) {
+        // Stylesheet links being swapped out are not part of the source
+        const from = Array.from(parent.childNodes).filter((node) => !isStale(node));
+        const to = Array.from(source.childNodes);
+        // Skip the unchanged runs at both ends (one native comparison per
+        // node), so the work done below is proportional to the change
+        let start = 0;
+        while (start < from.length && start < to.length && from[start].isEqualNode(to[start])) {
+            start++;
+        }
+        let fromEnd = from.length;
+        let toEnd = to.length;
+        while (fromEnd > start && toEnd > start && from[fromEnd - 1].isEqualNode(to[toEnd - 1])) {
+            fromEnd--;
+            toEnd--;
+        }
+        const ids = new Map(); // id -> element, among the changed old children
+        for (let i = start; i < fromEnd; i++) {
+            if (from[i].nodeType === ELEMENT_NODE && from[i].id) {
+                ids.set(from[i].id, from[i]);
+            }
+        }
+        const used = new Set();
+        const end = fromEnd < from.length ? from[fromEnd] : null; // Insert before the unchanged tail
+        let i = start;
+        for (let j = start; j < toEnd; j++) {
+            while (i < fromEnd && used.has(from[i])) {
+                i++;
+            }
+            const target = to[j];
+            const current = i < fromEnd ? from[i] : null;
+            const anchor = current || end;
+            const keyed = target.nodeType === ELEMENT_NODE && target.id ? ids.get(target.id) : undefined;
+            if (keyed && keyed !== current && !used.has(keyed) && keyed.nodeName === target.nodeName) {
+                // Moved: keep the element (and its state), just reposition it
+                parent.insertBefore(keyed, anchor);
+                used.add(keyed);
+                morphNode(keyed, target);
+            } else if (current && sameKind(current, target)) {
+                used.add(current);
+                morphNode(current, target);
+                i++;
+            } else if (current && j + 1 < toEnd && sameKind(current, to[j + 1])) {
+                // Inserted before the current node
+                parent.insertBefore(document.importNode(target, true), anchor);
+            } else {
+                parent.insertBefore(document.importNode(target, true), anchor);
+                if (current && !(current.nodeType === ELEMENT_NODE && current.id && toHasId(to, j + 1, toEnd, current.id))) {
+                    used.add(current);
+                    current.remove(); // Replaced
+                    i++;
+                }
+            }
+        }
+        for (let k = start; k < fromEnd; k++) {
+            if (!used.has(from[k]) && from[k].parentNode === parent) {
+                from[k].remove();
+            }
+        }
+    }
+
+    function toHasId(nodes, begin, end, id) {
+        for (let k = begin; k < end; k++) {
+            if (nodes[k].nodeType === ELEMENT_NODE && nodes[k].id === id) {
+                return true;
+            }
+        }
+        return false;
+    }
+
+    function patchElement(patch) {
+        const body = document.body;
+        if (!body) {
+            return false;
+        }
+        const elements = body.getElementsByTagName("*");
+        if (elements.length !== patch.count) {
+            return false; // Scripts or the parser changed the DOM: the index means nothing
+        }
+        const target = elements[patch.index];
+        if (!target || target.localName !== patch.tag) {
+            return false;
+        }
+        // Parsed inert: nothing loads or runs until nodes are imported
+        const template = document.createElement("template");
+        template.innerHTML = patch.html;
+        morphChildren(target, template.content);
+        return true;
+    }
+
+    function patchDocument(patch) {
+        const source = new DOMParser().parseFromString(patch.html, "text/html");
+        morphAttributes(document.documentElement, source.documentElement);
+        morphNode(document.head, source.head);
+        morphNode(document.body, source.body);
+        return true;
+    }
+
+    window.__flextaLivePatch = {
+        // Returns the mode applied, or false if the patch does not fit the page
+        apply(patch) {
+            if (patch.mode === "element") {
+                return patchElement(patch) ? "element" : false;
+            }
+            return patchDocument(patch) ? "document" : false;
+        },
+    };
+})();
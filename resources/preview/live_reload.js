@@ -0,0 +1,80 @@
+// website_builder/resources/preview/live_reload.js
+// Added to the pages the development server (utils/dev_server.py) sends to
+// browsers. Listens for changed files and reloads the page if it uses one;
+// changed stylesheets it links are swapped in place instead.
+(function () {
+    "use strict";
+    if (window.__flextaLiveReload || !window.EventSource) {
+        return;
+    }
+    window.__flextaLiveReload = true;
+
+    function decoded(path) {
+        try {
+            return decodeURIComponent(path);
+        } catch (e) {
+            return path;
+        }
+    }
+
+    function pathOf(href) {
+        try {
+            const url = new URL(href, document.baseURI);
+            return url.origin === location.origin ? decoded(url.pathname) : null;
+        } catch (e) {
+            return null;
+        }
+    }
+
+    // The page itself and everything it fetched from the server so far
+    function usedPaths() {
+        const page = decoded(location.pathname);
+        const paths = new Set([page.endsWith("/") ? page + "index.html" : page]);
+        for (const entry of performance.getEntriesByType("resource")) {
+            const path = pathOf(entry.name);
+            if (path) {
+                paths.add(path);
+            }
+        }
+        return paths;
+    }
+
+    // Swaps the links of the given stylesheets; false if one is not linked (e.g. @imported)
+    function swapStylesheets(paths) {
+        const links = Array.from(document.querySelectorAll('link[rel~="stylesheet"][href]'));
+        for (const path of paths) {
+            const matching = links.filter((link) => pathOf(link.href) === path);
+            if (!matching.length) {
+                return false;
+            }
+            for (const link of matching) {
+                const url = new URL(link.href);
+                url.searchParams.set("flexta-css", String(Date.now()));
+                const fresh = link.cloneNode();
+                fresh.href = url.href;
+                fresh.addEventListener("load", () => link.remove(), { once: true });
+                fresh.addEventListener("error", () => link.remove(), { once: true });
+                link.after(fresh);
+            }
+        }
+        return true;
+    }
+
+    const source = new EventSource("/__flexta/events");
+    source.addEventListener("change", (event) => {
+        const change = JSON.parse(event.data);
+        if (change.everything) {
+            location.reload();
+            return;
+        }
+        const used = usedPaths();
+        const relevant = change.paths.map(decoded).filter((path) => used.has(path));
+        if (!relevant.length) {
+            return;
+        }
+        if (relevant.every((path) => path.toLowerCase().endsWith(".css")) && swapStylesheets(relevant)) {
+            return;
+        }
+        location.reload();
+    });
+})();
@@ -0,0 +1,356 @@
+# website_builder/utils/completion_engine.py
+import os
+import re
+import posixpath
+import logging
+from collections import Counter
+from typing import Dict, List, NamedTuple, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .completion_trie import CompletionTrie
+from .fs_events import DELETED, IGNORED_DIRECTORIES, RESCAN, FileSystemEventService
+from .symbol_extractor import CLASS, ID
+from .web_vocabulary import (CSS_GLOBAL_VALUES, CSS_PROPERTIES, CSS_VALUES, GLOBAL_ATTRIBUTES, HTML_TAGS,
+                             PATH_ATTRIBUTES, TAG_ATTRIBUTES)
+
+logger = logging.getLogger(__name__)
+
+# --- Completion kinds ---
+TAGS = "tag"
+ATTRIBUTES = "attribute"
+PROPERTIES = "css-property"
+VALUES = "css-value"
+CLASSES = "class"
+IDS = "id"
+PATHS = "path"
+
+CONTEXT_CHARS = 2000 # How far back from the cursor the context is looked for
+USE_BONUS = 10       # Frequency added each time a completion is accepted
+
+_TAG_NAME = re.compile(r"<\s*([A-Za-z][\w-]*)")
+_ATTRIBUTE_VALUE = re.compile(r"""([\w:.-]+)\s*=\s*(["'])([^"']*)$""")
+_ATTRIBUTE_NAME = re.compile(r"\s([\w:-]*)$")
+_CSS_DECLARATION = re.compile(r"\s*([\w-]+)\s*:\s*([^;{}]*)$")
+_CSS_VALUE_TOKEN = re.compile(r"[\w#.%()-]*$")
+_JS_ID_STRING = re.compile(r"""\bgetElementById\s*\(\s*["'`]([\w-]*)$""")
+_JS_CLASS_STRING = re.compile(r"""\b(?:getElementsByClassName\s*\(|classList\s*\.\s*\w+\s*\()\s*["'`]([\w-]*)$""")
+_JS_SELECTOR_STRING = re.compile(r"""\bquerySelector(?:All)?\s*\(\s*["'`][^"'`]*?([.#])([\w-]*)$""")
+
+
+class CompletionContext(NamedTuple):
+    kind: str
+    prefix: str                # Text before the cursor the completion replaces
+    key: Optional[str] = None  # Tag name (attributes) or property name (CSS values)
+    document: Optional[str] = None  # Path of the file being edited (paths are completed relative to it)
+
+
+def completion_context(before: str, language: Optional[str], document: Optional[str] = None) -> Optional[CompletionContext]:
+    """
+    Works out what can be completed at the cursor from the text before it
+    (only the last CONTEXT_CHARS are looked at). Returns None where nothing
+    is completed (e.g. HTML text content, JS code outside selector strings).
+    """
+    before = before[-CONTEXT_CHARS:]
+    if language == "html":
+        context = _html_context(before)
+        return context._replace(document=document) if context is not None and context.kind == PATHS else context
+    if language == "css":
+        return _css_context(before)
+    if language == "js":
+        return _js_context(before)
+    return None
+
+
+def _html_context(before: str) -> Optional[CompletionContext]:
+    tag_start = before.rfind("<")
+    if tag_start > before.rfind(">"):
+        tag_text = before[tag_start:]
+        match = re.fullmatch(r"</?([\w-]*)", tag_text)
+        if match:
+            return CompletionContext(TAGS, match.group(1))
+        tag = _TAG_NAME.match(tag_text)
+        tag_name = tag.group(1).lower() if tag else None
+        value = _ATTRIBUTE_VALUE.search(tag_text)
+        if value:
+            attribute, text = value.group(1).lower(), value.group(3)
+            if attribute == "class":
+                return CompletionContext(CLASSES, re.search(r"[\w-]*$", text).group(0))
+            if attribute == "id":
+                return CompletionContext(IDS, text)
+            if attribute in PATH_ATTRIBUTES:
+                return CompletionContext(PATHS, text)
+            if attribute == "style":
+                return _css_declaration_context(text[text.rfind(";") + 1:])
+            return None
+        name = _ATTRIBUTE_NAME.search(tag_text)
+        if name and tag_name:
+            return CompletionContext(ATTRIBUTES, name.group(1), tag_name)
+        return None
+    # Inside a <style> or <script> element?
+    lowered = before.lower()
+    style_start = lowered.rfind("<style")
+    if style_start > lowered.rfind("</style"):
+        return _css_context(before[before.find(">", style_start) + 1:])
+    script_start = lowered.rfind("<script")
+    if script_start > lowered.rfind("</script"):
+        return _js_context(before[before.find(">", script_start) + 1:])
+    return None
+
+
+def _css_context(before: str) -> Optional[CompletionContext]:
+    block_start = before.rfind("{")
+    if block_start > before.rfind("}"):
+        segment = before[max(block_start, before.rfind(";")) + 1:]
+        if ":" not in segment and re.search(r"[.#][\w-]*$", segment):
+            return _css_selector_context(segment) # Rule inside @media (or a nested rule)
+        return _css_declaration_context(segment)
+    return _css_selector_context(before)
+
+
+def _css_declaration_context(segment: str) -> Optional[CompletionContext]:
+    declaration = _CSS_DECLARATION.match(segment)
+    if declaration:
+        prefix = _CSS_VALUE_TOKEN.search(declaration.group(2)).group(0)
+        return CompletionContext(VALUES, prefix, declaration.group(1).lower())
+    name = re.fullmatch(r"\s*([\w-]*)", segment)
+    if name:
+        return CompletionContext(PROPERTIES, name.group(1))
+    return None
+
+
+def _css_selector_context(before: str) -> Optional[CompletionContext]:
+    match = re.search(r"([.#])([\w-]*)$", before)
+    if not match or re.search(r"\d\.$", before[:match.end(1)]): # Not "1.5"
+        return None
+    return CompletionContext(CLASSES if match.group(1) == "." else IDS, match.group(2))
+
+
+def _js_context(before: str) -> Optional[CompletionContext]:
+    match = _JS_ID_STRING.search(before)
+    if match:
+        return CompletionContext(IDS, match.group(1))
+    match = _JS_CLASS_STRING.search(before)
+    if match:
+        return CompletionContext(CLASSES, match.group(1))
+    match = _JS_SELECTOR_STRING.search(before)
+    if match:
+        return CompletionContext(CLASSES if match.group(1) == "." else IDS, match.group(2))
+    return None
+
+
+def _ranked(words) -> CompletionTrie:
+    """A trie of a vocabulary list, ranked by its order (first = most frequent)."""
+    return CompletionTrie((word, len(words) - rank) for rank, word in enumerate(words))
+
+
+class PathScanSignals(QObject):
+    finished = pyqtSignal(int, object, object) # generation, CompletionTrie, set of relative paths
+
+
+class PathScanTask(QRunnable):
+    """Collects a project's file paths (relative, '/'-separated) into a warmed-up trie."""
+    def __init__(self, generation: int, root: str):
+        super().__init__()
+        self.generation = generation
+        self.root = root
+        self.signals = PathScanSignals()
+
+    def run(self):
+        paths = set()
+        try:
+            for directory, dirnames, filenames in os.walk(self.root):
+                dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRECTORIES and not d.startswith(".")]
+                for filename in filenames:
+                    paths.add(_relative_path(self.root, os.path.join(directory, filename)))
+        except Exception as e:
+            logger.error(f"Scanning project paths for completion failed: {e}", exc_info=True)
+        trie = CompletionTrie((path, 1) for path in paths)
+        trie.warm()
+        self.signals.finished.emit(self.generation, trie, paths)
+
+
+def _relative_path(root: str, file_path: str) -> str:
+    return os.path.relpath(file_path, root).replace(os.sep, "/")
+
+
+class CompletionEngine(QObject):
+    """
+    Completion candidates for the editor, from prefix tries (see CompletionTrie):
+    the built-in HTML/CSS vocabulary, plus the current project's classes and
+    ids (weighted by how often the project uses them, kept in step with the
+    ProjectSymbolIndexer) and file paths (kept in step with filesystem
+    events). Accepted completions gain weight, so the ranking adapts.
+
+    Used from the GUI thread; only the initial path scan runs on a worker.
+    """
+    def __init__(self, symbol_indexer=None, parent=None):
+        super().__init__(parent)
+        self.tags = _ranked(HTML_TAGS)
+        self.global_attributes = _ranked(GLOBAL_ATTRIBUTES)
+        self.tag_attributes = {tag: _ranked(attributes) for tag, attributes in TAG_ATTRIBUTES.items()}
+        self.properties = _ranked(CSS_PROPERTIES)
+        self.values = {prop: _ranked(values) for prop, values in CSS_VALUES.items()}
+        self.global_values = _ranked(CSS_GLOBAL_VALUES)
+        for trie in (self.tags, self.global_attributes, self.properties, self.global_values):
+            trie.warm()
+
+        self.classes = CompletionTrie()
+        self.ids = CompletionTrie()
+        self.paths = CompletionTrie()
+        self._path_set = set()
+        self._file_terms: Dict[str, Counter] = {} # file_path -> Counter{(kind, name): uses} in the tries
+
+        self.project_root: Optional[str] = None
+        self.generation = 0
+        self.fs_subscription = None
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self._tasks = set()
+
+        self.symbol_indexer = symbol_indexer
+        if symbol_indexer is not None:
+            symbol_indexer.index_updated.connect(self._on_symbols_updated)
+
+    def set_project_root(self, root_path: Optional[str]):
+        root_path = os.path.normpath(root_path) if root_path else None
+        if root_path == self.project_root:
+            return
+        if self.fs_subscription is not None:
+            FileSystemEventService.instance().unsubscribe(self.fs_subscription)
+            self.fs_subscription = None
+        self.generation += 1
+        self.classes.clear()
+        self.ids.clear()
+        self.paths.clear()
+        self._path_set = set()
+        self._file_terms.clear()
+        self.project_root = root_path
+        if not root_path or not os.path.isdir(root_path):
+            return
+        self.fs_subscription = FileSystemEventService.instance().subscribe(root_path, self._on_project_events)
+        self._scan_paths()
+
+    def _scan_paths(self):
+        task = PathScanTask(self.generation, self.project_root)
+        task.signals.finished.connect(lambda generation, trie, paths, task=task: self._on_paths_scanned(task, generation, trie, paths))
+        self._tasks.add(task)
+        self.pool.start(task)
+
+    def _on_paths_scanned(self, task: PathScanTask, generation: int, trie: CompletionTrie, paths: set):
+        self._tasks.discard(task)
+        if generation == self.generation:
+            self.paths = trie
+            self._path_set = paths
+            logger.debug(f"Completion: {len(paths)} project paths.")
+
+    def _on_project_events(self, events):
+        for event in events:
+            if event.kind == RESCAN:
+                self._scan_paths()
+                return
+            relative = _relative_path(self.project_root, event.path)
+            if event.kind == DELETED:
+                prefix = relative + "/"
+                for path in [p for p in self._path_set if p == relative or p.startswith(prefix)]:
+                    self._path_set.discard(path)
+                    self.paths.remove(path)
+            elif event.is_dir:
+                self._scan_paths() # Moved-in directories bring their files along
+                return
+            elif relative not in self._path_set and os.path.isfile(event.path):
+                self._path_set.add(relative)
+                self.paths.add(relative)
+
+    def _on_symbols_updated(self, file_paths: list):
+        """Applies the changed files' class and id usage counts to the tries."""
+        index = self.symbol_indexer.index
+        tries = {CLASS: self.classes, ID: self.ids}
+        for file_path in file_paths:
+            terms = Counter((s.kind, s.name) for s in index.symbols(file_path) if s.kind in tries)
+            old_terms = self._file_terms.pop(file_path, Counter())
+            if terms:
+                self._file_terms[file_path] = terms
+            for key in terms.keys() | old_terms.keys():
+                delta = terms[key] - old_terms[key]
+                if delta:
+                    tries[key[0]].add(key[1], delta)
+
+    def complete(self, context: CompletionContext, limit: int = 20) -> List[str]:
+        """Candidates for a context, best first."""
+        prefix = context.prefix
+        if context.kind == TAGS:
+            return self.tags.complete(prefix, limit)
+        if context.kind == ATTRIBUTES:
+            specific = self.tag_attributes.get(context.key)
+            return self._merge(specific, self.global_attributes, prefix, limit)
+        if context.kind == PROPERTIES:
+            return self.properties.complete(prefix, limit)
+        if context.kind == VALUES:
+            return self._merge(self.values.get(context.key), self.global_values, prefix, limit)
+        if context.kind == CLASSES:
+            return self.classes.complete(prefix, limit)
+        if context.kind == IDS:
+            return self.ids.complete(prefix, limit)
+        if context.kind == PATHS:
+            return self._complete_path(prefix, context.document, limit)
+        return []
+
+    def _complete_path(self, prefix: str, document: Optional[str], limit: int) -> List[str]:
+        """
+        Paths as the document links to them: relative to its directory, or
+        to the project root after a leading '/' (as on a server rooted there).
+        """
+        if prefix.startswith("/"):
+            return ["/" + path for path in self.paths.complete(prefix[1:], limit)]
+        base = self._document_directory(document)
+        if base is None: # Not a file of the project: only root-relative paths are known
+            return []
+        lead = re.match(r"(?:\./)?(?:\.\./)*", prefix).group(0)
+        rest = prefix[len(lead):]
+        directory = posixpath.normpath(posixpath.join(base, lead))
+        if directory == os.pardir or directory.startswith(os.pardir + "/"):
+            return [] # Above the project root
+        scope = "" if directory == os.curdir else directory + "/"
+        words = [lead + path[len(scope):] for path in self.paths.complete(scope + rest, limit)]
+        if not lead and scope and "../".startswith(rest):
+            # Nothing typed past the document's directory yet: offer the rest of the project too
+            words.extend(posixpath.relpath(path, base) for path in self.paths.complete("", limit)
+                         if not path.startswith(scope))
+        return words[:limit]
+
+    def _document_directory(self, document: Optional[str]) -> Optional[str]:
+        """The document's directory relative to the project root ('' for the root), or None if outside it."""
+        if not document or not self.project_root:
+            return None
+        try:
+            directory = _relative_path(self.project_root, os.path.dirname(os.path.normpath(document)))
+        except ValueError: # Different drive on Windows
+            return None
+        if directory == os.pardir or directory.startswith(os.pardir + "/"):
+            return None
+        return "" if directory == os.curdir else directory
+
+    @staticmethod
+    def _merge(first: Optional[CompletionTrie], second: CompletionTrie, prefix: str, limit: int) -> List[str]:
+        words = first.complete(prefix, limit) if first is not None else []
+        seen = set(words)
+        words.extend(word for word in second.complete(prefix, limit) if word not in seen)
+        return words[:limit]
+
+    def record_use(self, context: CompletionContext, word: str):
+        """Ranks an accepted completion higher from now on."""
+        if context.kind == TAGS:
+            trie = self.tags
+        elif context.kind == ATTRIBUTES:
+            specific = self.tag_attributes.get(context.key)
+            trie = specific if specific is not None and word in specific else self.global_attributes
+        elif context.kind == PROPERTIES:
+            trie = self.properties
+        elif context.kind == VALUES:
+            specific = self.values.get(context.key)
+            trie = specific if specific is not None and word in specific else self.global_values
+        else:
+            return # Project vocabularies are ranked by actual use in the project
+        if word in trie:
+            trie.add(word, USE_BONUS)
@@ -0,0 +1,111 @@
+# website_builder/utils/completion_trie.py
+import heapq
+from typing import Iterable, List, Optional, Tuple
+
+TOP_K = 32 # Best completions cached per trie node (and the most complete() returns)
+
+
+class _Node:
+    __slots__ = ("children", "count", "word", "top")
+
+    def __init__(self):
+        self.children = {}
+        self.count = 0     # Frequency of the word ending here (0: no word ends here)
+        self.word = None
+        self.top = None    # [(-count, word)] best TOP_K words in this subtree, best first; None = stale
+
+
+class CompletionTrie:
+    """
+    Prefix trie of words with frequencies. Every node caches the TOP_K most
+    frequent words below it, so complete() is a walk down the prefix plus a
+    slice, whatever the vocabulary size. Changing a word only invalidates the
+    caches on its path; they are rebuilt (from the children's caches) on the
+    next lookup that needs them.
+
+    Not thread-safe: build it on one thread, then use it from one thread.
+    """
+    def __init__(self, words: Iterable[Tuple[str, int]] = ()):
+        self._root = _Node()
+        self._size = 0
+        for word, count in words:
+            self.add(word, count)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, word: str) -> bool:
+        node = self._find(word)
+        return node is not None and node.count > 0
+
+    def _find(self, prefix: str) -> Optional[_Node]:
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def add(self, word: str, count: int = 1):
+        """Adds `count` to a word's frequency (inserting it if needed); a negative count lowers it."""
+        if not word or not count:
+            return
+        path = [self._root]
+        node = self._root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                if count < 0:
+                    return # Lowering a word that is not there
+                child = node.children[char] = _Node()
+            node = child
+            path.append(node)
+        was_word = node.count > 0
+        node.count = max(0, node.count + count)
+        node.word = word if node.count else None
+        self._size += (node.count > 0) - was_word
+        for path_node in path:
+            path_node.top = None
+        if not node.count:
+            self._prune(word, path)
+
+    def remove(self, word: str):
+        """Removes a word whatever its frequency."""
+        node = self._find(word)
+        if node is not None and node.count:
+            self.add(word, -node.count)
+
+    def count(self, word: str) -> int:
+        node = self._find(word)
+        return node.count if node else 0
+
+    def _prune(self, word: str, path: List[_Node]):
+        # Drop the now empty tail of the word's path
+        for depth in range(len(word), 0, -1):
+            node = path[depth]
+            if node.count or node.children:
+                break
+            del path[depth - 1].children[word[depth - 1]]
+
+    def _top(self, node: _Node) -> List[Tuple[int, str]]:
+        if node.top is None:
+            candidates = [(-node.count, node.word)] if node.count else []
+            for child in node.children.values():
+                candidates.extend(self._top(child))
+            node.top = heapq.nsmallest(TOP_K, candidates)
+        return node.top
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """The most frequent words starting with `prefix` (most frequent first, then alphabetical)."""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        return [word for _, word in self._top(node)[:limit]]
+
+    def warm(self):
+        """Builds every node's cache now (e.g. on a worker thread), so no lookup has to."""
+        self._top(self._root)
+
+    def clear(self):
+        self._root = _Node()
+        self._size = 0
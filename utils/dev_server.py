@@ -0,0 +1,444 @@
+# website_builder/utils/dev_server.py
+"""
+Local development server: serves the project over HTTP on localhost, for
+opening it in a real browser ("Run in Browser") with working fetch/XHR and
+ES modules.
+
+StaticFileServer is the asyncio side: HTTP/1.1 with keep-alive, ETag and
+Last-Modified validators answered with 304, file contents cached in memory
+(invalidated by change notifications, so a cache hit costs no system call),
+and Server-Sent Events at EVENTS_PATH through which served pages (which get
+resources/preview/live_reload.js added) learn about changed files.
+DevServer runs it on an event loop thread and feeds it the project's
+filesystem events and the editor's saves.
+"""
+import os
+import json
+import asyncio
+import logging
+import threading
+import email.utils
+from collections import OrderedDict
+from typing import Dict, Iterable, NamedTuple, Optional, Set
+from urllib.parse import quote, unquote, urlsplit
+
+from PyQt6.QtCore import QCoreApplication, QObject
+
+from .fs_events import CREATED, RESCAN, FileSystemEventService
+from .overlay_scheme import INDEX_FILE, content_type
+from .page_dependencies import normalized_path
+
+logger = logging.getLogger(__name__)
+
+EVENTS_PATH = "/__flexta/events"
+CLIENT_PATH = "/__flexta/live-reload.js"
+LIVE_RELOAD_SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "preview", "live_reload.js"
+)
+_CLIENT_TAG = f'<script src="{CLIENT_PATH}"></script>'.encode()
+
+_REASONS = {
+    200: "OK", 301: "Moved Permanently", 304: "Not Modified", 400: "Bad Request", 403: "Forbidden",
+    404: "Not Found", 405: "Method Not Allowed", 431: "Request Header Fields Too Large",
+}
+
+
+class _Request(NamedTuple):
+    method: str
+    path: str # Decoded
+    raw_path: str
+    version: str
+    headers: Dict[str, str] # Lower-case names
+
+
+class _CachedFile(NamedTuple):
+    data: bytes
+    content_type: str
+    etag: str
+    last_modified: str # HTTP date
+    mtime: int # Whole seconds, as compared with If-Modified-Since
+
+
+def _parse_request(head: bytes) -> Optional[_Request]:
+    try:
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ")
+    except ValueError:
+        return None
+    if not version.startswith("HTTP/1."):
+        return None
+    headers = {}
+    for line in lines[1:]:
+        if line:
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+    raw_path = urlsplit(target).path
+    return _Request(method, unquote(raw_path), raw_path, version, headers)
+
+
+def url_path_for(root: str, path: str) -> Optional[str]:
+    """The URL path of a file below `root` (None if it is outside)."""
+    try:
+        relative = os.path.relpath(path, root)
+    except ValueError: # Different drive on Windows
+        return None
+    if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return None
+    return "/" + quote("" if relative == os.curdir else relative.replace(os.sep, "/"))
+
+
+def _inject_client(data: bytes) -> bytes:
+    """An HTML page with the live reload client added (before </body> if there is one)."""
+    index = data.lower().rfind(b"</body>")
+    if index == -1:
+        return data + _CLIENT_TAG
+    return data[:index] + _CLIENT_TAG + data[index:]
+
+
+def _read_file(file_path: str) -> Optional[_CachedFile]:
+    """Reads a file for serving (on an executor thread)."""
+    try:
+        with open(file_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            data = f.read()
+    except OSError:
+        return None
+    mime = content_type(file_path)
+    if mime == "text/html":
+        data = _inject_client(data)
+    return _CachedFile(
+        data, mime, f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"',
+        email.utils.formatdate(stat.st_mtime, usegmt=True), int(stat.st_mtime),
+    )
+
+
+class StaticFileServer:
+    """Serves files below `root` (see the module docstring). Use it on its event loop's thread only."""
+    CACHE_BYTES = 64 * 1024 * 1024
+    MAX_CACHED_FILE_BYTES = 8 * 1024 * 1024 # Bigger files are read for every request
+    MAX_HEADER_BYTES = 64 * 1024
+    KEEP_ALIVE_SECONDS = 15
+    HEARTBEAT_SECONDS = 20 # Event stream comments, so dead clients are noticed
+    BACKLOG = 512 # One page load can open many connections at once
+
+    def __init__(self, root: str):
+        self.root = os.path.normpath(root)
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._cache: "OrderedDict[str, _CachedFile]" = OrderedDict() # normalized path -> file
+        self._cache_bytes = 0
+        self._generation = 0 # Bumped by invalidations, so reads that raced one are not cached
+        self._loading: Dict[str, asyncio.Future] = {} # normalized path -> read in progress
+        self._connections: Set[asyncio.Task] = set()
+        self._subscribers: Set[asyncio.Queue] = set() # One per open event stream
+        try:
+            with open(LIVE_RELOAD_SCRIPT_PATH, "rb") as f:
+                self._client_script = f.read()
+        except OSError as e:
+            logger.error(f"Live reload client unavailable: {e}")
+            self._client_script = b""
+
+    async def start(self, host: str, port: int) -> int:
+        """Starts listening (port 0: any free port); returns the port."""
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, limit=self.MAX_HEADER_BYTES, backlog=self.BACKLOG
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.port
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        for task in list(self._connections):
+            task.cancel()
+        await asyncio.gather(*self._connections, return_exceptions=True)
+
+    def set_root(self, root: str):
+        self.root = os.path.normpath(root)
+        self.files_changed((), everything=True)
+
+    # --- Change notifications ---
+    def files_changed(self, paths: Iterable[str], everything: bool = False):
+        """Drops changed files from the cache and tells the connected pages (everything: reload them all)."""
+        self._generation += 1
+        url_paths = []
+        if everything:
+            self._cache.clear()
+            self._cache_bytes = 0
+        for path in paths:
+            cached = self._cache.pop(normalized_path(path), None)
+            if cached is not None:
+                self._cache_bytes -= len(cached.data)
+            url_path = url_path_for(self.root, path)
+            if url_path is not None:
+                url_paths.append(url_path)
+        if not url_paths and not everything:
+            return
+        message = f"event: change\ndata: {json.dumps({'paths': url_paths, 'everything': everything})}\n\n"
+        for queue in self._subscribers:
+            queue.put_nowait(message)
+
+    def _file_for(self, url_path: str) -> Optional[str]:
+        path = os.path.normpath(os.path.join(self.root, *url_path.lstrip("/").split("/")))
+        if "\0" in path or (path != self.root and not path.startswith(os.path.join(self.root, ""))):
+            return None
+        return path
+
+    # --- HTTP ---
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.KEEP_ALIVE_SECONDS)
+                except asyncio.LimitOverrunError:
+                    await self._send(writer, 431, keep_alive=False)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError):
+                    break
+                request = _parse_request(head)
+                if request is None:
+                    await self._send(writer, 400, keep_alive=False)
+                    break
+                body_length = request.headers.get("content-length", "0")
+                if body_length.isdigit() and int(body_length):
+                    await reader.readexactly(int(body_length)) # Not used; skipped to reach the next request
+                if not await self._respond(request, writer):
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except asyncio.CancelledError:
+            pass # Server closing
+        except Exception as e:
+            logger.error(f"Development server connection failed: {e}", exc_info=True)
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _respond(self, request: _Request, writer: asyncio.StreamWriter) -> bool:
+        """Answers a request; returns whether the connection stays open for another."""
+        connection = request.headers.get("connection", "").lower()
+        keep_alive = connection != "close" if request.version == "HTTP/1.1" else connection == "keep-alive"
+        if request.method not in ("GET", "HEAD"):
+            await self._send(writer, 405, {"Allow": "GET, HEAD"}, keep_alive=keep_alive)
+            return keep_alive
+        head_only = request.method == "HEAD"
+        if request.path == EVENTS_PATH:
+            await self._stream_events(writer)
+            return False
+        if request.path == CLIENT_PATH:
+            headers = {"Content-Type": "text/javascript", "Cache-Control": "no-cache"}
+            await self._send(writer, 200, headers, self._client_script, keep_alive, head_only)
+            return keep_alive
+        file_path = self._file_for(request.path)
+        if file_path is None:
+            await self._send(writer, 403, keep_alive=keep_alive)
+            return keep_alive
+        if request.path.endswith("/"):
+            file_path = os.path.join(file_path, INDEX_FILE)
+        elif normalized_path(file_path) not in self._cache and os.path.isdir(file_path):
+            # Relative references in its index page resolve against the directory
+            await self._send(writer, 301, {"Location": request.raw_path + "/"}, keep_alive=keep_alive)
+            return keep_alive
+        file = await self._load(file_path)
+        if file is None:
+            await self._send(writer, 404, keep_alive=keep_alive)
+            return keep_alive
+        headers = {
+            "Content-Type": file.content_type,
+            "ETag": file.etag,
+            "Last-Modified": file.last_modified,
+            "Cache-Control": "no-cache", # Always revalidated: cheap (304) and never stale
+        }
+        if self._not_modified(request, file):
+            await self._send(writer, 304, headers, keep_alive=keep_alive)
+        else:
+            await self._send(writer, 200, headers, file.data, keep_alive, head_only)
+        return keep_alive
+
+    @staticmethod
+    def _not_modified(request: _Request, file: _CachedFile) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None: # Takes precedence over If-Modified-Since
+            tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+            return "*" in tags or file.etag in tags
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return file.mtime <= since
+        return False
+
+    async def _send(self, writer: asyncio.StreamWriter, status: int, headers: Optional[Dict[str, str]] = None,
+                    body: bytes = b"", keep_alive: bool = True, head_only: bool = False):
+        reason = _REASONS.get(status, "")
+        if status >= 400 and not body:
+            body = f"{status} {reason}\n".encode()
+            headers = dict(headers or {}, **{"Content-Type": "text/plain; charset=utf-8"})
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        lines.extend(f"{name}: {value}" for name, value in (headers or {}).items())
+        if status != 304:
+            lines.append(f"Content-Length: {len(body)}")
+        lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+        writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+        if body and not head_only and status != 304:
+            writer.write(body)
+        await writer.drain()
+
+    async def _load(self, file_path: str) -> Optional[_CachedFile]:
+        """A file's content, from the cache or read once for all concurrent requests."""
+        key = normalized_path(file_path)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+        loading = self._loading.get(key)
+        if loading is None:
+            loading = asyncio.ensure_future(self._read(key, file_path))
+            self._loading[key] = loading
+            loading.add_done_callback(lambda _, key=key: self._loading.pop(key, None))
+        return await asyncio.shield(loading) # One request giving up does not cancel the read for the others
+
+    async def _read(self, key: str, file_path: str) -> Optional[_CachedFile]:
+        generation = self._generation
+        file = await asyncio.get_running_loop().run_in_executor(None, _read_file, file_path)
+        if file is not None and generation == self._generation and len(file.data) <= self.MAX_CACHED_FILE_BYTES:
+            self._cache[key] = file
+            self._cache_bytes += len(file.data)
+            while self._cache_bytes > self.CACHE_BYTES:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted.data)
+        return file
+
+    async def _stream_events(self, writer: asyncio.StreamWriter):
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.add(queue)
+        try:
+            writer.write(
+                b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nCache-Control: no-cache\r\n"
+                b"Connection: keep-alive\r\n\r\nretry: 1000\n\n"
+            )
+            await writer.drain()
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), self.HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    message = ": heartbeat\n\n"
+                writer.write(message.encode())
+                await writer.drain()
+        finally:
+            self._subscribers.discard(queue)
+
+
+class DevServer(QObject):
+    """
+    Runs a StaticFileServer for the current project on localhost, on an
+    asyncio event loop thread of its own. Started on first use; the project's
+    filesystem events and the editor's saves are forwarded to it.
+    """
+    HOST = "127.0.0.1"
+    PREFERRED_PORT = 5510 # Stable URLs across sessions when it is free; any free port otherwise
+    START_TIMEOUT_SECONDS = 5
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.root: Optional[str] = None
+        self._server: Optional[StaticFileServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self.fs_subscription = None
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    def set_root(self, root: Optional[str]):
+        """Points the server at a project (a running server keeps running, serving the new one)."""
+        self.root = os.path.normpath(root) if root else None
+        if not self.running:
+            return
+        if self.root is None:
+            self.stop()
+            return
+        self._subscribe()
+        self._loop.call_soon_threadsafe(self._server.set_root, self.root)
+
+    def start(self) -> bool:
+        """Starts serving the project if it is not yet; returns whether the server is running."""
+        if self.running:
+            return True
+        if not self.root:
+            return False
+        server = StaticFileServer(self.root)
+        loop = asyncio.new_event_loop()
+        thread = threading.Thread(target=loop.run_forever, name="DevServer", daemon=True)
+        thread.start()
+        for port in (self.PREFERRED_PORT, 0):
+            try:
+                asyncio.run_coroutine_threadsafe(server.start(self.HOST, port), loop).result(self.START_TIMEOUT_SECONDS)
+                break
+            except OSError as e:
+                logger.info(f"Development server could not listen on port {port}: {e}")
+            except Exception as e:
+                logger.error(f"Development server failed to start: {e}", exc_info=True)
+                break
+        if server.port is None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(self.START_TIMEOUT_SECONDS)
+            loop.close()
+            return False
+        self._server, self._loop, self._thread = server, loop, thread
+        self._subscribe()
+        logger.info(f"Development server for {self.root} listening on http://{self.HOST}:{server.port}/")
+        return True
+
+    def stop(self):
+        if not self.running:
+            return
+        server, loop, thread = self._server, self._loop, self._thread
+        self._server = self._loop = self._thread = None
+        if self.fs_subscription is not None:
+            FileSystemEventService.instance().unsubscribe(self.fs_subscription)
+            self.fs_subscription = None
+        try:
+            asyncio.run_coroutine_threadsafe(server.close(), loop).result(self.START_TIMEOUT_SECONDS)
+        except Exception as e:
+            logger.warning(f"Development server did not close cleanly: {e}")
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(self.START_TIMEOUT_SECONDS)
+        if not thread.is_alive():
+            loop.close()
+        logger.info("Development server stopped.")
+
+    def url_for_path(self, path: str) -> Optional[str]:
+        """The server URL of a project file (None if the server is not running or the file is outside)."""
+        if not self.running:
+            return None
+        url_path = url_path_for(self.root, os.path.normpath(path))
+        return f"http://{self.HOST}:{self._server.port}{url_path}" if url_path is not None else None
+
+    def notify_file_saved(self, file_path: str):
+        """Reports a file written by the editor (the application's own writes are not filesystem events)."""
+        if self.running:
+            self._loop.call_soon_threadsafe(self._server.files_changed, [os.path.normpath(file_path)])
+
+    def _subscribe(self):
+        fs_events = FileSystemEventService.instance()
+        if self.fs_subscription is not None:
+            fs_events.unsubscribe(self.fs_subscription)
+        self.fs_subscription = fs_events.subscribe(self.root, self._on_project_events)
+
+    def _on_project_events(self, events):
+        if not self.running:
+            return
+        # Lost events, or a directory removed or renamed: its files are not listed, so start over
+        everything = any(event.kind == RESCAN or (event.is_dir and event.kind != CREATED) for event in events)
+        paths = [event.path for event in events if not event.is_dir and event.kind != RESCAN]
+        self._loop.call_soon_threadsafe(self._server.files_changed, paths, everything)
@@ -0,0 +1,146 @@
+# website_builder/utils/file_loader.py
+import os
+import re
+import codecs
+import time
+import hashlib
+import logging
+from typing import NamedTuple, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from .latency_metrics import OPEN_DECODE, OPEN_READ, LatencyMetrics
+
+logger = logging.getLogger(__name__)
+
+FALLBACK_ENCODING = "latin-1"  # Decodes any byte sequence
+
+# (BOM, codec) - UTF-32 before UTF-16, since the UTF-32 LE BOM starts with the UTF-16 LE one
+_BOMS = (
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# <meta charset="..."> or <meta http-equiv="Content-Type" content="...; charset=...">,
+# looked for in the first 1024 bytes like the HTML prescan does
+_META_CHARSET = re.compile(
+    rb"""<meta\b[^>]*?\bcharset\s*=\s*["']?\s*([A-Za-z0-9_.:-]+)""", re.IGNORECASE
+)
+META_PRESCAN_BYTES = 1024
+
+
+def sniff_encoding(data: bytes) -> Optional[str]:
+    """
+    Returns the encoding declared by a byte order mark or an HTML <meta charset>,
+    or None if the bytes declare nothing (or an unknown codec).
+    """
+    for bom, encoding in _BOMS:
+        if data.startswith(bom):
+            return encoding
+
+    match = _META_CHARSET.search(data[:META_PRESCAN_BYTES])
+    if match:
+        declared = match.group(1).decode("ascii", "ignore")
+        try:
+            encoding = codecs.lookup(declared).name
+        except LookupError:
+            logger.debug(f"Ignoring unknown declared charset: {declared}")
+            return None
+        # A page saved as UTF-8 with a UTF-16 declaration is mislabelled; the
+        # declaration can only be honoured if it is ASCII-compatible
+        if encoding.startswith(("utf-16", "utf-32")):
+            return "utf-8"
+        return encoding
+    return None
+
+
+def decode_text(data: bytes) -> Tuple[str, str]:
+    """
+    Decodes file bytes to editor text, returning (text, encoding).
+
+    The BOM or <meta charset> wins; otherwise UTF-8 is tried, then latin-1.
+    Line endings are normalized to '\\n' (as reading in text mode does).
+    """
+    candidates = [sniff_encoding(data), "utf-8"]
+    text = None
+    for encoding in candidates:
+        if not encoding:
+            continue
+        try:
+            text = data.decode(encoding)
+            break
+        except (UnicodeDecodeError, LookupError):
+            logger.debug(f"Decoding as {encoding} failed, trying next candidate.")
+    if text is None:
+        encoding = FALLBACK_ENCODING
+        text = data.decode(encoding)
+
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text, encoding
+
+
+class FileFingerprint(NamedTuple):
+    """What a file looked like on disk when we last loaded or saved it."""
+    mtime_ns: int
+    size: int
+    digest: bytes
+
+    def matches_stat(self, st: os.stat_result) -> bool:
+        """Cheap check: same mtime and size means the file was not touched since."""
+        return st.st_mtime_ns == self.mtime_ns and st.st_size == self.size
+
+
+def content_digest(data: bytes) -> bytes:
+    """Fast content hash used in fingerprints (BLAKE2b, 128 bit)."""
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def fingerprint_for(data: bytes, st: os.stat_result) -> FileFingerprint:
+    return FileFingerprint(st.st_mtime_ns, st.st_size, content_digest(data))
+
+
+def read_text_file(file_path: str) -> Tuple[str, str, FileFingerprint]:
+    """Reads a file once and decodes it, returning (text, encoding, fingerprint)."""
+    metrics = LatencyMetrics.instance()
+    started = time.perf_counter_ns()
+    with open(file_path, "rb") as f:
+        st = os.fstat(f.fileno())
+        data = f.read()
+    read_done = time.perf_counter_ns()
+    text, encoding = decode_text(data)
+    if metrics.enabled:
+        metrics.record(OPEN_READ, read_done - started)
+        metrics.record_since(OPEN_DECODE, read_done)
+    return text, encoding, fingerprint_for(data, st)
+
+
+class FileLoadSignals(QObject):
+    loaded = pyqtSignal(str, int, str, str, object)  # file_path, request_id, text, encoding, FileFingerprint
+    failed = pyqtSignal(str, int, str)       # file_path, request_id, error message
+
+
+class FileLoadTask(QRunnable):
+    """
+    Reads and decodes a file on a QThreadPool worker.
+
+    Results are delivered through `signals`, which lives in the thread that
+    created the task (the GUI thread), so connected slots run there.
+    """
+    def __init__(self, file_path: str, request_id: int):
+        super().__init__()
+        self.file_path = file_path
+        self.request_id = request_id
+        self.signals = FileLoadSignals()
+
+    def run(self):
+        try:
+            text, encoding, fingerprint = read_text_file(self.file_path)
+        except Exception as e:
+            logger.error(f"Error reading file {self.file_path}: {e}")
+            self.signals.failed.emit(self.file_path, self.request_id, str(e))
+            return
+        self.signals.loaded.emit(self.file_path, self.request_id, text, encoding, fingerprint)
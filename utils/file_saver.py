@@ -0,0 +1,162 @@
+# website_builder/utils/file_saver.py
+import os
+import time
+import uuid
+import logging
+from typing import Optional
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from .file_loader import FileFingerprint, content_digest, fingerprint_for
+from .latency_metrics import SAVE_WRITE, LatencyMetrics
+
+logger = logging.getLogger(__name__)
+
+# --- fsync policies ---
+FSYNC_NEVER = "never"  # Leave flushing to the OS (fastest; a crash may lose the new content)
+FSYNC_FILE = "file"    # fsync the temp file before the rename (no truncated files after a crash)
+FSYNC_FULL = "full"    # Also fsync the directory, so the rename itself is durable
+FSYNC_POLICIES = (FSYNC_NEVER, FSYNC_FILE, FSYNC_FULL)
+DEFAULT_FSYNC_POLICY = FSYNC_FILE
+
+
+def temp_path_for(file_path: str) -> str:
+    """A unique hidden sibling of `file_path` to write to before renaming."""
+    directory, name = os.path.split(file_path)
+    return os.path.join(directory, f".{name}.{uuid.uuid4().hex[:8]}.tmp")
+
+
+def encode_text(content: str, encoding: str = "utf-8") -> bytes:
+    """
+    Encodes editor text the way a text-mode write would (platform line
+    endings), in the encoding the file was read with (a BOM codec such as
+    'utf-8-sig' writes the BOM back).
+    """
+    if os.linesep != "\n":
+        content = content.replace("\n", os.linesep)
+    return content.encode(encoding)
+
+
+def write_temp(file_path: str, data: bytes, temp_path: str, fsync_policy: str = DEFAULT_FSYNC_POLICY) -> str:
+    """
+    First half of an atomic write: writes `data` to `temp_path` with the
+    permissions of the existing file. Returns the path the temp file is to be
+    renamed over (symlinks resolved). The temp file is removed on failure.
+    """
+    target = os.path.realpath(file_path)
+    try:
+        mode = os.stat(target).st_mode & 0o7777
+    except FileNotFoundError:
+        mode = None
+
+    fd = os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0), 0o666)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+            f.flush()
+            if fsync_policy in (FSYNC_FILE, FSYNC_FULL):
+                os.fsync(f.fileno())
+        if mode is not None:
+            os.chmod(temp_path, mode)
+    except BaseException:
+        discard_temp(temp_path)
+        raise
+    return target
+
+
+def discard_temp(temp_path: str):
+    try:
+        os.remove(temp_path)
+    except OSError:
+        pass
+
+
+def fsync_directory(path: str):
+    """Makes renames inside a directory durable (where the platform supports it)."""
+    if hasattr(os, "O_DIRECTORY"):
+        dir_fd = os.open(path or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+def write_atomic(file_path: str, data: bytes, temp_path: str, fsync_policy: str = DEFAULT_FSYNC_POLICY) -> os.stat_result:
+    """
+    Writes `data` to `temp_path` and renames it over `file_path`, so readers and
+    crashes only ever see the old or the new content, never a partial file.
+    Symlinks are written through; the existing file's permissions are kept.
+    Returns the stat of the written file.
+    """
+    target = write_temp(file_path, data, temp_path, fsync_policy)
+    try:
+        os.replace(temp_path, target)
+    except BaseException:
+        discard_temp(temp_path)
+        raise
+
+    if fsync_policy == FSYNC_FULL:
+        fsync_directory(os.path.dirname(target))
+    return os.stat(target)
+
+
+class FileSaveSignals(QObject):
+    finished = pyqtSignal(object)  # FileSaveTask (check .error / .skipped / .fingerprint)
+
+
+class FileSaveTask(QRunnable):
+    """
+    Encodes and atomically writes one buffer on a QThreadPool worker.
+
+    If `previous` (the fingerprint of what we last loaded or saved) still
+    describes the file on disk and the new bytes hash the same, nothing is
+    written and the task reports `skipped`.
+    """
+    def __init__(self, file_path: str, content: str, request_id: int, fsync_policy: str,
+                 previous: Optional[FileFingerprint] = None, encoding: str = "utf-8"):
+        super().__init__()
+        self.setAutoDelete(False)  # Owned by the caller until it has seen the result
+        self.file_path = file_path
+        self.content = content
+        self.encoding = encoding
+        self.request_id = request_id
+        self.fsync_policy = fsync_policy
+        self.previous = previous
+        self.temp_path = temp_path_for(file_path)
+        self.signals = FileSaveSignals()
+
+        self.done = False
+        self.skipped = False
+        self.unencodable: Optional[str] = None # Encoding the text did not fit (saved as UTF-8 instead)
+        self.error: Optional[str] = None
+        self.fingerprint: Optional[FileFingerprint] = None
+
+    def run(self):
+        started = time.perf_counter_ns()
+        try:
+            try:
+                data = encode_text(self.content, self.encoding)
+            except UnicodeEncodeError:
+                logger.warning(f"Text of {self.file_path} cannot be encoded as {self.encoding}, saving as UTF-8.")
+                self.unencodable, self.encoding = self.encoding, "utf-8"
+                data = encode_text(self.content, self.encoding)
+            self.content = None  # Not needed any more; don't keep a second copy alive
+            if self.previous is not None and self._unchanged_on_disk(data):
+                self.skipped = True
+                self.fingerprint = self.previous
+            else:
+                st = write_atomic(self.file_path, data, self.temp_path, self.fsync_policy)
+                self.fingerprint = fingerprint_for(data, st)
+        except Exception as e:
+            logger.error(f"Error saving file {self.file_path}: {e}")
+            self.error = str(e)
+        LatencyMetrics.instance().record_since(SAVE_WRITE, started)
+        self.done = True
+        self.signals.finished.emit(self)
+
+    def _unchanged_on_disk(self, data: bytes) -> bool:
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return False
+        return self.previous.matches_stat(st) and content_digest(data) == self.previous.digest
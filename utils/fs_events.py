@@ -0,0 +1,492 @@
+# website_builder/utils/fs_events.py
+"""
+Project-wide filesystem event service.
+
+One FileSystemEventService per process replaces the separate watchers the
+editor, the preview and the file explorer used to run. Directories are watched
+recursively (inotify on Linux, QFileSystemWatcher elsewhere), bursts of raw
+events are coalesced, echoes of the application's own writes are dropped, and
+subscribers receive batched, typed FsEvents for the paths they subscribed to.
+"""
+import os
+import sys
+import time
+import errno
+import struct
+import ctypes
+import ctypes.util
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+from PyQt6.QtCore import QFileSystemWatcher, QObject, QSocketNotifier, QTimer, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# --- Event kinds ---
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+RESCAN = "rescan"  # Events were lost (e.g. queue overflow); re-examine the whole subscribed path
+
+# Directory names never descended into when watching a tree
+IGNORED_DIRECTORIES = frozenset({".git", ".hg", ".svn", "node_modules", "__pycache__", ".venv", "venv", ".idea"})
+
+
+class FsEvent(NamedTuple):
+    kind: str
+    path: str
+    is_dir: bool = False
+
+
+def _merge_kinds(previous: str, new: str) -> Optional[str]:
+    """Combines two kinds seen for the same path within one batch (None: nothing happened)."""
+    if previous == CREATED:
+        if new == DELETED:
+            return None  # Temporary file, created and removed again
+        return CREATED
+    if previous == DELETED and new == CREATED:
+        return MODIFIED  # Replaced (e.g. atomic save by another program)
+    return new
+
+
+# --- Backends ---
+class _InotifyBackend(QObject):
+    """Linux inotify through ctypes; one non-recursive watch per directory."""
+    raw_event = pyqtSignal(str, str, bool)  # kind, path, is_dir
+    overflow = pyqtSignal()
+
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ONLYDIR = 0x01000000
+    IN_ISDIR = 0x40000000
+    WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                  | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+    _HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+    @classmethod
+    def available(cls) -> bool:
+        return sys.platform.startswith("linux") and cls._load_libc() is not None
+
+    @staticmethod
+    def _load_libc():
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1  # Raises AttributeError if missing
+            return libc
+        except (OSError, AttributeError):
+            return None
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._libc = self._load_libc()
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, f"inotify_init1 failed: {os.strerror(err)}")
+        self._wd_to_dir: Dict[int, str] = {}
+        self._dir_to_wd: Dict[str, int] = {}
+        self._notifier = QSocketNotifier(self._fd, QSocketNotifier.Type.Read, self)
+        self._notifier.activated.connect(self._read_events)
+
+    def add_directory(self, path: str) -> bool:
+        if path in self._dir_to_wd:
+            return True
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.warning("inotify watch limit reached (fs.inotify.max_user_watches); "
+                               f"not watching: {path}")
+            else:
+                logger.debug(f"inotify_add_watch failed for {path}: {os.strerror(err)}")
+            return False
+        self._wd_to_dir[wd] = path
+        self._dir_to_wd[path] = wd
+        return True
+
+    def remove_directory(self, path: str):
+        wd = self._dir_to_wd.pop(path, None)
+        if wd is not None:
+            self._wd_to_dir.pop(wd, None)
+            self._libc.inotify_rm_watch(self._fd, wd)
+
+    def add_file(self, path: str):
+        pass  # Files are reported through their (watched) parent directory
+
+    def remove_file(self, path: str):
+        pass
+
+    def watched_directories(self) -> List[str]:
+        return list(self._dir_to_wd)
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"Error reading inotify events: {e}")
+            return
+
+        offset = 0
+        header_size = self._HEADER.size
+        while offset + header_size <= len(data):
+            wd, mask, _cookie, name_length = self._HEADER.unpack_from(data, offset)
+            raw_name = data[offset + header_size:offset + header_size + name_length].rstrip(b"\0")
+            offset += header_size + name_length
+
+            if mask & self.IN_Q_OVERFLOW:
+                self.overflow.emit()
+                continue
+            directory = self._wd_to_dir.get(wd)
+            if directory is None:
+                continue
+            if mask & self.IN_IGNORED:  # Watch removed by the kernel (directory gone)
+                self._wd_to_dir.pop(wd, None)
+                self._dir_to_wd.pop(directory, None)
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                self.raw_event.emit(DELETED, directory, True)
+                continue
+
+            path = os.path.join(directory, os.fsdecode(raw_name)) if raw_name else directory
+            is_dir = bool(mask & self.IN_ISDIR)
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                self.raw_event.emit(CREATED, path, is_dir)
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                self.raw_event.emit(DELETED, path, is_dir)
+            elif not is_dir:
+                self.raw_event.emit(MODIFIED, path, False)
+
+
+class _QtWatcherBackend(QObject):
+    """
+    Portable fallback on QFileSystemWatcher: every directory is watched and its
+    listing diffed on change; explicitly added files are watched for content
+    changes (a directory watch does not see in-place writes).
+    """
+    raw_event = pyqtSignal(str, str, bool)
+    overflow = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.directoryChanged.connect(self._on_directory_changed)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._snapshots: Dict[str, Dict[str, Tuple[bool, int, int]]] = {}
+        self._files: Set[str] = set()
+
+    @staticmethod
+    def _snapshot(path: str) -> Dict[str, Tuple[bool, int, int]]:
+        entries = {}
+        try:
+            with os.scandir(path) as it:
+                for entry in it:
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                        entries[entry.name] = (entry.is_dir(follow_symlinks=False), st.st_mtime_ns, st.st_size)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return entries
+
+    def add_directory(self, path: str) -> bool:
+        if path in self._snapshots:
+            return True
+        if not self._watcher.addPath(path):
+            return False
+        self._snapshots[path] = self._snapshot(path)
+        return True
+
+    def remove_directory(self, path: str):
+        if self._snapshots.pop(path, None) is not None:
+            self._watcher.removePath(path)
+
+    def add_file(self, path: str):
+        if path not in self._files and os.path.isfile(path):
+            self._files.add(path)
+            self._watcher.addPath(path)
+
+    def remove_file(self, path: str):
+        if path in self._files:
+            self._files.discard(path)
+            self._watcher.removePath(path)
+
+    def watched_directories(self) -> List[str]:
+        return list(self._snapshots)
+
+    def _on_directory_changed(self, path: str):
+        old = self._snapshots.get(path)
+        if old is None:
+            return
+        if not os.path.isdir(path):
+            self.remove_directory(path)
+            self.raw_event.emit(DELETED, path, True)
+            return
+        new = self._snapshot(path)
+        self._snapshots[path] = new
+        for name, (is_dir, mtime, size) in new.items():
+            previous = old.get(name)
+            if previous is None:
+                self.raw_event.emit(CREATED, os.path.join(path, name), is_dir)
+            elif not is_dir and previous[1:] != (mtime, size):
+                self.raw_event.emit(MODIFIED, os.path.join(path, name), False)
+        for name, (is_dir, _mtime, _size) in old.items():
+            if name not in new:
+                self.raw_event.emit(DELETED, os.path.join(path, name), is_dir)
+
+    def _on_file_changed(self, path: str):
+        if os.path.exists(path):
+            # Replaced files drop out of the watcher; put them back
+            if path not in self._watcher.files():
+                self._watcher.addPath(path)
+            self.raw_event.emit(MODIFIED, path, False)
+        else:
+            self.raw_event.emit(DELETED, path, False)
+
+
+# --- Service ---
+class _Subscription(NamedTuple):
+    handle: int
+    path: str
+    callback: Callable[[List[FsEvent]], None]
+
+
+class FileSystemEventService(QObject):
+    """
+    Shared, recursive filesystem watching with batched delivery.
+
+    subscribe(path, callback) returns a handle for unsubscribe(). Subscribing to
+    a directory covers its whole tree; subscribing to a file covers that file.
+    Watches are reference-counted per path, so the preview and the explorer both
+    subscribing to the project root share one set of watches, which is only
+    dropped when the last subscriber leaves.
+
+    Raw events are merged per path for COALESCE_MS after the last one (at most
+    MAX_WAIT_MS), then each subscriber's callback gets one list of FsEvents.
+
+    Writes made by the application itself should be wrapped in
+    begin_own_write() / end_own_write(); events for a path are then dropped
+    while the write is in progress and afterwards as long as the file is still
+    exactly what was written (same mtime and size).
+    """
+    COALESCE_MS = 100
+    MAX_WAIT_MS = 500
+
+    _instance: Optional["FileSystemEventService"] = None
+
+    @classmethod
+    def instance(cls) -> "FileSystemEventService":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._backend = None
+        if _InotifyBackend.available():
+            try:
+                self._backend = _InotifyBackend(self)
+                logger.info("Filesystem events: using inotify.")
+            except OSError as e:
+                logger.warning(f"inotify unavailable ({e}), falling back to QFileSystemWatcher.")
+        if self._backend is None:
+            self._backend = _QtWatcherBackend(self)
+            logger.info("Filesystem events: using QFileSystemWatcher.")
+        self._backend.raw_event.connect(self._on_raw_event)
+        self._backend.overflow.connect(self._on_overflow)
+
+        self._subscriptions: Dict[int, _Subscription] = {}
+        self._path_refcounts: Dict[str, int] = {}
+        self._next_handle = 0
+
+        self._pending: Dict[str, FsEvent] = {}
+        self._rescan_pending = False
+        self._first_pending_at = 0.0
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(self.COALESCE_MS)
+        self._flush_timer.timeout.connect(self._flush)
+
+        self._writes_in_progress: Dict[str, int] = {}
+        self._own_writes: Dict[str, Tuple[int, int]] = {}  # path -> (mtime_ns, size) we left behind
+
+    # --- Subscriptions ---
+    def subscribe(self, path: str, callback: Callable[[List[FsEvent]], None]) -> int:
+        """Starts delivering events for `path` (a file, or a directory tree) to `callback`."""
+        path = os.path.normpath(os.path.abspath(path))
+        self._next_handle += 1
+        handle = self._next_handle
+        self._subscriptions[handle] = _Subscription(handle, path, callback)
+        count = self._path_refcounts.get(path, 0)
+        self._path_refcounts[path] = count + 1
+        if count == 0:
+            self._watch_path(path)
+        return handle
+
+    def unsubscribe(self, handle: int):
+        subscription = self._subscriptions.pop(handle, None)
+        if subscription is None:
+            return
+        path = subscription.path
+        count = self._path_refcounts.get(path, 0) - 1
+        if count > 0:
+            self._path_refcounts[path] = count
+            return
+        self._path_refcounts.pop(path, None)
+        self._unwatch_uncovered(path)
+
+    def _watch_path(self, path: str):
+        if os.path.isdir(path):
+            self._watch_tree(path)
+            logger.debug(f"Watching tree: {path} ({len(self._backend.watched_directories())} directories watched)")
+        else:
+            self._backend.add_directory(os.path.dirname(path))
+            self._backend.add_file(path)
+
+    def _watch_tree(self, root: str) -> List[str]:
+        """Watches `root` and its subdirectories; returns the directories added."""
+        added = []
+        for directory, subdirs, _files in os.walk(root):
+            subdirs[:] = [d for d in subdirs if d not in IGNORED_DIRECTORIES]
+            if self._backend.add_directory(directory):
+                added.append(directory)
+        return added
+
+    def _is_tree_subscribed(self, path: str) -> bool:
+        """Whether `path` lies within a subscribed directory tree."""
+        for subscribed in self._path_refcounts:
+            if path == subscribed or path.startswith(subscribed + os.sep):
+                if os.path.isdir(subscribed):
+                    return True
+        return False
+
+    def _covers(self, directory: str) -> bool:
+        """Whether some remaining subscription still needs `directory` watched."""
+        for subscribed in self._path_refcounts:
+            if directory == subscribed or directory.startswith(subscribed + os.sep):
+                return True
+            if directory == os.path.dirname(subscribed):
+                return True
+        return False
+
+    def _unwatch_uncovered(self, path: str):
+        self._backend.remove_file(path)
+        for directory in self._backend.watched_directories():
+            if (directory == path or directory.startswith(path + os.sep)
+                    or directory == os.path.dirname(path)) and not self._covers(directory):
+                self._backend.remove_directory(directory)
+
+    # --- Own writes ---
+    def begin_own_write(self, path: str):
+        """Marks `path` as being written by the application (events are ignored)."""
+        path = os.path.normpath(os.path.abspath(path))
+        self._writes_in_progress[path] = self._writes_in_progress.get(path, 0) + 1
+
+    def end_own_write(self, path: str):
+        """Ends an own write; the resulting file state is remembered as ours."""
+        path = os.path.normpath(os.path.abspath(path))
+        count = self._writes_in_progress.get(path, 0) - 1
+        if count > 0:
+            self._writes_in_progress[path] = count
+        else:
+            self._writes_in_progress.pop(path, None)
+        try:
+            st = os.stat(path)
+            self._own_writes[path] = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            self._own_writes.pop(path, None)
+
+    def _is_own_echo(self, event: FsEvent) -> bool:
+        path = event.path
+        if path in self._writes_in_progress:
+            return True
+        signature = self._own_writes.get(path)
+        if signature is None or event.kind == DELETED:
+            return False
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        if (st.st_mtime_ns, st.st_size) == signature:
+            return True
+        del self._own_writes[path]  # Changed since our write: from now on it's external
+        return False
+
+    # --- Raw events ---
+    def _on_raw_event(self, kind: str, path: str, is_dir: bool):
+        path = os.path.normpath(path)
+        self._queue(FsEvent(kind, path, is_dir))
+        if is_dir and kind == CREATED and self._is_tree_subscribed(path):
+            # New directory inside a watched tree: watch it and report what was
+            # already created in it before the watch was in place
+            for directory in self._watch_tree(path):
+                if directory != path:
+                    self._queue(FsEvent(CREATED, directory, True))
+                try:
+                    with os.scandir(directory) as it:
+                        for entry in it:
+                            if not entry.is_dir(follow_symlinks=False):
+                                self._queue(FsEvent(CREATED, entry.path, False))
+                except OSError:
+                    pass
+        elif is_dir and kind == DELETED:
+            for directory in self._backend.watched_directories():
+                if directory == path or directory.startswith(path + os.sep):
+                    self._backend.remove_directory(directory)
+
+    def _on_overflow(self):
+        logger.warning("Filesystem event queue overflowed; subscribers will rescan.")
+        self._rescan_pending = True
+        self._schedule_flush()
+
+    def _queue(self, event: FsEvent):
+        previous = self._pending.get(event.path)
+        if previous is None:
+            self._pending[event.path] = event
+        else:
+            kind = _merge_kinds(previous.kind, event.kind)
+            if kind is None:
+                del self._pending[event.path]
+            else:
+                self._pending[event.path] = event._replace(kind=kind)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if not self._flush_timer.isActive():
+            self._first_pending_at = time.perf_counter()
+            self._flush_timer.start()
+        elif (time.perf_counter() - self._first_pending_at) * 1000 < self.MAX_WAIT_MS:
+            self._flush_timer.start()  # Restart: wait for the burst to settle
+
+    def _flush(self):
+        batch = [event for event in self._pending.values() if not self._is_own_echo(event)]
+        self._pending = {}
+        rescan, self._rescan_pending = self._rescan_pending, False
+        if not batch and not rescan:
+            return
+
+        for subscription in list(self._subscriptions.values()):
+            if subscription.handle not in self._subscriptions:
+                continue  # Unsubscribed by an earlier callback in this flush
+            sub_path = subscription.path
+            prefix = sub_path + os.sep
+            events = [e for e in batch if e.path == sub_path or e.path.startswith(prefix)]
+            if rescan:
+                events.append(FsEvent(RESCAN, sub_path, os.path.isdir(sub_path)))
+            if not events:
+                continue
+            try:
+                subscription.callback(events)
+            except Exception as e:
+                logger.error(f"Error in filesystem event subscriber for {sub_path}: {e}", exc_info=True)
@@ -0,0 +1,188 @@
+# website_builder/utils/highlight_registry.py
+import time
+import logging
+from typing import Dict, Optional
+
+from PyQt6 import sip
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QFont, QTextCharFormat
+
+from . import syntax_lexer
+
+logger = logging.getLogger(__name__)
+
+# --- Token Colors per Theme ---
+# Token kind -> (color, bold, italic)
+THEME_TOKEN_STYLES = {
+    "light": {
+        syntax_lexer.TAG: (QColor(0, 0, 128), True, False), # Dark Blue
+        syntax_lexer.ATTRIBUTE: (QColor(128, 0, 0), False, False), # Dark Red
+        syntax_lexer.TAG_BRACKET: (QColor(128, 128, 128), False, False), # Gray brackets
+        syntax_lexer.CSS_SELECTOR: (QColor(128, 0, 128), False, False), # Purple
+        syntax_lexer.CSS_PROPERTY: (QColor(0, 128, 0), False, False), # Dark Green
+        syntax_lexer.CSS_VALUE: (QColor(0, 0, 200), False, False), # Blue values
+        syntax_lexer.JS_KEYWORD: (QColor(170, 120, 100), True, False), # Darker red
+        syntax_lexer.JS_BUILTIN: (QColor(100, 100, 200), False, False), # Lighter blue/purple
+        syntax_lexer.COMMENT: (QColor(128, 128, 128), False, True), # Gray
+        syntax_lexer.STRING: (QColor(0, 150, 0), False, False), # Green strings
+        syntax_lexer.NUMBER: (QColor(200, 100, 0), False, False), # Orange numbers
+    },
+    "dark": {
+        syntax_lexer.TAG: (QColor(86, 156, 214), True, False), # Soft blue
+        syntax_lexer.ATTRIBUTE: (QColor(156, 220, 254), False, False), # Light blue
+        syntax_lexer.TAG_BRACKET: (QColor(128, 128, 128), False, False), # Gray brackets
+        syntax_lexer.CSS_SELECTOR: (QColor(215, 186, 125), False, False), # Sand
+        syntax_lexer.CSS_PROPERTY: (QColor(156, 220, 254), False, False), # Light blue
+        syntax_lexer.CSS_VALUE: (QColor(206, 145, 120), False, False), # Salmon
+        syntax_lexer.JS_KEYWORD: (QColor(197, 134, 192), True, False), # Pink/purple
+        syntax_lexer.JS_BUILTIN: (QColor(78, 201, 176), False, False), # Teal
+        syntax_lexer.COMMENT: (QColor(106, 153, 85), False, True), # Muted green
+        syntax_lexer.STRING: (QColor(206, 145, 120), False, False), # Salmon strings
+        syntax_lexer.NUMBER: (QColor(181, 206, 168), False, False), # Pale green numbers
+    },
+}
+DEFAULT_THEME = "light"
+
+
+def create_format(color: QColor, bold: bool = False, italic: bool = False) -> QTextCharFormat:
+    fmt = QTextCharFormat()
+    fmt.setForeground(color)
+    if bold:
+        fmt.setFontWeight(QFont.Weight.Bold)
+    if italic:
+        fmt.setFontItalic(True)
+    return fmt
+
+
+class HighlightFormatRegistry(QObject):
+    """
+    Process-wide registry of syntax highlighting formats, shared by every open
+    highlighter.
+
+    Formats are built once per theme and handed out as one shared dict, so 40
+    open tabs hold one set of QTextCharFormats instead of 40. (The lexers and
+    their compiled patterns are likewise module-level singletons in
+    utils.syntax_lexer.)
+
+    When the theme changes, every registered highlighter is switched to the new
+    formats and its document is recoloured in time-sliced batches on the event
+    loop. Highlighters are not recreated and block states are left untouched.
+    """
+    theme_changed = pyqtSignal(str)
+
+    LARGE_DOCUMENT_BLOCKS = 2000  # Larger documents are recoloured in chunks
+    RECOLOR_CHUNK_BLOCKS = 200
+    SLICE_BUDGET_MS = 8
+
+    _instance: Optional["HighlightFormatRegistry"] = None
+
+    @classmethod
+    def instance(cls) -> "HighlightFormatRegistry":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._theme = DEFAULT_THEME
+        self._formats: Dict[str, Dict[str, QTextCharFormat]] = {}
+        # Python wrappers of highlighters owned by their documents are not kept
+        # alive by PyQt, so hold them here; deleted ones are pruned as we go.
+        self._highlighters = []
+        # Pending recolour work: [highlighter, position of next block]
+        self._recolor_queue = []
+        self._recolor_timer = QTimer(self)
+        self._recolor_timer.setInterval(0)
+        self._recolor_timer.timeout.connect(self._recolor_slice)
+
+    def current_theme(self) -> str:
+        return self._theme
+
+    def formats(self, theme: Optional[str] = None) -> Dict[str, QTextCharFormat]:
+        """Returns the shared token kind -> format dict for a theme (default: current)."""
+        theme = theme if theme in THEME_TOKEN_STYLES else self._theme
+        formats = self._formats.get(theme)
+        if formats is None:
+            formats = {
+                kind: create_format(*style) for kind, style in THEME_TOKEN_STYLES[theme].items()
+            }
+            self._formats[theme] = formats
+        return formats
+
+    def register(self, highlighter):
+        """Tracks a highlighter so it is recoloured on theme changes."""
+        self._prune()
+        self._highlighters.append(highlighter)
+
+    def _prune(self):
+        self._highlighters = [h for h in self._highlighters if not sip.isdeleted(h)]
+
+    def set_theme(self, theme_name: str):
+        if theme_name not in THEME_TOKEN_STYLES:
+            logger.warning(f"No highlighting colors for theme '{theme_name}', keeping '{self._theme}'.")
+            return
+        if theme_name == self._theme:
+            return
+        self._theme = theme_name
+        formats = self.formats()
+
+        self._prune()
+        self._recolor_queue = []
+        for highlighter in self._highlighters:
+            if highlighter.document() is None:
+                continue
+            highlighter.formats = formats
+            self._recolor_queue.append([highlighter, 0])
+        logger.info(f"Recoloring {len(self._recolor_queue)} documents for theme: {theme_name}")
+        if self._recolor_queue:
+            self._recolor_timer.start()
+        self.theme_changed.emit(theme_name)
+
+    def _recolor_slice(self):
+        deadline = time.perf_counter() + self.SLICE_BUDGET_MS / 1000.0
+        while self._recolor_queue and time.perf_counter() < deadline:
+            entry = self._recolor_queue[0]
+            highlighter, position = entry
+            document = None if sip.isdeleted(highlighter) else highlighter.document()
+            if document is None:
+                self._recolor_queue.pop(0)
+                continue
+
+            # Applying formats marks the contents dirty; that is not an edit, so
+            # keep the editor from emitting textChanged for it.
+            was_blocked = document.blockSignals(True)
+            try:
+                if document.blockCount() < self.LARGE_DOCUMENT_BLOCKS:
+                    highlighter.rehighlight()
+                    done = True
+                else:
+                    next_position = self._recolor_chunk(highlighter, document, position)
+                    done = next_position is None
+                    entry[1] = next_position
+            finally:
+                document.blockSignals(was_blocked)
+            if done:
+                self._recolor_queue.pop(0)
+
+        if not self._recolor_queue:
+            self._recolor_timer.stop()
+
+    def _recolor_chunk(self, highlighter, document, position: int) -> Optional[int]:
+        """
+        Recolours up to RECOLOR_CHUNK_BLOCKS blocks from `position` and returns
+        where to continue, or None at the end of the document.
+
+        rehighlightBlock only carries on into the next block while block states
+        change. Marking the chunk's blocks with a sentinel state makes one call
+        cover the whole chunk and stop right after it.
+        """
+        first = document.findBlock(position)
+        block = first
+        count = 0
+        while block.isValid() and count < self.RECOLOR_CHUNK_BLOCKS:
+            if block.userState() != -1: # Never-highlighted blocks are left to their scheduler
+                block.setUserState(-2)
+            block = block.next()
+            count += 1
+        highlighter.rehighlightBlock(first)
+        return block.position() if block.isValid() else None
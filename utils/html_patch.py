@@ -0,0 +1,178 @@
+# website_builder/utils/html_patch.py
+"""
+Plans live preview patches: how to bring a page showing one version of an
+HTML document up to date with a newer version (see
+resources/preview/live_patch.js, which applies them in the page).
+
+If the change lies inside the content of one explicitly closed element in
+<body>, only that element's new inner HTML is sent, addressed by its index
+among the body's elements in source order (which is document order as long
+as the browser built the DOM straight from the source; the page checks the
+element count and tag name and refuses the patch otherwise). Anything else
+is sent as the whole document, which the page morphs into its DOM.
+"""
+import re
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+ELEMENT = "element"
+DOCUMENT = "document"
+MAX_RANGE_SHIFT = 256 # How far left an ambiguous change is slid to find an element spanning it
+
+_FOREIGN = frozenset(("svg", "math"))
+_VOID = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+))
+# Elements whose content is text (the browser finds no tags in it)
+_RAW_TEXT = frozenset(("script", "style", "textarea", "title", "xmp", "iframe", "noembed", "noframes"))
+# Elements whose content is not patched on its own: raw text (handled by the
+# parent), foreign content (would be parsed as HTML), implied children (a
+# <table>'s <tbody>) and the document structure
+_NOT_PATCHABLE = _RAW_TEXT | frozenset(("template", "svg", "math", "table", "html", "head", "noscript"))
+_IMPLIED_PARENTS = {"tr": "tbody", "col": "colgroup"} # Directly in a <table>
+_BODY = re.compile(r"""<body(?=[\s/>])(?:[^>"']+|"[^"]*"|'[^']*')*>""", re.IGNORECASE)
+_TAG = re.compile(
+    r"<!--.*?(?:-->|\Z)|<[!?][^>]*>?"
+    r"""|<(/?)([A-Za-z][^\s/>]*)((?:[^>"']+|"[^"]*"|'[^']*')*)>""",
+    re.DOTALL,
+)
+_SCRIPT = re.compile(r"<script\b[^>]*>.*?(?:</script\s*>|\Z)", re.IGNORECASE | re.DOTALL)
+
+
+def changed_range(old: str, new: str) -> Tuple[int, int, int]:
+    """(start, old_end, new_end): old[start:old_end] was replaced by new[start:new_end]."""
+    limit = min(len(old), len(new))
+    start = 0
+    step = 4096 # Compare big slices first; the strings are usually mostly equal
+    while step:
+        while start + step <= limit and old[start:start + step] == new[start:start + step]:
+            start += step
+        step //= 8
+    limit -= start
+    suffix = 0
+    step = 4096
+    while step:
+        while suffix + step <= limit and old[len(old) - suffix - step:len(old) - suffix] == new[len(new) - suffix - step:len(new) - suffix]:
+            suffix += step
+        step //= 8
+    return start, len(old) - suffix, len(new) - suffix
+
+
+class _Element(NamedTuple):
+    index: int        # Among the body's descendant elements, in source order
+    tag: str
+    content_start: int
+    content_end: int
+
+
+def _scan_body(text: str) -> Tuple[int, List[_Element]]:
+    """(number of elements in <body>, the patchable ones that are explicitly closed)."""
+    body = _BODY.search(text)
+    if body is None:
+        return 0, []
+    count = 0
+    closed: List[_Element] = []
+    stack: List[Tuple[str, int, int, bool]] = [] # (tag, index, content_start, in_foreign)
+    foreign_depth = 0
+    skip_to = 0 # End of the raw text being skipped
+    for match in _TAG.finditer(text, body.end()):
+        if match.start() < skip_to:
+            continue
+        name = match.group(2)
+        if name is None: # Comment, doctype, processing instruction
+            continue
+        tag = name.lower()
+        if match.group(1): # End tag
+            for depth in range(len(stack) - 1, -1, -1):
+                if stack[depth][0] == tag:
+                    break
+            else:
+                continue
+            # Elements closed implicitly here have no reliable span
+            if foreign_depth:
+                foreign_depth -= sum(1 for open_tag, _, _, _ in stack[depth:] if open_tag in _FOREIGN)
+            open_tag, index, content_start, in_foreign = stack[depth]
+            del stack[depth:]
+            if not in_foreign and open_tag not in _NOT_PATCHABLE:
+                closed.append(_Element(index, open_tag, content_start, match.start()))
+            continue
+        if tag in ("body", "html"): # Merged into the existing elements
+            continue
+        implied = _IMPLIED_PARENTS.get(tag)
+        if implied and stack and stack[-1][0] == "table" and not foreign_depth:
+            # The browser wraps it in a <tbody> (or <colgroup>) the source does not have
+            stack.append((implied, count, -1, False))
+            count += 1
+        index = count
+        count += 1
+        self_closing = match.group(3).endswith("/")
+        if tag in _VOID or (self_closing and (foreign_depth or tag in _FOREIGN)):
+            continue
+        if tag in _RAW_TEXT and not foreign_depth: # Its content is text, up to the end tag
+            end = re.compile(rf"</{tag}[\s/>]", re.IGNORECASE).search(text, match.end())
+            skip_to = end.start() if end else len(text)
+        stack.append((tag, index, match.end(), foreign_depth > 0))
+        if tag in _FOREIGN:
+            foreign_depth += 1
+    return count, closed
+
+
+def plan_patch(old: str, new: str) -> dict:
+    """The patch (see live_patch.js) turning a page built from `old` into one built from `new`."""
+    count, closed = _body_elements(old)
+    new_spans = {(e.index, e.tag): (e.content_start, e.content_end) for e in _body_elements(new)[1]}
+    best = None
+    for start, old_end, new_end in _shifted_ranges(old, new, *changed_range(old, new)):
+        delta = new_end - old_end
+        candidates = [e for e in closed if e.content_start <= start and old_end <= e.content_end]
+        # Innermost first. The element must also span the change in the new text
+        # (an edit can open or close tags), with everything before it unchanged
+        for element in sorted(candidates, key=lambda e: e.content_end - e.content_start):
+            if best is not None and element.content_end - element.content_start >= best[0].content_end - best[0].content_start:
+                break
+            if new_spans.get((element.index, element.tag)) == (element.content_start, element.content_end + delta):
+                best = element, delta
+                break
+    if best is None:
+        return document_patch(new)
+    element, delta = best
+    return {
+        "mode": ELEMENT,
+        "index": element.index,
+        "tag": element.tag,
+        "count": count,
+        "html": new[element.content_start:element.content_end + delta],
+    }
+
+
+def _shifted_ranges(old: str, new: str, start: int, old_end: int, new_end: int):
+    """
+    The changed range, then the equivalent ones further left that start at a
+    tag (the innermost element spanning any of them is patched). The prefix
+    scan pushes an ambiguous change right: appending '<li>y</li>' before
+    '</ul>' shares the '<' of '</ul>', which puts the start past the end of
+    the list's content.
+    """
+    yield start, old_end, new_end
+    for _ in range(MAX_RANGE_SHIFT):
+        if not start or old[old_end - 1] != new[new_end - 1]:
+            return
+        start, old_end, new_end = start - 1, old_end - 1, new_end - 1
+        if new[start] == "<":
+            yield start, old_end, new_end
+
+
+def document_patch(new: str) -> dict:
+    return {"mode": DOCUMENT, "html": new}
+
+
+@lru_cache(maxsize=4) # Each text is scanned as the new one, then again as the old one
+def _body_elements(text: str) -> Tuple[int, Tuple[_Element, ...]]:
+    count, closed = _scan_body(text)
+    return count, tuple(closed)
+
+
+def scripts_changed(old: str, new: str) -> bool:
+    """Whether the <script> elements differ (morphing does not re-run scripts; a reload does)."""
+    return _SCRIPT.findall(old) != _SCRIPT.findall(new)
@@ -0,0 +1,146 @@
+# website_builder/utils/latency_metrics.py
+import json
+import time
+import logging
+import threading
+from typing import Dict, Optional
+
+from PyQt6.QtCore import QObject, QSettings, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# --- Metric names ---
+HIGHLIGHT_BLOCK = "highlight.block"                # One highlightBlock call
+KEYSTROKE_TO_PAINT = "editor.keystroke_to_paint"   # Key press until the editor starts repainting
+OPEN_READ = "open.read"                            # Reading a file's bytes (worker thread)
+OPEN_DECODE = "open.decode"                        # Decoding them to text (worker thread)
+OPEN_SET_TEXT = "open.set_plain_text"              # Putting the text into the document
+OPEN_FIRST_HIGHLIGHT = "open.first_highlight"      # Highlighting done while opening (or the first viewport)
+SAVE_WRITE = "save.write"                          # Encoding and writing a file (worker thread)
+SAVE_TOTAL = "save.total"                          # Save queued until its completion was handled
+
+HISTOGRAM_BUCKETS = 32 # Bucket b holds durations in [2^(b-1), 2^b) microseconds; the last one is open-ended
+
+
+class LatencyHistogram:
+    """
+    Fixed-size histogram of durations: power-of-two microsecond buckets plus
+    count, sum and max, so recording is O(1) and memory never grows.
+    Percentiles are estimated as the upper bound of the bucket they fall in.
+    """
+    __slots__ = ("counts", "count", "total_us", "max_us")
+
+    def __init__(self):
+        self.counts = [0] * HISTOGRAM_BUCKETS
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, elapsed_us: int):
+        self.counts[min(elapsed_us.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_us += elapsed_us
+        if elapsed_us > self.max_us:
+            self.max_us = elapsed_us
+
+    def mean_us(self) -> float:
+        return self.total_us / self.count if self.count else 0.0
+
+    def percentile_us(self, fraction: float) -> int:
+        if not self.count:
+            return 0
+        rank = fraction * self.count
+        seen = 0
+        for bucket, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                return min(1 << bucket, self.max_us)
+        return self.max_us
+
+    def copy(self) -> "LatencyHistogram":
+        clone = LatencyHistogram()
+        clone.counts = list(self.counts)
+        clone.count, clone.total_us, clone.max_us = self.count, self.total_us, self.max_us
+        return clone
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_us": round(self.mean_us(), 1),
+            "p50_us": self.percentile_us(0.50),
+            "p90_us": self.percentile_us(0.90),
+            "p99_us": self.percentile_us(0.99),
+            "max_us": self.max_us,
+            # Upper bound (us) of each non-empty bucket -> count
+            "buckets": {str(1 << b): n for b, n in enumerate(self.counts) if n},
+        }
+
+
+class LatencyMetrics(QObject):
+    """
+    Application-wide latency recorder (shared instance via instance()).
+
+    Instrumented code checks `enabled` before taking timestamps, so when
+    recording is off the cost is one attribute test. record() may be called
+    from worker threads.
+    """
+    enabled_changed = pyqtSignal(bool)
+
+    ENABLED_SETTING_KEY = "Debug/LatencyMetrics"
+
+    _instance: Optional["LatencyMetrics"] = None
+
+    @classmethod
+    def instance(cls) -> "LatencyMetrics":
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.enabled = QSettings().value(self.ENABLED_SETTING_KEY, False, type=bool)
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def set_enabled(self, enabled: bool):
+        if enabled == self.enabled:
+            return
+        self.enabled = enabled
+        QSettings().setValue(self.ENABLED_SETTING_KEY, enabled)
+        logger.info(f"Latency metrics {'enabled' if enabled else 'disabled'}.")
+        self.enabled_changed.emit(enabled)
+
+    def record(self, name: str, elapsed_ns: int):
+        """Adds one duration (from time.perf_counter_ns differences) to a metric."""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = LatencyHistogram()
+            histogram.record(elapsed_ns // 1000)
+
+    def record_since(self, name: str, started_ns: int):
+        self.record(name, time.perf_counter_ns() - started_ns)
+
+    def snapshot(self) -> Dict[str, LatencyHistogram]:
+        """A consistent copy of all histograms, by metric name."""
+        with self._lock:
+            return {name: histogram.copy() for name, histogram in self._histograms.items()}
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def to_json(self) -> str:
+        data = {
+            "enabled": self.enabled,
+            "metrics": {name: histogram.to_dict() for name, histogram in sorted(self.snapshot().items())},
+        }
+        return json.dumps(data, indent=2)
+
+    def dump(self, path: str):
+        """Writes all histograms to a JSON file."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+        logger.info(f"Latency metrics written to: {path}")
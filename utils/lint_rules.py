@@ -0,0 +1,368 @@
+# website_builder/utils/lint_rules.py
+"""
+Qt-free diagnostics for HTML, CSS and JavaScript source.
+
+The checks catch the mistakes that otherwise only show as a broken preview:
+HTML elements left open, closed twice or closed out of order, duplicate ids
+and attributes; CSS braces, comments and strings left open, declarations
+without a colon, value or separating semicolon; JavaScript brackets,
+strings, template literals, regular expressions and comments left open or
+closed by the wrong bracket. JavaScript is only tokenized, not parsed, so
+grammar errors beyond bracket structure are out of reach.
+
+Inline <style> and <script> bodies of HTML documents are checked as CSS/JS.
+Everything here is a plain function of the text, so it can run in worker
+processes (see utils.lint_service).
+"""
+import bisect
+import re
+from html.parser import HTMLParser
+from typing import Callable, List, NamedTuple, Tuple
+
+# --- Severities ---
+ERROR = "error"
+WARNING = "warning"
+
+MAX_DIAGNOSTICS = 200 # Per file; past this the file is broken enough
+
+Reporter = Callable[[int, int, str, str], None] # offset, length, severity, message
+
+
+class Diagnostic(NamedTuple):
+    line: int       # 0-based
+    column: int     # 0-based
+    length: int     # Characters to underline (at least 1)
+    severity: str   # ERROR or WARNING
+    message: str
+
+
+def lint_text(text: str, language: str) -> List[Diagnostic]:
+    """Diagnostics for a document in `language` ("html", "css" or "js"), sorted by position."""
+    linter = _LINTERS.get(language)
+    if linter is None:
+        return []
+    line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+    diagnostics = []
+
+    def report(offset: int, length: int, severity: str, message: str):
+        if len(diagnostics) < MAX_DIAGNOSTICS:
+            line = bisect.bisect_right(line_starts, offset) - 1
+            diagnostics.append(Diagnostic(line, offset - line_starts[line], max(1, length), severity, message))
+
+    linter(text, 0, report)
+    diagnostics.sort()
+    return diagnostics
+
+
+# --- HTML ---
+VOID_ELEMENTS = frozenset((
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+    "param", "source", "track", "wbr",
+))
+# Elements whose end tag may be left out (the parser closes them implicitly)
+OPTIONAL_END_ELEMENTS = frozenset((
+    "html", "head", "body", "p", "li", "dt", "dd", "option", "optgroup", "tr", "td",
+    "th", "thead", "tbody", "tfoot", "colgroup", "caption", "rb", "rt", "rp",
+))
+FOREIGN_ELEMENTS = frozenset(("svg", "math")) # Self-closing tags are fine inside these
+_SCRIPT_JS_TYPES = frozenset(("", "text/javascript", "module", "application/javascript"))
+
+
+class _HtmlChecker(HTMLParser):
+    def __init__(self, text: str, base: int, report: Reporter):
+        super().__init__(convert_charrefs=True)
+        self.text = text
+        self.base = base
+        self.report = report
+        self.line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+        self.stack: List[Tuple[str, int]] = [] # (tag, offset of its start tag)
+        self.ids = {}
+        self.foreign_depth = 0
+        self.embedded = None # (language, body offset) while inside <style>/<script>
+
+    def tag_offset(self) -> int:
+        line, column = self.getpos()
+        return self.line_starts[line - 1] + column
+
+    def handle_starttag(self, tag, attrs):
+        offset = self.tag_offset()
+        self._check_attributes(tag, attrs, offset)
+        if tag in VOID_ELEMENTS:
+            return
+        self.stack.append((tag, offset))
+        if tag in FOREIGN_ELEMENTS:
+            self.foreign_depth += 1
+        if tag == "style":
+            self.embedded = ("css", offset + len(self.get_starttag_text()))
+        elif tag == "script" and (dict(attrs).get("type") or "").lower() in _SCRIPT_JS_TYPES:
+            self.embedded = ("js", offset + len(self.get_starttag_text()))
+
+    def handle_startendtag(self, tag, attrs):
+        offset = self.tag_offset()
+        self._check_attributes(tag, attrs, offset)
+        if tag not in VOID_ELEMENTS and not self.foreign_depth:
+            self.report(self.base + offset, len(tag) + 1, WARNING,
+                        f"<{tag}/> does not close the element in HTML; it stays open until </{tag}>")
+            self.stack.append((tag, offset))
+
+    def handle_endtag(self, tag):
+        offset = self.tag_offset()
+        if self.embedded is not None and tag in ("style", "script"):
+            language, body_start = self.embedded
+            self.embedded = None
+            _LINTERS[language](self.text[body_start:offset], self.base + body_start, self.report)
+        if tag in VOID_ELEMENTS:
+            self.report(self.base + offset, len(tag) + 2, WARNING, f"<{tag}> is a void element and takes no end tag")
+            return
+        depth = next((i for i in range(len(self.stack) - 1, -1, -1) if self.stack[i][0] == tag), None)
+        if depth is None:
+            self.report(self.base + offset, len(tag) + 2, ERROR, f"Unexpected </{tag}>: no open <{tag}>")
+            return
+        for open_tag, open_offset in self.stack[depth + 1:]:
+            if open_tag not in OPTIONAL_END_ELEMENTS:
+                self.report(self.base + open_offset, len(open_tag) + 1, ERROR, f"<{open_tag}> is not closed before </{tag}>")
+        for open_tag, _ in self.stack[depth:]:
+            if open_tag in FOREIGN_ELEMENTS:
+                self.foreign_depth -= 1
+        del self.stack[depth:]
+
+    def _check_attributes(self, tag, attrs, offset):
+        seen = set()
+        for name, value in attrs:
+            if name in seen:
+                self.report(self.base + offset, len(tag) + 1, WARNING, f"Duplicate attribute '{name}' on <{tag}>")
+            seen.add(name)
+            if name == "id" and value:
+                if value in self.ids:
+                    self.report(self.base + offset, len(tag) + 1, WARNING,
+                                f"Duplicate id '{value}' (first used on line {self.ids[value] + 1})")
+                else:
+                    self.ids[value] = bisect.bisect_right(self.line_starts, offset) - 1
+
+    def finish(self):
+        self.close()
+        if self.embedded is not None: # <style>/<script> left open: its body runs to the end
+            language, body_start = self.embedded
+            _LINTERS[language](self.text[body_start:], self.base + body_start, self.report)
+        for tag, offset in self.stack:
+            if tag not in OPTIONAL_END_ELEMENTS:
+                self.report(self.base + offset, len(tag) + 1, WARNING, f"<{tag}> is never closed")
+
+
+def lint_html(text: str, base: int, report: Reporter):
+    comment = text.rfind("<!--")
+    if comment != -1 and text.find("-->", comment + 4) == -1:
+        report(base + comment, 4, ERROR, "Unclosed comment: the rest of the document is commented out")
+    checker = _HtmlChecker(text, base, report)
+    checker.feed(text)
+    checker.finish()
+
+
+# --- CSS ---
+_CSS_COMMENT = re.compile(r"/\*.*?(\*/|\Z)", re.DOTALL)
+_CSS_STRING = re.compile(r""""(?:\\.|[^"\\\n])*("|$)|'(?:\\.|[^'\\\n])*('|$)""", re.MULTILINE)
+# Unquoted url(): its body may hold ';' (data: URLs) and anything but quotes, parentheses and space
+_CSS_URL = re.compile(r"""(\burl\(\s*)([^"'()\s]+)(?=\s*\))""", re.IGNORECASE)
+_CSS_STRUCTURE = re.compile(r"[{};]")
+_CSS_PROPERTY_NAME = re.compile(r"(?:--|-?[A-Za-z_])[\w-]*|\*[\w-]+") # '*zoom' style hacks pass
+_CSS_MISSING_SEMICOLON = re.compile(r"\n\s*-?[A-Za-z_][\w-]*\s*:(?!:)")
+_CSS_HEX_COLOR = re.compile(r"(?<![\w(-])#([0-9A-Za-z]+)\b")
+
+
+def _blank(match) -> str:
+    """Replacement keeping line breaks (and so every later offset)."""
+    return re.sub(r"[^\n]", " ", match.group(0))
+
+
+def lint_css(text: str, base: int, report: Reporter):
+    def blank_comment(match):
+        if not match.group(1):
+            report(base + match.start(), 2, ERROR, "Unclosed comment")
+        return _blank(match)
+
+    def blank_string(match):
+        if not (match.group(1) or match.group(2)):
+            report(base + match.start(), len(match.group(0)), ERROR, "Unclosed string")
+        # Keep the quotes so an empty value is not mistaken for a missing one
+        return match.group(0)[0] + " " * (len(match.group(0)) - 1)
+
+    text = _CSS_COMMENT.sub(blank_comment, text)
+    text = _CSS_STRING.sub(blank_string, text)
+    text = _CSS_URL.sub(lambda match: match.group(1) + " " * len(match.group(2)), text)
+
+    open_braces = []
+    segment_start = 0
+    for match in _CSS_STRUCTURE.finditer(text):
+        char, position = match.group(0), match.start()
+        segment = text[segment_start:position]
+        if char == "{":
+            if not segment.strip():
+                report(base + position, 1, ERROR, "Missing selector before '{'")
+            open_braces.append(position)
+        elif open_braces:
+            if segment.strip() and not _is_nested_at_rule(segment):
+                _check_declaration(segment, base + segment_start, report)
+            if char == "}":
+                open_braces.pop()
+        elif char == "}":
+            report(base + position, 1, ERROR, "Unmatched '}'")
+        elif not segment.strip().startswith("@"):
+            report(base + position, 1, ERROR, "Unexpected ';' outside a rule")
+        segment_start = position + 1
+    for position in open_braces:
+        report(base + position, 1, ERROR, "Unclosed '{'")
+    rest = text[segment_start:]
+    if not open_braces and rest.strip():
+        report(base + segment_start + len(rest) - len(rest.lstrip()), len(rest.strip()), ERROR, "Expected '{' after selector")
+
+
+def _is_nested_at_rule(segment: str) -> bool:
+    return segment.lstrip().startswith("@") # e.g. @apply, @include inside a rule
+
+
+def _check_declaration(segment: str, offset: int, report: Reporter):
+    stripped = segment.lstrip()
+    offset += len(segment) - len(stripped)
+    stripped = stripped.rstrip()
+    name, colon, value = stripped.partition(":")
+    name = name.rstrip()
+    if not colon:
+        report(offset, len(stripped), ERROR, f"Expected ':' in declaration '{stripped.splitlines()[0]}'")
+        return
+    if not _CSS_PROPERTY_NAME.fullmatch(name):
+        report(offset, len(name), ERROR, f"Invalid property name '{name}'")
+    value_offset = offset + len(stripped) - len(value)
+    if not value.strip():
+        if not name.startswith("--"): # Custom properties may be empty
+            report(offset, len(name), ERROR, f"Missing value for '{name}'")
+        return
+    missing = _CSS_MISSING_SEMICOLON.search(value)
+    if missing:
+        line_end = value_offset + len(value[:missing.start()].rstrip())
+        report(line_end - 1, 1, ERROR, "Missing ';' between declarations")
+    if value.count("(") != value.count(")"):
+        report(value_offset, len(value.rstrip()), ERROR, "Unbalanced parentheses in value")
+    if not name.startswith("--"):
+        for color in _CSS_HEX_COLOR.finditer(value):
+            digits = color.group(1)
+            if len(digits) not in (3, 4, 6, 8) or not re.fullmatch(r"[0-9A-Fa-f]+", digits):
+                report(value_offset + color.start(), len(color.group(0)), WARNING, f"Invalid hex color '#{digits}'")
+
+
+# --- JavaScript ---
+_JS_TOKEN = re.compile(r"""
+    (?P<space>\s+)
+  | (?P<line_comment>//[^\n]*)
+  | (?P<block_comment>/\*(?:.*?\*/)?)
+  | (?P<string>"(?:\\.|[^"\\\n])*(?P<closed_dq>")?|'(?:\\.|[^'\\\n])*(?P<closed_sq>')?)
+  | (?P<template>`)
+  | (?P<word>[A-Za-z_$\u00a0-\uffff][\w$\u00a0-\uffff]*)
+  | (?P<number>\.?\d[\w.]*)
+  | (?P<bracket>[()\[\]{}])
+  | (?P<slash>/)
+  | (?P<punctuation>[^\s\w$"'`/()\[\]{}]+)
+""", re.VERBOSE | re.DOTALL)
+_JS_TEMPLATE_BODY = re.compile(r"(?:\\.|[^`\\$]|\$(?!\{))*", re.DOTALL)
+_JS_REGEX = re.compile(r"/(?:\\.|\[(?:\\.|[^\]\\\n])*\]|[^/\\\n\[])+/[A-Za-z]*")
+# After these words a '/' starts a regular expression, not a division
+_JS_REGEX_KEYWORDS = frozenset((
+    "return", "typeof", "instanceof", "in", "of", "new", "delete", "void", "throw",
+    "case", "do", "else", "yield", "await",
+))
+_JS_PAIRS = {")": "(", "]": "[", "}": "{"}
+
+
+def lint_js(text: str, base: int, report: Reporter):
+    stack: List[Tuple[str, int]] = [] # (opening bracket or "${", offset)
+    regex_allowed = True # Whether a '/' here would start a regular expression
+    position, length = 0, len(text)
+
+    def scan_template(start: int, opened_at: int) -> int:
+        """Scans template literal text from `start`; returns where code resumes."""
+        end = _JS_TEMPLATE_BODY.match(text, start).end()
+        if text.startswith("${", end):
+            stack.append(("${", end))
+            return end + 2
+        if end >= length:
+            report(base + opened_at, 1, ERROR, "Unterminated template literal")
+            return length
+        return end + 1 # Past the closing backtick
+
+    while position < length:
+        match = _JS_TOKEN.match(text, position)
+        if match is None: # Not expected: every character starts some token
+            position += 1
+            continue
+        kind, token = match.lastgroup, match.group(0)
+        if kind == "space" or kind == "line_comment":
+            position = match.end()
+            continue
+        if kind == "block_comment":
+            if not token.endswith("*/") or len(token) < 4:
+                report(base + position, 2, ERROR, "Unclosed comment")
+            position = match.end()
+            continue
+        if kind == "string":
+            if not (match.group("closed_dq") or match.group("closed_sq")):
+                report(base + position, len(token), ERROR, "Unterminated string")
+            regex_allowed = False
+        elif kind == "template":
+            position = scan_template(position + 1, position)
+            regex_allowed = False
+            continue
+        elif kind == "word":
+            regex_allowed = token in _JS_REGEX_KEYWORDS
+        elif kind == "number":
+            regex_allowed = False
+        elif kind == "slash":
+            if regex_allowed:
+                regex = _JS_REGEX.match(text, position)
+                if regex is None:
+                    report(base + position, 1, ERROR, "Unterminated regular expression")
+                    position = text.find("\n", position)
+                    position = length if position == -1 else position
+                    continue
+                position = regex.end()
+                regex_allowed = False
+                continue
+            regex_allowed = True
+        elif kind == "bracket":
+            if token in "([{":
+                stack.append((token, position))
+                regex_allowed = True
+            else:
+                if stack and stack[-1][0] == "${" and token == "}":
+                    stack.pop()
+                    position = scan_template(position + 1, position)
+                    regex_allowed = False
+                    continue
+                _close_bracket(stack, token, base + position, report)
+                regex_allowed = token == "}"
+        else: # Punctuation / operators
+            regex_allowed = not token.endswith(("++", "--")) and not token.endswith(".")
+        position = match.end()
+
+    for opening, offset in stack:
+        if opening == "${":
+            report(base + offset, 2, ERROR, "Unclosed '${' in template literal")
+        else:
+            report(base + offset, 1, ERROR, f"Unclosed '{opening}'")
+
+
+def _close_bracket(stack, token: str, offset: int, report: Reporter):
+    opening = _JS_PAIRS[token]
+    if stack and stack[-1][0] == opening:
+        stack.pop()
+        return
+    depth = next((i for i in range(len(stack) - 1, -1, -1) if stack[i][0] == opening), None)
+    if depth is None:
+        report(offset, 1, ERROR, f"Unexpected '{token}'")
+        return
+    # The brackets opened since are missing their closing counterparts
+    for unclosed, unclosed_offset in stack[depth + 1:]:
+        if unclosed != "${":
+            report(unclosed_offset, 1, ERROR, f"'{unclosed}' is not closed before '{token}'")
+    del stack[depth:]
+
+
+_LINTERS = {"html": lint_html, "css": lint_css, "js": lint_js}
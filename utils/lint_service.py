@@ -0,0 +1,129 @@
+# website_builder/utils/lint_service.py
+import hashlib
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, NamedTuple, Optional
+
+from PyQt6.QtCore import QCoreApplication, QObject, pyqtSignal
+
+from .lint_rules import lint_text
+from .symbol_extractor import language_for_path
+
+logger = logging.getLogger(__name__)
+
+LINT_MAX_CHARS = 2 * 1024 * 1024 # Bigger texts are not linted
+
+
+def content_key(text: str, language: str) -> str:
+    """Cache key of a text's diagnostics: its language and a hash of its content."""
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+    return f"{language}:{digest}"
+
+
+class _LintJob(NamedTuple):
+    file_path: str
+    key: str
+    future: Future
+
+
+class LintService(QObject):
+    """
+    Lints file contents (see utils.lint_rules) in a pool of worker processes,
+    so linting never competes with the GUI thread for the interpreter.
+
+    Results are cached by content hash: text that was linted before (an
+    unchanged file, an undo back to an earlier state, the same text in
+    another file) is answered from the cache without a job. A newer text for a
+    file supersedes its pending job, which is cancelled if it has not started
+    and ignored otherwise.
+    """
+    diagnostics_ready = pyqtSignal(str, object) # file_path, [Diagnostic] (sorted by position)
+    _job_done = pyqtSignal(object) # _LintJob; emitted from the executor's callback thread
+
+    MAX_WORKERS = 2
+    CACHE_ENTRIES = 512
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict() # content key -> diagnostics, least recently used first
+        self._jobs: Dict[str, _LintJob] = {} # file_path -> its latest pending job
+        self._job_done.connect(self._on_job_done)
+        app = QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.shutdown)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # "spawn" everywhere: forking a process that runs Qt threads is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.MAX_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def lint(self, file_path: str, text: str):
+        """Lints a file's (possibly unsaved) text; diagnostics_ready follows, right away if cached."""
+        language = language_for_path(file_path)
+        if language is None or len(text) > LINT_MAX_CHARS:
+            self.forget(file_path)
+            self.diagnostics_ready.emit(file_path, [])
+            return
+        key = content_key(text, language)
+        job = self._jobs.get(file_path)
+        if job is not None:
+            if job.key == key:
+                return # Already being linted
+            del self._jobs[file_path]
+            job.future.cancel() # Superseded (a running job just finishes unheard)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            self.diagnostics_ready.emit(file_path, list(cached))
+            return
+        try:
+            future = self._pool().submit(lint_text, text, language)
+        except (BrokenProcessPool, RuntimeError) as e:
+            logger.error(f"Lint workers unavailable, restarting them: {e}")
+            self._executor = None
+            future = self._pool().submit(lint_text, text, language)
+        job = _LintJob(file_path, key, future)
+        self._jobs[file_path] = job
+        future.add_done_callback(lambda f, job=job: self._job_done.emit(job))
+
+    def forget(self, file_path: str):
+        """Drops a file's pending job (e.g. its tab was closed)."""
+        job = self._jobs.pop(file_path, None)
+        if job is not None:
+            job.future.cancel()
+
+    def _on_job_done(self, job: _LintJob):
+        if job.future.cancelled():
+            return
+        try:
+            diagnostics = tuple(job.future.result())
+        except BrokenProcessPool as e:
+            logger.error(f"Lint worker died: {e}")
+            self._executor = None
+            if self._jobs.get(job.file_path) is job:
+                del self._jobs[job.file_path]
+            return
+        except Exception as e:
+            logger.error(f"Linting {job.file_path} failed: {e}", exc_info=True)
+            diagnostics = () # Cached too: the same text would fail the same way
+        self._cache[job.key] = diagnostics
+        if len(self._cache) > self.CACHE_ENTRIES:
+            self._cache.popitem(last=False)
+        if self._jobs.get(job.file_path) is not job:
+            return # Superseded while running; its result is still good for the cache
+        del self._jobs[job.file_path]
+        self.diagnostics_ready.emit(job.file_path, list(diagnostics))
+
+    def shutdown(self):
+        """Stops the worker processes (pending jobs are dropped)."""
+        self._jobs.clear()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -0,0 +1,172 @@
+# website_builder/utils/overlay_scheme.py
+"""
+The flexta: URL scheme the preview loads project pages through.
+
+flexta://project/<path> serves <project root>/<path> from an overlay of the
+editor over the disk: a file with unsaved edits is served from its editor
+buffer (no disk I/O, no save needed to see a change), any other file from
+disk through an in-process cache. Paths resolve like on a web server rooted
+at the project, so '/'-absolute references work as they do when deployed.
+
+The scheme must be registered (register_overlay_scheme) before the
+QApplication is created.
+"""
+import os
+import logging
+import mimetypes
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from PyQt6.QtCore import QBuffer, QByteArray, QUrl
+from PyQt6.QtWebEngineCore import QWebEngineUrlRequestJob, QWebEngineUrlScheme, QWebEngineUrlSchemeHandler
+
+from .page_dependencies import normalized_path
+
+logger = logging.getLogger(__name__)
+
+SCHEME = "flexta"
+HOST = "project"
+INDEX_FILE = "index.html"
+
+# Set here rather than guessed: the platform's table can be wrong (a .js
+# registered as text/plain on Windows stops module scripts from loading)
+_CONTENT_TYPES = {
+    ".html": "text/html", ".htm": "text/html", ".css": "text/css",
+    ".js": "text/javascript", ".mjs": "text/javascript", ".json": "application/json",
+    ".svg": "image/svg+xml", ".wasm": "application/wasm", ".webp": "image/webp",
+    ".woff": "font/woff", ".woff2": "font/woff2", ".ttf": "font/ttf", ".otf": "font/otf",
+}
+
+
+def register_overlay_scheme():
+    """Registers the scheme with Qt WebEngine (before the QApplication is created)."""
+    scheme = QWebEngineUrlScheme(SCHEME.encode())
+    scheme.setSyntax(QWebEngineUrlScheme.Syntax.Host)
+    flags = (QWebEngineUrlScheme.Flag.SecureScheme | QWebEngineUrlScheme.Flag.CorsEnabled
+             | QWebEngineUrlScheme.Flag.LocalAccessAllowed)
+    fetch_allowed = getattr(QWebEngineUrlScheme.Flag, "FetchApiAllowed", None) # Qt 6.6+
+    if fetch_allowed is not None:
+        flags |= fetch_allowed
+    scheme.setFlags(flags)
+    QWebEngineUrlScheme.registerScheme(scheme)
+
+
+def content_type(path: str) -> str:
+    extension = os.path.splitext(path)[1].lower()
+    return _CONTENT_TYPES.get(extension) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+class OverlayFile(NamedTuple):
+    data: bytes
+    from_buffer: bool # Unsaved editor text (encoded as UTF-8)
+
+
+class OverlayFileSystem:
+    """
+    Project files as the preview sees them: an open file's unsaved text where
+    there is one, the disk otherwise. Disk reads are cached (least recently
+    used first out), validated against the file's size and modification time.
+    """
+    CACHE_BYTES = 64 * 1024 * 1024
+    MAX_CACHED_FILE_BYTES = 8 * 1024 * 1024 # Bigger files are read every time
+
+    def __init__(self):
+        self.root: Optional[str] = None
+        # file_path -> the editor's text of the file if it has unsaved edits, else None (set by the controller)
+        self.buffer_source: Optional[Callable[[str], Optional[str]]] = None
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict() # normalized path -> (mtime_ns, size, data)
+        self._cache_bytes = 0
+
+    def set_root(self, root: Optional[str]):
+        self.root = os.path.normpath(root) if root else None
+        self.clear_cache()
+
+    def clear_cache(self):
+        self._cache.clear()
+        self._cache_bytes = 0
+
+    def url_for_path(self, path: str) -> Optional[QUrl]:
+        """The scheme URL of a file in the project (None if it is outside)."""
+        if not self.root:
+            return None
+        try:
+            relative = os.path.relpath(path, self.root)
+        except ValueError: # Different drive on Windows
+            return None
+        if relative == os.pardir or relative.startswith(os.pardir + os.sep):
+            return None
+        url = QUrl()
+        url.setScheme(SCHEME)
+        url.setHost(HOST)
+        url.setPath("/" + ("" if relative == os.curdir else relative.replace(os.sep, "/")), QUrl.ParsingMode.DecodedMode)
+        return url
+
+    def path_for_url(self, url: QUrl) -> Optional[str]:
+        """The project file a scheme URL refers to (None if it is not one, or escapes the root)."""
+        if url.scheme() != SCHEME or url.host() != HOST or not self.root:
+            return None
+        relative = url.path(QUrl.ComponentFormattingOption.FullyDecoded).lstrip("/")
+        path = os.path.normpath(os.path.join(self.root, *relative.split("/")))
+        if path != self.root and not path.startswith(os.path.join(self.root, "")):
+            return None
+        return path
+
+    def read(self, path: str) -> Optional[OverlayFile]:
+        """A file's current content (None if it does not exist or cannot be read)."""
+        if self.buffer_source is not None:
+            text = self.buffer_source(path)
+            if text is not None:
+                return OverlayFile(text.encode("utf-8", "surrogatepass"), True)
+        key = normalized_path(path)
+        try:
+            stat = os.stat(path)
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+                self._cache.move_to_end(key)
+                return OverlayFile(cached[2], False)
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self._drop(key)
+            return None
+        self._drop(key)
+        if len(data) <= self.MAX_CACHED_FILE_BYTES:
+            self._cache[key] = (stat.st_mtime_ns, stat.st_size, data)
+            self._cache_bytes += len(data)
+            while self._cache_bytes > self.CACHE_BYTES:
+                _, (_, _, evicted) = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+        return OverlayFile(data, False)
+
+    def _drop(self, key: str):
+        cached = self._cache.pop(key, None)
+        if cached is not None:
+            self._cache_bytes -= len(cached[2])
+
+
+class OverlaySchemeHandler(QWebEngineUrlSchemeHandler):
+    """Answers the preview's flexta: requests from an OverlayFileSystem."""
+    def __init__(self, overlay: OverlayFileSystem, parent=None):
+        super().__init__(parent)
+        self.overlay = overlay
+
+    def requestStarted(self, job: QWebEngineUrlRequestJob):
+        if bytes(job.requestMethod()) not in (b"GET", b"HEAD"):
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        path = self.overlay.path_for_url(job.requestUrl())
+        if path is None:
+            job.fail(QWebEngineUrlRequestJob.Error.RequestDenied)
+            return
+        if os.path.isdir(path):
+            path = os.path.join(path, INDEX_FILE)
+        file = self.overlay.read(path)
+        if file is None:
+            job.fail(QWebEngineUrlRequestJob.Error.UrlNotFound)
+            return
+        mime = content_type(path)
+        if file.from_buffer and mime.startswith("text/"):
+            mime += ";charset=utf-8" # Takes precedence over a <meta charset> of the file
+        buffer = QBuffer(job) # Freed with the job
+        buffer.setData(QByteArray(file.data))
+        job.reply(mime.encode(), buffer)
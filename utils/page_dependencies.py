@@ -0,0 +1,180 @@
+# website_builder/utils/page_dependencies.py
+"""
+Static discovery of the local files an HTML page loads: stylesheets,
+scripts (and their static ES module imports), images, media, fonts and
+other url()s of its CSS (followed through @import), and iframes (followed
+recursively). Navigation links (<a href>) are not dependencies.
+
+References are resolved like a browser resolves them for a page served
+from the project root: relative to the referencing file, or to the root for
+'/'-absolute paths. URLs with a scheme (http:, data:, ...) are skipped.
+Missing files are still listed, so creating one counts as a change.
+"""
+import os
+import re
+import logging
+from html.parser import HTMLParser
+from typing import Iterable, List, Optional, Set
+from urllib.parse import unquote, urlsplit
+from urllib.request import url2pathname
+
+from PyQt6.QtCore import QObject, QRunnable, pyqtSignal
+
+from .file_loader import decode_text
+
+logger = logging.getLogger(__name__)
+
+DEPENDENCY_MAX_FILE_BYTES = 4 * 1024 * 1024 # Bigger files are listed but not scanned for references
+MAX_SCANNED_FILES = 500 # Per page, against pathological reference graphs
+
+HTML_EXTENSIONS = (".html", ".htm")
+CSS_EXTENSIONS = (".css",)
+JS_EXTENSIONS = (".js", ".mjs")
+
+_SRC_ATTRIBUTES = frozenset(("src", "poster", "data"))
+_HREF_TAGS = frozenset(("link", "use", "image")) # <a href> is navigation, not a dependency
+_SRCSET_ATTRIBUTES = frozenset(("srcset", "imagesrcset"))
+_CSS_URL = re.compile(r"""url\(\s*(?:"([^"]*)"|'([^']*)'|([^)'"\s]+))\s*\)""", re.IGNORECASE)
+_CSS_IMPORT = re.compile(r"""@import\s+(?:"([^"]*)"|'([^']*)')""", re.IGNORECASE)
+_CSS_COMMENT = re.compile(r"/\*.*?(?:\*/|\Z)", re.DOTALL)
+_JS_IMPORT = re.compile(
+    r"""(?:\bimport\s*(?:[\w$*{}\s,]+\s*from\s*)?|\bexport\s*[\w$*{}\s,]+\s*from\s*|\bimport\s*\(\s*)(["'])([^"'\n]+)\1"""
+)
+
+
+def normalized_path(path: str) -> str:
+    """The form dependency sets hold paths in (normalized, case-folded where the filesystem is)."""
+    return os.path.normcase(os.path.normpath(path))
+
+
+def resolve_reference(reference: str, referrer: str, root: str) -> Optional[str]:
+    """The local file a reference in `referrer` points at, or None (remote, data:, fragment only...)."""
+    reference = reference.strip()
+    if not reference or reference.startswith(("#", "//")):
+        return None
+    parts = urlsplit(reference)
+    if len(parts.scheme) > 1: # A one-letter "scheme" is a Windows drive
+        return os.path.normpath(url2pathname(parts.path)) if parts.scheme == "file" else None
+    if parts.scheme:
+        return os.path.normpath(unquote(reference))
+    path = unquote(parts.path)
+    if not path:
+        return None
+    if path.startswith("/"):
+        return os.path.normpath(os.path.join(root, path.lstrip("/")))
+    return os.path.normpath(os.path.join(os.path.dirname(referrer), path))
+
+
+def css_references(text: str) -> List[str]:
+    text = _CSS_COMMENT.sub("", text)
+    references = [next(group for group in match.groups() if group is not None) for match in _CSS_URL.finditer(text)]
+    references.extend(match.group(1) or match.group(2) for match in _CSS_IMPORT.finditer(text))
+    return references
+
+
+def js_references(text: str) -> List[str]:
+    return [match.group(2) for match in _JS_IMPORT.finditer(text) if match.group(2).startswith((".", "/"))]
+
+
+class _HtmlReferences(HTMLParser):
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.references: List[str] = []
+        self.in_style = False
+
+    def handle_starttag(self, tag, attrs):
+        for name, value in attrs:
+            if not value:
+                continue
+            if name in _SRC_ATTRIBUTES or (name in ("href", "xlink:href") and tag in _HREF_TAGS):
+                self.references.append(value)
+            elif name in _SRCSET_ATTRIBUTES:
+                self.references.extend(candidate.split()[0] for candidate in value.split(",") if candidate.strip())
+            elif name == "style":
+                self.references.extend(css_references(value))
+        self.in_style = tag == "style"
+
+    def handle_endtag(self, tag):
+        self.in_style = False
+
+    def handle_data(self, data):
+        if self.in_style:
+            self.references.extend(css_references(data))
+
+
+def html_references(text: str) -> List[str]:
+    parser = _HtmlReferences()
+    parser.feed(text)
+    parser.close()
+    return parser.references
+
+
+def _read_text(file_path: str) -> Optional[str]:
+    try:
+        if os.path.getsize(file_path) > DEPENDENCY_MAX_FILE_BYTES:
+            return None
+        with open(file_path, "rb") as f:
+            return decode_text(f.read())[0]
+    except OSError:
+        return None
+
+
+def collect_dependencies(page_path: str, root: str) -> Set[str]:
+    """Every local file `page_path` loads, directly or indirectly (normalized_path form, the page included)."""
+    dependencies = {normalized_path(page_path)}
+    queue = [os.path.normpath(page_path)]
+    scanned = 0
+    while queue and scanned < MAX_SCANNED_FILES:
+        file_path = queue.pop()
+        extension = os.path.splitext(file_path)[1].lower()
+        if extension in HTML_EXTENSIONS:
+            extract = html_references
+        elif extension in CSS_EXTENSIONS:
+            extract = css_references
+        elif extension in JS_EXTENSIONS:
+            extract = js_references
+        else:
+            continue
+        text = _read_text(file_path)
+        scanned += 1
+        if text is None:
+            continue
+        for reference in extract(text):
+            resolved = resolve_reference(reference, file_path, root)
+            if resolved is None:
+                continue
+            key = normalized_path(resolved)
+            if key not in dependencies:
+                dependencies.add(key)
+                queue.append(resolved)
+    return dependencies
+
+
+def affects(dependencies: Iterable[str], path: str, is_dir: bool = False) -> bool:
+    """Whether a change of `path` (a file, or a whole directory) touches any of `dependencies`."""
+    key = normalized_path(path)
+    if not is_dir:
+        return key in dependencies
+    prefix = os.path.join(key, "")
+    return any(dependency.startswith(prefix) for dependency in dependencies)
+
+
+class DependencyScanSignals(QObject):
+    finished = pyqtSignal(int, object) # generation, set of normalized dependency paths
+
+
+class DependencyScanTask(QRunnable):
+    def __init__(self, generation: int, page_path: str, root: str):
+        super().__init__()
+        self.generation = generation
+        self.page_path = page_path
+        self.root = root
+        self.signals = DependencyScanSignals()
+
+    def run(self):
+        try:
+            dependencies = collect_dependencies(self.page_path, self.root)
+        except Exception as e:
+            logger.error(f"Scanning the dependencies of {self.page_path} failed: {e}", exc_info=True)
+            dependencies = None
+        self.signals.finished.emit(self.generation, dependencies)
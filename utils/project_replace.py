@@ -0,0 +1,265 @@
+# website_builder/utils/project_replace.py
+import os
+import re
+import time
+import bisect
+import logging
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .file_loader import decode_text
+from .file_saver import DEFAULT_FSYNC_POLICY, FSYNC_FULL, discard_temp, fsync_directory, temp_path_for, write_temp
+from .trigram_index import SEARCH_MAX_FILE_BYTES, is_binary
+
+logger = logging.getLogger(__name__)
+
+
+class PreparedReplacement(NamedTuple):
+    file_path: str
+    temp_path: str   # Holds the new content until the commit renames it over target
+    target: str      # file_path with symlinks resolved
+    count: int       # Replacements made in the file
+
+
+class ReplaceResult(NamedTuple):
+    changed: List[str]                # Files whose new content is on disk
+    replacements: int                 # Replacements made in those files
+    errors: List[Tuple[str, str]]     # (file_path, message)
+    committed: bool                   # False: nothing was written (failure or cancel)
+
+
+def replace_in_text(text: str, pattern, replace: Callable) -> Tuple[str, int]:
+    """Returns (new_text, number of replacements)."""
+    return pattern.subn(replace, text)
+
+
+def replace_keeping_line_endings(raw_text: str, pattern, replace: Callable) -> Tuple[str, int]:
+    """
+    Replaces in a file's text (original line endings) where search and its
+    preview match: in the text with normalized line endings, so that '$'
+    and '\n' in the pattern behave the same. Line endings outside the
+    matches are kept; line breaks in replacements take the file's first one.
+    """
+    if "\r" not in raw_text:
+        return replace_in_text(raw_text, pattern, replace)
+    text = raw_text.replace("\r\n", "\n").replace("\r", "\n")
+    newline = re.search(r"\r\n?|\n", raw_text).group()
+    breaks, shifts, shift = [], [], 0 # Normalized offset of each line break, raw chars added up to it
+    for match in re.finditer(r"\r\n|\r|\n", raw_text):
+        breaks.append(match.start() - shift)
+        shift += len(match.group()) - 1
+        shifts.append(shift)
+
+    def raw_offset(offset: int) -> int:
+        index = bisect.bisect_left(breaks, offset) # Line breaks before offset
+        return offset + (shifts[index - 1] if index else 0)
+
+    pieces, last, count = [], 0, 0
+    for match in pattern.finditer(text):
+        pieces.append(raw_text[raw_offset(last):raw_offset(match.start())])
+        pieces.append(replace(match).replace("\n", newline))
+        last = match.end()
+        count += 1
+    if not count:
+        return raw_text, 0
+    pieces.append(raw_text[raw_offset(last):])
+    return "".join(pieces), count
+
+
+def prepare_replacement(file_path: str, pattern, replace: Callable, fsync_policy: str) -> Optional[PreparedReplacement]:
+    """
+    Replaces in one file's content and writes the result to a temp file next
+    to it; returns None if nothing matched (or the file is binary or too big
+    to be searched). The file's encoding and line endings are kept: only the
+    matched text changes.
+    """
+    if os.path.getsize(file_path) > SEARCH_MAX_FILE_BYTES:
+        return None # Not searched either
+    with open(file_path, "rb") as f:
+        data = f.read()
+    if is_binary(data):
+        return None
+    _text, encoding = decode_text(data)
+    text = data.decode(encoding) # Undo decode_text's line ending normalization
+    new_text, count = replace_keeping_line_endings(text, pattern, replace)
+    if not count:
+        return None
+    temp_path = temp_path_for(file_path)
+    target = write_temp(file_path, new_text.encode(encoding), temp_path, fsync_policy)
+    return PreparedReplacement(file_path, temp_path, target, count)
+
+
+class ReplaceSignals(QObject):
+    prepared = pyqtSignal(int, list, list)  # job_id, [PreparedReplacement], [(file_path, message)]
+    committed = pyqtSignal(int, list, list) # job_id, [file_path renamed into place], [(file_path, message)]
+
+
+class PrepareReplaceTask(QRunnable):
+    """Writes the replaced content of a batch of files to temp files."""
+    def __init__(self, replacer: "ProjectReplacer", job_id: int, files: List[str], pattern, replace: Callable,
+                 fsync_policy: str):
+        super().__init__()
+        self.replacer = replacer
+        self.job_id = job_id
+        self.files = files
+        self.pattern = pattern
+        self.replace = replace
+        self.fsync_policy = fsync_policy
+        self.signals = ReplaceSignals()
+
+    def run(self):
+        prepared, errors = [], []
+        for file_path in self.files:
+            if self.job_id != self.replacer.job_id:
+                break # Cancelled
+            try:
+                result = prepare_replacement(file_path, self.pattern, self.replace, self.fsync_policy)
+                if result is not None:
+                    prepared.append(result)
+            except (OSError, UnicodeError) as e:
+                errors.append((file_path, str(e)))
+            except Exception as e:
+                logger.error(f"Replacing in {file_path} failed: {e}", exc_info=True)
+                errors.append((file_path, str(e)))
+        self.signals.prepared.emit(self.job_id, prepared, errors)
+
+
+class CommitReplaceTask(QRunnable):
+    """
+    Renames every prepared temp file over its target, or (with `discard`)
+    removes them all. Stops at the first failed rename, discarding the rest.
+    """
+    def __init__(self, job_id: int, prepared: List[PreparedReplacement], fsync_policy: str, discard: bool = False):
+        super().__init__()
+        self.job_id = job_id
+        self.prepared = prepared
+        self.fsync_policy = fsync_policy
+        self.discard = discard
+        self.signals = ReplaceSignals()
+
+    def run(self):
+        renamed, errors = [], []
+        failed = self.discard
+        directories = set()
+        for item in self.prepared:
+            if failed:
+                discard_temp(item.temp_path)
+                continue
+            try:
+                os.replace(item.temp_path, item.target)
+                renamed.append(item.file_path)
+                directories.add(os.path.dirname(item.target))
+            except OSError as e:
+                errors.append((item.file_path, str(e)))
+                discard_temp(item.temp_path)
+                failed = True
+        if self.fsync_policy == FSYNC_FULL:
+            for directory in directories:
+                try:
+                    fsync_directory(directory)
+                except OSError as e:
+                    logger.warning(f"Could not fsync {directory}: {e}")
+        self.signals.committed.emit(self.job_id, renamed, errors)
+
+
+class ProjectReplacer(QObject):
+    """
+    Replace in files, all or nothing: every file's new content is first
+    written to a temp file (in parallel, on a worker pool); only when all of
+    them succeeded are the temp files renamed into place. Any failure, or a
+    cancel, removes the temp files and leaves every file untouched.
+    """
+    progress = pyqtSignal(int, int)  # files processed, total
+    finished = pyqtSignal(object)    # ReplaceResult
+
+    BATCH_FILES = 50
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(QThreadPool.globalInstance().maxThreadCount(), 4)))
+        self.job_id = 0
+        self._job: Optional[Dict] = None
+        self._tasks = set() # Keep running tasks (and their signals) alive
+
+    def is_running(self) -> bool:
+        return self._job is not None
+
+    def replace(self, files: List[str], pattern, replace: Callable, fsync_policy: str = DEFAULT_FSYNC_POLICY) -> int:
+        """Starts replacing in `files`; the outcome arrives through finished. Returns the job id."""
+        self.cancel()
+        self.job_id += 1
+        files = sorted(set(files))
+        self._job = {
+            "id": self.job_id, "total": len(files), "done": 0, "prepared": [], "errors": [],
+            "fsync_policy": fsync_policy, "started": time.perf_counter(), "batches": 0,
+        }
+        if not files:
+            self._finish(ReplaceResult([], 0, [], True), self._job)
+            return self.job_id
+        for start in range(0, len(files), self.BATCH_FILES):
+            batch = files[start:start + self.BATCH_FILES]
+            task = PrepareReplaceTask(self, self.job_id, batch, pattern, replace, fsync_policy)
+            task.signals.prepared.connect(
+                lambda job_id, prepared, errors, task=task, n=len(batch): self._on_prepared(task, job_id, n, prepared, errors)
+            )
+            self._job["batches"] += 1
+            self._tasks.add(task)
+            self.pool.start(task)
+        return self.job_id
+
+    def cancel(self):
+        """Abandons the running job (before its commit), removing what it prepared; reported as not committed."""
+        if self._job is None or self._job.get("committing"):
+            return # Renames already under way are not interrupted
+        job = self._job
+        self._job = None
+        self.job_id += 1 # Batches still running stop and report back as stale
+        job["cancelled"] = True
+        self._run_commit(job, discard=True)
+        self.finished.emit(ReplaceResult([], 0, [], False))
+
+    def _on_prepared(self, task: PrepareReplaceTask, job_id: int, file_count: int, prepared: list, errors: list):
+        self._tasks.discard(task)
+        job = self._job
+        if job is None or job_id != job["id"]:
+            # Cancelled meanwhile: drop whatever this batch still wrote
+            self._start_commit_task(job_id, prepared, DEFAULT_FSYNC_POLICY, discard=True)
+            return
+        job["prepared"].extend(prepared)
+        job["errors"].extend(errors)
+        job["done"] += file_count
+        job["batches"] -= 1
+        self.progress.emit(job["done"], job["total"])
+        if job["batches"]:
+            return
+        job["committing"] = True
+        self._run_commit(job, discard=bool(job["errors"]))
+
+    def _run_commit(self, job: Dict, discard: bool):
+        task = self._start_commit_task(job["id"], job["prepared"], job["fsync_policy"], discard)
+        task.signals.committed.connect(lambda job_id, renamed, errors, job=job: self._on_committed(job, discard, renamed, errors))
+
+    def _start_commit_task(self, job_id: int, prepared: list, fsync_policy: str, discard: bool) -> CommitReplaceTask:
+        task = CommitReplaceTask(job_id, prepared, fsync_policy, discard)
+        task.signals.committed.connect(lambda *args, task=task: self._tasks.discard(task))
+        self._tasks.add(task)
+        self.pool.start(task)
+        return task
+
+    def _on_committed(self, job: Dict, discarded: bool, renamed: list, errors: list):
+        if job.get("cancelled"):
+            return
+        counts = {item.file_path: item.count for item in job["prepared"]}
+        result = ReplaceResult(renamed, sum(counts[fp] for fp in renamed), job["errors"] + errors, not discarded and not errors)
+        logger.info(
+            f"Replace in files: {len(renamed)} files changed ({result.replacements} replacements), "
+            f"{len(result.errors)} errors, {time.perf_counter() - job['started']:.2f}s"
+        )
+        self._finish(result, job)
+
+    def _finish(self, result: ReplaceResult, job: Optional[Dict] = None):
+        if self._job is job:
+            self._job = None
+        self.finished.emit(result)
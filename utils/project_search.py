@@ -0,0 +1,438 @@
+# website_builder/utils/project_search.py
+import os
+import re
+import bisect
+import time
+import logging
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from .fs_events import DELETED, IGNORED_DIRECTORIES, RESCAN, FileSystemEventService
+from .trigram_index import (TrigramIndex, load_index, query_plan, read_searchable_text,
+                            save_index, trigrams_of)
+
+logger = logging.getLogger(__name__)
+
+# Never worth reading to find out they are not text
+BINARY_EXTENSIONS = frozenset({
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico", ".bmp", ".tif", ".tiff", ".avif",
+    ".woff", ".woff2", ".ttf", ".otf", ".eot",
+    ".zip", ".gz", ".tgz", ".bz2", ".xz", ".7z", ".rar",
+    ".pdf", ".mp3", ".mp4", ".webm", ".ogg", ".wav", ".mov", ".avi",
+    ".exe", ".dll", ".so", ".dylib", ".pyc", ".class", ".jar", ".wasm",
+})
+
+MAX_MATCHES_PER_FILE = 1000
+MAX_MATCHES = 20000
+MAX_LINE_TEXT = 300 # Longer (e.g. minified) lines are cut around the match
+
+
+class SearchMatch(NamedTuple):
+    file_path: str
+    line: int       # 0-based
+    column: int     # 0-based, in characters
+    length: int
+    line_text: str  # The matched line (shortened if very long); column is relative to the full line
+    preview: Optional[str] = None # line_text with the match replaced (when previewing a replacement)
+
+
+def walk_text_files(root: str) -> Iterable[str]:
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRECTORIES and not d.startswith(".")]
+        for filename in filenames:
+            if os.path.splitext(filename)[1].lower() not in BINARY_EXTENSIONS:
+                yield os.path.join(directory, filename)
+
+
+def compile_query(query: str, regex: bool, case_sensitive: bool) -> "re.Pattern":
+    """Compiles a find-in-files query; raises re.error for an invalid regular expression."""
+    flags = re.MULTILINE | (0 if case_sensitive else re.IGNORECASE)
+    return re.compile(query if regex else re.escape(query), flags)
+
+
+def replacement_function(pattern: "re.Pattern", replacement: str, regex: bool) -> Callable[["re.Match"], str]:
+    """
+    Returns match -> replacement text. For regular expressions the replacement
+    may refer to groups (\\1, \\g<name>); raises re.error if it is invalid.
+    """
+    if not regex:
+        return lambda match: replacement
+    try:
+        pattern.sub(replacement, "") # Parses (and so validates) the template
+    except IndexError as e: # Unknown group name
+        raise re.error(str(e))
+    return lambda match: match.expand(replacement)
+
+
+def search_text(file_path: str, text: str, pattern: "re.Pattern", limit: int = MAX_MATCHES_PER_FILE,
+                replace: Optional[Callable[["re.Match"], str]] = None) -> List[SearchMatch]:
+    """All (up to `limit`) non-empty matches of a pattern in one file's text, with previews if `replace` is given."""
+    matches = []
+    line_starts = None
+    for match in pattern.finditer(text):
+        start, end = match.span()
+        if start == end:
+            continue
+        if line_starts is None:
+            line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+        line = bisect.bisect_right(line_starts, start) - 1
+        line_start = line_starts[line]
+        line_end = text.find("\n", start)
+        if line_end == -1:
+            line_end = len(text)
+        column = start - line_start
+        if line_end - line_start > MAX_LINE_TEXT:
+            shown_start = max(line_start, start - MAX_LINE_TEXT // 3)
+            line_text = text[shown_start:min(line_end, shown_start + MAX_LINE_TEXT)]
+        else:
+            shown_start = line_start
+            line_text = text[line_start:line_end]
+        preview = None
+        if replace is not None:
+            # A match running past the end of the line is previewed up to the line end
+            preview = line_text[:start - shown_start] + replace(match) + line_text[end - shown_start:]
+        matches.append(SearchMatch(file_path, line, column, end - start, line_text, preview))
+        if len(matches) >= limit:
+            break
+    return matches
+
+
+def _stamp(st) -> tuple:
+    return (st.st_mtime_ns, st.st_size)
+
+
+def index_text_file(index: TrigramIndex, file_path: str):
+    """(Re)indexes one file from disk; binary, oversized and vanished files end up with no trigrams or no entry."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        index.remove_file(file_path)
+        return
+    text = read_searchable_text(file_path)
+    # Binary and oversized files are kept (without trigrams) so their stamp saves re-reading them
+    index.update_file(file_path, _stamp(st), trigrams_of(text) if text is not None else ())
+
+
+class IndexSignals(QObject):
+    scanned = pyqtSignal(int, list, list) # generation, [stale file_path], [vanished file_path]
+    indexed = pyqtSignal(int)             # generation (a batch of files was indexed)
+
+
+class ScanTask(QRunnable):
+    """
+    Compares the project tree with the index (loading the saved index first,
+    if asked to) and reports files to (re)index and files that are gone.
+    """
+    def __init__(self, indexer: "ProjectSearchIndexer", generation: int, load_saved: bool):
+        super().__init__()
+        self.indexer = indexer
+        self.generation = generation
+        self.load_saved = load_saved
+        self.signals = IndexSignals()
+
+    def run(self):
+        root = self.indexer.project_root
+        stale, vanished = [], []
+        try:
+            if self.load_saved:
+                started = time.perf_counter()
+                saved = load_index(root)
+                if saved is not None and self.generation == self.indexer.generation:
+                    self.indexer.index = saved
+                    logger.info(f"Loaded search index of {saved.file_count()} files in {time.perf_counter() - started:.2f}s.")
+            known = self.indexer.index.stamps()
+            for file_path in walk_text_files(root):
+                if self.generation != self.indexer.generation:
+                    return
+                try:
+                    stamp = _stamp(os.stat(file_path))
+                except OSError:
+                    continue
+                if known.pop(file_path, None) != stamp:
+                    stale.append(file_path)
+            vanished = list(known)
+        except Exception as e:
+            logger.error(f"Scanning project for search failed: {e}", exc_info=True)
+        finally:
+            self.signals.scanned.emit(self.generation, stale, vanished)
+
+
+class IndexTask(QRunnable):
+    """Indexes a batch of files on a worker thread."""
+    def __init__(self, indexer: "ProjectSearchIndexer", generation: int, files: List[str]):
+        super().__init__()
+        self.indexer = indexer
+        self.generation = generation
+        self.files = files
+        self.signals = IndexSignals()
+
+    def run(self):
+        index = self.indexer.index
+        try:
+            for file_path in self.files:
+                if self.generation != self.indexer.generation:
+                    return
+                index_text_file(index, file_path)
+        except Exception as e:
+            logger.error(f"Indexing files for search failed: {e}", exc_info=True)
+        finally:
+            self.signals.indexed.emit(self.generation)
+
+
+class SaveIndexTask(QRunnable):
+    def __init__(self, index: TrigramIndex, project_root: str):
+        super().__init__()
+        self.index = index
+        self.project_root = project_root
+
+    def run(self):
+        try:
+            save_index(self.index, self.project_root)
+        except OSError as e:
+            logger.warning(f"Could not save search index for {self.project_root}: {e}")
+
+
+class SearchSignals(QObject):
+    matches_found = pyqtSignal(int, list) # search_id, [SearchMatch] (one file's worth)
+    finished = pyqtSignal(int, int, int)  # search_id, files searched, matches
+
+
+class SearchTask(QRunnable):
+    """
+    Verifies candidate files against the pattern, streaming each file's
+    matches as soon as it has been searched. Open editor buffers with unsaved
+    changes are searched instead of their files.
+    """
+    def __init__(self, indexer: "ProjectSearchIndexer", search_id: int, pattern: "re.Pattern",
+                 candidates: Optional[List[str]], buffers: Dict[str, str],
+                 replace: Optional[Callable[["re.Match"], str]] = None):
+        super().__init__()
+        self.indexer = indexer
+        self.search_id = search_id
+        self.pattern = pattern
+        self.replace = replace
+        self.candidates = candidates # None: the index is not ready, search every file
+        self.buffers = buffers
+        self.signals = SearchSignals()
+
+    def run(self):
+        searched = found = 0
+        started = time.perf_counter()
+        files = self.candidates if self.candidates is not None else walk_text_files(self.indexer.project_root)
+        # Dirty buffers are always searched: their text may match where the file does not
+        paths = sorted(set(files) | set(self.buffers))
+        try:
+            for file_path in paths:
+                if self.search_id != self.indexer.search_id:
+                    return # Superseded or cancelled
+                text = self.buffers.get(file_path)
+                if text is None:
+                    text = read_searchable_text(file_path)
+                    if text is None:
+                        continue
+                searched += 1
+                matches = search_text(file_path, text, self.pattern, min(MAX_MATCHES_PER_FILE, MAX_MATCHES - found),
+                                      self.replace)
+                if matches:
+                    found += len(matches)
+                    self.signals.matches_found.emit(self.search_id, matches)
+                    if found >= MAX_MATCHES:
+                        break
+        except Exception as e:
+            logger.error(f"Find in files failed: {e}", exc_info=True)
+        finally:
+            self.signals.finished.emit(self.search_id, searched, found)
+        logger.debug(f"Searched {searched} files ({len(paths)} candidates) in {time.perf_counter() - started:.3f}s")
+
+
+class ProjectSearchIndexer(QObject):
+    """
+    Find in files for the current project, narrowed by a TrigramIndex.
+
+    The index is loaded from the last session, brought up to date with a scan
+    and then kept current from filesystem events (and saves made by the
+    editor, which the event service does not report). Building runs in
+    worker threads; the index is saved again a while after it changes.
+    """
+    index_ready = pyqtSignal(int)               # files in the index
+    matches_found = pyqtSignal(int, list)       # search_id, [SearchMatch]
+    search_finished = pyqtSignal(int, int, int) # search_id, files searched, matches
+
+    INDEX_BATCH_FILES = 100
+    SAVE_DELAY_MS = 10000 # Coalesce saves of the index after incremental updates
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index = TrigramIndex()
+        self.project_root: Optional[str] = None
+        self.generation = 0
+        self.search_id = 0
+        self.ready = False
+        self.fs_subscription = None
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(QThreadPool.globalInstance().maxThreadCount(), 4)))
+        self.search_pool = QThreadPool(self) # Searches never wait for indexing
+        self.search_pool.setMaxThreadCount(1)
+        self._tasks = set() # Keep running tasks (and their signals) alive
+        self._scans = 0 # Scans still running for the current generation
+        self._outstanding = 0 # Index batches still running for the current generation
+        self._dirty = False # Index changed since it was last saved
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(self.SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self._save)
+
+    def set_project_root(self, root_path: Optional[str]):
+        root_path = os.path.normpath(root_path) if root_path else None
+        if root_path == self.project_root:
+            return
+        self.flush(wait=False)
+        if self.fs_subscription is not None:
+            FileSystemEventService.instance().unsubscribe(self.fs_subscription)
+            self.fs_subscription = None
+        self.generation += 1
+        self.search_id += 1
+        self.index = TrigramIndex()
+        self.ready = False
+        self._scans = self._outstanding = 0
+        self.project_root = root_path
+        if not root_path or not os.path.isdir(root_path):
+            return
+        self.fs_subscription = FileSystemEventService.instance().subscribe(root_path, self._on_project_events)
+        self._scan(load_saved=True)
+
+    def reindex_file(self, file_path: str):
+        """Reindexes one file (e.g. after the editor saved it)."""
+        file_path = os.path.normpath(file_path)
+        if self.project_root and file_path.startswith(os.path.join(self.project_root, "")):
+            self._index_files([file_path])
+
+    def _scan(self, load_saved: bool = False):
+        self.ready = False
+        self._scans += 1
+        task = ScanTask(self, self.generation, load_saved)
+        task.signals.scanned.connect(lambda generation, stale, vanished, task=task: self._on_scanned(task, generation, stale, vanished))
+        self._tasks.add(task)
+        self.pool.start(task)
+
+    def _on_scanned(self, task: ScanTask, generation: int, stale: list, vanished: list):
+        self._tasks.discard(task)
+        if generation != self.generation:
+            return
+        self._scans -= 1
+        for file_path in vanished:
+            self.index.remove_file(file_path)
+        if stale or vanished:
+            self._dirty = True
+            logger.info(f"Search index: {len(stale)} files to index, {len(vanished)} removed.")
+        self._index_files(stale)
+        self._check_ready()
+
+    def _index_files(self, files: List[str]):
+        for start in range(0, len(files), self.INDEX_BATCH_FILES):
+            task = IndexTask(self, self.generation, files[start:start + self.INDEX_BATCH_FILES])
+            task.signals.indexed.connect(lambda generation, task=task: self._on_indexed(task, generation))
+            self._tasks.add(task)
+            self._outstanding += 1
+            self.pool.start(task)
+
+    def _on_indexed(self, task: IndexTask, generation: int):
+        self._tasks.discard(task)
+        if generation != self.generation:
+            return
+        self._outstanding -= 1
+        self._dirty = True
+        self._check_ready()
+
+    def _check_ready(self):
+        if self._scans or self._outstanding:
+            return
+        if not self.ready:
+            self.ready = True
+            logger.info(f"Search index ready: {self.index.file_count()} files.")
+            self.index_ready.emit(self.index.file_count())
+        if self._dirty:
+            self._save_timer.start()
+
+    def _on_project_events(self, events):
+        files = []
+        for event in events:
+            if event.kind == RESCAN:
+                self._scan()
+                return
+            if event.kind == DELETED:
+                self.index.remove_tree(event.path)
+                self.index.remove_file(event.path)
+                self._dirty = True
+            elif event.is_dir:
+                self._scan() # New or moved-in directory: a scan finds its files (unchanged ones are skipped)
+                return
+            elif os.path.splitext(event.path)[1].lower() not in BINARY_EXTENSIONS:
+                files.append(event.path)
+        self._index_files(files)
+        self._check_ready()
+
+    def search(self, query: str, regex: bool = False, case_sensitive: bool = False,
+               buffers: Optional[Dict[str, str]] = None, replacement: Optional[str] = None) -> int:
+        """
+        Starts a search (cancelling any running one) and returns its id; results
+        arrive through matches_found and search_finished, with previews of
+        `replacement` if given. Raises re.error for an invalid regular
+        expression or replacement.
+        """
+        pattern = compile_query(query, regex, case_sensitive)
+        replace = replacement_function(pattern, replacement, regex) if replacement is not None else None
+        self.search_id += 1
+        if not self.project_root:
+            return self.search_id
+        if self.ready:
+            started = time.perf_counter()
+            candidates = self.index.candidates(query_plan(query, regex))
+            logger.debug(f"{len(candidates)} candidate files of {self.index.file_count()} ({(time.perf_counter() - started) * 1000:.1f} ms)")
+        else:
+            candidates = None
+        buffers = {os.path.normpath(fp): text for fp, text in (buffers or {}).items()}
+        task = SearchTask(self, self.search_id, pattern, candidates, buffers, replace)
+        task.signals.matches_found.connect(self._on_matches_found)
+        task.signals.finished.connect(lambda search_id, searched, found, task=task: self._on_search_finished(task, search_id, searched, found))
+        self._tasks.add(task)
+        self.search_pool.start(task)
+        return self.search_id
+
+    def candidate_files(self, query: str, regex: bool) -> List[str]:
+        """Files that may contain matches of a query (every text file while the index is not ready)."""
+        if not self.project_root:
+            return []
+        if self.ready:
+            return self.index.candidates(query_plan(query, regex))
+        return sorted(walk_text_files(self.project_root))
+
+    def cancel_search(self):
+        self.search_id += 1
+
+    def _on_matches_found(self, search_id: int, matches: list):
+        if search_id == self.search_id:
+            self.matches_found.emit(search_id, matches)
+
+    def _on_search_finished(self, task: SearchTask, search_id: int, searched: int, found: int):
+        self._tasks.discard(task)
+        if search_id == self.search_id:
+            self.search_finished.emit(search_id, searched, found)
+
+    def _save(self):
+        if self._dirty and self.ready and self.project_root:
+            self._dirty = False
+            self.pool.start(SaveIndexTask(self.index, self.project_root))
+
+    def flush(self, wait: bool = True):
+        """Saves the index now if it changed (waiting for the write if `wait`), e.g. before quitting."""
+        self._save_timer.stop()
+        if not (self._dirty and self.ready and self.project_root):
+            return
+        self._dirty = False
+        task = SaveIndexTask(self.index, self.project_root)
+        if wait:
+            task.run()
+        else:
+            self.pool.start(task)
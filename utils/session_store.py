@@ -0,0 +1,102 @@
+# website_builder/utils/session_store.py
+import os
+import json
+import hashlib
+import logging
+from typing import List, NamedTuple, Optional
+
+from PyQt6.QtCore import QStandardPaths
+
+from .file_saver import FSYNC_NEVER, encode_text, temp_path_for, write_atomic
+
+logger = logging.getLogger(__name__)
+
+SESSION_FORMAT_VERSION = 1
+
+
+class SessionTab(NamedTuple):
+    """One open editor tab as remembered between runs."""
+    file_path: str
+    cursor_position: int = 0
+    cursor_anchor: int = 0
+    vertical_scroll: int = 0
+    horizontal_scroll: int = 0
+
+
+class EditorSession(NamedTuple):
+    tabs: List[SessionTab]
+    active_index: int = -1
+
+
+def session_path_for(project_path: str) -> str:
+    """
+    Where a project's session is kept: in the application data directory (so
+    the project folder, its watchers and its exports never see it), named
+    after the project's absolute path.
+    """
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    key = hashlib.sha1(os.path.abspath(project_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(data_dir, "sessions", f"{key}.json")
+
+
+def load_session(project_path: str) -> Optional[EditorSession]:
+    """Returns the saved session of a project, or None if there is none (or it is unreadable)."""
+    path = session_path_for(project_path)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable session file {path}: {e}")
+        return None
+
+    if data.get("version") != SESSION_FORMAT_VERSION:
+        logger.info(f"Ignoring session file with unsupported version: {path}")
+        return None
+    tabs = []
+    for entry in data.get("tabs", []):
+        try:
+            # Paths inside the project are stored relative to it, so moved projects keep their session
+            file_path = os.path.normpath(os.path.join(project_path, entry["path"]))
+            vertical_scroll, horizontal_scroll = entry.get("scroll", (0, 0))
+            tabs.append(SessionTab(
+                file_path, int(entry.get("cursor", 0)), int(entry.get("anchor", 0)),
+                int(vertical_scroll), int(horizontal_scroll),
+            ))
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping malformed session entry {entry!r}: {e}")
+    return EditorSession(tabs, int(data.get("active", -1)))
+
+
+def save_session(project_path: str, session: EditorSession):
+    """Writes a project's session (atomically; a crash never leaves a truncated file)."""
+    project_path = os.path.abspath(project_path)
+    tabs = []
+    for tab in session.tabs:
+        stored_path = tab.file_path
+        try:
+            if os.path.commonpath([project_path, os.path.abspath(stored_path)]) == project_path:
+                stored_path = os.path.relpath(stored_path, project_path)
+        except ValueError:
+            pass # Different drive: keep the absolute path
+        tabs.append({
+            "path": stored_path,
+            "cursor": tab.cursor_position,
+            "anchor": tab.cursor_anchor,
+            "scroll": [tab.vertical_scroll, tab.horizontal_scroll],
+        })
+    data = {
+        "version": SESSION_FORMAT_VERSION,
+        "project": project_path,
+        "active": session.active_index,
+        "tabs": tabs,
+    }
+
+    path = session_path_for(project_path)
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_atomic(path, encode_text(json.dumps(data, indent=2)), temp_path_for(path), FSYNC_NEVER)
+        logger.debug(f"Saved session with {len(tabs)} tabs to: {path}")
+    except OSError as e:
+        logger.error(f"Could not save session to {path}: {e}")
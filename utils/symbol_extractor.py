@@ -0,0 +1,260 @@
+# website_builder/utils/symbol_extractor.py
+"""
+Qt-free extraction of project symbols from HTML, CSS and JavaScript source.
+
+HTML yields element ids (definitions) and class attribute values (usages),
+plus everything found in inline <style> and <script> bodies. CSS yields the
+classes and ids its rule selectors style (definitions, at the rule) and an
+outline entry per rule. JavaScript yields function, class and variable
+declarations, calls of named functions, and ids/classes referenced through
+the DOM API (getElementById, querySelector, classList, ...).
+
+Extraction is regex based: comments are blanked out (keeping offsets) first,
+so positions map straight back to the original text.
+"""
+import bisect
+import os
+import re
+from typing import List, NamedTuple, Optional, Tuple
+
+# --- Symbol kinds ---
+ID = "id"
+CLASS = "class"
+FUNCTION = "function"
+VARIABLE = "variable"
+
+# --- Roles ---
+DEFINITION = "definition"
+USAGE = "usage"
+
+EXTENSION_LANGUAGES = {
+    ".html": "html", ".htm": "html", ".xhtml": "html",
+    ".css": "css",
+    ".js": "js", ".mjs": "js", ".cjs": "js",
+}
+
+
+class Symbol(NamedTuple):
+    kind: str
+    name: str
+    role: str
+    file_path: str
+    line: int   # 0-based
+    column: int # 0-based, in characters
+
+
+class OutlineEntry(NamedTuple):
+    label: str
+    kind: str
+    line: int
+    column: int
+
+
+class ExtractedSymbols(NamedTuple):
+    symbols: List[Symbol]
+    outline: List[OutlineEntry]
+
+
+def language_for_path(file_path: str) -> Optional[str]:
+    return EXTENSION_LANGUAGES.get(os.path.splitext(file_path)[1].lower())
+
+
+def _blank(match) -> str:
+    """Replacement keeping line breaks (and so every later offset's line/column)."""
+    return re.sub(r"[^\n]", " ", match.group(0))
+
+
+class _Positions:
+    """Maps text offsets to (line, column)."""
+    def __init__(self, text: str):
+        self.line_starts = [0] + [m.end() for m in re.finditer("\n", text)]
+
+    def __call__(self, offset: int) -> Tuple[int, int]:
+        line = bisect.bisect_right(self.line_starts, offset) - 1
+        return line, offset - self.line_starts[line]
+
+
+# --- HTML ---
+_HTML_COMMENT = re.compile(r"<!--.*?(?:-->|\Z)", re.DOTALL)
+_HTML_EMBEDDED = re.compile(r"<(style|script)\b[^>]*>(.*?)(?:</\1\s*>|\Z)", re.DOTALL | re.IGNORECASE)
+_HTML_TAG = re.compile(r"<[A-Za-z][^>]*>")
+_HTML_ID_CLASS_ATTR = re.compile(
+    r"""\s(id|class)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""", re.IGNORECASE
+)
+_NAME = re.compile(r"[^\s]+")
+
+# --- CSS ---
+_CSS_COMMENT = re.compile(r"/\*.*?(?:\*/|\Z)", re.DOTALL)
+_CSS_PRELUDE = re.compile(r"[^{};]+(?=\{)")
+_CSS_SELECTOR_NOISE = re.compile(r"""\[[^\]]*\]|"[^"]*"|'[^']*'|\([^)]*\)""") # Attribute selectors, strings, :not(...) args
+_CSS_CLASS_OR_ID = re.compile(r"([.#])(-?[_a-zA-Z\u00a0-\uffff][\w\-\u00a0-\uffff]*)")
+
+# --- JavaScript ---
+_JS_COMMENT = re.compile(r"//[^\n]*|/\*.*?(?:\*/|\Z)", re.DOTALL)
+_JS_STRING = re.compile(r'''"(?:\\.|[^"\\\n])*"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`''', re.DOTALL)
+_JS_COMMENT_OR_STRING = re.compile(_JS_STRING.pattern + "|" + _JS_COMMENT.pattern, re.DOTALL)
+_JS_IDENT = r"[A-Za-z_$][\w$]*"
+_JS_FUNCTION_DECL = re.compile(rf"\bfunction\b\s*\*?\s*({_JS_IDENT})")
+_JS_CLASS_DECL = re.compile(rf"\bclass\s+({_JS_IDENT})")
+_JS_VARIABLE_DECL = re.compile(rf"\b(const|let|var)\s+({_JS_IDENT})(\s*=\s*(?:async\s+)?(?:function\b|\([^()]*\)\s*=>|{_JS_IDENT}\s*=>))?")
+_JS_CALL = re.compile(rf"(?<![\w$.])({_JS_IDENT})\s*\(")
+_JS_DOM_ID = re.compile(r"""\bgetElementById\s*\(\s*(["'`])([^"'`]+)\1""")
+_JS_DOM_CLASS_NAME = re.compile(r"""\bgetElementsByClassName\s*\(\s*(["'`])([^"'`]+)\1""")
+_JS_DOM_SELECTOR = re.compile(r"""\b(?:querySelector|querySelectorAll|closest|matches)\s*\(\s*(["'`])([^"'`]+)\1""")
+_JS_CLASS_LIST = re.compile(r"""\bclassList\s*\.\s*(?:add|remove|toggle|contains|replace)\s*\(([^)]*)\)""")
+_JS_STRING_ARGUMENT = re.compile(r"""(["'`])([^"'`]*)\1""")
+_JS_KEYWORDS = frozenset((
+    "if", "for", "while", "switch", "catch", "function", "return", "typeof", "new", "delete",
+    "void", "await", "yield", "super", "import", "in", "of", "with", "do", "else", "case",
+))
+
+
+def extract_symbols(file_path: str, text: str, language: Optional[str] = None) -> ExtractedSymbols:
+    """Extracts the symbols and outline of one file's text."""
+    language = language or language_for_path(file_path)
+    positions = _Positions(text)
+    symbols: List[Symbol] = []
+    outline: List[OutlineEntry] = []
+    if language == "html":
+        _extract_html(file_path, text, 0, positions, symbols, outline)
+    elif language == "css":
+        _extract_css(file_path, text, 0, positions, symbols, outline)
+    elif language == "js":
+        _extract_js(file_path, text, 0, positions, symbols, outline)
+    outline.sort(key=lambda entry: (entry.line, entry.column))
+    return ExtractedSymbols(symbols, outline)
+
+
+def _add(symbols, file_path, positions, kind, name, role, offset):
+    line, column = positions(offset)
+    symbols.append(Symbol(kind, name, role, file_path, line, column))
+
+
+def _extract_html(file_path, text, base, positions, symbols, outline):
+    text = _HTML_COMMENT.sub(_blank, text)
+    embedded_spans = []
+    for match in _HTML_EMBEDDED.finditer(text):
+        body_start = match.start(2)
+        embedded_spans.append((match.start(), match.end()))
+        if match.group(1).lower() == "style":
+            _extract_css(file_path, match.group(2), base + body_start, positions, symbols, outline)
+        else:
+            _extract_js(file_path, match.group(2), base + body_start, positions, symbols, outline)
+
+    for tag in _HTML_TAG.finditer(text):
+        if any(start < tag.start() < end for start, end in embedded_spans):
+            continue # Markup-looking text inside <script>/<style>
+        for attr in _HTML_ID_CLASS_ATTR.finditer(tag.group(0)):
+            group = next(g for g in (2, 3, 4) if attr.group(g) is not None)
+            value_start = base + tag.start() + attr.start(group)
+            is_id = attr.group(1).lower() == "id"
+            for name in _NAME.finditer(attr.group(group)):
+                if is_id:
+                    _add(symbols, file_path, positions, ID, name.group(0), DEFINITION, value_start + name.start())
+                    line, column = positions(value_start + name.start())
+                    outline.append(OutlineEntry(f"#{name.group(0)}", ID, line, column))
+                else:
+                    _add(symbols, file_path, positions, CLASS, name.group(0), USAGE, value_start + name.start())
+
+
+def _extract_css(file_path, text, base, positions, symbols, outline):
+    text = _CSS_COMMENT.sub(_blank, text)
+    for prelude in _CSS_PRELUDE.finditer(text):
+        selector = prelude.group(0)
+        stripped = selector.strip()
+        if not stripped or stripped.startswith("@"):
+            continue # At-rules (@media, @font-face, ...) are not selectors
+        if re.match(r"^(from|to|\d+(\.\d+)?%)(\s*,\s*(from|to|\d+(\.\d+)?%))*$", stripped):
+            continue # @keyframes steps
+        start = base + prelude.start() + (len(selector) - len(selector.lstrip()))
+        line, column = positions(start)
+        outline.append(OutlineEntry(" ".join(stripped.split()), "rule", line, column))
+        cleaned = _CSS_SELECTOR_NOISE.sub(_blank, selector)
+        for match in _CSS_CLASS_OR_ID.finditer(cleaned):
+            kind = CLASS if match.group(1) == "." else ID
+            _add(symbols, file_path, positions, kind, match.group(2), DEFINITION, base + prelude.start() + match.start(2))
+
+
+def _extract_js(file_path, text, base, positions, symbols, outline):
+    text = _JS_COMMENT_OR_STRING.sub(lambda m: m.group(0) if m.group(0)[0] in "\"'`" else _blank(m), text)
+
+    # DOM references, which live in string arguments
+    for match in _JS_DOM_ID.finditer(text):
+        _add(symbols, file_path, positions, ID, match.group(2).strip(), USAGE, base + match.start(2))
+    for match in _JS_DOM_CLASS_NAME.finditer(text):
+        for name in _NAME.finditer(match.group(2)):
+            _add(symbols, file_path, positions, CLASS, name.group(0), USAGE, base + match.start(2) + name.start())
+    for match in _JS_DOM_SELECTOR.finditer(text):
+        cleaned = _CSS_SELECTOR_NOISE.sub(_blank, match.group(2))
+        for ref in _CSS_CLASS_OR_ID.finditer(cleaned):
+            kind = CLASS if ref.group(1) == "." else ID
+            _add(symbols, file_path, positions, kind, ref.group(2), USAGE, base + match.start(2) + ref.start(2))
+    for match in _JS_CLASS_LIST.finditer(text):
+        for argument in _JS_STRING_ARGUMENT.finditer(match.group(1)):
+            for name in _NAME.finditer(argument.group(2)):
+                offset = base + match.start(1) + argument.start(2) + name.start()
+                _add(symbols, file_path, positions, CLASS, name.group(0), USAGE, offset)
+
+    # Declarations and calls, with strings blanked out too
+    code = _JS_STRING.sub(_blank, text)
+    declared_at = set()
+    for match in _JS_FUNCTION_DECL.finditer(code):
+        _js_definition(file_path, base, positions, symbols, outline, FUNCTION, match, 1, "function")
+        declared_at.add(match.start(1))
+    for match in _JS_CLASS_DECL.finditer(code):
+        _js_definition(file_path, base, positions, symbols, outline, FUNCTION, match, 1, "class")
+    for match in _JS_VARIABLE_DECL.finditer(code):
+        kind = FUNCTION if match.group(3) else VARIABLE
+        _js_definition(file_path, base, positions, symbols, outline, kind, match, 2, match.group(1))
+    for match in _JS_CALL.finditer(code):
+        name = match.group(1)
+        if name in _JS_KEYWORDS or match.start(1) in declared_at:
+            continue
+        _add(symbols, file_path, positions, FUNCTION, name, USAGE, base + match.start(1))
+
+
+def _js_definition(file_path, base, positions, symbols, outline, kind, match, group, keyword):
+    offset = base + match.start(group)
+    _add(symbols, file_path, positions, kind, match.group(group), DEFINITION, offset)
+    line, column = positions(offset)
+    outline.append(OutlineEntry(f"{keyword} {match.group(group)}", kind, line, column))
+
+
+# --- Symbol under the cursor ---
+_WORD_CHARS = re.compile(r"[\w\-$\u00a0-\uffff]")
+
+
+def symbol_at(line_text: str, column: int, language: Optional[str]) -> Optional[Tuple[str, str]]:
+    """
+    Returns (kind, name) of the symbol at `column` of a line, judged from its
+    surroundings: a value of an id/class attribute, a .class or #id in CSS (or
+    a JS selector string), or a JS identifier (kind FUNCTION; callers may fall
+    back to VARIABLE).
+    """
+    start = column
+    while start > 0 and _WORD_CHARS.match(line_text[start - 1]):
+        start -= 1
+    end = column
+    while end < len(line_text) and _WORD_CHARS.match(line_text[end]):
+        end += 1
+    name = line_text[start:end]
+    if not name:
+        return None
+    before = line_text[:start]
+    previous = before[-1:]
+    in_string = re.search(r"""["'`][^"'`]*$""", before)
+
+    if previous in (".", "#"):
+        member_access = previous == "." and re.search(r"[\w$)\]]\.$", before)
+        if language == "css" or in_string or (language == "html" and not member_access):
+            return (CLASS if previous == "." else ID), name
+    attr = re.search(r"""\b(id|class)\s*=\s*["']?[^"'>]*$""", before, re.IGNORECASE)
+    if attr:
+        return (ID if attr.group(1).lower() == "id" else CLASS), name
+    if re.search(r"""\bgetElementById\s*\(\s*["'`]\s*$""", before):
+        return ID, name
+    if re.search(r"""\b(getElementsByClassName\s*\(|classList\s*\.\s*\w+\s*\([^)]*)["'`][^"'`]*$""", before):
+        return CLASS, name
+    if language in ("js", "html") and re.fullmatch(_JS_IDENT, name):
+        return FUNCTION, name
+    return None
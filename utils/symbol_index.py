@@ -0,0 +1,285 @@
+# website_builder/utils/symbol_index.py
+import os
+import time
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from .fs_events import DELETED, IGNORED_DIRECTORIES, RESCAN, FileSystemEventService
+from .symbol_extractor import DEFINITION, EXTENSION_LANGUAGES, USAGE, OutlineEntry, Symbol, extract_symbols
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAX_FILE_BYTES = 2 * 1024 * 1024 # Bigger files (bundles, minified vendor code) are not indexed
+
+
+def is_indexable(file_path: str) -> bool:
+    return os.path.splitext(file_path)[1].lower() in EXTENSION_LANGUAGES
+
+
+class _FileEntry:
+    __slots__ = ("stamp", "symbols", "outline", "keys")
+
+    def __init__(self, stamp, symbols, outline):
+        self.stamp = stamp # (mtime_ns, size) of the indexed disk content, or None for an editor buffer
+        self.symbols = symbols
+        self.outline = outline
+        self.keys = {(symbol.kind, symbol.name) for symbol in symbols}
+
+
+class SymbolIndex:
+    """
+    Project-wide symbol tables, updated one file at a time.
+
+    Symbols are kept per file and in an inverted map (kind, name) -> file ->
+    symbols, so definitions/usages lookups are a dict access plus the size
+    of the answer, however many files the project has. Thread-safe: indexing
+    workers update it while the GUI thread queries it.
+    """
+    def __init__(self):
+        self._files: Dict[str, _FileEntry] = {}
+        self._by_key: Dict[Tuple[str, str], Dict[str, List[Symbol]]] = {}
+        self._lock = threading.Lock()
+
+    def update_file(self, file_path: str, symbols: List[Symbol], outline: List[OutlineEntry], stamp=None):
+        """Replaces everything known about one file."""
+        entry = _FileEntry(stamp, symbols, outline)
+        by_key: Dict[Tuple[str, str], List[Symbol]] = {}
+        for symbol in sorted(symbols, key=lambda s: (s.line, s.column)):
+            by_key.setdefault((symbol.kind, symbol.name), []).append(symbol)
+        with self._lock:
+            self._drop(file_path)
+            self._files[file_path] = entry
+            for key, file_symbols in by_key.items():
+                self._by_key.setdefault(key, {})[file_path] = file_symbols
+
+    def remove_file(self, file_path: str):
+        with self._lock:
+            self._drop(file_path)
+
+    def remove_tree(self, directory: str):
+        """Forgets every file under a directory (e.g. it was deleted)."""
+        prefix = os.path.join(directory, "")
+        with self._lock:
+            for file_path in [fp for fp in self._files if fp.startswith(prefix)]:
+                self._drop(file_path)
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._by_key.clear()
+
+    def _drop(self, file_path: str):
+        entry = self._files.pop(file_path, None)
+        if entry is None:
+            return
+        for key in entry.keys:
+            files = self._by_key.get(key)
+            if files is not None:
+                files.pop(file_path, None)
+                if not files:
+                    del self._by_key[key]
+
+    def stamp(self, file_path: str):
+        with self._lock:
+            entry = self._files.get(file_path)
+            return entry.stamp if entry else None
+
+    def file_count(self) -> int:
+        return len(self._files)
+
+    def lookup(self, kind: str, name: str, role: Optional[str] = None) -> List[Symbol]:
+        """All symbols of a kind and name (optionally only one role), by file and position."""
+        with self._lock:
+            files = self._by_key.get((kind, name))
+            if not files:
+                return []
+            # Per-file lists are already in position order; only the files need sorting
+            by_file = sorted(files.items())
+        if role is None:
+            return [s for _, symbols in by_file for s in symbols]
+        return [s for _, symbols in by_file for s in symbols if s.role == role]
+
+    def definitions(self, kind: str, name: str) -> List[Symbol]:
+        return self.lookup(kind, name, DEFINITION)
+
+    def usages(self, kind: str, name: str) -> List[Symbol]:
+        return self.lookup(kind, name, USAGE)
+
+    def symbols(self, file_path: str) -> List[Symbol]:
+        """Everything indexed for one file."""
+        with self._lock:
+            entry = self._files.get(file_path)
+            return list(entry.symbols) if entry else []
+
+    def outline(self, file_path: str) -> List[OutlineEntry]:
+        with self._lock:
+            entry = self._files.get(file_path)
+            return list(entry.outline) if entry else []
+
+
+def index_file(index: SymbolIndex, file_path: str, force: bool = False) -> bool:
+    """(Re)indexes one file from disk; returns whether its entry changed."""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        had_entry = index.stamp(file_path) is not None
+        index.remove_file(file_path)
+        return had_entry
+    stamp = (st.st_mtime_ns, st.st_size)
+    if not force and index.stamp(file_path) == stamp:
+        return False
+    if st.st_size > INDEX_MAX_FILE_BYTES:
+        index.update_file(file_path, [], [], stamp)
+        return True
+    try:
+        with open(file_path, "rb") as f:
+            text = f.read().decode("utf-8", errors="replace")
+    except OSError as e:
+        logger.debug(f"Could not read {file_path} for indexing: {e}")
+        return False
+    extracted = extract_symbols(file_path, text)
+    index.update_file(file_path, extracted.symbols, extracted.outline, stamp)
+    return True
+
+
+def walk_indexable(root: str) -> Iterable[str]:
+    for directory, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in IGNORED_DIRECTORIES and not d.startswith(".")]
+        for filename in filenames:
+            if is_indexable(filename):
+                yield os.path.join(directory, filename)
+
+
+class IndexSignals(QObject):
+    files_indexed = pyqtSignal(int, list) # generation, [file_path] whose symbols changed
+    finished = pyqtSignal(int, int)       # generation, files looked at
+
+
+class IndexTask(QRunnable):
+    """
+    Indexes files (or whole directory trees) on a worker thread, reporting
+    changed files in batches. Stops early once `generation` is outdated.
+    """
+    BATCH_FILES = 200
+
+    def __init__(self, indexer: "ProjectSymbolIndexer", generation: int,
+                 files: Iterable[str] = (), trees: Iterable[str] = (), buffers: Iterable[Tuple[str, str]] = ()):
+        super().__init__()
+        self.indexer = indexer
+        self.generation = generation
+        self.files = list(files)
+        self.trees = list(trees)
+        self.buffers = list(buffers)
+        self.signals = IndexSignals()
+
+    def run(self):
+        index = self.indexer.index
+        started = time.perf_counter()
+        changed, seen = [], 0
+
+        def paths():
+            yield from self.files
+            for tree in self.trees:
+                yield from walk_indexable(tree)
+
+        try:
+            for file_path, text in self.buffers:
+                extracted = extract_symbols(file_path, text)
+                index.update_file(file_path, extracted.symbols, extracted.outline)
+                changed.append(file_path)
+            for file_path in paths():
+                if self.generation != self.indexer.generation:
+                    return # Project changed; results would be stale
+                seen += 1
+                if index_file(index, file_path):
+                    changed.append(file_path)
+                if len(changed) >= self.BATCH_FILES:
+                    self.signals.files_indexed.emit(self.generation, changed)
+                    changed = []
+        except Exception as e:
+            logger.error(f"Symbol indexing failed: {e}", exc_info=True)
+        finally:
+            if changed:
+                self.signals.files_indexed.emit(self.generation, changed)
+            self.signals.finished.emit(self.generation, seen)
+        if self.trees:
+            logger.info(f"Indexed {seen} files in {time.perf_counter() - started:.2f}s ({index.file_count()} in index).")
+
+
+class ProjectSymbolIndexer(QObject):
+    """
+    Keeps a SymbolIndex of the current project up to date in the background:
+    a full scan when the project is set, then per-file updates from
+    filesystem events and from unsaved editor buffers.
+    """
+    index_updated = pyqtSignal(list) # [file_path] whose symbols changed
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.index = SymbolIndex()
+        self.project_root: Optional[str] = None
+        self.generation = 0
+        self.fs_subscription = None
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1) # Parsing is pure Python; one worker keeps the GUI thread free
+        self._tasks = set() # Keep running tasks (and their signals) alive
+
+    def set_project_root(self, root_path: Optional[str]):
+        root_path = os.path.normpath(root_path) if root_path else None
+        if root_path == self.project_root:
+            return
+        if self.fs_subscription is not None:
+            FileSystemEventService.instance().unsubscribe(self.fs_subscription)
+            self.fs_subscription = None
+        self.generation += 1
+        self.index.clear()
+        self.project_root = root_path
+        if not root_path or not os.path.isdir(root_path):
+            return
+        self.fs_subscription = FileSystemEventService.instance().subscribe(root_path, self._on_project_events)
+        self._start(trees=[root_path])
+
+    def update_buffer(self, file_path: str, text: str):
+        """Reindexes an open file from its (possibly unsaved) editor text."""
+        if self.project_root and is_indexable(file_path):
+            self._start(buffers=[(os.path.normpath(file_path), text)])
+
+    def reindex_file(self, file_path: str):
+        """Reindexes a file from disk (e.g. its unsaved edits were discarded)."""
+        if self.project_root and is_indexable(file_path):
+            self._start(files=[os.path.normpath(file_path)])
+
+    def _start(self, **work):
+        task = IndexTask(self, self.generation, **work)
+        task.signals.files_indexed.connect(self._on_files_indexed)
+        task.signals.finished.connect(lambda generation, seen, task=task: self._tasks.discard(task))
+        self._tasks.add(task)
+        self.pool.start(task)
+
+    def _on_files_indexed(self, generation: int, file_paths: list):
+        if generation == self.generation:
+            self.index_updated.emit(file_paths)
+
+    def _on_project_events(self, events):
+        files, trees, removed = [], [], []
+        for event in events:
+            if event.kind == RESCAN:
+                self.index.clear()
+                self._start(trees=[self.project_root])
+                return
+            if event.kind == DELETED:
+                # Deleted file or directory: both are cheap to drop right away
+                self.index.remove_tree(event.path)
+                self.index.remove_file(event.path)
+                removed.append(event.path)
+            elif event.is_dir:
+                trees.append(event.path)
+            elif is_indexable(event.path):
+                files.append(event.path)
+        if removed:
+            self.index_updated.emit(removed)
+        if files or trees:
+            self._start(files=files, trees=trees)
@@ -0,0 +1,320 @@
+# website_builder/utils/syntax_lexer.py
+"""
+Single-pass, state-machine lexer for HTML, CSS and JavaScript.
+
+The lexer walks a line of text exactly once. Each lexer state owns one
+precompiled master regex (an alternation of everything that can start a token
+in that context), so scanning a block is a short loop of `search` calls instead
+of one `globalMatch` per highlighting rule.
+
+The state a line ends in is an int, which is what QSyntaxHighlighter stores as
+the block state. Feeding it back in as the start state of the next line carries
+multi-line constructs (comments, tags, attribute strings, <style>/<script>
+bodies, template literals) across blocks.
+
+This module has no Qt dependency so it can be benchmarked and reused outside the
+GUI (e.g. by indexers).
+"""
+import re
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple, Union
+
+# --- Token kinds (keys into the highlighter's format table) ---
+TAG = "tag"
+TAG_BRACKET = "tag_bracket"
+ATTRIBUTE = "attribute"
+STRING = "string"
+COMMENT = "comment"
+CSS_SELECTOR = "css_selector"
+CSS_PROPERTY = "css_property"
+CSS_VALUE = "css_value"
+JS_KEYWORD = "js_keyword"
+JS_BUILTIN = "js_builtin"
+NUMBER = "number"
+
+TOKEN_KINDS = (
+    TAG, TAG_BRACKET, ATTRIBUTE, STRING, COMMENT, CSS_SELECTOR,
+    CSS_PROPERTY, CSS_VALUE, JS_KEYWORD, JS_BUILTIN, NUMBER,
+)
+
+# --- Lexer states (stored as QTextBlock user state) ---
+# HTML
+HTML_TEXT = 0
+HTML_COMMENT = 1
+HTML_TAG_OPEN = 2       # After '<', expecting a tag name
+HTML_TAG_CLOSE = 3      # After '</', expecting a tag name
+HTML_TAG = 4            # Inside a generic start tag (attributes)
+HTML_TAG_DQ = 5         # Inside a "double quoted" attribute value
+HTML_TAG_SQ = 6         # Inside a 'single quoted' attribute value
+STYLE_TAG = 7           # Inside <style ...> attributes; '>' enters embedded CSS
+STYLE_TAG_DQ = 8
+STYLE_TAG_SQ = 9
+SCRIPT_TAG = 10         # Inside <script ...> attributes; '>' enters embedded JS
+SCRIPT_TAG_DQ = 11
+SCRIPT_TAG_SQ = 12
+# CSS
+CSS_RULES = 20          # Selector context (outside braces)
+CSS_BLOCK = 21          # Declaration context (inside braces)
+CSS_COMMENT = 22        # /* */ opened in selector context
+CSS_BLOCK_COMMENT = 23  # /* */ opened in declaration context
+# JavaScript
+JS_CODE = 30
+JS_COMMENT = 31
+JS_TEMPLATE = 32        # Inside a `template literal`
+
+# Flag OR'ed onto CSS/JS states when they are embedded in an HTML document,
+# so the lexer knows to look for the matching </style> or </script>.
+EMBEDDED = 0x40
+
+JS_KEYWORDS = frozenset([
+    "function", "var", "let", "const", "if", "else", "for", "while", "return", "class",
+    "import", "export", "from", "new", "this", "super", "try", "catch", "finally",
+    "throw", "async", "await", "switch", "case", "default", "break", "continue",
+    "do", "delete", "in", "instanceof", "typeof", "void", "yield", "of", "true",
+    "false", "null", "undefined", "extends", "static", "get", "set",
+])
+
+JS_BUILTINS = frozenset([
+    "document", "window", "console", "alert", "prompt", "confirm", "parseInt",
+    "parseFloat", "String", "Number", "Boolean", "Object", "Array", "Date",
+    "Math", "JSON", "RegExp", "Error", "setTimeout", "setInterval",
+    "clearTimeout", "clearInterval", "isNaN", "isFinite", "encodeURI",
+    "decodeURI", "encodeURIComponent", "decodeURIComponent", "Promise", "Map", "Set",
+    "Symbol", "Proxy", "Reflect", "fetch",
+])
+
+_JS_IDENTIFIER_KINDS = {word: JS_KEYWORD for word in JS_KEYWORDS}
+_JS_IDENTIFIER_KINDS.update({word: JS_BUILTIN for word in JS_BUILTINS})
+
+Span = Tuple[int, int, str]  # start, length, token kind
+TokenSpec = Union[None, str, Mapping[str, str]]
+
+
+class _Rule(NamedTuple):
+    name: str
+    pattern: str
+    token: TokenSpec           # str, a word -> kind mapping, or None (no format)
+    next_state: Optional[int]  # None keeps the current state
+
+
+class _CompiledState(NamedTuple):
+    regex: "re.Pattern"
+    actions: Dict[str, Tuple[TokenSpec, Optional[int]]]
+    fill: Optional[str]        # Token kind for text between matches (comments/strings)
+
+
+_CLOSE_STYLE = r"</\s*(?i:style)\s*>"
+_CLOSE_SCRIPT = r"</\s*(?i:script)\s*>"
+
+
+def _tag_rules(dq_state: int, sq_state: int, on_close: int) -> List[_Rule]:
+    """Rules for the attribute section of a start tag."""
+    return [
+        _Rule("self_close", r"/>", TAG_BRACKET, HTML_TEXT),
+        _Rule("gt", r">", TAG_BRACKET, on_close),
+        _Rule("dq", r'"', STRING, dq_state),
+        _Rule("sq", r"'", STRING, sq_state),
+        _Rule("unquoted", r"(?<==)[^\s\"'=<>`]+", STRING, None),
+        _Rule("attr", r"[^\s\"'>/=]+", ATTRIBUTE, None),
+    ]
+
+
+def _quoted_rules(quote: str, tag_state: int) -> List[_Rule]:
+    return [_Rule("end", quote, STRING, tag_state)]
+
+
+RuleTable = Dict[int, Tuple[List[_Rule], Optional[str]]]
+
+
+def _html_rules() -> RuleTable:
+    rules: RuleTable = {}
+    rules[HTML_TEXT] = ([
+        _Rule("comment_open", r"<!--", COMMENT, HTML_COMMENT),
+        _Rule("declaration", r"<![A-Za-z][^>]*>?", TAG, None),
+        _Rule("close_lt", r"</(?=\s*[A-Za-z])", TAG_BRACKET, HTML_TAG_CLOSE),
+        _Rule("open_lt", r"<(?=[A-Za-z])", TAG_BRACKET, HTML_TAG_OPEN),
+    ], None)
+    rules[HTML_COMMENT] = ([_Rule("end", r"-->", COMMENT, HTML_TEXT)], COMMENT)
+    rules[HTML_TAG_OPEN] = ([
+        _Rule("style_name", r"(?i:style)(?![\w:-])", TAG, STYLE_TAG),
+        _Rule("script_name", r"(?i:script)(?![\w:-])", TAG, SCRIPT_TAG),
+        _Rule("name", r"[\w:-]+", TAG, HTML_TAG),
+        _Rule("gt", r">", TAG_BRACKET, HTML_TEXT),
+    ], None)
+    rules[HTML_TAG_CLOSE] = ([
+        _Rule("name", r"[\w:-]+", TAG, None),
+        _Rule("gt", r">", TAG_BRACKET, HTML_TEXT),
+    ], None)
+
+    for tag_state, dq_state, sq_state, on_close in (
+        (HTML_TAG, HTML_TAG_DQ, HTML_TAG_SQ, HTML_TEXT),
+        (STYLE_TAG, STYLE_TAG_DQ, STYLE_TAG_SQ, CSS_RULES | EMBEDDED),
+        (SCRIPT_TAG, SCRIPT_TAG_DQ, SCRIPT_TAG_SQ, JS_CODE | EMBEDDED),
+    ):
+        rules[tag_state] = (_tag_rules(dq_state, sq_state, on_close), None)
+        rules[dq_state] = (_quoted_rules('"', tag_state), STRING)
+        rules[sq_state] = (_quoted_rules("'", tag_state), STRING)
+    return rules
+
+
+def _css_rules() -> RuleTable:
+    rules: RuleTable = {}
+    css_string = [
+        _Rule("dq_string", r'"(?:[^"\\]|\\.)*"?', STRING, None),
+        _Rule("sq_string", r"'(?:[^'\\]|\\.)*'?", STRING, None),
+    ]
+    rules[CSS_RULES] = ([
+        _Rule("comment_open", r"/\*", COMMENT, CSS_COMMENT),
+        *css_string,
+        _Rule("at_rule", r"@[\w-]+", CSS_SELECTOR, None),
+        _Rule("block_open", r"\{", None, CSS_BLOCK),
+        _Rule("selector", r"[^\s{}/;,\"'<@]+", CSS_SELECTOR, None),
+    ], None)
+    rules[CSS_BLOCK] = ([
+        _Rule("comment_open", r"/\*", COMMENT, CSS_BLOCK_COMMENT),
+        *css_string,
+        _Rule("block_close", r"\}", None, CSS_RULES),
+        _Rule("nested_selector", r"[^\s{};\"'/<][^{};\"'/<]*(?=\{)", CSS_SELECTOR, None),
+        _Rule("property", r"-?[A-Za-z][\w-]*(?=\s*:)", CSS_PROPERTY, None),
+        _Rule("value", r":[^;{}\"'<]*", CSS_VALUE, None),
+    ], None)
+    rules[CSS_COMMENT] = ([_Rule("end", r"\*/", COMMENT, CSS_RULES)], COMMENT)
+    rules[CSS_BLOCK_COMMENT] = ([_Rule("end", r"\*/", COMMENT, CSS_BLOCK)], COMMENT)
+    return rules
+
+
+def _js_rules() -> RuleTable:
+    rules: RuleTable = {}
+    rules[JS_CODE] = ([
+        _Rule("line_comment", r"//.*", COMMENT, None),
+        _Rule("comment_open", r"/\*", COMMENT, JS_COMMENT),
+        _Rule("dq_string", r'"(?:[^"\\]|\\.)*"?', STRING, None),
+        _Rule("sq_string", r"'(?:[^'\\]|\\.)*'?", STRING, None),
+        _Rule("template_open", r"`", STRING, JS_TEMPLATE),
+        _Rule("number", r"\b(?:0[xX][0-9a-fA-F]+|\d+(?:\.\d+)?(?:[eE][+-]?\d+)?)\b", NUMBER, None),
+        _Rule("identifier", r"[A-Za-z_$][\w$]*", _JS_IDENTIFIER_KINDS, None),
+    ], None)
+    rules[JS_COMMENT] = ([_Rule("end", r"\*/", COMMENT, JS_CODE)], COMMENT)
+    rules[JS_TEMPLATE] = ([
+        _Rule("escape", r"\\.", STRING, None),
+        _Rule("end", r"`", STRING, JS_CODE),
+    ], STRING)
+    return rules
+
+
+def _embedded_variant(rule_list: List[_Rule], close_pattern: str) -> List[_Rule]:
+    """
+    Returns the rules for a CSS/JS state embedded in HTML: the closing tag is
+    recognised everywhere (even inside comments and strings, as browsers do) and
+    every transition stays within the embedded state family.
+    """
+    embedded = [_Rule("close_tag", close_pattern, TAG, HTML_TEXT)]
+    # Rules that consume text within a line stop short of the closing tag
+    # (block comments and template literals fill their state, so the tag is found there anyway)
+    not_closing = f"(?!{close_pattern})"
+    stopping = {
+        "line_comment": f"//(?:{not_closing}.)*",
+        "dq_string": rf'"(?:{not_closing}[^"\\]|\\{not_closing}.)*"?',
+        "sq_string": rf"'(?:{not_closing}[^'\\]|\\{not_closing}.)*'?",
+    }
+    for rule in rule_list:
+        pattern = stopping.get(rule.name, rule.pattern)
+        next_state = rule.next_state
+        if next_state is not None:
+            next_state |= EMBEDDED
+        embedded.append(rule._replace(pattern=pattern, next_state=next_state))
+    return embedded
+
+
+def _compile(rule_list: List[_Rule], fill: Optional[str]) -> _CompiledState:
+    regex = re.compile("|".join(f"(?P<{r.name}>{r.pattern})" for r in rule_list))
+    actions = {r.name: (r.token, r.next_state) for r in rule_list}
+    return _CompiledState(regex, actions, fill)
+
+
+def _compile_table(rules: RuleTable, embedded_close: Optional[str] = None) -> Dict[int, _CompiledState]:
+    """Compiles a rule table; with `embedded_close`, as the EMBEDDED variant."""
+    compiled: Dict[int, _CompiledState] = {}
+    for state, (rule_list, fill) in rules.items():
+        if embedded_close:
+            compiled[state | EMBEDDED] = _compile(_embedded_variant(rule_list, embedded_close), fill)
+        else:
+            compiled[state] = _compile(rule_list, fill)
+    return compiled
+
+
+class Lexer:
+    """
+    A language's state table plus the single-pass scanning loop.
+
+    Each lexer only holds the states its language can be in, so a CSS file never
+    pays for HTML or JavaScript rules. The HTML lexer additionally carries the
+    embedded CSS/JS states it hands <style>/<script> bodies to.
+    """
+    def __init__(self, language: str, states: Dict[int, _CompiledState], initial_state: int):
+        self.language = language
+        self.states = states
+        self.initial_state = initial_state
+
+    def lex_line(self, text: str, state: int) -> Tuple[List[Span], int]:
+        """
+        Tokenizes one line starting in `state`.
+
+        Returns the list of (start, length, token_kind) spans, in order and
+        non-overlapping, and the state the line ends in.
+        """
+        spans: List[Span] = []
+        states = self.states
+        compiled = states.get(state)
+        if compiled is None:  # Unknown/stale block state, restart the language
+            state = self.initial_state
+            compiled = states[state]
+
+        pos = 0
+        length = len(text)
+        while pos < length:
+            match = compiled.regex.search(text, pos)
+            if match is None:
+                if compiled.fill:
+                    spans.append((pos, length - pos, compiled.fill))
+                break
+
+            start, end = match.span()
+            if compiled.fill and start > pos:
+                spans.append((pos, start - pos, compiled.fill))
+
+            token, next_state = compiled.actions[match.lastgroup]
+            if token is not None:
+                kind = token if isinstance(token, str) else token.get(match.group())
+                if kind is not None:
+                    # Merge with the previous span when contiguous and of the same
+                    # kind (e.g. a comment body followed by its terminator), so the
+                    # highlighter issues fewer setFormat calls.
+                    if spans and spans[-1][2] == kind and sum(spans[-1][:2]) == start:
+                        prev_start = spans[-1][0]
+                        spans[-1] = (prev_start, end - prev_start, kind)
+                    else:
+                        spans.append((start, end - start, kind))
+
+            if next_state is not None and next_state != state:
+                state = next_state
+                compiled = states[state]
+            pos = end if end > start else start + 1
+
+        return spans, state
+
+
+# Compiled once per process and shared by every highlighter.
+CSS_LEXER = Lexer("css", _compile_table(_css_rules()), CSS_RULES)
+JS_LEXER = Lexer("js", _compile_table(_js_rules()), JS_CODE)
+HTML_LEXER = Lexer("html", {
+    **_compile_table(_html_rules()),
+    **_compile_table(_css_rules(), _CLOSE_STYLE),
+    **_compile_table(_js_rules(), _CLOSE_SCRIPT),
+}, HTML_TEXT)
+
+LEXERS = {lexer.language: lexer for lexer in (HTML_LEXER, CSS_LEXER, JS_LEXER)}
+
+
+def lexer_for_language(language: str) -> Lexer:
+    """Returns the shared lexer for 'html', 'css' or 'js' (HTML for anything else)."""
+    return LEXERS.get(language, HTML_LEXER)
@@ -5,6 +5,8 @@ from PyQt6.QtCore import QSettings, Qt
 from PyQt6.QtGui import QColor, QPalette, QIcon
 from PyQt6.QtWidgets import QApplication, QStyleFactory
 
+from .highlight_registry import HighlightFormatRegistry
+
 logger = logging.getLogger(__name__)
 
 class ThemeManager:
@@ -68,6 +70,9 @@ class ThemeManager:
 
         # Apply the QSS stylesheet
         self.app.setStyleSheet(qss)
+
+        # Recolor syntax highlighting in open editors (shared formats, no new highlighters)
+        HighlightFormatRegistry.instance().set_theme(theme_name)
         logger.info(f"Applied theme: {theme_name}")
 
         # Save the selected theme preference
@@ -0,0 +1,322 @@
+# website_builder/utils/trigram_index.py
+"""
+Trigram index of a project's text files, used to narrow find-in-files
+queries down to the files that can possibly match.
+
+Every indexed file is reduced to the set of three-character substrings
+(trigrams) of its lowercased text. A literal query can only match files
+containing all of its trigrams; a regular expression is reduced to a plan of
+the literals any match must contain (AND/OR of literals), evaluated the same
+way. Candidates are then verified by actually searching them, so the index
+only has to be a superset: lowercasing makes it serve case-insensitive
+queries too, and parts of a pattern it cannot reason about simply do not
+restrict the candidates.
+"""
+import os
+import json
+import zlib
+import array
+import struct
+import hashlib
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    from re import _parser as sre_parse # Python 3.11+
+    from re import _constants as sre_constants
+except ImportError: # pragma: no cover - older Pythons
+    import sre_parse
+    import sre_constants
+
+from PyQt6.QtCore import QStandardPaths
+
+from .file_loader import decode_text, sniff_encoding
+from .file_saver import FSYNC_NEVER, write_atomic, temp_path_for
+
+logger = logging.getLogger(__name__)
+
+INDEX_FORMAT_VERSION = 1
+INDEX_MAGIC = b"FXTI"
+SEARCH_MAX_FILE_BYTES = 4 * 1024 * 1024 # Bigger files are neither indexed nor searched
+BINARY_SNIFF_BYTES = 8192
+
+
+def read_searchable_text(file_path: str) -> Optional[str]:
+    """
+    Returns a file's text decoded like the editor decodes it, or None for
+    binary files, files over SEARCH_MAX_FILE_BYTES and unreadable files.
+    """
+    try:
+        if os.path.getsize(file_path) > SEARCH_MAX_FILE_BYTES:
+            return None
+        with open(file_path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    if is_binary(data):
+        return None
+    return decode_text(data)[0]
+
+
+def is_binary(data: bytes) -> bool:
+    """Whether file bytes look binary: a NUL byte early on (which UTF-16/32 text with a BOM may have)."""
+    head = data[:BINARY_SNIFF_BYTES]
+    return b"\0" in head and not (sniff_encoding(head[:4]) or "").startswith(("utf-16", "utf-32"))
+
+
+def trigrams_of(text: str) -> Set[str]:
+    """The distinct trigrams of a text, lowercased."""
+    text = text.lower()
+    return set(map("".join, zip(text, text[1:], text[2:])))
+
+
+# --- Query plans ---
+# A plan is None (any file may match), ("lit", text), ("and", [plans]) or ("or", [plans]).
+
+def _literal_plan(text: str):
+    # Case folding of non-ASCII characters does not always agree between
+    # str.lower() and the re module, so only ASCII runs are relied on
+    runs = [run for run in "".join(c if c.isascii() else "\0" for c in text).split("\0") if len(run) >= 3]
+    return _and_plan([("lit", run) for run in runs])
+
+
+def _and_plan(plans):
+    plans = [plan for plan in plans if plan is not None]
+    if not plans:
+        return None
+    return plans[0] if len(plans) == 1 else ("and", plans)
+
+
+def _or_plan(plans):
+    if not plans or any(plan is None for plan in plans):
+        return None # One unconstrained alternative makes the whole alternation unconstrained
+    return plans[0] if len(plans) == 1 else ("or", plans)
+
+
+def _regex_plan(parsed) -> Optional[tuple]:
+    plans, run = [], []
+
+    def flush():
+        if run:
+            plans.append(_literal_plan("".join(run)))
+            run.clear()
+
+    for op, av in parsed:
+        if op is sre_constants.LITERAL:
+            run.append(chr(av))
+            continue
+        flush()
+        if op is sre_constants.SUBPATTERN:
+            plans.append(_regex_plan(av[-1]))
+        elif op in (sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT,
+                    getattr(sre_constants, "POSSESSIVE_REPEAT", None)):
+            minimum, _maximum, item = av
+            if minimum >= 1:
+                plans.append(_regex_plan(item))
+        elif op is getattr(sre_constants, "ATOMIC_GROUP", None):
+            plans.append(_regex_plan(av))
+        elif op is sre_constants.BRANCH:
+            plans.append(_or_plan([_regex_plan(branch) for branch in av[1]]))
+        # Character classes, anchors, lookarounds, backreferences...: no constraint
+    flush()
+    return _and_plan(plans)
+
+
+def query_plan(query: str, regex: bool) -> Optional[tuple]:
+    """
+    The literal constraints any match of a query satisfies (see module doc).
+    Raises re.error for an invalid regular expression.
+    """
+    if not regex:
+        return _literal_plan(query)
+    return _regex_plan(sre_parse.parse(query))
+
+
+class TrigramIndex:
+    """
+    Trigram -> file postings for a set of files, updated one file at a time.
+    Thread-safe: indexing workers update it while searches read it.
+    """
+    def __init__(self):
+        self._files: Dict[str, Tuple[tuple, Tuple[str, ...]]] = {} # path -> (stamp, trigrams)
+        self._ids: Dict[str, int] = {}
+        self._paths: List[Optional[str]] = []
+        self._free_ids: List[int] = []
+        self._postings: Dict[str, Set[int]] = {}
+        self._interned: Dict[str, str] = {} # One string object per distinct trigram, shared by all files
+        self._lock = threading.Lock()
+
+    def update_file(self, file_path: str, stamp: tuple, trigrams: Iterable[str]):
+        interned = self._interned
+        with self._lock:
+            self._drop(file_path)
+            file_trigrams = tuple(interned.setdefault(t, t) for t in trigrams)
+            file_id = self._free_ids.pop() if self._free_ids else len(self._paths)
+            if file_id == len(self._paths):
+                self._paths.append(file_path)
+            else:
+                self._paths[file_id] = file_path
+            self._ids[file_path] = file_id
+            self._files[file_path] = (stamp, file_trigrams)
+            postings = self._postings
+            for trigram in file_trigrams:
+                file_ids = postings.get(trigram)
+                if file_ids is None:
+                    postings[trigram] = {file_id}
+                else:
+                    file_ids.add(file_id)
+
+    def remove_file(self, file_path: str):
+        with self._lock:
+            self._drop(file_path)
+
+    def remove_tree(self, directory: str):
+        prefix = os.path.join(directory, "")
+        with self._lock:
+            for file_path in [fp for fp in self._files if fp.startswith(prefix)]:
+                self._drop(file_path)
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+            self._ids.clear()
+            self._paths.clear()
+            self._free_ids.clear()
+            self._postings.clear()
+            self._interned.clear()
+
+    def _drop(self, file_path: str):
+        entry = self._files.pop(file_path, None)
+        if entry is None:
+            return
+        file_id = self._ids.pop(file_path)
+        self._paths[file_id] = None
+        self._free_ids.append(file_id)
+        for trigram in entry[1]:
+            file_ids = self._postings.get(trigram)
+            if file_ids is not None:
+                file_ids.discard(file_id)
+                if not file_ids:
+                    del self._postings[trigram]
+
+    def stamp(self, file_path: str) -> Optional[tuple]:
+        with self._lock:
+            entry = self._files.get(file_path)
+            return entry[0] if entry else None
+
+    def stamps(self) -> Dict[str, tuple]:
+        with self._lock:
+            return {file_path: entry[0] for file_path, entry in self._files.items()}
+
+    def file_count(self) -> int:
+        return len(self._files)
+
+    def candidates(self, plan) -> List[str]:
+        """The indexed files that may contain a match of `plan`, sorted by path."""
+        with self._lock:
+            if plan is None:
+                file_ids = set(self._ids.values())
+            else:
+                file_ids = self._evaluate(plan)
+            return sorted(self._paths[file_id] for file_id in file_ids)
+
+    def _evaluate(self, plan) -> Set[int]:
+        kind, value = plan
+        if kind == "lit":
+            postings = [self._postings.get(t) for t in trigrams_of(value)]
+            if any(p is None for p in postings):
+                return set()
+            postings.sort(key=len) # Intersect starting from the rarest trigram
+            result = set(postings[0])
+            for file_ids in postings[1:]:
+                result &= file_ids
+                if not result:
+                    break
+            return result
+        results = [self._evaluate(child) for child in value]
+        if kind == "and":
+            results.sort(key=len)
+            return set.intersection(*results)
+        return set.union(*results)
+
+    def snapshot(self) -> List[Tuple[str, tuple, Tuple[str, ...]]]:
+        with self._lock:
+            return [(file_path, stamp, trigrams) for file_path, (stamp, trigrams) in self._files.items()]
+
+
+# --- Persistence ---
+
+def index_path_for(project_path: str) -> str:
+    """Where a project's search index is cached (application data, named after the project path)."""
+    data_dir = QStandardPaths.writableLocation(QStandardPaths.StandardLocation.AppDataLocation)
+    key = hashlib.sha1(os.path.abspath(project_path).encode("utf-8")).hexdigest()[:16]
+    return os.path.join(data_dir, "search_index", f"{key}.bin")
+
+
+def save_index(index: TrigramIndex, project_path: str):
+    """
+    Writes an index to disk. Layout (after the magic and version, zlib
+    compressed): a JSON header listing files (relative path, stamp, trigram
+    count), the table of distinct trigrams, then every file's trigrams as
+    uint32 offsets into that table.
+    """
+    entries = index.snapshot()
+    table: Dict[str, int] = {}
+    offsets = array.array("I")
+    files = []
+    for file_path, stamp, trigrams in entries:
+        files.append([os.path.relpath(file_path, project_path), stamp[0], stamp[1], len(trigrams)])
+        offsets.extend(table.setdefault(t, len(table)) for t in trigrams)
+    header = json.dumps({"files": files}).encode("utf-8")
+    trigram_table = "".join(table).encode("utf-8")
+    payload = b"".join((
+        struct.pack("<I", len(header)), header,
+        struct.pack("<I", len(trigram_table)), trigram_table,
+        offsets.tobytes(),
+    ))
+    data = INDEX_MAGIC + struct.pack("<I", INDEX_FORMAT_VERSION) + zlib.compress(payload, 1)
+
+    path = index_path_for(project_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, data, temp_path_for(path), FSYNC_NEVER)
+    logger.debug(f"Saved search index ({len(files)} files, {len(data) / 1024:.0f} KiB): {path}")
+
+
+def load_index(project_path: str) -> Optional[TrigramIndex]:
+    """Reads a project's saved index, or returns None if there is none (or it is unusable)."""
+    path = index_path_for(project_path)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        logger.warning(f"Could not read search index {path}: {e}")
+        return None
+    try:
+        if data[:4] != INDEX_MAGIC or struct.unpack_from("<I", data, 4)[0] != INDEX_FORMAT_VERSION:
+            logger.info(f"Ignoring search index with unsupported format: {path}")
+            return None
+        payload = zlib.decompress(data[8:])
+        header_length = struct.unpack_from("<I", payload, 0)[0]
+        offset = 4 + header_length
+        files = json.loads(payload[4:offset].decode("utf-8"))["files"]
+        table_length = struct.unpack_from("<I", payload, offset)[0]
+        offset += 4
+        table_text = payload[offset:offset + table_length].decode("utf-8")
+        offset += table_length
+        table = [table_text[i:i + 3] for i in range(0, len(table_text), 3)]
+        offsets = array.array("I")
+        offsets.frombytes(payload[offset:])
+
+        index = TrigramIndex()
+        position = 0
+        for relative_path, mtime_ns, size, count in files:
+            trigrams = [table[i] for i in offsets[position:position + count]]
+            position += count
+            index.update_file(os.path.normpath(os.path.join(project_path, relative_path)), (mtime_ns, size), trigrams)
+        return index
+    except (ValueError, KeyError, IndexError, TypeError, struct.error, zlib.error) as e:
+        logger.warning(f"Ignoring corrupt search index {path}: {e}")
+        return None
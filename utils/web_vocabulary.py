@@ -0,0 +1,198 @@
+# website_builder/utils/web_vocabulary.py
+"""
+Built-in HTML and CSS vocabulary for completion. Lists are ordered from most
+to least commonly used; the order becomes the initial frequency ranking.
+"""
+
+HTML_TAGS = (
+    "div", "a", "span", "p", "li", "img", "script", "link", "meta", "ul", "button", "input",
+    "section", "h1", "h2", "h3", "i", "br", "form", "label", "nav", "footer", "header", "style",
+    "strong", "option", "td", "tr", "main", "article", "svg", "path", "select", "textarea", "table",
+    "h4", "h5", "h6", "em", "small", "ol", "hr", "iframe", "title", "head", "body", "html", "th",
+    "thead", "tbody", "tfoot", "aside", "figure", "figcaption", "picture", "source", "video", "audio",
+    "canvas", "noscript", "blockquote", "code", "pre", "b", "u", "s", "sub", "sup", "abbr", "address",
+    "time", "mark", "dl", "dt", "dd", "fieldset", "legend", "details", "summary", "dialog", "template",
+    "slot", "caption", "colgroup", "col", "optgroup", "datalist", "output", "progress", "meter",
+    "embed", "object", "track", "map", "area", "base", "cite", "q", "kbd", "samp", "var", "del",
+    "ins", "wbr", "bdi", "bdo", "ruby", "rt", "rp", "data", "search", "menu", "hgroup",
+)
+
+GLOBAL_ATTRIBUTES = (
+    "class", "id", "style", "title", "role", "hidden", "tabindex", "lang", "dir", "draggable",
+    "contenteditable", "spellcheck", "translate", "accesskey", "inert", "popover", "slot",
+    "aria-label", "aria-hidden", "aria-expanded", "aria-controls", "aria-describedby",
+    "aria-labelledby", "aria-current", "aria-live", "aria-selected", "aria-disabled",
+    "data-", "onclick", "onchange", "oninput", "onsubmit", "onload", "onkeydown", "onkeyup",
+    "onmouseover", "onmouseout", "onfocus", "onblur",
+)
+
+TAG_ATTRIBUTES = {
+    "a": ("href", "target", "rel", "download", "hreflang", "type", "referrerpolicy", "ping"),
+    "img": ("src", "alt", "width", "height", "loading", "srcset", "sizes", "decoding", "crossorigin",
+            "usemap", "fetchpriority", "referrerpolicy"),
+    "script": ("src", "type", "defer", "async", "crossorigin", "integrity", "nomodule", "referrerpolicy"),
+    "link": ("rel", "href", "type", "media", "crossorigin", "integrity", "as", "sizes", "hreflang"),
+    "meta": ("name", "content", "charset", "http-equiv", "property"),
+    "input": ("type", "name", "value", "placeholder", "required", "disabled", "checked", "readonly",
+              "autocomplete", "autofocus", "min", "max", "step", "pattern", "maxlength", "minlength",
+              "multiple", "accept", "form", "list", "size", "src", "alt"),
+    "button": ("type", "name", "value", "disabled", "form", "formaction", "formmethod", "popovertarget"),
+    "form": ("action", "method", "enctype", "target", "novalidate", "autocomplete", "name", "accept-charset"),
+    "label": ("for", "form"),
+    "select": ("name", "required", "disabled", "multiple", "size", "form", "autocomplete"),
+    "option": ("value", "selected", "disabled", "label"),
+    "textarea": ("name", "rows", "cols", "placeholder", "required", "disabled", "readonly", "maxlength",
+                 "minlength", "wrap", "autocomplete", "form"),
+    "iframe": ("src", "width", "height", "allow", "allowfullscreen", "loading", "name", "sandbox",
+               "srcdoc", "referrerpolicy"),
+    "video": ("src", "controls", "autoplay", "loop", "muted", "poster", "preload", "width", "height",
+              "playsinline", "crossorigin"),
+    "audio": ("src", "controls", "autoplay", "loop", "muted", "preload", "crossorigin"),
+    "source": ("src", "type", "srcset", "sizes", "media"),
+    "track": ("src", "kind", "srclang", "label", "default"),
+    "td": ("colspan", "rowspan", "headers"),
+    "th": ("colspan", "rowspan", "scope", "headers", "abbr"),
+    "ol": ("start", "reversed", "type"),
+    "li": ("value",),
+    "html": ("lang", "xmlns"),
+    "style": ("media", "nonce"),
+    "time": ("datetime",),
+    "details": ("open", "name"),
+    "dialog": ("open",),
+    "canvas": ("width", "height"),
+    "svg": ("viewBox", "width", "height", "xmlns", "fill", "stroke"),
+    "path": ("d", "fill", "stroke", "stroke-width"),
+    "area": ("href", "alt", "shape", "coords", "target"),
+    "object": ("data", "type", "width", "height", "name"),
+    "embed": ("src", "type", "width", "height"),
+    "progress": ("value", "max"),
+    "meter": ("value", "min", "max", "low", "high", "optimum"),
+    "base": ("href", "target"),
+    "q": ("cite",),
+    "blockquote": ("cite",),
+    "del": ("cite", "datetime"),
+    "ins": ("cite", "datetime"),
+    "col": ("span",),
+    "colgroup": ("span",),
+    "output": ("for", "form", "name"),
+    "fieldset": ("disabled", "form", "name"),
+    "optgroup": ("label", "disabled"),
+}
+
+# Attributes whose value is a path or URL
+PATH_ATTRIBUTES = frozenset({"href", "src", "action", "poster", "data", "cite", "formaction"})
+
+CSS_PROPERTIES = (
+    "color", "display", "width", "margin", "padding", "background", "font-size", "height",
+    "position", "border", "background-color", "text-align", "top", "font-weight", "left",
+    "margin-top", "line-height", "border-radius", "font-family", "margin-bottom", "align-items",
+    "justify-content", "flex", "z-index", "overflow", "opacity", "cursor", "transition", "right",
+    "bottom", "max-width", "box-shadow", "padding-left", "margin-left", "gap", "transform",
+    "text-decoration", "content", "padding-top", "min-height", "flex-direction", "border-bottom",
+    "margin-right", "padding-right", "padding-bottom", "box-sizing", "min-width", "grid-template-columns",
+    "flex-wrap", "white-space", "vertical-align", "background-image", "background-size", "font-style",
+    "border-top", "text-transform", "letter-spacing", "max-height", "outline", "visibility",
+    "background-position", "background-repeat", "float", "clear", "list-style", "overflow-x",
+    "overflow-y", "pointer-events", "animation", "text-overflow", "flex-grow", "flex-shrink",
+    "flex-basis", "align-self", "align-content", "justify-items", "justify-self", "order",
+    "grid-template-rows", "grid-column", "grid-row", "grid-area", "grid-template-areas", "grid-gap",
+    "row-gap", "column-gap", "place-items", "place-content", "border-color", "border-width",
+    "border-style", "border-left", "border-right", "border-collapse", "border-spacing", "filter",
+    "backdrop-filter", "object-fit", "object-position", "aspect-ratio", "inset", "user-select",
+    "word-break", "word-wrap", "overflow-wrap", "text-shadow", "font", "font-variant",
+    "list-style-type", "list-style-position", "table-layout", "resize", "scroll-behavior",
+    "transform-origin", "transition-property", "transition-duration", "transition-timing-function",
+    "transition-delay", "animation-name", "animation-duration", "animation-timing-function",
+    "animation-delay", "animation-iteration-count", "animation-direction", "animation-fill-mode",
+    "will-change", "clip-path", "mix-blend-mode", "isolation", "outline-offset", "caret-color",
+    "accent-color", "appearance", "columns", "column-count", "hyphens", "text-indent",
+    "background-attachment", "background-clip", "background-origin", "mask", "scroll-snap-type",
+    "scroll-snap-align", "scroll-margin", "scroll-padding", "container-type", "container-name",
+    "counter-reset", "counter-increment", "quotes", "direction", "unicode-bidi", "writing-mode",
+    "tab-size", "font-display", "src", "touch-action", "contain", "content-visibility",
+)
+
+_SIZE_VALUES = ("auto", "0", "100%", "fit-content", "min-content", "max-content", "inherit")
+_COLOR_VALUES = ("transparent", "currentColor", "inherit", "white", "black", "red", "blue", "green",
+                 "gray", "rgb()", "rgba()", "hsl()", "var()")
+
+CSS_VALUES = {
+    "display": ("flex", "block", "none", "inline-block", "grid", "inline", "inline-flex", "contents",
+                "table", "table-cell", "list-item", "inline-grid", "flow-root"),
+    "position": ("relative", "absolute", "fixed", "sticky", "static"),
+    "text-align": ("center", "left", "right", "justify", "start", "end"),
+    "font-weight": ("bold", "normal", "400", "500", "600", "700", "300", "800", "lighter", "bolder"),
+    "align-items": ("center", "flex-start", "flex-end", "stretch", "baseline", "start", "end"),
+    "align-self": ("center", "flex-start", "flex-end", "stretch", "baseline", "auto"),
+    "align-content": ("center", "flex-start", "flex-end", "space-between", "space-around", "stretch"),
+    "justify-content": ("center", "space-between", "flex-start", "flex-end", "space-around",
+                        "space-evenly", "start", "end", "stretch"),
+    "flex-direction": ("column", "row", "row-reverse", "column-reverse"),
+    "flex-wrap": ("wrap", "nowrap", "wrap-reverse"),
+    "overflow": ("hidden", "auto", "scroll", "visible", "clip"),
+    "overflow-x": ("hidden", "auto", "scroll", "visible", "clip"),
+    "overflow-y": ("hidden", "auto", "scroll", "visible", "clip"),
+    "cursor": ("pointer", "default", "not-allowed", "text", "move", "grab", "grabbing", "crosshair",
+               "help", "wait", "progress", "zoom-in", "zoom-out"),
+    "visibility": ("hidden", "visible", "collapse"),
+    "white-space": ("nowrap", "normal", "pre", "pre-wrap", "pre-line", "break-spaces"),
+    "text-decoration": ("none", "underline", "line-through", "overline"),
+    "text-transform": ("uppercase", "lowercase", "capitalize", "none"),
+    "text-overflow": ("ellipsis", "clip"),
+    "box-sizing": ("border-box", "content-box"),
+    "float": ("left", "right", "none"),
+    "clear": ("both", "left", "right", "none"),
+    "font-style": ("italic", "normal", "oblique"),
+    "vertical-align": ("middle", "top", "bottom", "baseline", "text-top", "text-bottom", "sub", "super"),
+    "pointer-events": ("none", "auto"),
+    "user-select": ("none", "auto", "text", "all"),
+    "object-fit": ("cover", "contain", "fill", "none", "scale-down"),
+    "background-size": ("cover", "contain", "auto"),
+    "background-repeat": ("no-repeat", "repeat", "repeat-x", "repeat-y", "space", "round"),
+    "background-position": ("center", "top", "bottom", "left", "right"),
+    "background-attachment": ("fixed", "scroll", "local"),
+    "border-style": ("solid", "dashed", "dotted", "none", "double", "groove", "ridge", "inset", "outset"),
+    "border-collapse": ("collapse", "separate"),
+    "list-style": ("none", "disc", "circle", "square", "decimal"),
+    "list-style-type": ("none", "disc", "circle", "square", "decimal", "lower-alpha", "upper-roman"),
+    "word-break": ("break-word", "break-all", "keep-all", "normal"),
+    "overflow-wrap": ("break-word", "anywhere", "normal"),
+    "resize": ("none", "both", "horizontal", "vertical"),
+    "scroll-behavior": ("smooth", "auto"),
+    "table-layout": ("fixed", "auto"),
+    "appearance": ("none", "auto"),
+    "transition-timing-function": ("ease", "ease-in-out", "linear", "ease-in", "ease-out", "cubic-bezier()"),
+    "animation-timing-function": ("ease", "ease-in-out", "linear", "ease-in", "ease-out", "cubic-bezier()"),
+    "animation-iteration-count": ("infinite", "1"),
+    "animation-direction": ("normal", "reverse", "alternate", "alternate-reverse"),
+    "animation-fill-mode": ("forwards", "backwards", "both", "none"),
+    "font-display": ("swap", "block", "fallback", "optional", "auto"),
+    "direction": ("ltr", "rtl"),
+    "writing-mode": ("horizontal-tb", "vertical-rl", "vertical-lr"),
+    "container-type": ("inline-size", "size", "normal"),
+    "content-visibility": ("auto", "visible", "hidden"),
+    "mix-blend-mode": ("multiply", "screen", "overlay", "darken", "lighten", "normal", "difference"),
+    "isolation": ("isolate", "auto"),
+    "hyphens": ("auto", "manual", "none"),
+    "touch-action": ("none", "manipulation", "pan-x", "pan-y", "auto"),
+    "color": _COLOR_VALUES,
+    "background-color": _COLOR_VALUES,
+    "border-color": _COLOR_VALUES,
+    "caret-color": _COLOR_VALUES,
+    "accent-color": _COLOR_VALUES,
+    "width": _SIZE_VALUES,
+    "height": _SIZE_VALUES,
+    "min-width": _SIZE_VALUES,
+    "max-width": _SIZE_VALUES + ("none",),
+    "min-height": _SIZE_VALUES + ("100vh",),
+    "max-height": _SIZE_VALUES + ("none",),
+    "margin": ("0", "auto", "0 auto"),
+    "flex": ("1", "auto", "none", "1 1 0"),
+    "grid-template-columns": ("repeat()", "1fr", "auto", "minmax()", "subgrid"),
+    "grid-template-rows": ("repeat()", "1fr", "auto", "minmax()", "subgrid"),
+    "transform": ("translate()", "translateX()", "translateY()", "scale()", "rotate()", "none"),
+    "content": ('""', "none", "attr()", "counter()"),
+}
+
+# Keywords valid for any property
+CSS_GLOBAL_VALUES = ("inherit", "initial", "unset", "revert", "var()", "calc()")
@@ -1,189 +1,69 @@
 # website_builder/views/code_editor.py
 import os
+import time
 import logging # Use logging instead of prints for internal info
-from typing import Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from PyQt6.QtCore import QFileSystemWatcher, QRegularExpression, Qt, pyqtSignal
-from PyQt6.QtGui import QColor, QFont, QSyntaxHighlighter, QTextCharFormat
+from PyQt6 import sip
+from PyQt6.QtCore import QSettings, Qt, QThreadPool, QTimer, pyqtSignal
+from PyQt6.QtGui import QAction, QColor, QFont, QKeySequence, QTextCharFormat, QTextCursor, QTextDocument
 from PyQt6.QtWidgets import (
+    QHBoxLayout,
+    QLabel,
     QMessageBox,
+    QPlainTextDocumentLayout,
     QPlainTextEdit,
+    QProgressBar,
     QPushButton,
     QTabWidget,
+    QTextEdit,
     QVBoxLayout,
     QWidget,
 )
 
-logger = logging.getLogger(__name__)
-
-# --- Enhanced Syntax Highlighter ---
-class EnhancedHtmlCssJsHighlighter(QSyntaxHighlighter):
-    """Basic syntax highlighter for HTML, CSS, and JavaScript."""
-    def __init__(self, parent=None):
-        super().__init__(parent)
-        self.highlightingRules = []
-
-        # Define comment expressions for multi-line handling
-        self.commentStartExpression = QRegularExpression("/\\*")
-        self.commentEndExpression = QRegularExpression("\\*/")
-        self.multiLineCommentFormat = QTextCharFormat()
-        self.multiLineCommentFormat.setForeground(QColor(128, 128, 128)) # Gray
-        self.multiLineCommentFormat.setFontItalic(True)
-
-        # --- Common Formats ---
-        def create_format(color: QColor, bold: bool = False, italic: bool = False) -> QTextCharFormat:
-            fmt = QTextCharFormat()
-            fmt.setForeground(color)
-            if bold:
-                fmt.setFontWeight(QFont.Weight.Bold)
-            if italic:
-                fmt.setFontItalic(True)
-            return fmt
-
-        # --- HTML ---
-        htmlKeywordFormat = create_format(QColor(0, 0, 128), bold=True) # Dark Blue
-        htmlKeywords = [
-            "html", "head", "body", "title", "div", "span", "p", "a", "img", "ul", "ol", "li",
-            "table", "tr", "td", "th", "form", "input", "button", "textarea", "select",
-            "option", "meta", "link", "style", "script", "header", "footer", "nav",
-            "article", "section", "aside", "main", "figure", "figcaption"
-        ]
-        # Match opening and closing tags
-        for word in htmlKeywords:
-            try:
-                # Opening tag start (<tag) or self-closing (<tag />)
-                pattern_open = QRegularExpression(f"<\\s*{word}(\\b|(?=\\s|/?>))", QRegularExpression.PatternOption.CaseInsensitiveOption)
-                self.highlightingRules.append((pattern_open, htmlKeywordFormat))
-                # Closing tag (</tag>)
-                pattern_close = QRegularExpression(f"</\\s*{word}\\s*>", QRegularExpression.PatternOption.CaseInsensitiveOption)
-                self.highlightingRules.append((pattern_close, htmlKeywordFormat))
-            except Exception as e:
-                logger.error(f"Error creating HTML regex for '{word}': {e}")
-
-        htmlAttributeFormat = create_format(QColor(128, 0, 0)) # Dark Red
-        self.highlightingRules.append((QRegularExpression("\\b[a-zA-Z\\-:]+(?=\\s*=)"), htmlAttributeFormat))
-
-        htmlTagBracketFormat = create_format(QColor(128, 128, 128), bold=False) # Gray brackets
-        self.highlightingRules.append((QRegularExpression("[<>/]"), htmlTagBracketFormat)) # Highlight <, >, /
-
-        # --- CSS (Simplified - doesn't handle nested structures perfectly) ---
-        cssSelectorFormat = create_format(QColor(128, 0, 128)) # Purple
-        # Matches common selectors (element, class, id, attributes) at line start or after }
-        self.highlightingRules.append((QRegularExpression("(^\\s*|}\\s*)([\\w\\.#\\-\\*\\[\\]=:\"]+)(?=\\s*\\{)"), cssSelectorFormat))
-
-        cssPropertyFormat = create_format(QColor(0, 128, 0)) # Dark Green
-        self.highlightingRules.append((QRegularExpression("\\b([a-z\\-]+)(?=\\s*:)"), cssPropertyFormat))
-
-        cssValueFormat = create_format(QColor(0, 0, 200)) # Blue values
-        # Matches content between : and ; or }
-        self.highlightingRules.append((QRegularExpression(":\\s*([^;\\}]+)(?=[;\\}])"), cssValueFormat))
-
-        # --- JavaScript (Basic Keywords and Built-ins) ---
-        jsKeywordFormat = create_format(QColor(170, 120, 100), bold=True) # Darker red
-        jsKeywords = [
-            "function", "var", "let", "const", "if", "else", "for", "while", "return", "class",
-            "import", "export", "from", "new", "this", "super", "try", "catch", "finally",
-            "throw", "async", "await", "switch", "case", "default", "break", "continue",
-            "do", "delete", "in", "instanceof", "typeof", "void", "yield"
-        ]
-        for word in jsKeywords:
-            try:
-                pattern = QRegularExpression(f"\\b{word}\\b")
-                self.highlightingRules.append((pattern, jsKeywordFormat))
-            except Exception as e:
-                logger.error(f"Error creating JS keyword regex for '{word}': {e}")
-
-        jsBuiltinFormat = create_format(QColor(100, 100, 200)) # Lighter blue/purple
-        jsBuiltins = [
-            "document", "window", "console", "alert", "prompt", "confirm", "parseInt",
-            "parseFloat", "String", "Number", "Boolean", "Object", "Array", "Date",
-            "Math", "JSON", "RegExp", "Error", "setTimeout", "setInterval",
-            "clearTimeout", "clearInterval", "isNaN", "isFinite", "encodeURI",
-            "decodeURI", "encodeURIComponent", "decodeURIComponent", "Promise", "Map", "Set",
-            "Symbol", "Proxy", "Reflect", "fetch"
-        ]
-        for word in jsBuiltins:
-            try:
-                pattern = QRegularExpression(f"\\b{word}\\b")
-                self.highlightingRules.append((pattern, jsBuiltinFormat))
-            except Exception as e:
-                logger.error(f"Error creating JS builtin regex for '{word}': {e}")
-
-        # --- Common ---
-        commentFormat = create_format(QColor(128, 128, 128), italic=True) # Gray
-        self.highlightingRules.append((QRegularExpression("//[^\n]*"), commentFormat))
-        # Removed multi-line comment regex here, handled by block state logic below
-
-        stringFormat = create_format(QColor(0, 150, 0)) # Green strings
-        self.highlightingRules.append((QRegularExpression("\".*?\""), stringFormat))
-        self.highlightingRules.append((QRegularExpression("'.*?'"), stringFormat))
-        self.highlightingRules.append((QRegularExpression("`.*?`"), stringFormat)) # Template literals
-
-        numberFormat = create_format(QColor(200, 100, 0)) # Orange numbers
-        self.highlightingRules.append((QRegularExpression("\\b\\d+(?:\\.\\d+)?(?:[eE][+-]?\\d+)?\\b"), numberFormat))
-
-    def highlightBlock(self, text):
-        # Apply single-line rules first
-        for pattern, format_rule in self.highlightingRules:
-            try:
-                match_iterator = pattern.globalMatch(text)
-                while match_iterator.hasNext():
-                    match = match_iterator.next()
-                    start = match.capturedStart()
-                    length = match.capturedLength()
-                    # Check if inside a multi-line comment before applying format
-                    if not self.is_inside_multiline_comment(start):
-                        self.setFormat(start, length, format_rule)
-            except Exception as e:
-                 logger.error(f"Error in highlighter match processing: {e} with pattern {pattern.pattern()}")
-
-        # Handle multi-line comments using block state
-        self.setCurrentBlockState(0) # Default state: not in comment
-
-        startIndex = 0
-        # If previous block ended inside a comment, start searching from beginning
-        if self.previousBlockState() == 1:
-            startIndex = 0
-        else: # Otherwise, find the first /* in this block
-            match = self.commentStartExpression.match(text)
-            startIndex = match.capturedStart() if match.hasMatch() else -1
-
-        while startIndex >= 0:
-            # Find the end of the comment */
-            endMatch = self.commentEndExpression.match(text, startIndex + 2) # Start searching after /*
-            endIndex = endMatch.capturedStart()
-            commentLength = 0
-
-            if endIndex == -1: # Comment doesn't end in this block
-                self.setCurrentBlockState(1) # Mark block state as inside comment
-                commentLength = len(text) - startIndex
-            else: # Comment ends in this block
-                commentLength = endIndex - startIndex + endMatch.capturedLength()
-
-            # Apply the comment format
-            self.setFormat(startIndex, commentLength, self.multiLineCommentFormat)
-
-            # Find the next /* starting after the current comment ends
-            match = self.commentStartExpression.match(text, startIndex + commentLength)
-            startIndex = match.capturedStart() if match.hasMatch() else -1
-
-    def is_inside_multiline_comment(self, position: int) -> bool:
-        """Helper to check if a position is within a formatted multi-line comment."""
-        # This requires checking the format at the position, which is tricky
-        # as formats are applied sequentially. The block state method is more robust.
-        # For simplicity, this helper might not be perfectly accurate if other rules
-        # overwrite the comment format partially. Rely primarily on the block state logic.
-        # A simple check (might be inaccurate):
-        # current_format = self.format(position)
-        # return current_format == self.multiLineCommentFormat
-        return self.currentBlockState() == 1 # Rely on block state
+from utils.file_loader import FileLoadTask
+from utils.file_saver import DEFAULT_FSYNC_POLICY, FSYNC_POLICIES, FileSaveTask
+from utils.fs_events import DELETED, FileSystemEventService
+from utils.latency_metrics import OPEN_FIRST_HIGHLIGHT, OPEN_SET_TEXT, SAVE_TOTAL, LatencyMetrics
+from utils.lint_rules import ERROR
+from utils.session_store import EditorSession, SessionTab
+
+from .document_changes import DocumentChangeTracker
+from .document_patcher import patch_document
+from .editor_completer import EditorCompleter
+from .highlight_scheduler import HighlightScheduler
+from .keystroke_probe import KeystrokeLatencyProbe
+from .large_file_loader import LargeFileLoader
+from .syntax_highlighters import create_highlighter
+from .tab_hibernation import HibernatedTab, estimated_document_bytes
 
+logger = logging.getLogger(__name__)
 
 # --- Code Editor Widget ---
 class CodeEditorTabWidget(QWidget):
-    content_changed = pyqtSignal(str, str)  # file_path, content
+    content_changed = pyqtSignal(str, int, list)  # file_path, version, [ContentDelta] (coalesced)
     tab_closed_signal = pyqtSignal(str)  # file_path (emitted AFTER tab is removed)
     modification_changed = pyqtSignal(str, bool) # file_path, modified_status
+    save_finished = pyqtSignal(str, bool) # file_path, success (a background save completed)
+    current_file_changed = pyqtSignal(str) # file_path of the newly activated tab
+    definition_requested = pyqtSignal(str, str, int) # file_path, line text, column of the cursor
+    usages_requested = pyqtSignal(str, str, int) # file_path, line text, column of the cursor
+    document_loaded = pyqtSignal(str) # file_path whose editor (re)received its full text (open, wake, reload)
+
+    # Files at least this big open in large-file mode (memory-mapped, loaded in
+    # chunks, no highlighting, no content_changed). Configurable via QSettings.
+    LARGE_FILE_SETTING_KEY = "Editor/LargeFileThresholdMB"
+    DEFAULT_LARGE_FILE_THRESHOLD_MB = 8
+    # How hard saves push data to disk: "never", "file" (default) or "full"
+    SAVE_FSYNC_SETTING_KEY = "Editor/SaveFsyncPolicy"
+    # Memory open documents may use before the least recently used clean,
+    # inactive tabs are hibernated (0 disables hibernation)
+    TAB_MEMORY_BUDGET_SETTING_KEY = "Editor/TabMemoryBudgetMB"
+    DEFAULT_TAB_MEMORY_BUDGET_MB = 256
+    HIBERNATE_DELAY_MS = 1000 # Let rapid tab switching settle before evicting
+    SESSION_FILL_INTERVAL_MS = 50 # Pause between background loads of restored tabs
+    ERROR_UNDERLINE_COLOR = QColor("#e51400")
+    WARNING_UNDERLINE_COLOR = QColor("#d79b00")
 
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -194,11 +74,187 @@ class CodeEditorTabWidget(QWidget):
         self.tab_widget.setTabsClosable(True)
         self.tab_widget.setMovable(True)
         self.tab_widget.tabCloseRequested.connect(self.close_tab)
+        self.tab_widget.currentChanged.connect(self._on_current_tab_changed)
 
         self.layout.addWidget(self.tab_widget)
 
         self.open_files = {}  # Dictionary: file_path -> QPlainTextEdit widget
-        self.file_watchers = {}  # Dictionary: file_path -> QFileSystemWatcher
+        self.fs_subscriptions = {}  # Dictionary: file_path -> FileSystemEventService handle
+        self.large_file_loaders = {}  # Dictionary: file_path -> LargeFileLoader (while loading)
+        self.change_trackers = {}  # Dictionary: file_path -> DocumentChangeTracker
+        # Last known disk state (mtime, size, hash) per open file, from its last
+        # load, save or handled external change. Lets watcher pings be answered
+        # with a stat instead of a full read.
+        self.file_fingerprints = {}  # Dictionary: file_path -> FileFingerprint
+
+        # Files are read and decoded on worker threads; several opens (e.g. a
+        # restored session) run concurrently.
+        self.load_pool = QThreadPool(self)
+        self.load_pool.setMaxThreadCount(max(2, min(QThreadPool.globalInstance().maxThreadCount(), 8)))
+        self._pending_loads = {}  # Dictionary: file_path -> (request_id, FileLoadTask)
+        self._next_load_id = 0
+
+        # Saves are written on their own pool (temp file + rename), in parallel for Save All
+        self.save_pool = QThreadPool(self)
+        self.save_pool.setMaxThreadCount(4)
+        self._saves_in_flight = {}  # Dictionary: file_path -> FileSaveTask
+        self._queued_saves = {}  # Dictionary: file_path -> (content, batch) to write after the running save
+        self._next_save_id = 0
+        # Open files patched by a replace in files that is not committed yet:
+        # file_path -> (editor, was modified before, undo steps right after the patch)
+        self._uncommitted_edits = {}
+
+        # Tab hibernation: the documents of clean, inactive tabs are unloaded
+        # (least recently used first) once open documents exceed the memory budget
+        self.hibernated_tabs = {}  # Dictionary: file_path -> HibernatedTab
+        self._tab_lru = {}  # file_path -> None, least recently activated first (dicts keep order)
+        self._budget_timer = QTimer(self)
+        self._budget_timer.setSingleShot(True)
+        self._budget_timer.setInterval(self.HIBERNATE_DELAY_MS)
+        self._budget_timer.timeout.connect(self.enforce_memory_budget)
+        self._session_fill_queue = []  # Restored session tabs still to be read in the background
+        self._pending_locations = {}  # Dictionary: file_path -> (line, column) to show once loaded
+        self.diagnostics = {}  # Dictionary: file_path -> [Diagnostic] underlined in its editor
+
+        # Latency instrumentation (see utils.latency_metrics); off unless enabled in the debug panel
+        self.metrics = LatencyMetrics.instance()
+        self.keystroke_probe = KeystrokeLatencyProbe(self)
+        self.metrics.enabled_changed.connect(self._on_metrics_enabled_changed)
+
+        # Code completion (the engine is provided by the controller, see set_completion_engine)
+        self.completer = EditorCompleter(self)
+
+    def large_file_threshold(self) -> int:
+        """Returns the size in bytes from which files open in large-file mode."""
+        value = QSettings().value(self.LARGE_FILE_SETTING_KEY, self.DEFAULT_LARGE_FILE_THRESHOLD_MB)
+        try:
+            threshold_mb = float(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid large file threshold setting '{value}', using default.")
+            threshold_mb = self.DEFAULT_LARGE_FILE_THRESHOLD_MB
+        return int(threshold_mb * 1024 * 1024)
+
+    def tab_memory_budget(self) -> int:
+        """Returns the memory budget in bytes for resident tab documents (0 = unlimited)."""
+        value = QSettings().value(self.TAB_MEMORY_BUDGET_SETTING_KEY, self.DEFAULT_TAB_MEMORY_BUDGET_MB)
+        try:
+            budget_mb = float(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid tab memory budget setting '{value}', using default.")
+            budget_mb = self.DEFAULT_TAB_MEMORY_BUDGET_MB
+        return max(0, int(budget_mb * 1024 * 1024))
+
+    def is_large_file(self, file_path: str) -> bool:
+        """Whether an open file is shown in large-file mode."""
+        editor = self.open_files.get(file_path)
+        return bool(editor is not None and editor.property("large_file"))
+
+    def _create_editor(self) -> QPlainTextEdit:
+        editor = QPlainTextEdit()
+        editor.setFont(QFont("Courier New", 11)) # Consider making font configurable
+        editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap) # Optional: QPlainTextEdit.LineWrapMode.WidgetWidth
+        if self.metrics.enabled:
+            self.keystroke_probe.attach(editor)
+        self.completer.attach(editor)
+
+        # Symbol navigation (answered by the controller from the project symbol index)
+        for text, shortcut, signal in (("Go to Definition", "F12", self.definition_requested),
+                                       ("Find Usages", "Shift+F12", self.usages_requested)):
+            action = QAction(text, editor)
+            action.setShortcut(QKeySequence(shortcut))
+            action.setShortcutContext(Qt.ShortcutContext.WidgetShortcut)
+            action.triggered.connect(lambda checked=False, e=editor, s=signal: self._request_symbol(e, s))
+            editor.addAction(action)
+        editor.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        editor.customContextMenuRequested.connect(lambda pos, e=editor: self._show_context_menu(e, pos))
+        return editor
+
+    def _show_context_menu(self, editor: QPlainTextEdit, pos):
+        if not editor.textCursor().hasSelection():
+            # Like most editors, the symbol under the mouse is the one acted on
+            editor.setTextCursor(editor.cursorForPosition(pos))
+        menu = editor.createStandardContextMenu(pos)
+        menu.addSeparator()
+        menu.addActions(editor.actions())
+        menu.exec(editor.viewport().mapToGlobal(pos))
+        menu.deleteLater()
+
+    def _request_symbol(self, editor: QPlainTextEdit, signal):
+        file_path = editor.property("file_path")
+        if not file_path or self._is_loading(file_path):
+            return
+        cursor = editor.textCursor()
+        signal.emit(file_path, cursor.block().text(), cursor.positionInBlock())
+
+    def go_to_location(self, file_path: str, line: int, column: int = 0):
+        """Opens a file (if needed) and puts the cursor at a 0-based line and column."""
+        file_path = os.path.normpath(file_path)
+        self._pending_locations[file_path] = (line, column)
+        self.open_file(file_path)
+        if file_path not in self.open_files:
+            self._pending_locations.pop(file_path, None)
+            return
+        if not self._is_loading(file_path) and file_path not in self.hibernated_tabs:
+            self._apply_pending_location(file_path)
+        # Otherwise it is applied once the content has been loaded or woken
+
+    def _apply_pending_location(self, file_path: str):
+        location = self._pending_locations.pop(file_path, None)
+        editor = self.open_files.get(file_path)
+        if location is None or editor is None:
+            return
+        line, column = location
+        block = editor.document().findBlockByNumber(line)
+        if not block.isValid():
+            return
+        cursor = QTextCursor(block)
+        cursor.movePosition(QTextCursor.MoveOperation.Right, QTextCursor.MoveMode.MoveAnchor, min(column, block.length() - 1))
+        editor.setTextCursor(cursor)
+        editor.centerCursor()
+        editor.setFocus()
+
+    def set_diagnostics(self, file_path: str, diagnostics: list):
+        """Underlines a file's lint diagnostics (see utils.lint_service) in its editor."""
+        file_path = os.path.normpath(file_path)
+        if file_path not in self.open_files:
+            return
+        self.diagnostics[file_path] = diagnostics
+        self._apply_diagnostics(file_path)
+
+    def _apply_diagnostics(self, file_path: str):
+        editor = self.open_files.get(file_path)
+        if editor is None or file_path in self.hibernated_tabs or self.is_large_file(file_path):
+            return
+        document = editor.document()
+        selections = []
+        for diagnostic in self.diagnostics.get(file_path, ()):
+            block = document.findBlockByNumber(diagnostic.line)
+            if not block.isValid():
+                continue
+            # Positions are those of the linted text; clamp them to the current one
+            column = min(diagnostic.column, block.length() - 1)
+            cursor = QTextCursor(block)
+            cursor.setPosition(block.position() + column)
+            cursor.setPosition(block.position() + min(column + diagnostic.length, block.length() - 1), QTextCursor.MoveMode.KeepAnchor)
+            char_format = QTextCharFormat()
+            char_format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.WaveUnderline)
+            char_format.setUnderlineColor(self.ERROR_UNDERLINE_COLOR if diagnostic.severity == ERROR else self.WARNING_UNDERLINE_COLOR)
+            selection = QTextEdit.ExtraSelection()
+            selection.cursor = cursor
+            selection.format = char_format
+            selections.append(selection)
+        editor.setExtraSelections(selections)
+
+    def set_completion_engine(self, engine):
+        """Sets the CompletionEngine the editors' completion popup draws from."""
+        self.completer.engine = engine
+
+    def _on_metrics_enabled_changed(self, enabled: bool):
+        if enabled:
+            for editor in self.open_files.values():
+                self.keystroke_probe.attach(editor)
+        else:
+            self.keystroke_probe.detach_all()
 
     def open_file(self, file_path: str):
         """Opens a file in a new tab or switches to it if already open."""
@@ -220,61 +276,23 @@ class CodeEditorTabWidget(QWidget):
             return
 
         try:
-            # Try reading with UTF-8, fallback to latin-1
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-            except UnicodeDecodeError:
-                logger.warning(f"UTF-8 decoding failed for {file_path}, trying latin-1.")
-                with open(file_path, "r", encoding="latin-1") as f:
-                    content = f.read()
-            logger.info(f"Successfully read file: {file_path}")
-
-            editor = QPlainTextEdit()
-            editor.setFont(QFont("Courier New", 11)) # Consider making font configurable
-            editor.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap) # Optional: QPlainTextEdit.LineWrapMode.WidgetWidth
-
-            # Block signals during initial setup
-            editor.blockSignals(True)
-            editor.setPlainText(content)
-            editor.document().setModified(False) # Reset modified state after loading
-            editor.blockSignals(False)
-
-            # Apply highlighter based on file extension
-            # TODO: Make highlighter selection more robust (e.g., based on mime types or config)
-            if file_path.lower().endswith((".html", ".htm", ".css", ".js")):
-                try:
-                    highlighter = EnhancedHtmlCssJsHighlighter(editor.document())
-                    logger.debug(f"Applied syntax highlighter for: {file_path}")
-                except Exception as e:
-                    logger.error(f"Failed to apply highlighter for {file_path}: {e}")
-
-
+            if os.path.getsize(file_path) >= self.large_file_threshold():
+                self._open_large_file(file_path)
+                return
+
+            # Show the tab straight away; the file is read on a worker thread
+            editor = self._create_editor()
+            editor.setReadOnly(True)
+            editor.setPlaceholderText(f"Loading {os.path.basename(file_path)}...")
             editor.setProperty("file_path", file_path)
-            # Connect modificationChanged signal to handle '*' in tab text
-            editor.modificationChanged.connect(
-                lambda modified, fp=file_path: self._on_modification_changed(fp, modified)
-            )
-            # Connect textChanged to potentially trigger external updates (like preview)
-            editor.textChanged.connect(lambda fp=file_path: self._on_text_changed(fp))
-
+            editor.setProperty("loading", True)
 
-            # Place editor inside a container widget for the tab
-            editor_container = QWidget()
-            container_layout = QVBoxLayout(editor_container)
-            container_layout.setContentsMargins(0, 0, 0, 0)
-            container_layout.addWidget(editor)
-
-            tab_index = self.tab_widget.addTab(editor_container, os.path.basename(file_path))
-            self.tab_widget.setTabToolTip(tab_index, file_path) # Show full path in tooltip
+            tab_index = self._add_editor_tab(file_path, editor)
             self.tab_widget.setCurrentIndex(tab_index)
             logger.info(f"Added tab at index {tab_index} for: {file_path}")
 
             self.open_files[file_path] = editor
-            self._watch_file(file_path)
-
-            # Initial saved status is false (not modified since opening)
-            self.set_tab_saved_status(file_path, True) # True means 'not modified *'
+            self._load_file_async(file_path, self._on_file_opened, self._on_file_open_failed)
 
         except Exception as e:
             logger.error(f"Error opening file {file_path}: {e}", exc_info=True)
@@ -284,39 +302,276 @@ class CodeEditorTabWidget(QWidget):
                 f"Could not open file: {file_path}\n\n{e}"
             )
 
-    def _read_file_content(self, file_path: str) -> Optional[str]:
-        """Reads file content, trying UTF-8 then Latin-1."""
+    def _add_editor_tab(self, file_path: str, editor: QPlainTextEdit) -> int:
+        """Adds a tab holding `editor` (inside a container widget); returns its index."""
+        editor_container = QWidget()
+        container_layout = QVBoxLayout(editor_container)
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        container_layout.addWidget(editor)
+
+        tab_index = self.tab_widget.addTab(editor_container, os.path.basename(file_path))
+        self.tab_widget.setTabToolTip(tab_index, file_path) # Show full path in tooltip
+        return tab_index
+
+    def _load_file_async(self, file_path: str, on_loaded, on_failed):
+        """
+        Reads and decodes a file on the load pool. `on_loaded(file_path, content,
+        encoding, fingerprint)` or `on_failed(file_path, message)` runs on the GUI thread,
+        unless the load was superseded by a newer one for the same file or the
+        tab was closed in the meantime.
+        """
+        self._next_load_id += 1
+        request_id = self._next_load_id
+        task = FileLoadTask(file_path, request_id)
+        task.signals.loaded.connect(
+            lambda fp, rid, text, encoding, fingerprint: self._finish_load(fp, rid, on_loaded, text, encoding, fingerprint)
+        )
+        task.signals.failed.connect(
+            lambda fp, rid, message: self._finish_load(fp, rid, on_failed, message)
+        )
+        # The task is kept referenced until it reports back
+        self._pending_loads[file_path] = (request_id, task)
+        self.load_pool.start(task)
+
+    def _finish_load(self, file_path: str, request_id: int, callback, *args):
+        pending = self._pending_loads.get(file_path)
+        if pending is None or pending[0] != request_id:
+            logger.debug(f"Discarding stale load result for: {file_path}")
+            return
+        del self._pending_loads[file_path]
+        if file_path not in self.open_files:
+            return # Tab was closed while loading
+        callback(file_path, *args)
+
+    def _is_loading(self, file_path: str) -> bool:
+        """Whether the editor for a file does not hold the file's content yet."""
+        if file_path in self.large_file_loaders:
+            return True
+        editor = self.open_files.get(file_path)
+        return bool(editor is not None and editor.property("loading"))
+
+    def _on_file_opened(self, file_path: str, content: str, encoding: str, fingerprint):
+        """Fills a freshly opened tab with the content read by the worker."""
+        editor = self.open_files[file_path]
+        logger.info(f"Successfully read file ({encoding}): {file_path}")
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                return f.read()
-        except UnicodeDecodeError:
-            try:
-                with open(file_path, "r", encoding="latin-1") as f:
-                    return f.read()
-            except Exception as e_fallback:
-                logger.error(f"Encoding fallback failed for {file_path}: {e_fallback}")
-                return None
+            self._attach_document(file_path, editor, content, encoding)
+            self.file_fingerprints[file_path] = fingerprint
+            # Connect modificationChanged signal to handle '*' in tab text
+            editor.modificationChanged.connect(
+                lambda modified, fp=file_path: self._on_modification_changed(fp, modified)
+            )
+            self._watch_file(file_path)
+
+            # Initial saved status is false (not modified since opening)
+            self.set_tab_saved_status(file_path, True) # True means 'not modified *'
+            self._apply_pending_location(file_path)
+            self._schedule_budget_check()
+
         except Exception as e:
-            logger.error(f"Error reading file content for {file_path}: {e}")
-            return None
+            logger.error(f"Error opening file {file_path}: {e}", exc_info=True)
+            self._on_file_open_failed(file_path, str(e))
+
+    def _attach_document(self, file_path: str, editor: QPlainTextEdit, content: str, encoding: str):
+        """Puts content into an empty editor document, with highlighting and change tracking."""
+        # Apply the highlighter for the file's language (extension, else content sniff).
+        # It is attached while the document is still empty so that attaching
+        # it does not queue a synchronous pass over the whole document.
+        highlighter = None
+        try:
+            highlighter = create_highlighter(file_path, editor.document(), content)
+        except Exception as e:
+            logger.error(f"Failed to apply highlighter for {file_path}: {e}")
+        # Large documents: highlight the viewport first, the rest in time slices
+        scheduler = None
+        if highlighter and HighlightScheduler.should_schedule(content):
+            scheduler = HighlightScheduler(editor, highlighter)
+
+        # Block signals during initial setup
+        measure = self.metrics.enabled
+        if measure:
+            started = time.perf_counter_ns()
+            highlight_ns = highlighter.highlight_ns if highlighter else 0
+        editor.blockSignals(True)
+        if scheduler:
+            # Keep the highlighter from seeing the insertion; the scheduler
+            # highlights the document once the tab is visible.
+            editor.document().blockSignals(True)
+        editor.setPlainText(content)
+        if measure:
+            # Small documents are highlighted inside setPlainText; report that separately
+            highlight_ns = (highlighter.highlight_ns - highlight_ns) if highlighter else 0
+            self.metrics.record(OPEN_SET_TEXT, time.perf_counter_ns() - started - highlight_ns)
+            if highlighter and not scheduler:
+                self.metrics.record(OPEN_FIRST_HIGHLIGHT, highlight_ns)
+        editor.document().blockSignals(False)
+        editor.document().setModified(False) # Reset modified state after loading
+        editor.blockSignals(False)
+
+        editor.setProperty("encoding", encoding)
+        editor.setProperty("loading", False)
+        editor.setPlaceholderText("")
+        editor.setReadOnly(False)
+        # Coalesced edit deltas drive external updates (like preview); the
+        # full text is only built when a consumer asks for it (get_content)
+        tracker = DocumentChangeTracker(editor.document(), editor)
+        tracker.changed.connect(
+            lambda version, deltas, fp=file_path: self.content_changed.emit(fp, version, deltas)
+        )
+        self.change_trackers[file_path] = tracker
+
+        if scheduler:
+            # Highlights the visible blocks synchronously, the rest in the background
+            started = time.perf_counter_ns()
+            scheduler.start()
+            self.metrics.record_since(OPEN_FIRST_HIGHLIGHT, started)
+        self._apply_diagnostics(file_path)
+        self.document_loaded.emit(file_path)
+
+    def _on_file_open_failed(self, file_path: str, message: str):
+        """Removes the placeholder tab of a file that could not be read."""
+        editor = self.open_files.pop(file_path, None)
+        self._tab_lru.pop(file_path, None)
+        # A restored session tab was watched (and tracked as hibernated) before its read
+        self._unwatch_file(file_path)
+        self.hibernated_tabs.pop(file_path, None)
+        self.file_fingerprints.pop(file_path, None)
+        self._pending_locations.pop(file_path, None)
+        if editor:
+            tab_index = self.tab_widget.indexOf(editor.parentWidget())
+            if tab_index != -1:
+                self.tab_widget.removeTab(tab_index)
+            editor.parentWidget().deleteLater()
+        QMessageBox.critical(
+            self,
+            "Error Opening File",
+            f"Could not open file: {file_path}\n\n{message}"
+        )
+
+    def _open_large_file(self, file_path: str):
+        """
+        Opens a file in large-file mode: the editor starts read-only ("read-mostly",
+        the user can opt in to editing), is filled from a memory-mapped file in
+        chunks, and has no syntax highlighting and no per-keystroke content_changed
+        emission (every emission would copy the whole document).
+        """
+        size_mb = os.path.getsize(file_path) / (1024 * 1024)
+        logger.info(f"Opening large file ({size_mb:.1f} MB) in large-file mode: {file_path}")
+
+        editor = self._create_editor()
+        editor.setReadOnly(True)
+        editor.setProperty("file_path", file_path)
+        editor.setProperty("large_file", True)
+        editor.modificationChanged.connect(
+            lambda modified, fp=file_path: self._on_modification_changed(fp, modified)
+        )
+
+        # Banner above the editor: mode explanation, load progress, opt-in to editing
+        banner = QWidget()
+        banner.setObjectName("largeFileBanner")
+        banner_layout = QHBoxLayout(banner)
+        banner_layout.setContentsMargins(6, 2, 6, 2)
+        banner_label = QLabel(
+            f"Large file ({size_mb:.1f} MB): read-only, syntax highlighting and live preview are off."
+        )
+        progress_bar = QProgressBar()
+        progress_bar.setRange(0, 100)
+        progress_bar.setMaximumWidth(160)
+        edit_button = QPushButton("Edit Anyway")
+        edit_button.setEnabled(False) # Enabled once loading has finished
+        banner_layout.addWidget(banner_label, 1)
+        banner_layout.addWidget(progress_bar)
+        banner_layout.addWidget(edit_button)
+
+        def enable_editing():
+            editor.setReadOnly(False)
+            edit_button.hide()
+            banner_label.setText(
+                f"Large file ({size_mb:.1f} MB): syntax highlighting and live preview are off."
+            )
+        edit_button.clicked.connect(enable_editing)
+
+        editor_container = QWidget()
+        container_layout = QVBoxLayout(editor_container)
+        container_layout.setContentsMargins(0, 0, 0, 0)
+        container_layout.setSpacing(0)
+        container_layout.addWidget(banner)
+        container_layout.addWidget(editor)
+
+        tab_index = self.tab_widget.addTab(editor_container, os.path.basename(file_path))
+        self.tab_widget.setTabToolTip(tab_index, file_path)
+        self.tab_widget.setCurrentIndex(tab_index)
+
+        self.open_files[file_path] = editor
+        self._watch_file(file_path)
+        self._start_large_file_load(file_path, editor, progress_bar, edit_button)
+
+    def _start_large_file_load(self, file_path: str, editor: QPlainTextEdit,
+                               progress_bar: QProgressBar, edit_button: QPushButton):
+        """(Re)starts filling a large-file editor from disk."""
+        previous = self.large_file_loaders.pop(file_path, None)
+        if previous:
+            previous.cancel()
+            previous.deleteLater()
+
+        loader = LargeFileLoader(file_path, editor)
+        self.large_file_loaders[file_path] = loader
+        progress_bar.setValue(0)
+        progress_bar.show()
+        edit_button.setEnabled(False)
+
+        def on_progress(loaded, total, fp=file_path):
+            percent = int(loaded * 100 / total) if total else 100
+            progress_bar.setValue(percent)
+            tab_index = self.tab_widget.indexOf(editor.parentWidget())
+            if tab_index != -1 and percent < 100:
+                self.tab_widget.setTabText(tab_index, f"{os.path.basename(fp)} ({percent}%)")
+
+        def on_finished(encoding, fp=file_path):
+            if self.large_file_loaders.get(fp) is loader:
+                del self.large_file_loaders[fp]
+            if loader.fingerprint is not None:
+                self.file_fingerprints[fp] = loader.fingerprint
+            if encoding:
+                editor.setProperty("encoding", encoding) # Saved back in it
+            loader.deleteLater()
+            progress_bar.hide()
+            edit_button.setEnabled(True)
+            self.set_tab_saved_status(fp, True)
+
+        def on_failed(message, fp=file_path):
+            on_finished("", fp)
+            QMessageBox.critical(self, "Error Opening File", f"Could not load file: {fp}\n\n{message}")
+
+        loader.progress.connect(on_progress)
+        loader.finished.connect(on_finished)
+        loader.failed.connect(on_failed)
+        loader.start()
 
     def _watch_file(self, file_path):
         """Starts watching a file for external changes."""
-        if file_path not in self.file_watchers:
-            watcher = QFileSystemWatcher([file_path], self)
-            watcher.fileChanged.connect(self.handle_external_change)
-            self.file_watchers[file_path] = watcher
+        if file_path not in self.fs_subscriptions:
+            handle = FileSystemEventService.instance().subscribe(
+                file_path, lambda events, fp=file_path: self._on_file_events(fp, events)
+            )
+            self.fs_subscriptions[file_path] = handle
             logger.debug(f"Started watching file: {file_path}")
 
     def _unwatch_file(self, file_path):
         """Stops watching a file."""
-        watcher = self.file_watchers.pop(file_path, None)
-        if watcher:
-            watcher.removePath(file_path)
-            watcher.fileChanged.disconnect(self.handle_external_change)
-            watcher.deleteLater() # Schedule watcher for deletion
+        handle = self.fs_subscriptions.pop(file_path, None)
+        if handle is not None:
+            FileSystemEventService.instance().unsubscribe(handle)
             logger.debug(f"Stopped watching file: {file_path}")
 
+    def _on_file_events(self, file_path: str, events):
+        """Batched filesystem events for an open file (own saves are already filtered out)."""
+        if events[-1].kind == DELETED:
+            # Keep the buffer; saving recreates the file
+            logger.warning(f"Open file was deleted or moved externally: {file_path}")
+            return
+        self.handle_external_change(file_path)
+
     def handle_external_change(self, file_path: str):
         """Handles notification that a file was changed outside the editor."""
         file_path = os.path.normpath(file_path)
@@ -331,15 +586,53 @@ class CodeEditorTabWidget(QWidget):
         if not editor:
             return # Should not happen if file_path is in open_files
 
-        # Read disk content *carefully*, handle potential read errors
-        disk_content = self._read_file_content(file_path)
-        if disk_content is None:
-             logger.error(f"Could not read disk content for {file_path} after external change.")
-             # Optionally inform user?
-             return
+        if file_path in self.hibernated_tabs:
+            # Nothing to compare against in memory; waking the tab checks the disk
+            logger.debug(f"Ignoring external change for hibernated tab until it is woken: {file_path}")
+            return
+
+        if file_path in self.large_file_loaders:
+            # Still loading from the old mapping: start over from the new contents
+            logger.info(f"Large file changed while loading, restarting load: {file_path}")
+            container = editor.parentWidget()
+            self._start_large_file_load(
+                file_path, editor, container.findChild(QProgressBar), container.findChild(QPushButton)
+            )
+            return
+
+        # Cheap check first: unchanged mtime and size means nothing to do (this
+        # also covers any ping caused by our own save)
+        fingerprint = self.file_fingerprints.get(file_path)
+        if fingerprint is not None:
+            try:
+                st = os.stat(file_path)
+            except OSError as e:
+                logger.warning(f"Could not stat {file_path} after external change: {e}")
+                return
+            if fingerprint.matches_stat(st):
+                logger.debug(f"Ignoring external change; file unchanged since last load/save: {file_path}")
+                return
+
+        # Read disk content off the GUI thread, then compare and prompt.
+        # A newer read supersedes one still in flight.
+        self._load_file_async(file_path, self._on_external_content, self._on_external_read_failed)
+
+    def _on_external_read_failed(self, file_path: str, message: str):
+        logger.error(f"Could not read disk content for {file_path} after external change: {message}")
+
+    def _on_external_content(self, file_path: str, disk_content: str, encoding: str, fingerprint):
+        """Second half of handle_external_change, once the disk content is read."""
+        editor = self.open_files[file_path]
+
+        # Touched, or rewritten with the same bytes: just remember the new mtime
+        previous = self.file_fingerprints.get(file_path)
+        self.file_fingerprints[file_path] = fingerprint
+        if previous is not None and previous.digest == fingerprint.digest:
+            logger.debug(f"Ignoring external change; content hash unchanged: {file_path}")
+            return
 
         # Compare with editor content
-        editor_content = editor.toPlainText()
+        editor_content = self.get_content(file_path)
 
         # If content matches, maybe the save operation triggered the watcher. Ignore.
         # Be careful with line endings or minor whitespace diffs if needed.
@@ -377,14 +670,10 @@ class CodeEditorTabWidget(QWidget):
             try:
                 logger.info(f"Reloading externally changed file: {file_path}")
                 editor.blockSignals(True)
-                # Preserve cursor roughly
-                cursor_pos = editor.textCursor().position()
-                editor.setPlainText(disk_content)
+                # Only the changed lines are replaced (one undo step); the cursor stays put
+                patch_document(editor.document(), disk_content, editor_content)
+                editor.setProperty("encoding", encoding)
                 editor.document().setModified(False) # Reloaded content is now 'saved' state
-                # Restore cursor
-                cursor = editor.textCursor()
-                cursor.setPosition(min(cursor_pos, len(disk_content)))
-                editor.setTextCursor(cursor)
                 editor.blockSignals(False)
                 # Emit modification changed *after* signals unblocked
                 self.modification_changed.emit(file_path, False)
@@ -404,16 +693,20 @@ class CodeEditorTabWidget(QWidget):
              self.modification_changed.emit(file_path, True)
 
 
-    def _on_text_changed(self, file_path: str):
-        """Slot connected to editor's textChanged signal."""
-        if file_path in self.open_files:
-            editor = self.open_files[file_path]
-            # This signal fires frequently. Only emit our content_changed signal
-            # if needed for live updates (e.g., preview).
-            # The modification status is handled by modificationChanged.
-            # logger.debug(f"textChanged triggered for: {file_path}")
-            self.content_changed.emit(file_path, editor.toPlainText())
-
+    def get_content(self, file_path: str) -> Optional[str]:
+        """
+        Returns the current text of an open file's editor, or None if it is not
+        open. Cached per edit version, so repeated pulls between edits are free.
+        """
+        file_path = os.path.normpath(file_path)
+        image = self.hibernated_tabs.get(file_path)
+        if image and image.data is not None:
+            return image.text()
+        tracker = self.change_trackers.get(file_path)
+        if tracker:
+            return tracker.text()
+        editor = self.open_files.get(file_path)
+        return editor.toPlainText() if editor else None
 
     def _on_modification_changed(self, file_path: str, modified: bool):
         """Slot connected to editor's modificationChanged signal."""
@@ -435,6 +728,10 @@ class CodeEditorTabWidget(QWidget):
                 self.tab_widget.setTabText(tab_index, tab_text)
 
 
+    def current_file_path(self) -> Optional[str]:
+        """The file path of the active editor tab, if any."""
+        return self._file_path_at(self.tab_widget.currentIndex())
+
     def get_current_editor_content(self) -> Tuple[Optional[str], Optional[str]]:
         """Returns the file path and content of the currently active editor tab."""
         current_index = self.tab_widget.currentIndex()
@@ -447,7 +744,7 @@ class CodeEditorTabWidget(QWidget):
             editor = editor_container.findChild(QPlainTextEdit)
             if editor:
                 file_path = editor.property("file_path")
-                content = editor.toPlainText()
+                content = self.get_content(file_path)
                 return file_path, content
         return None, None
 
@@ -461,72 +758,398 @@ class CodeEditorTabWidget(QWidget):
         return False
 
 
-    def save_file(self, file_path: str, content: str) -> bool:
-        """Saves the given content to the specified file path."""
+    def fsync_policy(self) -> str:
+        """Returns the configured fsync policy for saves (see utils.file_saver)."""
+        policy = QSettings().value(self.SAVE_FSYNC_SETTING_KEY, DEFAULT_FSYNC_POLICY)
+        if policy not in FSYNC_POLICIES:
+            logger.warning(f"Invalid fsync policy setting '{policy}', using default.")
+            return DEFAULT_FSYNC_POLICY
+        return policy
+
+    def save_file(self, file_path: str, content: str, wait: bool = False) -> bool:
+        """
+        Saves the given content to the specified file path.
+
+        The write happens on the save pool (temp file + rename); the tab's
+        modified state is updated when it completes. Returns whether the save
+        was started, or with `wait=True`, whether it succeeded.
+        """
         if not file_path:
              logger.error("save_file called with empty file path.")
              return False
 
-        logger.info(f"Attempting to save file: {file_path}")
-        # Temporarily stop watching file to prevent self-triggering change event
-        watcher = self.file_watchers.get(file_path)
-        if watcher:
-             logger.debug(f"Temporarily blocking signals for watcher: {file_path}")
-             watcher.blockSignals(True)
-             # It might be safer to remove/re-add path if blocking isn't reliable across OS/Qt versions
-             # watcher.removePath(file_path)
-
-        success = False
-        try:
-            with open(file_path, "w", encoding="utf-8") as f:
-                f.write(content)
-            logger.info(f"Successfully saved file: {file_path}")
+        if self._is_loading(file_path):
+             QMessageBox.information(self, "File Still Loading", f"Wait for the file to finish loading before saving:\n{file_path}")
+             logger.warning(f"Refused to save partially loaded file: {file_path}")
+             return False
+
+        if file_path in self.hibernated_tabs:
+            self._replace_hibernated_text(file_path, content)
+        self._queue_save(file_path, content)
+        if wait:
+            return self._wait_for_saves().get(file_path, False)
+        return True
+
+    def _queue_save(self, file_path: str, content: str, batch: Optional[dict] = None):
+        """Starts a background save, or queues it behind one already running for the file."""
+        if file_path in self._saves_in_flight:
+            # Only the newest content matters; it is written once the running save is done
+            logger.debug(f"Save already running, queueing newer content for: {file_path}")
+            superseded = self._queued_saves.get(file_path)
+            if superseded and superseded[1] is not None:
+                if batch is None:
+                    batch = superseded[1] # Keep reporting to the Save All that queued it
+                elif superseded[1] is not batch:
+                    self._batch_done(superseded[1], True) # Its content is replaced by newer content
+            self._queued_saves[file_path] = (content, batch)
+            return
 
+        logger.info(f"Attempting to save file: {file_path}")
+        self._next_save_id += 1
+        editor = self.open_files.get(file_path)
+        task = FileSaveTask(
+            file_path, content, self._next_save_id, self.fsync_policy(),
+            previous=self.file_fingerprints.get(file_path),
+            encoding=(editor.property("encoding") if editor else None) or "utf-8", # As the file was read
+        )
+        # Remember which edit we are saving: if the user types on while the
+        # write runs, the tab must stay modified
+        task.document_version = self._document_version(file_path)
+        task.batch = batch
+        task.queued_ns = time.perf_counter_ns()
+        task.signals.finished.connect(self._on_save_finished)
+
+        # Tell the event service this write (and its temp file) is ours, so nothing reacts to it
+        fs_events = FileSystemEventService.instance()
+        fs_events.begin_own_write(file_path)
+        fs_events.begin_own_write(task.temp_path)
+
+        self._saves_in_flight[file_path] = task
+        self.save_pool.start(task)
+
+    def _document_version(self, file_path: str) -> Optional[int]:
+        tracker = self.change_trackers.get(file_path)
+        if tracker:
+            return tracker.version
+        editor = self.open_files.get(file_path)
+        return editor.document().revision() if editor else None
+
+    def _wait_for_saves(self) -> dict:
+        """Blocks until every running and queued save is done; returns {file_path: success}."""
+        results = {}
+        while self._saves_in_flight:
+            self.save_pool.waitForDone()
+            for task in list(self._saves_in_flight.values()):
+                if task.done:
+                    results[task.file_path] = self._on_save_finished(task)
+        return results
+
+    def _on_save_finished(self, task: FileSaveTask) -> bool:
+        """Completion of a background save (GUI thread); returns whether it succeeded."""
+        file_path = task.file_path
+        success = task.error is None
+        if self._saves_in_flight.get(file_path) is not task:
+            return success # Already handled (e.g. by _wait_for_saves)
+        del self._saves_in_flight[file_path]
+        self.metrics.record_since(SAVE_TOTAL, task.queued_ns)
+
+        fs_events = FileSystemEventService.instance()
+        fs_events.end_own_write(task.temp_path)
+        fs_events.end_own_write(file_path)
+
+        if success:
+            if task.skipped:
+                logger.info(f"Skipped saving unchanged file: {file_path}")
+            else:
+                logger.info(f"Successfully saved file: {file_path}")
             # Mark the corresponding editor as unmodified *after* successful save
             if file_path in self.open_files:
-                editor = self.open_files[file_path]
-                editor.document().setModified(False)
-                # The modificationChanged signal will update the tab text
-
-            success = True
-
-        except Exception as e:
-            logger.error(f"Error saving file {file_path}: {e}", exc_info=True)
+                self.file_fingerprints[file_path] = task.fingerprint
+                if task.unencodable:
+                    self.open_files[file_path].setProperty("encoding", task.encoding)
+                    QMessageBox.warning(
+                        self, "File Saved as UTF-8",
+                        f"The text of {os.path.basename(file_path)} contains characters that "
+                        f"{task.unencodable} cannot represent, so the file was saved as UTF-8.\n\n"
+                        "If it declares its encoding (e.g. <meta charset>), update the declaration."
+                    )
+                if self._document_version(file_path) == task.document_version:
+                    editor = self.open_files[file_path]
+                    editor.document().setModified(False)
+                    # The modificationChanged signal will update the tab text
+                    self._schedule_budget_check()
+        elif task.batch is None:
             QMessageBox.critical(
-                self, "Error Saving File", f"Could not save file: {file_path}\n\n{e}"
+                self, "Error Saving File", f"Could not save file: {file_path}\n\n{task.error}"
             )
-            success = False
-        finally:
-            # Re-enable watching
-            if watcher:
-                 # if watcher.files() == []: # If path was removed
-                 #     watcher.addPath(file_path)
-                 watcher.blockSignals(False)
-                 logger.debug(f"Unblocked signals for watcher: {file_path}")
 
+        if task.batch is not None:
+            self._batch_done(task.batch, success)
+
+        self.save_finished.emit(file_path, success)
+
+        queued = self._queued_saves.pop(file_path, None)
+        if queued:
+            self._queue_save(file_path, *queued)
         return success
 
-    def save_all_files(self) -> bool:
-        """Saves all open files that have unsaved changes."""
-        saved_count = 0
-        error_count = 0
-        all_successful = True
+    def _batch_done(self, batch: dict, success: bool):
+        """Counts one finished save of a Save All; reports once all are done."""
+        batch["pending"] -= 1
+        batch["saved" if success else "errors"] += 1
+        if batch["pending"] == 0:
+            logger.info(f"Save All complete: {batch['saved']} files saved, {batch['errors']} errors.")
+            if batch["errors"] > 0:
+                QMessageBox.warning(self, "Save All Issues", f"Could not save {batch['errors']} files. Please check permissions or logs.")
+
+    def save_all_files(self, wait: bool = False) -> bool:
+        """
+        Saves all open files that have unsaved changes, in parallel on the save
+        pool. Returns whether the saves were started, or with `wait=True`,
+        whether all of them succeeded.
+        """
         logger.info("Attempting to save all modified files.")
+        to_save = [
+            file_path for file_path, editor in self.open_files.items()
+            if editor.document().isModified() and not self._is_loading(file_path)
+        ]
+        if not to_save:
+            logger.info("Save All: nothing to save.")
+            return True
+
+        batch = {"pending": len(to_save), "saved": 0, "errors": 0}
+        for file_path in to_save:
+             logger.debug(f"Found modified file to save: {file_path}")
+             self._queue_save(file_path, self.get_content(file_path), batch)
+
+        if wait:
+            results = self._wait_for_saves()
+            return all(results.get(file_path, False) for file_path in to_save)
+        return True
+
+    def _file_path_at(self, index: int) -> Optional[str]:
+        container = self.tab_widget.widget(index)
+        editor = container.findChild(QPlainTextEdit) if container else None
+        return editor.property("file_path") if editor else None
+
+    def _on_current_tab_changed(self, index: int):
+        file_path = self._file_path_at(index)
+        if not file_path:
+            return
+        # Most recently activated last
+        self._tab_lru.pop(file_path, None)
+        self._tab_lru[file_path] = None
+        if file_path in self.hibernated_tabs:
+            self._wake_tab(file_path)
+        self._schedule_budget_check()
+        self.current_file_changed.emit(file_path)
+
+    def _schedule_budget_check(self):
+        if self.tab_memory_budget() > 0:
+            self._budget_timer.start()
+
+    def enforce_memory_budget(self):
+        """
+        Hibernates the least recently used tabs until resident documents fit the
+        memory budget. Only clean, fully loaded, inactive tabs are candidates;
+        tabs with unsaved changes always stay resident.
+        """
+        budget = self.tab_memory_budget()
+        if budget <= 0:
+            return
+        resident = {
+            file_path: estimated_document_bytes(editor.document())
+            for file_path, editor in self.open_files.items()
+            if file_path not in self.hibernated_tabs
+        }
+        total = sum(resident.values())
+        if total <= budget:
+            return
+
+        current_path = self._file_path_at(self.tab_widget.currentIndex())
+        # Tabs never activated first, then least recently activated first
+        candidates = [fp for fp in resident if fp not in self._tab_lru] + list(self._tab_lru)
+        for file_path in candidates:
+            if total <= budget:
+                break
+            if file_path in resident and file_path != current_path and self._can_hibernate(file_path):
+                self._hibernate_tab(file_path)
+                total -= resident[file_path]
+        logger.debug(f"Resident tab documents: ~{total / (1024 * 1024):.1f} MB of {budget / (1024 * 1024):.0f} MB budget")
+
+    def _can_hibernate(self, file_path: str) -> bool:
+        editor = self.open_files[file_path]
+        return not (
+            editor.document().isModified()
+            or self._is_loading(file_path)
+            or self.is_large_file(file_path) # Its loader and banner state are not worth rebuilding
+            or file_path in self._pending_loads
+            or file_path in self._saves_in_flight
+        )
+
+    def _hibernate_tab(self, file_path: str):
+        """Unloads a tab's document, keeping its text compressed along with cursor and scroll state."""
+        editor = self.open_files[file_path]
+        image = HibernatedTab.capture(editor, self.get_content(file_path))
+
+        tracker = self.change_trackers.pop(file_path, None)
+        if tracker:
+            tracker.discard()
+            tracker.deleteLater()
+        for scheduler in editor.findChildren(HighlightScheduler):
+            scheduler.stop()
+            scheduler.deleteLater()
+
+        # A fresh, empty document replaces the old one; the highlighter and the
+        # undo history go with the old document
+        old_document = editor.document()
+        document = QTextDocument(editor)
+        document.setDocumentLayout(QPlainTextDocumentLayout(document))
+        editor.blockSignals(True)
+        editor.setDocument(document)
+        editor.blockSignals(False)
+        editor.setReadOnly(True)
+        if not sip.isdeleted(old_document): # Qt deletes the editor's original document itself
+            old_document.deleteLater()
+
+        self.hibernated_tabs[file_path] = image
+        logger.info(f"Hibernated tab ({len(image.data) / 1024:.0f} KiB compressed): {file_path}")
+
+    def _wake_tab(self, file_path: str, on_ready=None):
+        """
+        Restores a hibernated tab, from its compressed text unless the file changed
+        on disk meanwhile (or the tab was restored from a session and never loaded).
+        `on_ready()` is called once the tab holds its content again.
+        """
+        image = self.hibernated_tabs.pop(file_path)
+        editor = self.open_files[file_path]
+        fingerprint = self.file_fingerprints.get(file_path)
+        try:
+            unchanged = fingerprint is not None and fingerprint.matches_stat(os.stat(file_path))
+        except OSError:
+            unchanged = True # Gone from disk: the hibernated text is all there is
+
+        def restore(fp, content, encoding):
+            self._attach_document(fp, editor, content, encoding)
+            image.restore_view(editor)
+            self.set_tab_saved_status(fp, True)
+            self._apply_pending_location(fp)
+            if on_ready:
+                on_ready()
+
+        if image.data is not None and unchanged:
+            restore(file_path, image.text(), image.encoding)
+            logger.info(f"Woke hibernated tab: {file_path}")
+            return
 
-        for file_path, editor in list(self.open_files.items()): # Iterate over copy in case of issues
-             if editor.document().isModified():
-                 logger.debug(f"Found modified file to save: {file_path}")
-                 content = editor.toPlainText()
-                 if self.save_file(file_path, content):
-                     saved_count += 1
-                 else:
-                     error_count += 1
-                     all_successful = False # Mark overall success as false if any save fails
-
-        logger.info(f"Save All complete: {saved_count} files saved, {error_count} errors.")
-        if error_count > 0:
-             QMessageBox.warning(self, "Save All Issues", f"Could not save {error_count} files. Please check permissions or logs.")
-        return all_successful
+        # A clean tab simply picks up the (new) disk content
+        logger.info(f"Loading content of hibernated tab from disk: {file_path}")
+        editor.setPlaceholderText(f"Loading {os.path.basename(file_path)}...")
+        editor.setProperty("loading", True)
+
+        def on_loaded(fp, content, encoding, new_fingerprint):
+            self.file_fingerprints[fp] = new_fingerprint
+            restore(fp, content, encoding)
+
+        def on_failed(fp, message):
+            if image.data is None:
+                self._on_file_open_failed(fp, message)
+                if on_ready:
+                    on_ready()
+                return
+            logger.error(f"Could not reload {fp}, restoring hibernated text: {message}")
+            restore(fp, image.text(), image.encoding)
+
+        self._load_file_async(file_path, on_loaded, on_failed)
+
+    def _replace_hibernated_text(self, file_path: str, content: str):
+        image = self.hibernated_tabs[file_path]
+        self.hibernated_tabs[file_path] = image._replace(data=HibernatedTab.compress(content))
+
+    def session_state(self) -> EditorSession:
+        """The open tabs (in tab order) with cursor and scroll positions, for saving a session."""
+        tabs = []
+        active_index = -1
+        for index in range(self.tab_widget.count()):
+            file_path = self._file_path_at(index)
+            if not file_path or self.is_large_file(file_path):
+                continue # Large files are not worth reopening on every start
+            if index == self.tab_widget.currentIndex():
+                active_index = len(tabs)
+            image = self.hibernated_tabs.get(file_path)
+            if image is not None:
+                tabs.append(SessionTab(
+                    file_path, image.cursor_position, image.cursor_anchor,
+                    image.vertical_scroll, image.horizontal_scroll,
+                ))
+            elif self._is_loading(file_path):
+                tabs.append(SessionTab(file_path))
+            else:
+                editor = self.open_files[file_path]
+                cursor = editor.textCursor()
+                tabs.append(SessionTab(
+                    file_path, cursor.position(), cursor.anchor(),
+                    editor.verticalScrollBar().value(), editor.horizontalScrollBar().value(),
+                ))
+        return EditorSession(tabs, active_index)
+
+    def restore_session(self, session: EditorSession):
+        """
+        Recreates the tabs of a saved session at once. Each tab starts out as a
+        hibernated tab without content: only the active one is read and
+        highlighted straight away, the others are filled in one by one in the
+        background (and stay subject to the memory budget).
+        """
+        restored = []
+        self.tab_widget.blockSignals(True) # Adding the first tab would make it current (and load it)
+        try:
+            for tab in session.tabs:
+                file_path = os.path.normpath(tab.file_path)
+                if file_path in self.open_files or not os.path.isfile(file_path):
+                    continue
+                editor = self._create_editor()
+                editor.setReadOnly(True)
+                editor.setProperty("file_path", file_path)
+                editor.setProperty("loading", True)
+                editor.modificationChanged.connect(
+                    lambda modified, fp=file_path: self._on_modification_changed(fp, modified)
+                )
+                self.open_files[file_path] = editor
+                self.hibernated_tabs[file_path] = HibernatedTab(
+                    None, "utf-8", tab.cursor_position, tab.cursor_anchor,
+                    tab.vertical_scroll, tab.horizontal_scroll,
+                )
+                self._add_editor_tab(file_path, editor)
+                self._watch_file(file_path)
+                restored.append(file_path)
+        finally:
+            self.tab_widget.blockSignals(False)
+        logger.info(f"Restored session with {len(restored)} tabs.")
+        if not restored:
+            return
+
+        active_path = None
+        if 0 <= session.active_index < len(session.tabs):
+            active_path = os.path.normpath(session.tabs[session.active_index].file_path)
+        editor = self.open_files.get(active_path) if active_path in restored else self.open_files[restored[0]]
+        self.tab_widget.setCurrentIndex(self.tab_widget.indexOf(editor.parentWidget()))
+        self._on_current_tab_changed(self.tab_widget.currentIndex()) # No-op if the signal already woke it
+
+        self._session_fill_queue = [fp for fp in restored if fp in self.hibernated_tabs]
+        QTimer.singleShot(self.SESSION_FILL_INTERVAL_MS, self._fill_next_session_tab)
+
+    def _fill_next_session_tab(self):
+        """Loads the next session tab that has not been read yet (one at a time, in the background)."""
+        while self._session_fill_queue:
+            file_path = self._session_fill_queue.pop(0)
+            image = self.hibernated_tabs.get(file_path)
+            if image is not None and image.data is None:
+                self._wake_tab(file_path, on_ready=self._on_session_tab_filled)
+                return
+
+    def _on_session_tab_filled(self):
+        self._schedule_budget_check()
+        QTimer.singleShot(self.SESSION_FILL_INTERVAL_MS, self._fill_next_session_tab)
 
     def close_tab(self, index: int):
         """Handles the request to close a tab, prompting for unsaved changes."""
@@ -557,7 +1180,7 @@ class CodeEditorTabWidget(QWidget):
             )
 
             if reply == QMessageBox.StandardButton.Save:
-                if not self.save_file(file_path, editor.toPlainText()):
+                if not self.save_file(file_path, self.get_content(file_path), wait=True):
                     # Save failed, do not close the tab
                     proceed_with_close = False
             elif reply == QMessageBox.StandardButton.Cancel:
@@ -570,15 +1193,27 @@ class CodeEditorTabWidget(QWidget):
             self.tab_widget.removeTab(index)
 
             # Clean up resources
+            self._pending_loads.pop(file_path, None) # Drop any in-flight read
+            tracker = self.change_trackers.pop(file_path, None)
+            if tracker:
+                tracker.discard()
+            self.file_fingerprints.pop(file_path, None)
+            self.hibernated_tabs.pop(file_path, None)
+            self._tab_lru.pop(file_path, None)
+            self._pending_locations.pop(file_path, None)
+            self.diagnostics.pop(file_path, None)
+            loader = self.large_file_loaders.pop(file_path, None)
+            if loader:
+                loader.cancel()
             self._unwatch_file(file_path)
             editor_widget = self.open_files.pop(file_path, None)
 
             if editor_widget:
+                 self.keystroke_probe.detach(editor_widget)
+                 self.completer.detach(editor_widget)
                  # Disconnect signals manually? Might not be necessary if parent is deleted.
                  # try: editor_widget.modificationChanged.disconnect()
                  # except TypeError: pass
-                 # try: editor_widget.textChanged.disconnect()
-                 # except TypeError: pass
                  editor_widget.deleteLater() # Schedule editor for deletion
                  editor_container.deleteLater() # Schedule container for deletion
 
@@ -603,24 +1238,88 @@ class CodeEditorTabWidget(QWidget):
     def update_content(self, file_path: str, new_content: str):
         """Programmatically updates the content of an open editor without marking it modified."""
         file_path = os.path.normpath(file_path)
+        if file_path in self.hibernated_tabs:
+             logger.debug(f"Programmatically updating content of hibernated tab: {file_path}")
+             self._replace_hibernated_text(file_path, new_content)
+             return
         if file_path in self.open_files:
              editor = self.open_files[file_path]
              logger.debug(f"Programmatically updating content for: {file_path}")
              editor.blockSignals(True)
-             current_cursor_pos = editor.textCursor().position()
-             editor.setPlainText(new_content)
-             # Restore cursor if possible
-             cursor = editor.textCursor()
-             cursor.setPosition(min(current_cursor_pos, len(new_content)))
-             editor.setTextCursor(cursor)
+             # Patch only the lines that differ, keeping layout, highlighting and cursor
+             patch_document(editor.document(), new_content, self.get_content(file_path))
              editor.document().setModified(False) # Assume programmatic update is 'saved' state
              editor.blockSignals(False)
              # Manually trigger modification change signal to update tab '*'
              self.modification_changed.emit(file_path, False)
 
+    def apply_to_open_file(self, file_path: str, transform) -> Optional[int]:
+        """
+        Edits a resident open document with `transform(text) -> (new_text, count)`
+        as one undoable step, without saving it: the edit is kept (and saved
+        if the document was clean) by commit_open_file_edits, or undone by
+        revert_open_file_edits. Returns count, or None if the file is not open
+        in a form that can be patched (not open, hibernated, loading or
+        large), in which case the caller edits the file on disk.
+        """
+        file_path = os.path.normpath(file_path)
+        editor = self.open_files.get(file_path)
+        if (editor is None or file_path in self.hibernated_tabs or self._is_loading(file_path)
+                or self.is_large_file(file_path)):
+            return None
+        old_text = self.get_content(file_path)
+        new_text, count = transform(old_text)
+        if not count:
+            return 0
+        was_modified = editor.document().isModified()
+        patch_document(editor.document(), new_text, old_text) # One edit block: a single undo step
+        self._uncommitted_edits[file_path] = (editor, was_modified, editor.document().availableUndoSteps())
+        return count
+
+    def commit_open_file_edits(self) -> List[str]:
+        """Keeps the edits of apply_to_open_file, saving the documents that were clean; returns those saved."""
+        saved = []
+        for file_path, (editor, was_modified, _steps) in self._uncommitted_edits.items():
+            if was_modified or self.open_files.get(file_path) is not editor:
+                continue # Left unsaved as it was (or closed meanwhile)
+            if self.save_file(file_path, self.get_content(file_path)):
+                saved.append(file_path)
+        self._uncommitted_edits.clear()
+        return saved
+
+    def revert_open_file_edits(self) -> List[str]:
+        """Undoes the edits of apply_to_open_file; returns the files edited since, which are left as they are."""
+        kept = []
+        for file_path, (editor, _was_modified, steps) in self._uncommitted_edits.items():
+            if self.open_files.get(file_path) is not editor:
+                continue # Closed meanwhile: the edit went with it
+            if editor.document().availableUndoSteps() != steps:
+                logger.warning(f"Not undoing the replace in {file_path}: it was edited meanwhile.")
+                kept.append(file_path)
+                continue
+            editor.undo() # Back to the document's previous (saved or unsaved) state
+        self._uncommitted_edits.clear()
+        return kept
+
     def has_unsaved_changes(self) -> bool:
         """Checks if any open tab has unsaved modifications."""
         for editor in self.open_files.values():
             if editor.document().isModified():
                 return True
-        return False
\ No newline at end of file
+        return False
+
+    def unsaved_contents(self) -> Dict[str, str]:
+        """The text of every open file with unsaved modifications, by file path."""
+        return {
+            file_path: self.get_content(file_path)
+            for file_path, editor in self.open_files.items()
+            if editor.document().isModified() and not self._is_loading(file_path)
+        }
+
+    def unsaved_content(self, file_path: str) -> Optional[str]:
+        """The text of an open file if it has unsaved modifications, else None."""
+        file_path = os.path.normpath(file_path)
+        editor = self.open_files.get(file_path)
+        if editor is None or not editor.document().isModified() or self._is_loading(file_path):
+            return None
+        return self.get_content(file_path)
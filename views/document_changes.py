@@ -0,0 +1,124 @@
+# website_builder/views/document_changes.py
+import time
+import logging
+from typing import List, NamedTuple, Optional
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor, QTextDocument
+
+logger = logging.getLogger(__name__)
+
+PARAGRAPH_SEPARATOR = "\u2029" # What QTextCursor.selectedText() uses for line breaks
+
+
+def qt_length(text: str) -> int:
+    """Length of a string in QTextDocument positions (UTF-16 code units)."""
+    if text.isascii():
+        return len(text)
+    return len(text.encode("utf-16-le")) // 2
+
+
+class ContentDelta(NamedTuple):
+    """One edit, in document positions (UTF-16 units, as QTextDocument.contentsChange reports them)."""
+    position: int
+    chars_removed: int
+    inserted_text: str
+
+
+class DocumentChangeTracker(QObject):
+    """
+    Turns QTextDocument.contentsChange into coalesced, versioned deltas.
+
+    Every edit bumps `version` and is recorded as a ContentDelta; consecutive
+    typing (and backspacing over just-typed text) is merged into one delta.
+    `changed` is emitted once the document has been quiet for DEBOUNCE_MS, or at
+    the latest MAX_WAIT_MS after the first pending edit while typing continues.
+
+    Consumers that need the whole text call text(), which is built lazily and
+    cached per version, instead of receiving a copy on every keystroke.
+
+    Positions follow Qt's contentsChange conventions, which count the block
+    separator at the end of the document; a whole-document replacement (e.g.
+    setPlainText) shows up as removing one character more than the old text has.
+    """
+    changed = pyqtSignal(int, list)  # version, [ContentDelta]
+
+    DEBOUNCE_MS = 150
+    MAX_WAIT_MS = 500
+
+    def __init__(self, document: QTextDocument, parent=None):
+        super().__init__(parent if parent is not None else document)
+        self.document = document
+        self.version = 0
+        self._pending: List[ContentDelta] = []
+        self._first_pending_at = 0.0
+        self._text_cache: Optional[str] = None
+        self._text_cache_version = -1
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.DEBOUNCE_MS)
+        self._timer.timeout.connect(self.flush)
+        document.contentsChange.connect(self._on_contents_change)
+
+    def text(self) -> str:
+        """Returns the document's full plain text (cached until the next edit)."""
+        if self._text_cache_version != self.version:
+            self._text_cache = self.document.toPlainText()
+            self._text_cache_version = self.version
+        return self._text_cache
+
+    def flush(self):
+        """Emits the pending deltas now (no-op if there are none)."""
+        self._timer.stop()
+        if not self._pending:
+            return
+        deltas, self._pending = self._pending, []
+        self.changed.emit(self.version, deltas)
+
+    def discard(self):
+        """Drops pending deltas without emitting them (e.g. the tab is closing)."""
+        self._timer.stop()
+        self._pending = []
+
+    def _inserted_text(self, position: int, chars_added: int) -> str:
+        if chars_added <= 0:
+            return ""
+        cursor = QTextCursor(self.document)
+        end = min(position + chars_added, self.document.characterCount() - 1)
+        cursor.setPosition(position)
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
+        return cursor.selectedText().replace(PARAGRAPH_SEPARATOR, "\n")
+
+    def _on_contents_change(self, position: int, chars_removed: int, chars_added: int):
+        if chars_removed == 0 and chars_added == 0:
+            return
+        self.version += 1
+        delta = ContentDelta(position, chars_removed, self._inserted_text(position, chars_added))
+
+        if not self._pending:
+            self._first_pending_at = time.perf_counter()
+            self._pending.append(delta)
+        elif not self._coalesce(delta):
+            self._pending.append(delta)
+
+        waited_ms = (time.perf_counter() - self._first_pending_at) * 1000
+        if waited_ms < self.MAX_WAIT_MS or not self._timer.isActive():
+            self._timer.start()
+
+    def _coalesce(self, delta: ContentDelta) -> bool:
+        """Merges `delta` into the last pending delta if it directly continues it."""
+        last = self._pending[-1]
+        last_length = qt_length(last.inserted_text)
+        last_end = last.position + last_length
+        if delta.chars_removed == 0 and delta.position == last_end:
+            # Typing on at the end of the previous insertion
+            self._pending[-1] = last._replace(inserted_text=last.inserted_text + delta.inserted_text)
+            return True
+        if (not delta.inserted_text and delta.position + delta.chars_removed == last_end
+                and delta.chars_removed <= last_length and last_length == len(last.inserted_text)):
+            # Backspacing over text that was just typed
+            kept = last_length - delta.chars_removed
+            self._pending[-1] = last._replace(inserted_text=last.inserted_text[:kept])
+            return True
+        return False
@@ -0,0 +1,191 @@
+# website_builder/views/document_patcher.py
+import bisect
+import difflib
+import logging
+from typing import List, NamedTuple, Tuple
+
+from PyQt6.QtGui import QTextCursor, QTextDocument
+
+logger = logging.getLogger(__name__)
+
+
+class LineEdit(NamedTuple):
+    """Replace old lines [start, end) with `lines` (line numbers are block numbers)."""
+    start: int
+    end: int
+    lines: List[str]
+
+
+# Gaps without unique anchor lines are diffed with difflib only up to this many
+# line pairs (old x new); larger ones are replaced as a whole
+MAX_DIFFLIB_PAIRS = 250000
+
+# A same-sized gap is patched line by line if at most this many lines (or this
+# fraction of the gap) differ; otherwise it is diffed properly
+MIN_IN_PLACE_LINES = 16
+IN_PLACE_FRACTION = 16
+
+
+def line_edits(old_lines: List[str], new_lines: List[str]) -> List[LineEdit]:
+    """
+    Returns the edits that turn `old_lines` into `new_lines`, in document order.
+
+    After trimming the common prefix and suffix, a same-sized region in which
+    only a few lines differ is patched line by line. Otherwise, patience-style,
+    lines that occur exactly once on each side are matched up (the longest run
+    of such pairs in order on both sides) and the gaps between them are diffed
+    the same way. That keeps the usual case (a few changed lines in a large
+    file) close to linear, where difflib alone is quadratic on markup with many
+    repeated lines.
+    """
+    edits = []
+    ranges = [(0, len(old_lines), 0, len(new_lines))]
+    while ranges:
+        old_lo, old_hi, new_lo, new_hi = ranges.pop()
+        while old_lo < old_hi and new_lo < new_hi and old_lines[old_lo] == new_lines[new_lo]:
+            old_lo += 1
+            new_lo += 1
+        while old_lo < old_hi and new_lo < new_hi and old_lines[old_hi - 1] == new_lines[new_hi - 1]:
+            old_hi -= 1
+            new_hi -= 1
+        if old_lo == old_hi and new_lo == new_hi:
+            continue
+        if old_lo == old_hi or new_lo == new_hi:
+            edits.append(LineEdit(old_lo, old_hi, new_lines[new_lo:new_hi]))
+            continue
+
+        if old_hi - old_lo == new_hi - new_lo and _edit_in_place(old_lines, old_lo, old_hi, new_lines, new_lo, edits):
+            continue
+
+        anchors = _unique_anchors(old_lines, old_lo, old_hi, new_lines, new_lo, new_hi)
+        if anchors:
+            previous_old, previous_new = old_lo, new_lo
+            for old_index, new_index in anchors:
+                ranges.append((previous_old, old_index, previous_new, new_index))
+                previous_old, previous_new = old_index + 1, new_index + 1
+            ranges.append((previous_old, old_hi, previous_new, new_hi))
+        elif (old_hi - old_lo) * (new_hi - new_lo) <= MAX_DIFFLIB_PAIRS:
+            matcher = difflib.SequenceMatcher(None, old_lines[old_lo:old_hi], new_lines[new_lo:new_hi], autojunk=False)
+            edits.extend(
+                LineEdit(old_lo + i1, old_lo + i2, new_lines[new_lo + j1:new_lo + j2])
+                for tag, i1, i2, j1, j2 in matcher.get_opcodes()
+                if tag != "equal"
+            )
+        else:
+            edits.append(LineEdit(old_lo, old_hi, new_lines[new_lo:new_hi]))
+    edits.sort(key=lambda edit: (edit.start, edit.end))
+    return edits
+
+
+def _edit_in_place(old_lines, old_lo, old_hi, new_lines, new_lo, edits: List[LineEdit]) -> bool:
+    """
+    Same-sized gap: if only a few lines differ position by position (lines were
+    edited, none inserted or removed), adds one edit per run of them and returns True.
+    """
+    offset = new_lo - old_lo
+    differing = [
+        index for index, (old, new) in enumerate(zip(old_lines[old_lo:old_hi], new_lines[new_lo:old_hi + offset]), old_lo)
+        if old != new
+    ]
+    if len(differing) > max(MIN_IN_PLACE_LINES, (old_hi - old_lo) // IN_PLACE_FRACTION):
+        return False
+    run_start = previous = differing[0]
+    for index in differing[1:] + [None]:
+        if index != previous + 1:
+            edits.append(LineEdit(run_start, previous + 1, new_lines[run_start + offset:previous + 1 + offset]))
+            run_start = index
+        previous = index
+    return True
+
+
+def _unique_anchors(old_lines, old_lo, old_hi, new_lines, new_lo, new_hi) -> List[Tuple[int, int]]:
+    """Pairs (old, new) of lines unique on both sides, as the longest run increasing on both."""
+    counts = {}
+    for index in range(old_lo, old_hi):
+        line = old_lines[index]
+        entry = counts.get(line)
+        counts[line] = [1, index, -1] if entry is None else [entry[0] + 1, index, -1]
+    for index in range(new_lo, new_hi):
+        entry = counts.get(new_lines[index])
+        if entry is not None and entry[0] == 1:
+            # A second occurrence on the new side disqualifies the line
+            entry[2] = index if entry[2] == -1 else -2
+    pairs = sorted((new, old) for count, old, new in counts.values() if count == 1 and new >= 0)
+    if not pairs:
+        return []
+
+    # Longest increasing subsequence of the old positions (patience sorting)
+    tails, tail_indices, predecessors = [], [], [-1] * len(pairs)
+    for i, (_, old) in enumerate(pairs):
+        slot = bisect.bisect_left(tails, old)
+        if slot:
+            predecessors[i] = tail_indices[slot - 1]
+        if slot == len(tails):
+            tails.append(old)
+            tail_indices.append(i)
+        else:
+            tails[slot] = old
+            tail_indices[slot] = i
+    anchors = []
+    i = tail_indices[-1]
+    while i != -1:
+        new, old = pairs[i]
+        anchors.append((old, new))
+        i = predecessors[i]
+    anchors.reverse()
+    return anchors
+
+
+def patch_document(document: QTextDocument, new_text: str, old_text: str = None) -> int:
+    """
+    Turns `document`'s content into `new_text` by editing only the lines that differ.
+
+    Unlike setPlainText, unchanged blocks keep their layout and highlighting, the
+    undo history is kept (the whole patch is one undo step), and cursors in
+    untouched text stay where they are. Pass `old_text` if the caller already
+    has the document's plain text. Returns the number of line edits applied.
+    """
+    if old_text is None:
+        old_text = document.toPlainText()
+    if old_text == new_text:
+        return 0
+    edits = line_edits(old_text.split("\n"), new_text.split("\n"))
+    if not edits:
+        return 0
+
+    block_count = document.blockCount()
+    cursor = QTextCursor(document)
+    cursor.beginEditBlock()
+    try:
+        # Back to front, so positions of the edits still to come stay valid
+        for start, end, lines in reversed(edits):
+            _apply_edit(document, cursor, block_count, start, end, lines)
+    finally:
+        cursor.endEditBlock()
+    logger.debug(f"Patched document with {len(edits)} line edits")
+    return len(edits)
+
+
+def _apply_edit(document: QTextDocument, cursor: QTextCursor, block_count: int, start: int, end: int, lines: List[str]):
+    if end < block_count:
+        # Whole lines, each with its trailing separator
+        cursor.setPosition(document.findBlockByNumber(start).position())
+        cursor.setPosition(document.findBlockByNumber(end).position(), QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText("".join(line + "\n" for line in lines))
+        return
+
+    # The edit reaches the last line, which has no trailing separator
+    end_position = document.characterCount() - 1
+    if start == block_count:
+        cursor.setPosition(end_position)
+        cursor.insertText("".join("\n" + line for line in lines))
+    elif lines:
+        cursor.setPosition(document.findBlockByNumber(start).position())
+        cursor.setPosition(end_position, QTextCursor.MoveMode.KeepAnchor)
+        cursor.insertText("\n".join(lines))
+    else:
+        # Removing the trailing lines also removes the separator before them
+        previous = document.findBlockByNumber(start - 1)
+        cursor.setPosition(previous.position() + previous.length() - 1)
+        cursor.setPosition(end_position, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
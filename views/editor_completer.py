@@ -0,0 +1,158 @@
+# website_builder/views/editor_completer.py
+import logging
+from typing import Optional
+
+from PyQt6 import sip
+from PyQt6.QtCore import QEvent, QObject, QStringListModel, Qt, QTimer
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QCompleter, QPlainTextEdit
+
+from utils.completion_engine import CONTEXT_CHARS, CompletionContext, completion_context
+from utils.symbol_extractor import language_for_path
+
+logger = logging.getLogger(__name__)
+
+_ACCEPT_KEYS = (Qt.Key.Key_Return, Qt.Key.Key_Enter, Qt.Key.Key_Tab)
+
+
+class EditorCompleter(QObject):
+    """
+    Completion popup for editors, fed by a CompletionEngine. It pops up by
+    itself while a word is typed in a completable place (see
+    completion_context) and on Ctrl+Space; Enter/Tab or a click inserts the
+    selected candidate, Escape closes it.
+
+    One completer serves all editors. Editors in large-file mode are left alone.
+    """
+    MAX_ITEMS = 20
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.engine = None # CompletionEngine, set once the controller has created it
+        self._editors = []
+        self._editor: Optional[QPlainTextEdit] = None # Editor the popup is (or is about to be) shown for
+        self._context: Optional[CompletionContext] = None
+        self._forced = False
+
+        self._model = QStringListModel(self)
+        self.completer = QCompleter(self._model, self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.completer.setMaxVisibleItems(10)
+        self.completer.activated.connect(self._insert)
+        self.completer.popup().installEventFilter(self) # Runs before QCompleter's own filter
+
+        # Completions are worked out once the key has been applied to the text
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(0)
+        self._refresh_timer.timeout.connect(self._refresh)
+
+    def attach(self, editor: QPlainTextEdit):
+        if editor in self._editors:
+            return
+        self._editors.append(editor)
+        editor.installEventFilter(self)
+
+    def detach(self, editor: QPlainTextEdit):
+        if editor not in self._editors:
+            return
+        self._editors.remove(editor)
+        editor.removeEventFilter(self)
+        if self._editor is editor:
+            self._hide()
+            self._editor = None
+            self.completer.setWidget(None)
+
+    def eventFilter(self, watched, event):
+        event_type = event.type()
+        if event_type == QEvent.Type.KeyPress:
+            if watched is self.completer.popup():
+                return self._popup_key_press(event)
+            if isinstance(watched, QPlainTextEdit):
+                return self._editor_key_press(watched, event)
+        return False
+
+    def _editor_key_press(self, editor: QPlainTextEdit, event) -> bool:
+        if self.engine is None or editor.property("large_file"):
+            return False
+        if event.key() == Qt.Key.Key_Space and event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            self._schedule(editor, forced=True)
+            return True # Ctrl+Space would otherwise insert a space
+        if event.text().isprintable() and event.text() or event.key() == Qt.Key.Key_Backspace:
+            self._schedule(editor, forced=False)
+        return False
+
+    def _popup_key_press(self, event) -> bool:
+        # While the popup is open the keys reach it first; QCompleter passes
+        # unhandled ones straight on to the editor (bypassing its filters), so
+        # acceptance and refreshing are handled here
+        key = event.key()
+        if key in _ACCEPT_KEYS and not event.modifiers() & Qt.KeyboardModifier.ControlModifier:
+            index = self.completer.popup().currentIndex()
+            if not index.isValid():
+                index = self._model.index(0)
+            if index.isValid():
+                self._insert(index.data())
+            self._hide()
+            return True
+        if key == Qt.Key.Key_Escape:
+            self._hide()
+            return True
+        if self._editor is not None and (event.text().isprintable() and event.text() or key == Qt.Key.Key_Backspace):
+            self._schedule(self._editor, forced=self._forced)
+        return False
+
+    def _schedule(self, editor: QPlainTextEdit, forced: bool):
+        if editor is not self._editor:
+            self._hide()
+            self._editor = editor
+        self._forced = forced
+        self._refresh_timer.start()
+
+    def _hide(self):
+        self._refresh_timer.stop()
+        self._context = None
+        self.completer.popup().hide()
+
+    def _refresh(self):
+        editor = self._editor
+        if editor is None or sip.isdeleted(editor) or self.engine is None:
+            return
+        cursor = editor.textCursor()
+        file_path = editor.property("file_path")
+        if cursor.hasSelection() or not file_path:
+            self._hide()
+            return
+        position = cursor.position()
+        cursor.setPosition(max(0, position - CONTEXT_CHARS), QTextCursor.MoveMode.KeepAnchor)
+        before = cursor.selectedText().replace("\u2029", "\n") # Qt's paragraph separator
+
+        context = completion_context(before, language_for_path(file_path), file_path)
+        if context is None or not (context.prefix or self._forced):
+            self._hide()
+            return
+        words = self.engine.complete(context, self.MAX_ITEMS)
+        if not words or words == [context.prefix]:
+            self._hide()
+            return
+        self._context = context
+        self._model.setStringList(words)
+        if self.completer.widget() is not editor:
+            self.completer.setWidget(editor)
+        popup = self.completer.popup()
+        popup.setCurrentIndex(self._model.index(0))
+        rect = editor.cursorRect()
+        rect.translate(editor.viewport().pos())
+        rect.setWidth(popup.sizeHintForColumn(0) + popup.verticalScrollBar().sizeHint().width())
+        self.completer.complete(rect)
+
+    def _insert(self, word: str):
+        editor, context = self._editor, self._context
+        self._context = None
+        if editor is None or context is None or sip.isdeleted(editor) or not word:
+            return
+        cursor = editor.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.Left, QTextCursor.MoveMode.KeepAnchor, len(context.prefix))
+        cursor.insertText(word)
+        editor.setTextCursor(cursor)
+        self.engine.record_use(context, word)
@@ -4,8 +4,9 @@ import shutil
 import logging
 from PyQt6.QtWidgets import ( QTreeView, QMenu, QInputDialog, QMessageBox,
                               QLineEdit, QApplication, QAbstractItemView, QStyledItemDelegate, QStyleOptionViewItem )
-from PyQt6.QtCore import QDir, QModelIndex, Qt, QFileSystemWatcher, pyqtSignal, QTimer, pyqtSlot, QItemSelectionModel, QEvent
+from PyQt6.QtCore import QDir, QModelIndex, Qt, pyqtSignal, QTimer, pyqtSlot, QItemSelectionModel, QEvent
 from PyQt6.QtGui import QAction, QIcon, QFileSystemModel, QKeySequence, QKeyEvent
+from utils.fs_events import MODIFIED, FileSystemEventService
 from .project_file_proxy_model import ProjectFileProxyModel
 
 logger = logging.getLogger(__name__)
@@ -96,9 +97,8 @@ class FileExplorer(QTreeView):
         self.doubleClicked.connect(self.item_double_clicked)
         self.source_model.dataChanged.connect(self._handle_data_changed)
 
-        # File Watcher
-        self.root_watcher = QFileSystemWatcher(self)
-        self.root_watcher.directoryChanged.connect(self._refresh_current_directory)
+        # File Watcher (shared filesystem event service, whole project tree)
+        self.fs_subscription = None
 
         # Delete Action
         self.delete_action = QAction("Delete", self)
@@ -137,8 +137,10 @@ class FileExplorer(QTreeView):
             return
 
         logger.info(f"Setting root path to: {path}")
-        if self.current_root_path and self.current_root_path in self.root_watcher.directories():
-            self.root_watcher.removePath(self.current_root_path)
+        fs_events = FileSystemEventService.instance()
+        if self.fs_subscription is not None and self.current_root_path != path:
+            fs_events.unsubscribe(self.fs_subscription)
+            self.fs_subscription = None
             logger.debug(f"Stopped watching old root: {self.current_root_path}")
 
         self.current_root_path = path
@@ -149,13 +151,18 @@ class FileExplorer(QTreeView):
         proxy_root_index = self.proxy_model.mapFromSource(source_root_index)
         self.setRootIndex(proxy_root_index)
 
-        if path not in self.root_watcher.directories():
-            self.root_watcher.addPath(path)
+        if self.fs_subscription is None:
+            self.fs_subscription = fs_events.subscribe(path, self._on_tree_events)
             logger.debug(f"Started watching new root: {path}")
 
         self.folder_changed.emit(path)
         # No need to call filter update here, proxy handles it based on its mode
 
+    def _on_tree_events(self, events):
+        """Batched filesystem events from the project tree; only structure changes matter."""
+        if any(event.kind != MODIFIED for event in events):
+            self._refresh_current_directory(self.current_root_path)
+
     def _refresh_current_directory(self, path: str):
         """Refreshes the view for the current root directory."""
         # This might still be needed if the watcher approach is kept,
@@ -0,0 +1,190 @@
+# website_builder/views/find_panel.py
+import os
+import logging
+from typing import List, Optional
+
+from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtWidgets import (QCheckBox, QHBoxLayout, QLabel, QLineEdit, QPushButton,
+                           QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget)
+
+from utils.project_search import SearchMatch
+
+logger = logging.getLogger(__name__)
+
+
+class FindInFilesPanel(QWidget):
+    """
+    Query box (literal or regular expression, optionally case sensitive) over
+    a tree of matches grouped by file. Results are appended as the search
+    streams them in; activating a match emits location_activated.
+
+    With replacement text entered, every match is shown with its replaced
+    line. Replace All applies the replacement throughout the project (also
+    beyond the listed matches if the list was cut off), except in files
+    unchecked here.
+    """
+    search_requested = pyqtSignal(str, bool, bool, str) # query, regex, case_sensitive, replacement ("" = no preview)
+    replace_requested = pyqtSignal(str, bool, bool, str, list) # query, regex, case_sensitive, replacement, [excluded file_path]
+    cancel_requested = pyqtSignal()
+    location_activated = pyqtSignal(str, int, int) # file_path, line, column (0-based)
+
+    PREVIEW_DELAY_MS = 400 # Typing pause before the preview is refreshed for new replacement text
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project_root: Optional[str] = None
+        self._file_items = {} # file_path -> QTreeWidgetItem of the current results
+        self._match_count = 0
+        self._last_query = None # (query, regex, case_sensitive) of the shown results
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        controls = QHBoxLayout()
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Find in files")
+        self.query_edit.returnPressed.connect(self._request_search)
+        self.regex_checkbox = QCheckBox("Regex")
+        self.case_checkbox = QCheckBox("Match case")
+        self.find_button = QPushButton("Find")
+        self.find_button.clicked.connect(self._request_search)
+        self.stop_button = QPushButton("Stop")
+        self.stop_button.setEnabled(False)
+        self.stop_button.clicked.connect(self.cancel_requested)
+        controls.addWidget(self.query_edit, 1)
+        controls.addWidget(self.regex_checkbox)
+        controls.addWidget(self.case_checkbox)
+        controls.addWidget(self.find_button)
+        controls.addWidget(self.stop_button)
+        layout.addLayout(controls)
+
+        replace_controls = QHBoxLayout()
+        self.replace_edit = QLineEdit()
+        self.replace_edit.setPlaceholderText("Replace with (\\1, \\g<name> refer to regex groups)")
+        self.replace_edit.textEdited.connect(self._on_replacement_edited)
+        self.replace_button = QPushButton("Replace All")
+        self.replace_button.setEnabled(False)
+        self.replace_button.clicked.connect(self._request_replace)
+        replace_controls.addWidget(self.replace_edit, 1)
+        replace_controls.addWidget(self.replace_button)
+        layout.addLayout(replace_controls)
+
+        self._preview_timer = QTimer(self)
+        self._preview_timer.setSingleShot(True)
+        self._preview_timer.setInterval(self.PREVIEW_DELAY_MS)
+        self._preview_timer.timeout.connect(self._refresh_preview)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+        self.results_tree = QTreeWidget()
+        self.results_tree.setHeaderHidden(True)
+        self.results_tree.setUniformRowHeights(True) # Keeps big result sets cheap to lay out
+        self.results_tree.itemActivated.connect(self._on_item_activated)
+        layout.addWidget(self.results_tree)
+
+    def focus_query(self, text: str = ""):
+        if text:
+            self.query_edit.setText(text)
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def _request_search(self):
+        query = self.query_edit.text()
+        if query:
+            self._last_query = (query, self.regex_checkbox.isChecked(), self.case_checkbox.isChecked())
+            self.search_requested.emit(*self._last_query, self.replace_edit.text())
+
+    def _on_replacement_edited(self, text: str):
+        if self._last_query is not None:
+            self._preview_timer.start()
+
+    def _refresh_preview(self):
+        if self._last_query is not None:
+            self.search_requested.emit(*self._last_query, self.replace_edit.text())
+
+    def unchecked_files(self) -> List[str]:
+        return [
+            file_path for file_path, item in self._file_items.items()
+            if item.checkState(0) != Qt.CheckState.Checked
+        ]
+
+    def _request_replace(self):
+        if self._last_query is not None:
+            self.replace_requested.emit(*self._last_query, self.replace_edit.text(), self.unchecked_files())
+
+    def _display_path(self, file_path: str) -> str:
+        if self.project_root:
+            try:
+                return os.path.relpath(file_path, self.project_root)
+            except ValueError: # Different drive on Windows
+                pass
+        return file_path
+
+    def begin_search(self, query: str):
+        self.results_tree.clear()
+        self._file_items.clear()
+        self._match_count = 0
+        self.status_label.setText(f"Searching for '{query}'...")
+        self.stop_button.setEnabled(True)
+        self.replace_button.setEnabled(False)
+
+    def show_error(self, message: str):
+        self.status_label.setText(message)
+        self.stop_button.setEnabled(False)
+
+    def add_matches(self, matches: List[SearchMatch]):
+        self.results_tree.setUpdatesEnabled(False)
+        try:
+            for match in matches:
+                file_item = self._file_items.get(match.file_path)
+                if file_item is None:
+                    file_item = QTreeWidgetItem(self.results_tree)
+                    file_item.setFlags(file_item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+                    file_item.setCheckState(0, Qt.CheckState.Checked) # Unchecked files are left alone by Replace All
+                    file_item.setData(0, Qt.ItemDataRole.UserRole, (match.file_path, match.line, match.column))
+                    file_item.setExpanded(True)
+                    self._file_items[match.file_path] = file_item
+                text = f"{match.line + 1}: {match.line_text.strip()}"
+                if match.preview is not None:
+                    text += f"    \u2192    {match.preview.strip()}"
+                item = QTreeWidgetItem(file_item, [text])
+                item.setData(0, Qt.ItemDataRole.UserRole, (match.file_path, match.line, match.column))
+                file_item.setText(0, f"{self._display_path(match.file_path)} ({file_item.childCount()})")
+            self._match_count += len(matches)
+        finally:
+            self.results_tree.setUpdatesEnabled(True)
+        self.status_label.setText(f"Searching... {self._match_count} matches in {len(self._file_items)} files")
+
+    def search_finished(self, files_searched: int, matches: int):
+        self.stop_button.setEnabled(False)
+        self.replace_button.setEnabled(matches > 0)
+        self.status_label.setText(
+            f"{matches} matches in {len(self._file_items)} files ({files_searched} files searched)"
+        )
+
+    def search_cancelled(self):
+        self.stop_button.setEnabled(False)
+        self.status_label.setText(f"Stopped: {self._match_count} matches in {len(self._file_items)} files")
+
+    def begin_replace(self, file_count: int):
+        self.replace_button.setEnabled(False)
+        self.find_button.setEnabled(False)
+        self.stop_button.setEnabled(True)
+        self.status_label.setText(f"Replacing in {file_count} files...")
+
+    def replace_progress(self, done: int, total: int):
+        self.status_label.setText(f"Replacing... {done} of {total} files")
+
+    def replace_finished(self, message: str):
+        self.find_button.setEnabled(True)
+        self.stop_button.setEnabled(False)
+        self.results_tree.clear()
+        self._file_items.clear()
+        self._match_count = 0
+        self.status_label.setText(message)
+
+    def _on_item_activated(self, item: QTreeWidgetItem, column: int):
+        location = item.data(0, Qt.ItemDataRole.UserRole)
+        if location:
+            self.location_activated.emit(*location)
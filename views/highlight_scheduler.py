@@ -0,0 +1,165 @@
+# website_builder/views/highlight_scheduler.py
+import time
+import logging
+
+from PyQt6.QtCore import QObject, QTimer
+from PyQt6.QtGui import QTextBlock, QTextCursor
+from PyQt6.QtWidgets import QPlainTextEdit
+
+logger = logging.getLogger(__name__)
+
+
+class HighlightScheduler(QObject):
+    """
+    Viewport-first, time-sliced highlighting for large documents.
+
+    QSyntaxHighlighter normally highlights the whole document in one go when it
+    is attached, freezing the GUI on big files. While a scheduler is active, the
+    highlighter skips blocks that have never been highlighted unless the
+    scheduler has released them (see LexerHighlighter.highlightBlock). The
+    scheduler then:
+
+    1. highlights the blocks currently visible in the editor straight away (and
+       again whenever the user scrolls to a part that is not done yet), and
+    2. walks the rest of the document from the top in small slices on the event
+       loop, each bounded by SLICE_BUDGET_MS, so the GUI stays responsive.
+
+    Visible blocks that are reached before their predecessors are lexed from the
+    language's initial state, which is readable but may be off inside multi-line
+    constructs. When the background pass reaches them, Qt's own state-change
+    cascade re-lexes them with the correct state.
+
+    Once the background pass reaches the end, the scheduler detaches and the
+    highlighter goes back to its normal incremental behaviour.
+    """
+    MIN_BLOCKS = 2000           # Smaller documents are highlighted synchronously
+    SLICE_BUDGET_MS = 8         # Time per background slice (half a 60 Hz frame)
+    VIEWPORT_MARGIN_BLOCKS = 20 # Blocks past the visible area highlighted up front
+    CHUNK_BLOCKS = 100          # Blocks released at a time by the background pass
+
+    def __init__(self, editor: QPlainTextEdit, highlighter, parent=None):
+        super().__init__(parent if parent is not None else editor)
+        self.editor = editor
+        self.highlighter = highlighter
+        self.document = editor.document()
+
+        # Blocks up to the frontier are released to the highlighter; the
+        # background pass resumes at _resume. QTextCursors keep both positions
+        # valid while the user edits (created in start(), once the text is in).
+        self._frontier = None
+        self._resume = None
+        self._visible_range = (0, 0) # Character positions released for the viewport
+        self._in_visible_pass = False
+
+        self._slice_timer = QTimer(self)
+        self._slice_timer.setInterval(0)
+        self._slice_timer.timeout.connect(self._run_slice)
+
+    @classmethod
+    def should_schedule(cls, content: str) -> bool:
+        """Whether a document with this text is large enough to time-slice."""
+        return content.count("\n") + 1 >= cls.MIN_BLOCKS
+
+    def start(self):
+        """
+        Takes over highlighting of the editor's document.
+
+        The highlighter should have been attached while the document was empty
+        (and the text inserted with document signals blocked); otherwise
+        QSyntaxHighlighter has already queued its own full-document pass.
+        """
+        self._frontier = QTextCursor(self.document)
+        self._resume = QTextCursor(self.document)
+        self.highlighter.scheduler = self
+        self.editor.updateRequest.connect(self._on_update_request)
+        self._highlight_visible()
+        self._slice_timer.start()
+        logger.debug(f"Started time-sliced highlighting for {self.document.blockCount()} blocks.")
+
+    def stop(self):
+        """Detaches the scheduler; the highlighter resumes normal behaviour."""
+        self._slice_timer.stop()
+        try:
+            self.editor.updateRequest.disconnect(self._on_update_request)
+        except TypeError:
+            pass # Already disconnected
+        if getattr(self.highlighter, "scheduler", None) is self:
+            self.highlighter.scheduler = None
+
+    def is_released(self, block: QTextBlock) -> bool:
+        """Whether the highlighter may highlight this never-highlighted block yet."""
+        position = block.position()
+        if position <= self._frontier.position():
+            return True
+        start, end = self._visible_range
+        return start <= position <= end
+
+    def _rehighlight(self, block: QTextBlock):
+        # Applying formats marks the document contents dirty, which makes the
+        # editor emit textChanged/updateRequest; those are not user edits.
+        was_blocked = self.editor.blockSignals(True)
+        try:
+            self.highlighter.rehighlightBlock(block)
+        finally:
+            self.editor.blockSignals(was_blocked)
+
+    # --- Viewport ---
+    def _visible_blocks(self):
+        """Returns the first and last block of the visible area (plus a margin)."""
+        first = self.editor.firstVisibleBlock()
+        line_spacing = max(self.editor.fontMetrics().lineSpacing(), 1)
+        count = self.editor.viewport().height() // line_spacing + 1 + self.VIEWPORT_MARGIN_BLOCKS
+        last = first
+        while count > 0 and last.next().isValid():
+            last = last.next()
+            count -= 1
+        return first, last
+
+    def _highlight_visible(self):
+        if self._in_visible_pass:
+            return
+        self._in_visible_pass = True
+        try:
+            first, last = self._visible_blocks()
+            self._visible_range = (first.position(), last.position())
+            block = first
+            while block.isValid() and block.position() <= last.position():
+                if block.userState() == -1: # Not highlighted yet
+                    self._rehighlight(block)
+                block = block.next()
+        finally:
+            self._in_visible_pass = False
+
+    def _on_update_request(self, rect, dy):
+        # Fires on scrolling, resizing and repaints; only does work when the
+        # viewport shows blocks that have not been highlighted yet.
+        first, last = self._visible_blocks()
+        if dy != 0 or first.userState() == -1 or last.userState() == -1:
+            self._highlight_visible()
+
+    # --- Background pass ---
+    def _run_slice(self):
+        deadline = time.perf_counter() + self.SLICE_BUDGET_MS / 1000.0
+        block = self.document.findBlock(self._resume.position())
+        while block.isValid() and time.perf_counter() < deadline:
+            chunk_end = block
+            for _ in range(self.CHUNK_BLOCKS - 1):
+                if not chunk_end.next().isValid():
+                    break
+                chunk_end = chunk_end.next()
+
+            # Release the chunk; Qt's state-change cascade then usually covers
+            # it from a single rehighlightBlock call.
+            if chunk_end.position() > self._frontier.position():
+                self._frontier.setPosition(chunk_end.position())
+            while block.isValid() and block.position() <= chunk_end.position():
+                if block.userState() == -1:
+                    self._rehighlight(block)
+                block = block.next()
+
+            if block.isValid():
+                self._resume.setPosition(block.position())
+
+        if not block.isValid():
+            logger.debug("Time-sliced highlighting finished.")
+            self.stop()
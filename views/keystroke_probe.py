@@ -0,0 +1,72 @@
+# website_builder/views/keystroke_probe.py
+import time
+import logging
+
+from PyQt6.QtCore import QEvent, QObject, Qt
+from PyQt6.QtWidgets import QPlainTextEdit
+
+from utils.latency_metrics import KEYSTROKE_TO_PAINT, LatencyMetrics
+
+logger = logging.getLogger(__name__)
+
+# Pressed on their own these change nothing (and would be measured until the cursor blinks)
+_MODIFIER_KEYS = frozenset((Qt.Key.Key_Control, Qt.Key.Key_Shift, Qt.Key.Key_Alt, Qt.Key.Key_Meta,
+                            Qt.Key.Key_AltGr, Qt.Key.Key_CapsLock))
+
+
+class KeystrokeLatencyProbe(QObject):
+    """
+    Measures keystroke-to-paint latency of editors: from a key press reaching
+    the editor until its viewport starts the next repaint (which includes the
+    edit, highlighting and layout the key caused). Keys that change neither
+    the text nor the cursor are not measured: the next paint is not theirs.
+
+    One probe serves all editors. It is only installed as an event filter while
+    latency metrics are enabled, so it costs nothing otherwise.
+    """
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.metrics = LatencyMetrics.instance()
+        self._editors = []
+        # viewport -> (perf_counter_ns of the first unpainted key press, editor, its state before the key)
+        self._pending = {}
+
+    def attach(self, editor: QPlainTextEdit):
+        if editor in self._editors:
+            return
+        self._editors.append(editor)
+        editor.installEventFilter(self)
+        editor.viewport().installEventFilter(self)
+
+    def detach(self, editor: QPlainTextEdit):
+        if editor not in self._editors:
+            return
+        self._editors.remove(editor)
+        editor.removeEventFilter(self)
+        editor.viewport().removeEventFilter(self)
+        self._pending.pop(editor.viewport(), None)
+
+    def detach_all(self):
+        for editor in list(self._editors):
+            self.detach(editor)
+
+    def eventFilter(self, watched, event):
+        event_type = event.type()
+        if event_type == QEvent.Type.KeyPress and isinstance(watched, QPlainTextEdit):
+            if event.key() in _MODIFIER_KEYS:
+                return False
+            viewport = watched.viewport()
+            pending = self._pending.get(viewport)
+            # Keys pressed before the next paint are measured from the first one that changed something
+            if pending is None or pending[2] == self._state(watched):
+                self._pending[viewport] = (time.perf_counter_ns(), watched, self._state(watched))
+        elif event_type == QEvent.Type.Paint:
+            pending = self._pending.pop(watched, None)
+            if pending is not None and pending[2] != self._state(pending[1]):
+                self.metrics.record_since(KEYSTROKE_TO_PAINT, pending[0])
+        return False
+
+    @staticmethod
+    def _state(editor: QPlainTextEdit) -> tuple:
+        cursor = editor.textCursor()
+        return editor.document().revision(), cursor.position(), cursor.anchor()
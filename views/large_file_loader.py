@@ -0,0 +1,142 @@
+# website_builder/views/large_file_loader.py
+import io
+import os
+import mmap
+import time
+import codecs
+import hashlib
+import logging
+
+from PyQt6.QtCore import QObject, QTimer, pyqtSignal
+from PyQt6.QtGui import QTextCursor
+from PyQt6.QtWidgets import QPlainTextEdit
+
+from utils.file_loader import FileFingerprint
+
+logger = logging.getLogger(__name__)
+
+
+class LargeFileLoader(QObject):
+    """
+    Fills an editor with a large file in chunks on the event loop.
+
+    The file is memory-mapped, so only the chunk being decoded is ever copied into
+    Python. Each timer tick decodes and appends chunks until SLICE_BUDGET_MS is
+    used up, keeping the GUI responsive and reporting progress as it goes.
+
+    Decoding is UTF-8 with universal newlines (like open(..., "r")). If the file
+    turns out not to be valid UTF-8, loading restarts as latin-1, matching the
+    fallback of the normal open path.
+
+    The content is hashed as it streams through, so `fingerprint` is available
+    once loading has finished without reading the file again.
+    """
+    progress = pyqtSignal(int, int)     # bytes loaded, total bytes
+    finished = pyqtSignal(str)          # encoding used
+    failed = pyqtSignal(str)            # error message
+
+    CHUNK_BYTES = 64 * 1024
+    SLICE_BUDGET_MS = 12
+
+    def __init__(self, file_path: str, editor: QPlainTextEdit, parent=None):
+        super().__init__(parent if parent is not None else editor)
+        self.file_path = file_path
+        self.editor = editor
+        self.document = editor.document()
+        self.encoding = "utf-8"
+        self.fingerprint = None
+
+        self._file = None
+        self._map = None
+        self._offset = 0
+        self._decoder = None
+        self._cursor = None
+        self._stat = None
+        self._hash = None
+
+        self._timer = QTimer(self)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._load_slice)
+
+    @property
+    def total_bytes(self) -> int:
+        return len(self._map) if self._map is not None else 0
+
+    def start(self):
+        """Maps the file and starts filling the (empty) document."""
+        try:
+            self._file = open(self.file_path, "rb")
+            self._stat = os.fstat(self._file.fileno())
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError) as e:
+            self._close()
+            logger.error(f"Could not map large file {self.file_path}: {e}")
+            self.failed.emit(str(e))
+            return
+
+        # Loading is not an edit: nothing to undo, no modification flag
+        self.document.setUndoRedoEnabled(False)
+        self._restart("utf-8")
+        logger.info(f"Loading large file in chunks ({self.total_bytes} bytes): {self.file_path}")
+        self._timer.start()
+
+    def cancel(self):
+        """Stops loading (e.g. the tab was closed) and releases the mapping."""
+        if self._timer.isActive():
+            logger.debug(f"Cancelled loading large file: {self.file_path}")
+        self._timer.stop()
+        self._close()
+
+    def _restart(self, encoding: str):
+        self.encoding = encoding
+        self._offset = 0
+        self._hash = hashlib.blake2b(digest_size=16)
+        self._decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(encoding)(), translate=True
+        )
+        self.document.clear()
+        self._cursor = QTextCursor(self.document)
+
+    def _append(self, text: str):
+        if text:
+            self._cursor.movePosition(QTextCursor.MoveOperation.End)
+            self._cursor.insertText(text)
+
+    def _load_slice(self):
+        deadline = time.perf_counter() + self.SLICE_BUDGET_MS / 1000.0
+        try:
+            while self._offset < self.total_bytes and time.perf_counter() < deadline:
+                end = min(self._offset + self.CHUNK_BYTES, self.total_bytes)
+                chunk = self._map[self._offset:end]
+                self._offset = end
+                self._hash.update(chunk)
+                self._append(self._decoder.decode(chunk, final=end >= self.total_bytes))
+        except UnicodeDecodeError:
+            logger.warning(f"UTF-8 decoding failed for {self.file_path}, reloading as latin-1.")
+            self._restart("latin-1")
+            return
+        except Exception as e:
+            self.cancel()
+            self.document.setUndoRedoEnabled(True)
+            logger.error(f"Error loading large file {self.file_path}: {e}", exc_info=True)
+            self.failed.emit(str(e))
+            return
+
+        self.progress.emit(self._offset, self.total_bytes)
+        if self._offset >= self.total_bytes:
+            self.fingerprint = FileFingerprint(self._stat.st_mtime_ns, self._stat.st_size, self._hash.digest())
+            self._timer.stop()
+            self._close()
+            self.document.setUndoRedoEnabled(True)
+            self.document.setModified(False)
+            logger.info(f"Finished loading large file ({self.encoding}): {self.file_path}")
+            self.finished.emit(self.encoding)
+
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._cursor = None
@@ -0,0 +1,77 @@
+# website_builder/views/latency_panel.py
+import logging
+
+from PyQt6.QtCore import QTimer
+from PyQt6.QtWidgets import (QCheckBox, QHBoxLayout, QHeaderView, QPushButton,
+                           QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget)
+
+from utils.latency_metrics import LatencyMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyPanel(QWidget):
+    """
+    Debug panel showing the latency histograms recorded by LatencyMetrics
+    (count, mean, percentiles and max per metric), refreshed while visible.
+    """
+    REFRESH_MS = 1000
+    COLUMNS = ("Metric", "Count", "Mean (ms)", "p50 (ms)", "p90 (ms)", "p99 (ms)", "Max (ms)")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.metrics = LatencyMetrics.instance()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+
+        controls = QHBoxLayout()
+        self.enabled_checkbox = QCheckBox("Record latency metrics")
+        self.enabled_checkbox.setChecked(self.metrics.enabled)
+        self.enabled_checkbox.toggled.connect(self.metrics.set_enabled)
+        self.metrics.enabled_changed.connect(self.enabled_checkbox.setChecked)
+        reset_button = QPushButton("Reset")
+        reset_button.clicked.connect(self._reset)
+        controls.addWidget(self.enabled_checkbox, 1)
+        controls.addWidget(reset_button)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, len(self.COLUMNS))
+        self.table.setHorizontalHeaderLabels(self.COLUMNS)
+        self.table.verticalHeader().hide()
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
+        layout.addWidget(self.table)
+
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setInterval(self.REFRESH_MS)
+        self._refresh_timer.timeout.connect(self.refresh)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self._refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._refresh_timer.stop()
+
+    def refresh(self):
+        histograms = sorted(self.metrics.snapshot().items())
+        self.table.setRowCount(len(histograms))
+        for row, (name, histogram) in enumerate(histograms):
+            values = (
+                name,
+                str(histogram.count),
+                f"{histogram.mean_us() / 1000:.3f}",
+                f"{histogram.percentile_us(0.50) / 1000:.3f}",
+                f"{histogram.percentile_us(0.90) / 1000:.3f}",
+                f"{histogram.percentile_us(0.99) / 1000:.3f}",
+                f"{histogram.max_us / 1000:.3f}",
+            )
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+    def _reset(self):
+        self.metrics.reset()
+        self.refresh()
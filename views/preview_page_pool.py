@@ -0,0 +1,158 @@
+# website_builder/views/preview_page_pool.py
+import os
+import logging
+from collections import OrderedDict
+from typing import Iterator, Optional, Set
+
+from PyQt6.QtCore import QObject, QSettings
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineScript
+
+from utils.page_dependencies import CSS_EXTENSIONS, HTML_EXTENSIONS, JS_EXTENSIONS, affects, normalized_path
+
+logger = logging.getLogger(__name__)
+
+# Rough size of a page's share of the renderer: its JavaScript heap, the
+# resources it decoded and its elements (with their style and layout data)
+_MEMORY_ESTIMATE_JS = """
+(function () {
+    let bytes = performance.memory ? performance.memory.usedJSHeapSize : 0;
+    for (const entry of performance.getEntriesByType("navigation").concat(performance.getEntriesByType("resource"))) {
+        bytes += entry.decodedBodySize || 0;
+    }
+    return bytes + document.getElementsByTagName("*").length * 1024;
+})()
+"""
+
+
+class PooledPage:
+    """A preview page kept alive while not shown, with the state WebPreview tracks for the page it shows."""
+    def __init__(self, page: QWebEnginePage, file_path: str, prefetched: bool = False):
+        self.page = page
+        self.file_path = file_path
+        self.prefetched = prefetched # Loaded in the background, never shown yet
+        self.loaded = not prefetched # Finished loading
+        self.dependencies: Optional[Set[str]] = None # See WebPreview.dependencies
+        self.runtime_dependencies: Set[str] = set()
+        self.loaded_text: Optional[str] = None
+        self.page_text: Optional[str] = None
+        self.changed_stylesheets: Set[str] = set() # Changed while pooled; swapped in when shown
+        self.memory_bytes = PreviewPagePool.PAGE_BASE_BYTES
+
+    def affected_by(self, path: str, is_dir: bool = False) -> bool:
+        if self.dependencies is None: # Not scanned: go by file type
+            return is_dir or os.path.splitext(path)[1].lower() in HTML_EXTENSIONS + CSS_EXTENSIONS + JS_EXTENSIONS
+        return affects(self.dependencies, path, is_dir) or affects(self.runtime_dependencies, path, is_dir)
+
+
+class PreviewPagePool(QObject):
+    """
+    Recently previewed pages, kept alive (frozen: no timers or scripts run)
+    so that showing one again is a page swap instead of a load. Least
+    recently shown pages are evicted first, when there are more than
+    MAX_PAGES or their estimated memory exceeds the budget. A page is
+    evicted when one of its dependencies changes, except for stylesheets,
+    which are swapped in when it is shown again.
+    """
+    MAX_PAGES = 6
+    PAGE_BASE_BYTES = 8 * 1024 * 1024 # Assumed for every page, on top of the in-page estimate
+    # Memory pooled pages may use (0 disables the pool). Configurable via QSettings.
+    MEMORY_BUDGET_SETTING_KEY = "Preview/PagePoolMemoryMB"
+    DEFAULT_MEMORY_BUDGET_MB = 256
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._entries: "OrderedDict[str, PooledPage]" = OrderedDict() # normalized path -> page, least recently shown first
+
+    def memory_budget(self) -> int:
+        """Returns the memory budget in bytes for pooled pages (0 = no pool)."""
+        value = QSettings().value(self.MEMORY_BUDGET_SETTING_KEY, self.DEFAULT_MEMORY_BUDGET_MB)
+        try:
+            budget_mb = float(value)
+        except (TypeError, ValueError):
+            logger.warning(f"Invalid page pool memory budget setting '{value}', using default.")
+            budget_mb = self.DEFAULT_MEMORY_BUDGET_MB
+        return max(0, int(budget_mb * 1024 * 1024))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, file_path: str) -> bool:
+        return normalized_path(file_path) in self._entries
+
+    def __iter__(self) -> Iterator[PooledPage]:
+        return iter(list(self._entries.values()))
+
+    def get(self, file_path: str) -> Optional[PooledPage]:
+        return self._entries.get(normalized_path(file_path))
+
+    def has_room(self) -> bool:
+        """Whether a page can be added without evicting one (what prefetching waits for)."""
+        used = sum(entry.memory_bytes for entry in self._entries.values())
+        return len(self._entries) < self.MAX_PAGES and used + self.PAGE_BASE_BYTES <= self.memory_budget()
+
+    def put(self, entry: PooledPage):
+        """Pools a page that is no longer shown (or a prefetched one, which goes in as least recent)."""
+        if self.memory_budget() <= 0:
+            entry.page.deleteLater()
+            return
+        key = normalized_path(entry.file_path)
+        old = self._entries.pop(key, None)
+        if old is not None and old is not entry:
+            old.page.deleteLater()
+        self._entries[key] = entry
+        if entry.prefetched:
+            self._entries.move_to_end(key, last=False)
+        if entry.loaded:
+            self.park(entry)
+        self._enforce_limits()
+
+    def take(self, file_path: str) -> Optional[PooledPage]:
+        """Removes and returns the pooled page for a file, made active again, if there is one."""
+        entry = self._entries.pop(normalized_path(file_path), None)
+        if entry is not None:
+            entry.page.setLifecycleState(QWebEnginePage.LifecycleState.Active)
+        return entry
+
+    def park(self, entry: PooledPage):
+        """Measures a loaded pooled page, then freezes it."""
+        def measured(result):
+            if self._entries.get(normalized_path(entry.file_path)) is not entry:
+                return # Shown again or evicted meanwhile
+            if isinstance(result, (int, float)):
+                entry.memory_bytes = self.PAGE_BASE_BYTES + int(result)
+            entry.page.setLifecycleState(QWebEnginePage.LifecycleState.Frozen)
+            self._enforce_limits()
+
+        entry.page.runJavaScript(_MEMORY_ESTIMATE_JS, QWebEngineScript.ScriptWorldId.ApplicationWorld.value, measured)
+
+    def discard(self, file_path: str):
+        entry = self._entries.pop(normalized_path(file_path), None)
+        if entry is not None:
+            entry.page.deleteLater()
+
+    def invalidate(self, path: str, is_dir: bool = False, full: bool = False):
+        """A file (or directory) changed: evicts the pages it invalidates, queues stylesheet swaps for the others."""
+        stylesheet = not full and not is_dir and os.path.splitext(path)[1].lower() in CSS_EXTENSIONS
+        for key, entry in list(self._entries.items()):
+            if not entry.affected_by(path, is_dir):
+                continue
+            if stylesheet and entry.loaded:
+                entry.changed_stylesheets.add(os.path.normpath(path))
+            else:
+                logger.debug(f"Evicting pooled preview page {entry.file_path}: {path} changed.")
+                del self._entries[key]
+                entry.page.deleteLater()
+
+    def clear(self):
+        for entry in self._entries.values():
+            entry.page.deleteLater()
+        self._entries.clear()
+
+    def _enforce_limits(self):
+        budget = self.memory_budget()
+        used = sum(entry.memory_bytes for entry in self._entries.values())
+        while self._entries and (len(self._entries) > self.MAX_PAGES or used > budget):
+            key, entry = self._entries.popitem(last=False)
+            used -= entry.memory_bytes
+            logger.debug(f"Evicting pooled preview page {entry.file_path} (pool limits).")
+            entry.page.deleteLater()
@@ -0,0 +1,87 @@
+# website_builder/views/problems_panel.py
+import os
+import logging
+from typing import List, Optional
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import QLabel, QStyle, QTreeWidget, QTreeWidgetItem, QVBoxLayout, QWidget
+
+from utils.lint_rules import ERROR, Diagnostic
+
+logger = logging.getLogger(__name__)
+
+
+class ProblemsPanel(QWidget):
+    """
+    Diagnostics of the open files (see utils.lint_service), grouped by file.
+    Activating a problem emits location_activated.
+    """
+    location_activated = pyqtSignal(str, int, int) # file_path, line, column (0-based)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project_root: Optional[str] = None
+        self._file_items = {} # file_path -> QTreeWidgetItem (only files with problems)
+        self._counts = {} # file_path -> (errors, warnings)
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        self.status_label = QLabel("No problems")
+        layout.addWidget(self.status_label)
+        self.problems_tree = QTreeWidget()
+        self.problems_tree.setHeaderHidden(True)
+        self.problems_tree.setUniformRowHeights(True)
+        self.problems_tree.itemActivated.connect(self._on_item_activated)
+        layout.addWidget(self.problems_tree)
+
+        self._error_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_MessageBoxCritical)
+        self._warning_icon = self.style().standardIcon(QStyle.StandardPixmap.SP_MessageBoxWarning)
+
+    def _display_path(self, file_path: str) -> str:
+        if self.project_root:
+            try:
+                return os.path.relpath(file_path, self.project_root)
+            except ValueError: # Different drive on Windows
+                pass
+        return file_path
+
+    def set_diagnostics(self, file_path: str, diagnostics: List[Diagnostic]):
+        """Replaces a file's problems (an empty list removes the file)."""
+        file_item = self._file_items.pop(file_path, None)
+        self._counts.pop(file_path, None)
+        expanded = True
+        if file_item is not None:
+            expanded = file_item.isExpanded()
+            self.problems_tree.takeTopLevelItem(self.problems_tree.indexOfTopLevelItem(file_item))
+        if diagnostics:
+            errors = sum(1 for d in diagnostics if d.severity == ERROR)
+            self._counts[file_path] = (errors, len(diagnostics) - errors)
+            file_item = QTreeWidgetItem([f"{self._display_path(file_path)} ({len(diagnostics)})"])
+            file_item.setData(0, Qt.ItemDataRole.UserRole, (file_path, diagnostics[0].line, diagnostics[0].column))
+            for diagnostic in diagnostics:
+                item = QTreeWidgetItem(file_item, [f"{diagnostic.message}    :{diagnostic.line + 1}:{diagnostic.column + 1}"])
+                item.setIcon(0, self._error_icon if diagnostic.severity == ERROR else self._warning_icon)
+                item.setData(0, Qt.ItemDataRole.UserRole, (file_path, diagnostic.line, diagnostic.column))
+            # Keep files in path order
+            paths = sorted(self._file_items)
+            index = next((i for i, path in enumerate(paths) if path > file_path), len(paths))
+            self.problems_tree.insertTopLevelItem(index, file_item)
+            file_item.setExpanded(expanded)
+            self._file_items[file_path] = file_item
+        self._update_status()
+
+    def clear(self):
+        self.problems_tree.clear()
+        self._file_items.clear()
+        self._counts.clear()
+        self._update_status()
+
+    def _update_status(self):
+        errors = sum(counts[0] for counts in self._counts.values())
+        warnings = sum(counts[1] for counts in self._counts.values())
+        self.status_label.setText(f"{errors} errors, {warnings} warnings" if errors or warnings else "No problems")
+
+    def _on_item_activated(self, item: QTreeWidgetItem, column: int):
+        location = item.data(0, Qt.ItemDataRole.UserRole)
+        if location:
+            self.location_activated.emit(*location)
@@ -0,0 +1,87 @@
+# website_builder/views/symbol_panel.py
+import os
+import logging
+from typing import List, Optional
+
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtWidgets import QLabel, QListWidget, QListWidgetItem, QSplitter, QVBoxLayout, QWidget
+
+from utils.symbol_extractor import OutlineEntry, Symbol
+
+logger = logging.getLogger(__name__)
+
+
+class SymbolPanel(QWidget):
+    """
+    Outline of the current file (ids, CSS rules, JS functions and variables)
+    above the results of the last go-to-definition / find-usages lookup.
+    Activating an entry emits location_activated.
+    """
+    location_activated = pyqtSignal(str, int, int) # file_path, line, column (0-based)
+
+    MAX_RESULTS = 2000 # More than this is not browsable anyway
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.project_root: Optional[str] = None
+        self.outline_path: Optional[str] = None
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(4, 4, 4, 4)
+        splitter = QSplitter(Qt.Orientation.Vertical)
+
+        outline_box = QWidget()
+        outline_layout = QVBoxLayout(outline_box)
+        outline_layout.setContentsMargins(0, 0, 0, 0)
+        self.outline_label = QLabel("Outline")
+        self.outline_list = QListWidget()
+        self.outline_list.itemActivated.connect(self._on_item_activated)
+        outline_layout.addWidget(self.outline_label)
+        outline_layout.addWidget(self.outline_list)
+
+        results_box = QWidget()
+        results_layout = QVBoxLayout(results_box)
+        results_layout.setContentsMargins(0, 0, 0, 0)
+        self.results_label = QLabel("Results")
+        self.results_list = QListWidget()
+        self.results_list.itemActivated.connect(self._on_item_activated)
+        results_layout.addWidget(self.results_label)
+        results_layout.addWidget(self.results_list)
+
+        splitter.addWidget(outline_box)
+        splitter.addWidget(results_box)
+        layout.addWidget(splitter)
+
+    def _display_path(self, file_path: str) -> str:
+        if self.project_root:
+            try:
+                return os.path.relpath(file_path, self.project_root)
+            except ValueError: # Different drive on Windows
+                pass
+        return file_path
+
+    def show_outline(self, file_path: Optional[str], entries: List[OutlineEntry]):
+        self.outline_path = file_path
+        self.outline_list.clear()
+        self.outline_label.setText(f"Outline: {os.path.basename(file_path)}" if file_path else "Outline")
+        for entry in entries:
+            item = QListWidgetItem(f"{entry.label}    :{entry.line + 1}")
+            item.setToolTip(entry.kind)
+            item.setData(Qt.ItemDataRole.UserRole, (file_path, entry.line, entry.column))
+            self.outline_list.addItem(item)
+
+    def show_results(self, title: str, symbols: List[Symbol]):
+        self.results_list.clear()
+        shown = symbols[:self.MAX_RESULTS]
+        suffix = f" (first {len(shown)} of {len(symbols)})" if len(shown) < len(symbols) else f" ({len(symbols)})"
+        self.results_label.setText(title + suffix)
+        for symbol in shown:
+            location = f"{self._display_path(symbol.file_path)}:{symbol.line + 1}:{symbol.column + 1}"
+            item = QListWidgetItem(f"{location}    {symbol.name} ({symbol.role})")
+            item.setData(Qt.ItemDataRole.UserRole, (symbol.file_path, symbol.line, symbol.column))
+            self.results_list.addItem(item)
+
+    def _on_item_activated(self, item: QListWidgetItem):
+        location = item.data(Qt.ItemDataRole.UserRole)
+        if location:
+            self.location_activated.emit(*location)
@@ -0,0 +1,130 @@
+# website_builder/views/syntax_highlighters.py
+import os
+import re
+import time
+import logging
+from typing import Optional
+
+from PyQt6.QtGui import QSyntaxHighlighter, QTextDocument
+
+from utils import syntax_lexer
+from utils.highlight_registry import HighlightFormatRegistry
+from utils.latency_metrics import HIGHLIGHT_BLOCK, LatencyMetrics
+
+logger = logging.getLogger(__name__)
+
+
+class LexerHighlighter(QSyntaxHighlighter):
+    """
+    Base highlighter driven by a single-pass lexer from utils.syntax_lexer.
+
+    Subclasses pick the language's lexer (its own rule table). The lexer state a
+    block ends in is stored as the block state, so multi-line constructs continue
+    correctly onto the following blocks.
+
+    Formats come from the shared HighlightFormatRegistry, which swaps them and
+    recolours the document when the theme changes.
+    """
+    LEXER: syntax_lexer.Lexer = syntax_lexer.HTML_LEXER
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.lexer = self.LEXER
+        registry = HighlightFormatRegistry.instance()
+        self.formats = registry.formats()
+        registry.register(self)
+        # Set by a HighlightScheduler while it time-slices a large document
+        self.scheduler = None
+        self.metrics = LatencyMetrics.instance()
+        self.highlight_ns = 0 # Time spent in highlightBlock while metrics are enabled
+
+    def highlightBlock(self, text):
+        if self.scheduler is not None and self.currentBlockState() == -1:
+            if not self.scheduler.is_released(self.currentBlock()):
+                # Leave the block untouched (state stays -1) so Qt stops its
+                # rehighlight cascade here; the scheduler will come back to it.
+                return
+
+        started = time.perf_counter_ns() if self.metrics.enabled else 0
+        state = self.previousBlockState()
+        if state < 0: # First block, or block not highlighted yet
+            state = self.lexer.initial_state
+
+        spans, end_state = self.lexer.lex_line(text, state)
+        formats = self.formats
+        for start, length, kind in spans:
+            self.setFormat(start, length, formats[kind])
+
+        # Changing the state makes Qt rehighlight the next block as well
+        self.setCurrentBlockState(end_state)
+
+        if started:
+            elapsed = time.perf_counter_ns() - started
+            self.highlight_ns += elapsed
+            self.metrics.record(HIGHLIGHT_BLOCK, elapsed)
+
+
+class HtmlHighlighter(LexerHighlighter):
+    """HTML highlighter; <style>/<script> bodies are lexed with the CSS/JS rules."""
+    LEXER = syntax_lexer.HTML_LEXER
+
+
+class CssHighlighter(LexerHighlighter):
+    """Stylesheet highlighter."""
+    LEXER = syntax_lexer.CSS_LEXER
+
+
+class JsHighlighter(LexerHighlighter):
+    """JavaScript highlighter."""
+    LEXER = syntax_lexer.JS_LEXER
+
+
+HIGHLIGHTERS = {
+    "html": HtmlHighlighter,
+    "css": CssHighlighter,
+    "js": JsHighlighter,
+}
+
+EXTENSION_LANGUAGES = {
+    ".html": "html", ".htm": "html", ".xhtml": "html",
+    ".css": "css",
+    ".js": "js", ".mjs": "js", ".cjs": "js",
+}
+
+# Content sniffing, used only for files without an extension (a file with an
+# unknown one, e.g. .py or .md, is some other language and stays plain text)
+_SNIFF_HTML = re.compile(r"\A\s*(?:<!doctype\s+html|<html|<head|<body|<!--|<[a-z][\w-]*[\s>])", re.IGNORECASE)
+_SNIFF_JS = re.compile(r"^\s*(?:import|export|const|let|var|function|class|'use strict'|\"use strict\")\b", re.MULTILINE)
+_SNIFF_CSS = re.compile(r"^\s*(?:@(?:import|media|charset|font-face)\b|[.#:\w\[\]*>+~\s,-]+\{\s*(?:[\w-]+\s*:|$))", re.MULTILINE)
+
+
+def sniff_language(file_path: str, content: str = "") -> Optional[str]:
+    """
+    Guesses 'html', 'css' or 'js' for a file by its extension, or for a file
+    without one by looking at the start of its content. Returns None if
+    nothing matches.
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    if extension:
+        return EXTENSION_LANGUAGES.get(extension)
+
+    sample = content[:4096]
+    if not sample.strip():
+        return None
+    if _SNIFF_HTML.search(sample):
+        return "html"
+    if _SNIFF_CSS.search(sample):
+        return "css"
+    if _SNIFF_JS.search(sample):
+        return "js"
+    return None
+
+
+def create_highlighter(file_path: str, document: QTextDocument, content: str = "") -> Optional[LexerHighlighter]:
+    """Attaches the highlighter matching the file's language, if any."""
+    language = sniff_language(file_path, content)
+    if language is None:
+        return None
+    highlighter = HIGHLIGHTERS[language](document)
+    logger.debug(f"Applied {language} syntax highlighter for: {file_path}")
+    return highlighter
@@ -0,0 +1,59 @@
+# website_builder/views/tab_hibernation.py
+import zlib
+from typing import NamedTuple
+
+from PyQt6.QtGui import QTextCursor, QTextDocument
+from PyQt6.QtWidgets import QPlainTextEdit
+
+# Rough per-block cost of a laid-out, highlighted QTextDocument block (block
+# data, layout, format ranges), on top of two bytes per character
+BLOCK_OVERHEAD_BYTES = 400
+
+COMPRESSION_LEVEL = 1 # Fast; markup still shrinks to a fraction of its size
+
+
+def estimated_document_bytes(document: QTextDocument) -> int:
+    """Approximate memory held by an editor document (text, blocks, layout)."""
+    return document.characterCount() * 2 + document.blockCount() * BLOCK_OVERHEAD_BYTES
+
+
+class HibernatedTab(NamedTuple):
+    """
+    A clean tab whose document was unloaded: the text compressed, plus what is
+    needed to put the view back the way the user left it.
+    """
+    data: bytes
+    encoding: str
+    cursor_position: int
+    cursor_anchor: int
+    vertical_scroll: int
+    horizontal_scroll: int
+
+    @classmethod
+    def capture(cls, editor: QPlainTextEdit, text: str) -> "HibernatedTab":
+        cursor = editor.textCursor()
+        return cls(
+            cls.compress(text),
+            editor.property("encoding") or "utf-8",
+            cursor.position(),
+            cursor.anchor(),
+            editor.verticalScrollBar().value(),
+            editor.horizontalScrollBar().value(),
+        )
+
+    @staticmethod
+    def compress(text: str) -> bytes:
+        return zlib.compress(text.encode("utf-8", "surrogatepass"), COMPRESSION_LEVEL)
+
+    def text(self) -> str:
+        return zlib.decompress(self.data).decode("utf-8", "surrogatepass")
+
+    def restore_view(self, editor: QPlainTextEdit):
+        """Puts the cursor, selection and scroll position back (clamped to the current text)."""
+        last_position = editor.document().characterCount() - 1
+        cursor = editor.textCursor()
+        cursor.setPosition(min(self.cursor_anchor, last_position))
+        cursor.setPosition(min(self.cursor_position, last_position), QTextCursor.MoveMode.KeepAnchor)
+        editor.setTextCursor(cursor)
+        editor.verticalScrollBar().setValue(self.vertical_scroll)
+        editor.horizontalScrollBar().setValue(self.horizontal_scroll)
@@ -1,18 +1,117 @@
 # website_builder/views/web_preview.py
 import os
+import json
 import logging
 from PyQt6.QtWidgets import QWidget, QVBoxLayout, QMessageBox
 from PyQt6.QtWebEngineWidgets import QWebEngineView
-from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineSettings
-from PyQt6.QtCore import QUrl, QTimer, QFileSystemWatcher, QFileInfo
+from PyQt6.QtWebEngineCore import QWebEnginePage, QWebEngineProfile, QWebEngineScript, QWebEngineSettings
+from PyQt6.QtCore import QUrl, QThreadPool, QTimer, QFileInfo
+
+from utils.file_loader import decode_text
+from utils.overlay_scheme import SCHEME, OverlayFileSystem, OverlaySchemeHandler
+from utils.fs_events import DELETED, RESCAN, FileSystemEventService
+from utils.html_patch import ELEMENT, document_patch, plan_patch, scripts_changed
+from utils.page_dependencies import DependencyScanTask, affects, normalized_path
+
+from .preview_page_pool import PooledPage, PreviewPagePool
 
 logger = logging.getLogger(__name__)
 
+# Changes to these need the page reloaded; stylesheets are swapped in place.
+# (Until the page's dependencies are known, changes to other files are ignored.)
+FULL_RELOAD_EXTENSIONS = (".html", ".htm", ".js", ".mjs")
+STYLESHEET_EXTENSIONS = (".css",)
+
+# Morphs unsaved edits into the page (injected into every page it loads)
+LIVE_PATCH_SCRIPT_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "resources", "preview", "live_patch.js"
+)
+
+# Everything the page fetched so far (including what its scripts loaded)
+_RESOURCE_URLS_JS = "performance.getEntriesByType('resource').map((entry) => entry.name)"
+
+# The pages the page links to (candidates for prefetching)
+_LINK_URLS_JS = "Array.from(document.links, (link) => link.href)"
+
+# Replaces the <link rel="stylesheet"> elements (in the page and same-origin
+# iframes) whose URL is one of `targets` with a copy carrying a cache-busting
+# token; the old element is removed once the new sheet has loaded, so there is
+# no flash of unstyled content. Returns the number of links swapped, or -1 if
+# a target is only pulled in through @import (which needs a reload).
+_SWAP_STYLESHEETS_JS = """
+(function (targets, token) {
+    const key = (href) => {
+        try { const url = new URL(href, document.baseURI); return url.origin + decodeURIComponent(url.pathname); }
+        catch (e) { return null; }
+    };
+    const wanted = new Set(targets.map(key));
+    let swapped = 0, imported = false;
+    const importsWanted = (sheet) => {
+        let rules;
+        try { rules = sheet.cssRules; } catch (e) { return false; }
+        for (const rule of rules) {
+            // Only @import rules have a styleSheet (instanceof would fail for iframe rules)
+            if (rule.styleSheet && (wanted.has(key(rule.styleSheet.href)) || importsWanted(rule.styleSheet))) {
+                return true;
+            }
+        }
+        return false;
+    };
+    const visit = (doc) => {
+        doc.querySelectorAll('link[rel~="stylesheet"][href]:not([data-flexta-stale])').forEach((link) => {
+            if (!wanted.has(key(link.href))) { return; }
+            const url = new URL(link.href);
+            url.searchParams.set("flexta-css", token);
+            const fresh = link.cloneNode();
+            fresh.href = url.href;
+            link.dataset.flextaStale = "1";
+            fresh.addEventListener("load", () => link.remove(), { once: true });
+            fresh.addEventListener("error", () => link.remove(), { once: true });
+            link.after(fresh);
+            swapped++;
+        });
+        for (const sheet of doc.styleSheets) {
+            if (importsWanted(sheet)) { imported = true; }
+        }
+        for (const frame of doc.querySelectorAll("iframe")) {
+            try { if (frame.contentDocument) { visit(frame.contentDocument); } } catch (e) { /* Cross-origin */ }
+        }
+    };
+    visit(document);
+    return imported ? -1 : swapped;
+})
+"""
+
 class WebPreview(QWidget):
     """
     A widget using QWebEngineView to display a live preview of an HTML file.
-    Includes basic live reload functionality for the project's root directory.
+    Includes live reload for the project directory tree: changed stylesheets
+    are swapped into the page in place (keeping scroll position and script
+    state), other changes reload the page. Only changes to the page's
+    dependencies count: the files it references (followed through CSS,
+    module imports and iframes, see utils.page_dependencies), found when it
+    has loaded, plus whatever it fetched at runtime.
+
+    Unsaved edits of the previewed page are shown as you type: the editor's
+    text is patched into the page's DOM (see utils.html_patch and
+    resources/preview/live_patch.js) instead of reloading it, so scroll
+    position, form input and running scripts are kept. Saving such a page
+    then needs no reload, unless its scripts changed.
+
+    Pages are loaded through the flexta: scheme (utils.overlay_scheme), which
+    serves files with unsaved edits from their editor buffers: stylesheets
+    being edited are swapped in as you type, and a (re)loaded page picks up
+    unsaved scripts, all without saving.
+
+    Recently previewed pages stay alive in a PreviewPagePool: going back to
+    one swaps its page into the view (scroll position and script state
+    included) instead of loading it again. Pages the current one links to
+    are loaded into the pool in the background while it has room.
     """
+    LIVE_PATCH_DELAY_MS = 150 # Typing pause before an edit is patched into the page
+    LIVE_PATCH_MAX_CHARS = 2 * 1024 * 1024 # Bigger pages are only updated on save
+    PREFETCH_LINKED_PAGES = 2 # Linked pages loaded in the background per page (0: none)
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.layout = QVBoxLayout(self)
@@ -20,9 +119,10 @@ class WebPreview(QWidget):
 
         self.webview = QWebEngineView()
         self.layout.addWidget(self.webview)
+        self.profile = QWebEngineProfile.defaultProfile()
 
         # --- Configure WebEngine Settings ---
-        settings = self.webview.settings()
+        settings = self.profile.settings() # Defaults for every page the preview creates
         # Enable essential features for local development
         settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptEnabled, True)
         settings.setAttribute(QWebEngineSettings.WebAttribute.LocalContentCanAccessFileUrls, True) # Crucial for local CSS/JS/images
@@ -36,20 +136,56 @@ class WebPreview(QWidget):
         # settings.setAttribute(QWebEngineSettings.WebAttribute.JavascriptCanAccessClipboard, True) # Optional
         # settings.setAttribute(QWebEngineSettings.WebAttribute.AllowRunningInsecureContent, True) # Optional, use with caution
 
+        # Project files as the page sees them: unsaved editor text over the disk
+        self.overlay = OverlayFileSystem()
+        self.scheme_handler = OverlaySchemeHandler(self.overlay, self)
+        self.profile.installUrlSchemeHandler(SCHEME.encode(), self.scheme_handler)
+
         self.current_file = None # Path to the currently loaded HTML file
         self.project_root = None # Root directory of the current project
 
-        # --- File Watcher for Live Reload (Watches project root only) ---
-        self.project_watcher = QFileSystemWatcher(self)
-        self.project_watcher.directoryChanged.connect(self._schedule_reload)
-        self.project_watcher.fileChanged.connect(self._schedule_reload) # Watch for direct file changes too
-        self.watched_path = None # Store the single path being watched
+        # --- Live Reload: subscription to the shared filesystem event service (whole project tree) ---
+        self.watched_path = None # Project root we are subscribed to
+        self.fs_subscription = None
 
         # Debounce timer for reloads to avoid excessive reloads on multiple quick changes
         self.reload_timer = QTimer(self)
         self.reload_timer.setInterval(500) # 500ms delay before reloading
         self.reload_timer.setSingleShot(True)
         self.reload_timer.timeout.connect(self.perform_reload)
+        self._full_reload_pending = False
+        self._changed_stylesheets = set() # Paths of .css files to swap on the next reload
+        self._stylesheet_token = 0 # Cache buster for swapped stylesheets
+
+        # Dependencies of the current page (normalized paths); None until scanned
+        self.dependencies = None
+        self._runtime_dependencies = set() # Resources the loaded page fetched (e.g. by script)
+        self._scan_generation = 0
+        self.scan_pool = QThreadPool(self)
+        self.scan_pool.setMaxThreadCount(1)
+        self._tasks = set() # Keeps running scan tasks (and their signals) alive
+        self.webview.loadStarted.connect(self._on_load_started)
+        self.webview.loadFinished.connect(self._on_load_finished)
+
+        # --- Live preview of unsaved edits ---
+        self.buffer_source = None # file_path -> the editor's text of the file, or None; set by the controller
+        self.live_patch_timer = QTimer(self)
+        self.live_patch_timer.setInterval(self.LIVE_PATCH_DELAY_MS)
+        self.live_patch_timer.setSingleShot(True)
+        self.live_patch_timer.timeout.connect(self._patch_from_buffer)
+        self._loaded_text = None # Source text of the loaded page (None: not loaded, or not the current file)
+        self._page_text = None # Source text the page's DOM reflects (the loaded one plus patches)
+        self._page_generation = 0 # Counts loads, so patches finishing after one are ignored
+        self._buffer_pending = False
+        self._patch_in_flight = False
+        self._failed_text = None # Text whose patch broke the page (not retried)
+        self._live_patch_script = self._load_live_patch_script() # Inserted into every page
+        self._live_patch_available = self._live_patch_script is not None
+
+        # --- Pages kept alive for instant switching ---
+        # Pages are owned by this widget, not the view, which would delete a page it replaces
+        self.page_pool = PreviewPagePool(self)
+        self.webview.setPage(self._new_page())
 
         # Set initial placeholder content
         self.webview.setHtml("<p>Open an HTML file or project folder to start the preview.</p>",
@@ -65,21 +201,24 @@ class WebPreview(QWidget):
              # Optionally clear preview or show error?
              return
 
+        fs_events = FileSystemEventService.instance()
         # Stop watching old path if different
         if self.watched_path and self.watched_path != root_path:
-             self.project_watcher.removePath(self.watched_path)
+             fs_events.unsubscribe(self.fs_subscription)
              logger.debug(f"Stopped watching old path: {self.watched_path}")
              self.watched_path = None
+             self.fs_subscription = None
 
+        if self.project_root != root_path:
+            self.page_pool.clear() # Pages of another project
         self.project_root = root_path
+        self.overlay.set_root(root_path)
 
         # Start watching the new root directory if not already watched
         if self.watched_path != root_path:
-             if self.project_watcher.addPath(root_path):
-                 self.watched_path = root_path
-                 logger.debug(f"Started watching new path: {self.watched_path}")
-             else:
-                 logger.error(f"Failed to add path to watcher: {root_path}")
+             self.fs_subscription = fs_events.subscribe(root_path, self._on_project_events)
+             self.watched_path = root_path
+             logger.debug(f"Started watching new path: {self.watched_path}")
 
         # Attempt to automatically load index.html if it exists
         index_html_path = os.path.join(root_path, "index.html")
@@ -114,15 +253,24 @@ class WebPreview(QWidget):
              # self.webview.setHtml(f"<p>Cannot preview non-HTML file: {os.path.basename(file_path)}</p>")
              return
 
-        self.current_file = file_path
         # Ensure the project root is set correctly, infer if necessary
         if not self.project_root or not file_path.startswith(self.project_root):
              containing_dir = os.path.dirname(file_path)
              logger.warning(f"Loaded file '{os.path.basename(file_path)}' is outside current project root '{self.project_root}'. Setting root to '{containing_dir}'.")
              self.set_project_root(containing_dir) # Treat containing dir as root if no project set or file is outside
 
-        # Use file:/// URL for local files, crucial for relative paths (CSS, JS, images)
-        url = QUrl.fromLocalFile(file_path)
+        entry = self.page_pool.take(file_path) if normalized_path(file_path) != normalized_path(self.current_file or "") else None
+        stashed = self._stash_current_page(file_path)
+        self.current_file = file_path
+        self._forget_dependencies()
+        if entry is not None:
+            self._show_pooled_page(entry, stashed)
+            return
+        if stashed:
+            self.webview.setPage(self._new_page())
+
+        # Served by the overlay scheme, so unsaved edits of the page and what it loads are shown
+        url = self._url_for_path(file_path)
         logger.info(f"Loading URL in preview: {url.toString()}")
         self.webview.load(url)
 
@@ -131,6 +279,7 @@ class WebPreview(QWidget):
          """Clears the preview and resets the current file."""
          logger.info(f"Clearing preview: {message}")
          self.current_file = None
+         self._forget_dependencies()
          # Stop webview loading if any
          self.webview.stop()
          # Provide a base URL even for the cleared message
@@ -140,26 +289,332 @@ class WebPreview(QWidget):
          self.webview.setHtml(f"<p>{message}</p>", base_url)
 
 
-    def _schedule_reload(self, path: str):
-        """Schedules a reload using a debounced timer."""
-        # This gets triggered for file or directory changes within the watched root
-        logger.debug(f"Watcher detected change in '{path}'. Scheduling reload.")
-        # Check if the change is relevant (e.g., ignore changes to non-web files?)
-        # Simple approach: reload if *any* change happens in the watched root.
-        # More complex: check file extension, check if it's linked from current HTML etc.
-        if self.current_file:
-             # Debounce the reload requests - restart timer on each trigger
-             self.reload_timer.start()
+    # --- Page pool ---
+    def _new_page(self) -> QWebEnginePage:
+        page = QWebEnginePage(self.profile, self)
+        if self._live_patch_script is not None:
+            page.scripts().insert(self._live_patch_script)
+        return page
+
+    def _stash_current_page(self, next_file: str) -> bool:
+        """Moves the page showing the current file into the pool, if it is worth keeping; True if it was."""
+        if (not self.current_file or normalized_path(next_file) == normalized_path(self.current_file)
+                or self._loaded_text is None # Not (successfully) loaded yet
+                or self._patch_in_flight or self._full_reload_pending or self.page_pool.memory_budget() <= 0):
+            return False
+        entry = PooledPage(self.webview.page(), self.current_file)
+        entry.dependencies, entry.runtime_dependencies = self.dependencies, self._runtime_dependencies
+        entry.loaded_text, entry.page_text = self._loaded_text, self._page_text
+        entry.changed_stylesheets = self._changed_stylesheets
+        self.reload_timer.stop()
+        self.live_patch_timer.stop()
+        self._changed_stylesheets = set()
+        self._page_generation += 1 # Callbacks still due are for the pooled page
+        self._loaded_text = self._page_text = None
+        self.page_pool.put(entry)
+        logger.debug(f"Pooled preview page: {entry.file_path}")
+        return True
+
+    def _show_pooled_page(self, entry: PooledPage, stashed: bool):
+        """Swaps a pooled page of the current file into the view, restoring what is tracked about it."""
+        old_page = self.webview.page()
+        self.webview.setPage(entry.page)
+        if not stashed:
+            old_page.deleteLater()
+        logger.info(f"Showing pooled preview page: {self.current_file}")
+        self.reload_timer.stop()
+        self._full_reload_pending = False
+        self._page_generation += 1
+        self._patch_in_flight = False
+        self.dependencies, self._runtime_dependencies = entry.dependencies, entry.runtime_dependencies
+        self._loaded_text, self._page_text = entry.loaded_text, entry.page_text
+        if not entry.loaded:
+            return # Prefetched and still loading: the view reports when it has finished
+        self._buffer_pending = True # Edits made while it was pooled
+        self._patch_from_buffer()
+        if entry.prefetched: # Never shown yet: do what is done for a freshly loaded page
+            self._prefetch_linked_pages()
+            self._track_dependencies()
+        elif entry.changed_stylesheets:
+            self._changed_stylesheets = entry.changed_stylesheets
+            self.perform_reload() # Swaps them, then rescans
+        elif self.dependencies is None:
+            self._scan_dependencies()
+
+    def _prefetch_linked_pages(self):
+        """Loads pages the current one links to into the pool, while it has room."""
+        if self.PREFETCH_LINKED_PAGES <= 0 or not self.current_file:
+            return
+        current_file = self.current_file
+
+        def linked(urls):
+            if self.current_file != current_file or not isinstance(urls, list):
+                return
+            prefetched = 0
+            for url in urls:
+                if prefetched >= self.PREFETCH_LINKED_PAGES or not self.page_pool.has_room():
+                    break
+                path = self._path_for_url(url) if isinstance(url, str) else None
+                if path and os.path.isdir(path):
+                    path = os.path.join(path, "index.html")
+                if (not path or not path.lower().endswith((".html", ".htm")) or path in self.page_pool
+                        or normalized_path(path) == normalized_path(current_file) or not os.path.isfile(path)):
+                    continue
+                self._prefetch(path)
+                prefetched += 1
+
+        self.webview.page().runJavaScript(_LINK_URLS_JS, QWebEngineScript.ScriptWorldId.ApplicationWorld.value, linked)
+
+    def _prefetch(self, file_path: str):
+        logger.debug(f"Prefetching linked page: {file_path}")
+        entry = PooledPage(self._new_page(), file_path, prefetched=True)
+        entry.page.loadFinished.connect(lambda ok, entry=entry: self._on_prefetch_finished(entry, ok))
+        self.page_pool.put(entry)
+        entry.page.load(self._url_for_path(file_path))
+
+    def _on_prefetch_finished(self, entry: PooledPage, ok: bool):
+        if entry.loaded or self.page_pool.get(entry.file_path) is not entry:
+            return # Shown meanwhile (the view took over), evicted, or a later navigation of the page
+        if not ok:
+            self.page_pool.discard(entry.file_path)
+            return
+        entry.loaded = True
+        file = self.overlay.read(entry.file_path) # What it was served, for patching it when shown
+        if file is not None:
+            entry.loaded_text = entry.page_text = (
+                file.data.decode("utf-8", "surrogatepass") if file.from_buffer else decode_text(file.data)[0]
+            )
+        self.page_pool.park(entry)
+
+    # --- Dependencies ---
+    def _forget_dependencies(self):
+        self._scan_generation += 1 # Scans still running are for another page
+        self.dependencies = None
+        self._runtime_dependencies = set()
+
+    def _on_load_started(self):
+        self._page_generation += 1
+        self._loaded_text = self._page_text = None
+        self._patch_in_flight = False
+
+    def _on_load_finished(self, ok: bool):
+        if not self.current_file:
+            return
+        if ok and self._path_for_url(self.webview.url().toString()) == os.path.normpath(self.current_file):
+            self._loaded_text = self._page_text = self._read_page_text()
+            self._buffer_pending = True # The editor may hold unsaved edits of it
+            self._patch_from_buffer()
+            self._prefetch_linked_pages()
+        self._track_dependencies()
+
+    def _track_dependencies(self):
+        """Finds what the loaded page depends on: the files it references, and what it fetched."""
+        self._scan_dependencies()
+        current_file = self.current_file
+
+        def fetched(urls):
+            if self.current_file != current_file or not isinstance(urls, list):
+                return
+            self._runtime_dependencies = {
+                normalized_path(path) for path in map(self._path_for_url, urls) if path
+            }
+
+        self.webview.page().runJavaScript(_RESOURCE_URLS_JS, QWebEngineScript.ScriptWorldId.ApplicationWorld.value, fetched)
+
+    def _scan_dependencies(self):
+        """(Re)discovers the current page's dependencies on a worker thread."""
+        self._scan_generation += 1
+        task = DependencyScanTask(self._scan_generation, self.current_file, self.project_root or os.path.dirname(self.current_file))
+        task.signals.finished.connect(lambda generation, dependencies, task=task: self._on_dependencies_scanned(task, generation, dependencies))
+        self._tasks.add(task)
+        self.scan_pool.start(task)
+
+    def _on_dependencies_scanned(self, task: DependencyScanTask, generation: int, dependencies):
+        self._tasks.discard(task)
+        if generation == self._scan_generation and dependencies is not None:
+            self.dependencies = dependencies
+            logger.debug(f"Preview page has {len(dependencies)} dependencies: {self.current_file}")
+
+    def _url_for_path(self, path: str) -> QUrl:
+        """The URL the page loads a local file by (a file: URL outside the project)."""
+        return self.overlay.url_for_path(path) or QUrl.fromLocalFile(path)
+
+    def _path_for_url(self, url: str):
+        """The local file a URL the page loaded refers to, if any."""
+        qurl = QUrl(url)
+        if qurl.isLocalFile():
+            return os.path.normpath(qurl.toLocalFile())
+        return self.overlay.path_for_url(qurl)
+
+    def _affects_page(self, path: str, is_dir: bool = False) -> bool:
+        """Whether a change of `path` matters to the current page."""
+        if self.dependencies is None: # Not scanned yet: go by file type
+            return is_dir or os.path.splitext(path)[1].lower() in FULL_RELOAD_EXTENSIONS + STYLESHEET_EXTENSIONS
+        return affects(self.dependencies, path, is_dir) or affects(self._runtime_dependencies, path, is_dir)
+
+    def _on_project_events(self, events):
+        """Batched filesystem events from anywhere in the project tree."""
+        for event in events:
+            if event.kind == RESCAN: # Events were lost: anything may have changed
+                self.page_pool.clear()
+                self._schedule_reload(event.path, full=True)
+                continue
+            self.page_pool.invalidate(event.path, event.is_dir, full=event.kind == DELETED)
+            if self._affects_page(event.path, event.is_dir):
+                # Deleted files and changed directories are not worth patching in
+                self._schedule_reload(event.path, full=event.kind == DELETED or event.is_dir)
+
+    def notify_file_saved(self, file_path: str):
+        """
+        Reports a file written by the editor (the application's own writes
+        are not delivered as filesystem events).
+        """
+        self.page_pool.invalidate(file_path)
+        if self._patches_cover(file_path):
+            return # The page already shows the saved text (or is about to)
+        if self._affects_page(file_path):
+            self._schedule_reload(os.path.normpath(file_path))
+
+    def _schedule_reload(self, path: str, full: bool = False):
+        """Schedules a stylesheet swap or a full reload using a debounced timer."""
+        if not self.current_file:
+            return
+        if not full and os.path.splitext(path)[1].lower() in STYLESHEET_EXTENSIONS:
+            logger.debug(f"Stylesheet '{path}' changed. Scheduling swap.")
+            self._changed_stylesheets.add(path)
+        else:
+            logger.debug(f"Change in '{path}'. Scheduling reload.")
+            self._full_reload_pending = True
+        # Debounce the reload requests - restart timer on each trigger
+        self.reload_timer.start()
 
 
     def perform_reload(self):
-        """Reloads the currently loaded file in the webview."""
-        if self.current_file:
+        """Applies the changes collected since the last reload to the current page."""
+        full, stylesheets = self._full_reload_pending, self._changed_stylesheets
+        self._full_reload_pending, self._changed_stylesheets = False, set()
+        if not self.current_file:
+            logger.debug("Reload triggered but no current file loaded.")
+            return
+        if full:
             logger.info(f"Performing reload for: {self.current_file}")
             self.webview.reload() # Reload the current page in the webview
-        else:
-             logger.debug("Reload triggered but no current file loaded.")
+        elif stylesheets:
+            self._swap_stylesheets(stylesheets)
+            self._scan_dependencies() # The stylesheets may reference new fonts or images
+
+    def _swap_stylesheets(self, paths):
+        """Swaps changed stylesheets into the page in place (reloading only if that is not possible)."""
+        self._stylesheet_token += 1
+        urls = [self._url_for_path(path).toString(QUrl.ComponentFormattingOption.FullyEncoded) for path in sorted(paths)]
+        script = f"{_SWAP_STYLESHEETS_JS}({json.dumps(urls)}, {json.dumps(str(self._stylesheet_token))})"
+        current_file = self.current_file
+
+        def swapped(result):
+            if self.current_file != current_file:
+                return # Navigated away meanwhile
+            if not isinstance(result, (int, float)) or result < 0:
+                logger.info(f"Stylesheet change needs a reload (result: {result}): {self.current_file}")
+                self.webview.reload()
+            else:
+                logger.debug(f"Swapped {int(result)} stylesheet link(s) in place.")
+
+        # Isolated world: the page's own scripts cannot interfere (the DOM is shared)
+        self.webview.page().runJavaScript(script, QWebEngineScript.ScriptWorldId.ApplicationWorld.value, swapped)
+
+
+    # --- Live preview of unsaved edits ---
+    def _load_live_patch_script(self):
+        try:
+            with open(LIVE_PATCH_SCRIPT_PATH, "r", encoding="utf-8") as f:
+                source = f.read()
+        except OSError as e:
+            logger.error(f"Live patch script unavailable, unsaved edits will not be previewed: {e}")
+            return None
+        script = QWebEngineScript()
+        script.setName("flexta-live-patch")
+        script.setSourceCode(source)
+        script.setInjectionPoint(QWebEngineScript.InjectionPoint.DocumentCreation)
+        script.setWorldId(QWebEngineScript.ScriptWorldId.ApplicationWorld.value)
+        script.setRunsOnSubFrames(False)
+        return script
+
+    def _read_page_text(self):
+        """The current file's text as the overlay serves it (what the page was loaded from), or None."""
+        file = self.overlay.read(self.current_file)
+        if file is None:
+            logger.warning(f"Could not read the previewed file {self.current_file}")
+            return None
+        return file.data.decode("utf-8", "surrogatepass") if file.from_buffer else decode_text(file.data)[0]
+
+    def _buffer_text(self):
+        """The editor's text of the current page, if it can be patched in."""
+        if not self._live_patch_available or not self.current_file or self.buffer_source is None:
+            return None
+        text = self.buffer_source(self.current_file)
+        if text is None or len(text) > self.LIVE_PATCH_MAX_CHARS or text == self._failed_text:
+            return None
+        return text
+
+    def _patches_cover(self, file_path: str) -> bool:
+        """Whether saving file_path needs no reload: it is the page, and its saved text is patched in."""
+        if (self._page_text is None or not self.current_file
+                or normalized_path(file_path) != normalized_path(self.current_file)):
+            return False
+        text = self._buffer_text()
+        if text is None or scripts_changed(self._loaded_text, text): # Patches do not run scripts
+            return False
+        return text == self._page_text or self._buffer_pending or self._patch_in_flight
+
+    def buffer_changed(self, file_path: str):
+        """
+        Reports an edit of an open file: edits of the previewed page are
+        patched into it shortly, edited stylesheets it uses are swapped in.
+        """
+        if os.path.splitext(file_path)[1].lower() in STYLESHEET_EXTENSIONS:
+            self.page_pool.invalidate(file_path) # Swapped into pooled pages when shown
+        if not self.current_file:
+            return
+        if normalized_path(file_path) == normalized_path(self.current_file):
+            if self._live_patch_available:
+                self._buffer_pending = True
+                self.live_patch_timer.start()
+        elif os.path.splitext(file_path)[1].lower() in STYLESHEET_EXTENSIONS and self._affects_page(file_path):
+            self._schedule_reload(os.path.normpath(file_path))
+
+    def _patch_from_buffer(self):
+        """Patches the editor's text of the current page into it (one patch at a time)."""
+        if not self._buffer_pending or self._patch_in_flight or self._page_text is None:
+            return # Picked up once the page has loaded or the running patch is done
+        self._buffer_pending = False
+        text = self._buffer_text()
+        if text is None or text == self._page_text:
+            return
+        self._send_patch(plan_patch(self._page_text, text), text)
+
+    def _send_patch(self, patch: dict, text: str):
+        generation = self._page_generation
+        self._patch_in_flight = True
+
+        def applied(result):
+            if generation != self._page_generation:
+                return # The page was (re)loaded meanwhile
+            self._patch_in_flight = False
+            if result in ("element", "document"):
+                self._page_text = text
+                self._patch_from_buffer() # Edits made while this one ran
+            elif patch["mode"] == ELEMENT:
+                # The DOM no longer matches the source (changed by a script, or
+                # fixed up by the parser): morph the whole document instead
+                logger.debug("Element patch did not fit the page, morphing the document.")
+                self._send_patch(document_patch(text), text)
+            else:
+                logger.warning(f"Live patch failed (result: {result}), reloading: {self.current_file}")
+                self._failed_text = text # Until the next edit
+                self.webview.reload()
 
+        script = f"window.__flextaLivePatch ? window.__flextaLivePatch.apply({json.dumps(patch)}) : null"
+        self.webview.page().runJavaScript(script, QWebEngineScript.ScriptWorldId.ApplicationWorld.value, applied)
 
     def update_preview_content(self, html_content: str):
         """